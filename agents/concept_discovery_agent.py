@@ -59,7 +59,8 @@ class ConceptDiscoveryAgent:
             # 调用LLM
             response = await self.llm_client.call_json(
                 prompt=prompt,
-                system_role="你是一个跨学科知识专家，擅长发现不同领域之间的深层联系。"
+                system_role="你是一个跨学科知识专家，擅长发现不同领域之间的深层联系。",
+                task="discover"
             )
             
             # 提取概念列表
@@ -129,7 +130,8 @@ class ConceptDiscoveryAgent:
             # 调用LLM
             response = await self.llm_client.call_json(
                 prompt=prompt,
-                system_role="你是一个跨学科知识专家。"
+                system_role="你是一个跨学科知识专家。",
+                task="discover"
             )
             
             # 提取概念列表
@@ -55,7 +55,10 @@ class GraphBuilderAgent:
             # 调用LLM
             response = await self.llm_client.call_json(
                 prompt=prompt,
-                system_role="你是一个图数据结构专家，擅长将知识转换为标准化的图结构。"
+                system_role="你是一个图数据结构专家，擅长将知识转换为标准化的图结构。",
+                schema=self.prompt_generator.GRAPH_SCHEMA,
+                hedge_site="graph_builder",
+                task="graph_build"
             )
             
             # 提取节点和边
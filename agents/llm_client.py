@@ -3,13 +3,41 @@
 import os
 import asyncio
 import logging
+from dataclasses import replace
 from typing import Optional, Dict, Any, List
-from openai import AsyncOpenAI
 from shared.error_codes import ErrorCode
+from shared.circuit_breaker import CircuitOpenError, get_circuit_breaker
 from shared.constants import AgentConfig
+from shared.llm_cache import get_llm_cache
+from shared.llm_hedge import get_hedge_policy
+from shared.model_router import Route, get_model_router
+from shared.openai_clients import get_openai_client
+from shared.rate_limiter import request_priority
 
 logger = logging.getLogger(__name__)
 
+# call_json各解析路径的使用次数（direct / repaired / salvaged / salvage_rejected / structured_* / regenerated / failed）
+_json_path_stats: Dict[str, int] = {}
+# 提供方拒绝过response_format的模型
+_structured_unsupported: set = set()
+
+
+def _count_json_path(path: str):
+    _json_path_stats[path] = _json_path_stats.get(path, 0) + 1
+
+
+def get_json_path_stats() -> Dict[str, int]:
+    """call_json解析路径统计（/metrics）"""
+    return dict(_json_path_stats)
+
+
+def _missing_required(result: Any, schema: Dict[str, Any]) -> List[str]:
+    """schema顶层required字段中result缺少的部分（result不是对象时全部视为缺少）"""
+    required = schema.get("required") or []
+    if not isinstance(result, dict):
+        return list(required) if schema.get("type") == "object" else []
+    return [key for key in required if key not in result]
+
 
 class LLMClient:
     """LLM客户端（支持OpenRouter + Gemini）"""
@@ -51,10 +79,7 @@ class LLMClient:
         
         # 初始化OpenAI客户端（兼容OpenRouter）
         if self.api_key:
-            self.client = AsyncOpenAI(
-                api_key=self.api_key,
-                base_url=self.base_url
-            )
+            self.client = get_openai_client("agent", api_key=self.api_key, base_url=self.base_url)
             logger.info(f"LLM Client initialized: model={self.model}, base_url={self.base_url}")
         else:
             self.client = None
@@ -64,7 +89,10 @@ class LLMClient:
         prompt: str,
         system_role: str = "You are a helpful assistant.",
         max_retries: int = AgentConfig.MAX_RETRIES,
-        messages_history: Optional[List[Dict]] = None
+        messages_history: Optional[List[Dict]] = None,
+        cache_site: Optional[str] = "agent",
+        hedge_site: Optional[str] = None,
+        task: Optional[str] = None
     ) -> str:
         """
         调用LLM（带重试机制和推理支持）
@@ -73,7 +101,11 @@ class LLMClient:
             prompt: 用户提示
             system_role: 系统角色
             max_retries: 最大重试次数
-            messages_history: 消息历史（用于多轮对话）
+            messages_history: 消息历史（用于多轮对话，多轮对话不走响应缓存）
+            cache_site: 响应缓存的调用点名称，None表示不缓存
+            hedge_site: 对冲策略的调用点名称，None表示不对冲
+            task: 模型路由的任务类型（见shared.model_router），None表示使用self.model；
+                  指定时失败重试会换到下一个候选模型
             
         Returns:
             LLM响应文本
@@ -84,36 +116,22 @@ class LLMClient:
         if not self.client:
             raise ValueError("LLM client not initialized. Please set OPENROUTER_API_KEY.")
         
+        route = get_model_router().route(task, default_model=self.model) if task else None
+        request_params = self._request_params(prompt, system_role, messages_history, route)
+        tried: List[str] = []
+        if messages_history:
+            cache_site = None
+        if cache_site:
+            cached = await get_llm_cache().lookup(cache_site, request_params)
+            if cached is not None:
+                logger.info(f"LLM response served from cache ({cache_site})")
+                return cached
+        
         for attempt in range(max_retries):
             try:
                 logger.info(f"Calling LLM (attempt {attempt + 1}/{max_retries}, model={self.model})")
                 
-                # 构建消息列表
-                if messages_history:
-                    messages = messages_history.copy()
-                    messages.append({"role": "user", "content": prompt})
-                else:
-                    messages = [
-                        {"role": "system", "content": system_role},
-                        {"role": "user", "content": prompt}
-                    ]
-                
-                # 构建请求参数
-                request_params = {
-                    "model": self.model,
-                    "messages": messages,
-                    "temperature": min(0.3, self.temperature),  # 降低随机性，提高JSON格式准确性
-                    "max_tokens": self.max_tokens
-                }
-                
-                # Gemini 3 Pro支持推理模式
-                if self.enable_reasoning and "gemini-3-pro" in self.model.lower():
-                    request_params["extra_body"] = {"reasoning": {"enabled": True}}
-                
-                response = await asyncio.wait_for(
-                    self.client.chat.completions.create(**request_params),
-                    timeout=self.timeout
-                )
+                response = await self._create(request_params, hedge_site, route)
                 
                 # 检查响应有效性
                 if not response or not response.choices or len(response.choices) == 0:
@@ -139,8 +157,14 @@ class LLMClient:
                 if hasattr(response.choices[0].message, 'reasoning_details'):
                     logger.debug(f"Reasoning details: {response.choices[0].message.reasoning_details}")
                 
+                if cache_site:
+                    await get_llm_cache().store(cache_site, request_params, content)
                 return content
                 
+            except CircuitOpenError as e:
+                # 熔断期间重试没有意义，直接失败交给调用方回退
+                logger.warning(f"LLM call rejected: {e}")
+                raise Exception(ErrorCode.LLM_API_ERROR)
             except asyncio.TimeoutError:
                 logger.error(f"LLM timeout (attempt {attempt + 1})")
                 if attempt == max_retries - 1:
@@ -152,9 +176,80 @@ class LLMClient:
                 if attempt == max_retries - 1:
                     raise Exception(ErrorCode.LLM_API_ERROR)
                 await asyncio.sleep(AgentConfig.RETRY_DELAY * (2 ** attempt))
+            
+            # 按任务路由时，重试换到下一个候选模型（没有其他候选则继续用当前模型）
+            if route is not None:
+                tried.append(route.model)
+                fallback = get_model_router().route(task, default_model=self.model, exclude=tried)
+                if fallback is not None:
+                    route = fallback
+                    request_params = self._request_params(prompt, system_role, messages_history, route)
         
         raise Exception(ErrorCode.LLM_API_ERROR)
     
+    async def _create(
+        self,
+        request_params: Dict[str, Any],
+        hedge_site: Optional[str] = None,
+        route: Optional[Route] = None
+    ):
+        """
+        发出一次chat.completions请求（经过LLM熔断器）
+        
+        指定hedge_site时按该调用点的策略对冲；指定route时使用任务的超时，结果计入模型路由统计。
+        """
+        def send(params: Dict[str, Any]):
+            if route is not None:
+                return replace(route, model=params["model"]).call(
+                    lambda: self.client.chat.completions.create(**params)
+                )
+            return get_circuit_breaker("llm").call(
+                lambda: self.client.chat.completions.create(**params),
+                timeout=self.timeout
+            )
+        
+        if hedge_site is None:
+            return await send(request_params)
+        
+        hedge = get_hedge_policy(hedge_site)
+        backup_params = hedge.backup_params(request_params)
+        return await hedge.run(
+            lambda: send(request_params),
+            lambda: send(backup_params),
+            valid=lambda response: bool(response and response.choices and response.choices[0].message.content),
+            deadline=route.timeout if route is not None else self.timeout
+        )
+    
+    def _request_params(
+        self,
+        prompt: str,
+        system_role: str,
+        messages_history: Optional[List[Dict]] = None,
+        route: Optional[Route] = None
+    ) -> Dict[str, Any]:
+        """构建chat.completions请求参数（同时作为响应缓存的key）；指定route时使用其模型和max_tokens"""
+        if messages_history:
+            messages = messages_history.copy()
+            messages.append({"role": "user", "content": prompt})
+        else:
+            messages = [
+                {"role": "system", "content": system_role},
+                {"role": "user", "content": prompt}
+            ]
+        
+        model = route.model if route is not None else self.model
+        request_params = {
+            "model": model,
+            "messages": messages,
+            "temperature": min(0.3, self.temperature),  # 降低随机性，提高JSON格式准确性
+            "max_tokens": route.max_tokens if route is not None else self.max_tokens
+        }
+        
+        # Gemini 3 Pro支持推理模式
+        if self.enable_reasoning and "gemini-3-pro" in model.lower():
+            request_params["extra_body"] = {"reasoning": {"enabled": True}}
+        return request_params
+    
     def _clean_json_response(self, response: str) -> str:
         """
         清理LLM响应，移除常见的JSON格式问题
@@ -194,49 +289,131 @@ class LLMClient:
         
         return response
     
+    def supports_structured_output(self, model: Optional[str] = None) -> bool:
+        """
+        模型（默认self.model）是否使用结构化输出（response_format=json_schema）
+
+        LLM_STRUCTURED_OUTPUT=auto时按模型前缀判断（LLM_STRUCTURED_OUTPUT_MODELS），
+        提供方拒绝过response_format的模型之后不再使用。
+        """
+        model = model or self.model
+        mode = os.getenv("LLM_STRUCTURED_OUTPUT", "auto").lower()
+        if mode == "off" or model in _structured_unsupported:
+            return False
+        if mode == "on":
+            return True
+        prefixes = os.getenv("LLM_STRUCTURED_OUTPUT_MODELS", "openai/,google/gemini,gpt-").split(",")
+        return any(model.lower().startswith(p.strip()) for p in prefixes if p.strip())
+    
+    async def _call_structured(
+        self,
+        request_params: Dict[str, Any],
+        schema: Dict[str, Any],
+        hedge_site: Optional[str] = None,
+        route: Optional[Route] = None
+    ) -> Optional[str]:
+        """
+        以JSON Schema结构化输出请求一次（不重试）
+        
+        Returns:
+            回答文本；提供方不支持或请求失败时返回None（由调用方改走普通请求）
+        """
+        params = dict(request_params, response_format={
+            "type": "json_schema",
+            "json_schema": {"name": schema.get("title", "response"), "schema": schema}
+        })
+        try:
+            response = await self._create(params, hedge_site, route)
+        except Exception as e:
+            if getattr(e, "status_code", None) in (400, 422):
+                # 模型/提供方不接受response_format：记住，之后直接走普通请求
+                _structured_unsupported.add(params["model"])
+                _count_json_path("structured_unsupported")
+                logger.warning(f"Structured output rejected for {params['model']}, falling back: {e}")
+            else:
+                logger.warning(f"Structured output call failed, falling back: {type(e).__name__} {e}")
+            return None
+        return response.choices[0].message.content if response and response.choices else None
+    
     async def call_json(
         self,
         prompt: str,
         system_role: str = "You are a helpful assistant.",
-        max_retries: int = 3
+        max_retries: int = 3,
+        schema: Optional[Dict[str, Any]] = None,
+        hedge_site: Optional[str] = None,
+        task: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        调用LLM并解析JSON响应（带重试机制）
+        调用LLM并解析JSON响应
+        
+        解析顺序：直接解析 → 修复常见格式问题 → 截断输出保留完整元素，
+        都失败时才带着格式提示重新请求。提供schema且模型支持时使用结构化输出；
+        截断后保留的结果缺少schema顶层required字段时同样重新请求。
         
         Args:
             prompt: 用户提示
             system_role: 系统角色
-            max_retries: 最大重试次数
+            max_retries: 最大请求次数
+            schema: 期望输出的JSON Schema（顶层为对象）
+            hedge_site: 对冲策略的调用点名称，None表示不对冲
+            task: 模型路由的任务类型，None表示使用self.model
             
         Returns:
             解析后的JSON对象
         """
-        import json
-        from agents.utils import validate_json_output
+        from agents.utils import parse_json_tolerant
         
+        cache = get_llm_cache()
         for attempt in range(max_retries):
             try:
-                response_text = await self.call_with_retry(
-                    prompt=prompt,
-                    system_role=system_role,
-                    max_retries=2
-                )
+                # 只缓存能完整解析的回答，格式错误或被截断的回答不会被复用
+                route = get_model_router().route(task, default_model=self.model) if task else None
+                request_params = self._request_params(prompt, system_role, route=route)
+                cached = await cache.lookup("agent", request_params)
+                if cached is not None:
+                    try:
+                        return parse_json_tolerant(self._clean_json_response(cached))[0]
+                    except ValueError:
+                        pass
+                
+                response_text = None
+                structured = bool(schema) and self.client is not None and self.supports_structured_output(request_params["model"])
+                if structured:
+                    response_text = await self._call_structured(request_params, schema, hedge_site, route)
+                    structured = response_text is not None
+                if response_text is None:
+                    response_text = await self.call_with_retry(
+                        prompt=prompt,
+                        system_role=system_role,
+                        max_retries=2,
+                        cache_site=None,
+                        hedge_site=hedge_site,
+                        task=task
+                    )
                 
                 # 检查响应是否为空
                 if not response_text:
                     raise ValueError("LLM returned empty response")
                 
-                # 预清理响应
-                cleaned_response = self._clean_json_response(response_text)
-                
-                # 尝试解析JSON
-                return validate_json_output(cleaned_response)
+                result, path = parse_json_tolerant(self._clean_json_response(response_text))
+                _count_json_path(f"structured_{path}" if structured else path)
+                if path == "salvaged":
+                    missing = _missing_required(result, schema) if schema else []
+                    if missing:
+                        _count_json_path("salvage_rejected")
+                        raise ValueError(f"Truncated JSON output is missing required keys: {missing}")
+                    logger.warning("LLM JSON output was truncated, kept complete elements only")
+                else:
+                    await cache.store("agent", request_params, response_text)
+                return result
                 
             except ValueError as e:
                 logger.debug(f"JSON解析失败 (attempt {attempt + 1}/{max_retries}): {str(e)}")
                 
                 if attempt < max_retries - 1:
-                    # 重新请求LLM生成更规范的JSON
+                    # 所有本地修复都失败，重新请求LLM生成更规范的JSON
+                    _count_json_path("regenerated")
                     logger.debug("重新请求LLM生成规范JSON...")
                     prompt = f"""{prompt}
 
@@ -248,6 +425,7 @@ class LLMClient:
                     continue
                 else:
                     # 最后一次尝试失败，抛出异常
+                    _count_json_path("failed")
                     raise
             except Exception as e:
                 logger.error(f"LLM调用失败 (attempt {attempt + 1}/{max_retries}): {str(e)}")
@@ -264,7 +442,7 @@ class LLMClient:
         system_role: str = "You are a helpful assistant."
     ) -> List[str]:
         """
-        批量调用LLM
+        批量调用LLM（走限流器的background通道，让位于交互请求）
         
         Args:
             prompts: 提示列表
@@ -273,10 +451,11 @@ class LLMClient:
         Returns:
             响应列表
         """
-        tasks = [
-            self.call_with_retry(prompt, system_role)
-            for prompt in prompts
-        ]
+        with request_priority("background"):
+            tasks = [
+                asyncio.ensure_future(self.call_with_retry(prompt, system_role))
+                for prompt in prompts
+            ]
         return await asyncio.gather(*tasks)
 
 
@@ -1,5 +1,6 @@
 """Agent编排器 - 协调三个Agent的工作流程"""
 
+import os
 import time
 import logging
 from typing import List, Dict, Any, Optional
@@ -24,11 +25,20 @@ class AgentOrchestrator:
     3. GraphBuilderAgent - 构建知识图谱
     """
     
-    def __init__(self):
-        """初始化三个Agent"""
+    def __init__(self, verification_strategy: Optional[str] = None):
+        """
+        初始化三个Agent
+        
+        Args:
+            verification_strategy: 知识校验策略（见VerificationStrategy），
+                默认读取环境变量VERIFY_STRATEGY，未配置时为AgentConfig.VERIFY_STRATEGY
+        """
         self.discovery_agent = ConceptDiscoveryAgent()
         self.verification_agent = VerificationAgent()
         self.graph_builder_agent = GraphBuilderAgent()
+        self.verification_strategy = (
+            verification_strategy or os.getenv("VERIFY_STRATEGY") or AgentConfig.VERIFY_STRATEGY
+        )
         
         logger.info("AgentOrchestrator initialized")
     
@@ -39,7 +49,8 @@ class AgentOrchestrator:
         depth: int = AgentConfig.DEFAULT_DEPTH,
         max_concepts: int = AgentConfig.DEFAULT_MAX_CONCEPTS,
         enable_verification: bool = True,
-        progress_tracker: Optional[ProgressTracker] = None
+        progress_tracker: Optional[ProgressTracker] = None,
+        verification_strategy: Optional[str] = None
     ) -> DiscoverResponse:
         """
         执行完整的概念挖掘流程
@@ -51,6 +62,7 @@ class AgentOrchestrator:
             max_concepts: 最大概念数
             enable_verification: 是否启用知识校验
             progress_tracker: 进度追踪器
+            verification_strategy: 本次请求的知识校验策略，默认使用编排器配置
             
         Returns:
             API响应
@@ -122,7 +134,8 @@ class AgentOrchestrator:
                 
                 verified_concepts = await self.verification_agent.verify_concepts(
                     concepts=related_concepts,
-                    source_concept=concept
+                    source_concept=concept,
+                    strategy=verification_strategy or self.verification_strategy
                 )
                 
                 await progress_tracker.update(
@@ -246,7 +259,8 @@ class AgentOrchestrator:
             # 验证新概念
             verified_concepts = await self.verification_agent.verify_concepts(
                 concepts=new_concepts,
-                source_concept=parent_concept
+                source_concept=parent_concept,
+                strategy=self.verification_strategy
             )
             
             # 扩展图谱
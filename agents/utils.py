@@ -3,7 +3,7 @@
 import json
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from functools import wraps
 
 logger = logging.getLogger(__name__)
@@ -112,6 +112,81 @@ def validate_json_output(json_str: str) -> Dict[str, Any]:
             raise ValueError(f"Invalid JSON format: {str(e)}")
 
 
+def truncated_json_candidates(json_str: str, max_candidates: int = 20) -> List[str]:
+    """
+    截断JSON的补全候选（单遍扫描，从保留内容最多的开始）
+
+    只在外层都是数组时记录切点（数组的每个完整元素之后、顶层对象的每个完整字段之后），
+    截到切点后按当时未闭合的括号补齐：未写完的元素整体丢弃，不会留下缺字段的半个对象。
+    顶层值已经完整时（后面有多余内容）直接返回该值。
+    """
+    stack: List[str] = []
+    cuts: List[Tuple[int, str]] = []
+    in_string = False
+    escaped = False
+    started = False
+
+    for i, ch in enumerate(json_str):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "[{":
+            stack.append(ch)
+            started = True
+        elif ch in "]}":
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                return [json_str[:i + 1]]
+            if all(c == "[" for c in stack[1:]):
+                cuts.append((i + 1, "".join(stack)))
+        elif ch == "," and stack and all(c == "[" for c in stack[1:]):
+            cuts.append((i, "".join(stack)))
+
+    if not started:
+        return []
+    closers = {"[": "]", "{": "}"}
+    candidates = []
+    for position, still_open in reversed(cuts[-max_candidates:]):
+        candidates.append(json_str[:position] + "".join(closers[c] for c in reversed(still_open)))
+    return candidates
+
+
+def parse_json_tolerant(json_str: str) -> Tuple[Any, str]:
+    """
+    尽量解析LLM输出的JSON，不重新请求
+
+    Returns:
+        (解析结果, 使用的路径)：direct 直接解析；repaired 修复换行/转义/尾逗号后解析；
+        salvaged 输出被截断，保留已完整的数组元素/对象字段
+
+    Raises:
+        ValueError: 所有路径都失败
+    """
+    try:
+        return json.loads(json_str), "direct"
+    except json.JSONDecodeError:
+        pass
+    try:
+        return validate_json_output(json_str), "repaired"
+    except ValueError as e:
+        error = e
+    for candidate in truncated_json_candidates(json_str):
+        try:
+            return validate_json_output(candidate), "salvaged"
+        except ValueError:
+            continue
+    raise error
+
+
 def extract_concepts_from_response(response: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     从LLM响应中提取概念列表
@@ -1,9 +1,10 @@
 """知识校验Agent - 整合多源验证和可信度评分"""
 
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional
 from prompts.verification_prompts import VerificationPrompt
-from shared.constants import AgentConfig
+from shared.constants import AgentConfig, VerificationStrategy
 from agents.llm_client import get_llm_client
 from agents.utils import validate_json_output
 from algorithms.credibility_scorer import (
@@ -13,6 +14,7 @@ from algorithms.credibility_scorer import (
     SourceType
 )
 from algorithms.data_crawler import DataCrawler
+from shared.http_pool import get_http_pools
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +45,8 @@ class VerificationAgent:
             semantic_conflict_threshold=0.75  # 语义冲突阈值
         )
         self.multi_source_verifier = MultiSourceVerifier(self.credibility_scorer)
-        self.data_crawler = DataCrawler()
+        # 应用启动后创建时复用共享连接池（keep-alive），否则每次请求临时建连
+        self.data_crawler = DataCrawler(session=get_http_pools().aiohttp_session())
         
         logger.info("VerificationAgent initialized with enhanced multi-source verification (LLM weight=0.3)")
     
@@ -53,7 +56,9 @@ class VerificationAgent:
         concept_b: str,
         claimed_relation: str,
         strength: float,
-        enable_multi_source: bool = True
+        enable_multi_source: bool = True,
+        source_limits: Optional[Dict[str, asyncio.Semaphore]] = None,
+        deadline: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         验证概念关联的准确性（支持多源验证）
@@ -64,6 +69,8 @@ class VerificationAgent:
             claimed_relation: 声称的关联
             strength: 声称的关联强度
             enable_multi_source: 是否启用多源验证
+            source_limits: 各证据来源共享的并发限制（verify_concepts批量校验时传入）
+            deadline: 证据收集的截止时间（事件循环时间），到期后只用已取到的证据评分
             
         Returns:
             验证结果
@@ -74,7 +81,8 @@ class VerificationAgent:
             # 如果启用多源验证，收集多个来源的证据
             if enable_multi_source:
                 return await self._verify_with_multi_source(
-                    concept_a, concept_b, claimed_relation, strength
+                    concept_a, concept_b, claimed_relation, strength,
+                    source_limits=source_limits, deadline=deadline
                 )
             
             # 否则使用基础LLM验证
@@ -91,46 +99,57 @@ class VerificationAgent:
         concept_a: str,
         concept_b: str,
         claimed_relation: str,
-        strength: float
+        strength: float,
+        source_limits: Optional[Dict[str, asyncio.Semaphore]] = None,
+        deadline: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         使用多源验证（Wikipedia + Arxiv + LLM）
         
+        三个来源并发收集；到达deadline时取消未完成的来源，只用已取到的证据评分。
+        
         Returns:
             包含可信度评分和证据的验证结果
         """
-        # 1. 收集来自不同源的证据
-        data_sources = {}
+        query = f"{concept_a} {concept_b}"
         
-        # 1.1 Wikipedia证据
-        try:
-            wiki_data = await self.data_crawler.search_wikipedia(
-                f"{concept_a} {concept_b}"
-            )
-            if wiki_data:
-                data_sources["wikipedia"] = wiki_data
-        except Exception as e:
-            logger.warning(f"Wikipedia search failed: {str(e)}")
+        async def wikipedia():
+            return await self.data_crawler.search_wikipedia(query)
         
-        # 1.2 Arxiv证据
-        try:
-            arxiv_results = await self.data_crawler.search_arxiv(
-                f"{concept_a} {concept_b}",
-                max_results=3
-            )
-            if arxiv_results:
-                data_sources["arxiv"] = arxiv_results[0] if arxiv_results else None
-        except Exception as e:
-            logger.warning(f"Arxiv search failed: {str(e)}")
+        async def arxiv():
+            arxiv_results = await self.data_crawler.search_arxiv(query, max_results=3)
+            return arxiv_results[0] if arxiv_results else None
         
-        # 1.3 LLM推理证据
-        try:
-            llm_result = await self._get_llm_reasoning(
-                concept_a, concept_b, claimed_relation, strength
+        async def llm_reasoning():
+            return await self._get_llm_reasoning(concept_a, concept_b, claimed_relation, strength)
+        
+        # 1. 并发收集来自不同源的证据（来源 -> (并发限制名, 取证据)）
+        fetches = {
+            "wikipedia": ("wikipedia", wikipedia),
+            "arxiv": ("arxiv", arxiv),
+            "llm_reasoning": ("llm", llm_reasoning)
+        }
+        tasks = {
+            source: asyncio.ensure_future(
+                self._fetch_evidence(fetch, (source_limits or {}).get(limit))
             )
-            data_sources["llm_reasoning"] = llm_result
-        except Exception as e:
-            logger.warning(f"LLM reasoning failed: {str(e)}")
+            for source, (limit, fetch) in fetches.items()
+        }
+        timeout = None if deadline is None else max(0.0, deadline - asyncio.get_running_loop().time())
+        _, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        
+        data_sources = {}
+        missing = []
+        for source, task in tasks.items():
+            if task in pending:
+                missing.append(source)
+            elif task.exception() is not None:
+                logger.warning(f"{source} evidence failed: {task.exception()}")
+            elif task.result():
+                data_sources[source] = task.result()
         
         # 2. 使用多源验证器计算可信度
         verification_result = await self.multi_source_verifier.verify_from_multiple_sources(
@@ -150,7 +169,9 @@ class VerificationAgent:
             "has_conflicts": verification_result["has_conflicts"],
             "conflicts": verification_result.get("conflicts", []),
             "logical_reasoning": claimed_relation,
-            "warnings": verification_result["warnings"]
+            "warnings": verification_result["warnings"] + (
+                [f"校验超时，缺少证据来源: {', '.join(missing)}"] if missing else []
+            )
         }
         
         logger.info(
@@ -161,6 +182,14 @@ class VerificationAgent:
         
         return result
     
+    @staticmethod
+    async def _fetch_evidence(fetch, limit: Optional[asyncio.Semaphore] = None) -> Any:
+        """在来源的并发限制内取一次证据"""
+        if limit is None:
+            return await fetch()
+        async with limit:
+            return await fetch()
+    
     async def _verify_with_llm_only(
         self,
         concept_a: str,
@@ -198,7 +227,9 @@ class VerificationAgent:
         # 调用LLM
         response = await self.llm_client.call_json(
             prompt=prompt,
-            system_role="你是一个严谨的知识验证专家，负责核查信息的准确性。"
+            system_role="你是一个严谨的知识验证专家，负责核查信息的准确性。",
+            schema=self.prompt_generator.VERIFICATION_SCHEMA,
+            task="verify"
         )
         
         # 检查响应有效性
@@ -262,7 +293,9 @@ class VerificationAgent:
         
         response = await self.llm_client.call_json(
             prompt=prompt,
-            system_role="你是一个严谨的知识验证专家。"
+            system_role="你是一个严谨的知识验证专家。",
+            schema=self.prompt_generator.VERIFICATION_SCHEMA,
+            task="verify"
         )
         
         if response:
@@ -298,7 +331,8 @@ class VerificationAgent:
             # 调用LLM
             response = await self.llm_client.call_json(
                 prompt=prompt,
-                system_role="你是一个严谨的知识验证专家。"
+                system_role="你是一个严谨的知识验证专家。",
+                task="verify"
             )
             
             # 确保响应是列表
@@ -308,7 +342,12 @@ class VerificationAgent:
             # 处理验证结果
             results = []
             for item in response:
-                credibility_score = item.get('credibility_score', 0.0)
+                if not isinstance(item, dict):
+                    continue
+                try:
+                    credibility_score = float(item.get('credibility_score', 0.0))
+                except (TypeError, ValueError):
+                    credibility_score = 0.0
                 is_valid = credibility_score >= self.credibility_threshold
                 
                 results.append({
@@ -330,56 +369,168 @@ class VerificationAgent:
             logger.error(f"Batch verification failed: {str(e)}")
             raise
     
+    async def batch_score_concepts(
+        self,
+        concepts: List[Dict[str, Any]],
+        source_concept: str,
+        batch_size: int = AgentConfig.VERIFY_BATCH_SIZE,
+        deadline_at: Optional[float] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        按块批量LLM校验：每块一次batch_verify调用，各块并发
+        
+        Args:
+            concepts: 概念列表
+            source_concept: 源概念
+            batch_size: 每块的关联数
+            deadline_at: 截止时刻（事件循环时间），到时未返回的块按缺失处理
+            
+        Returns:
+            与concepts顺序一致的批量校验结果；所在块调用失败、超时或结果缺失的位置为None
+        """
+        loop = asyncio.get_running_loop()
+        chunks = [
+            list(range(start, min(start + batch_size, len(concepts))))
+            for start in range(0, len(concepts), max(1, batch_size))
+        ]
+        
+        async def score_chunk(indices: List[int]) -> List[Dict[str, Any]]:
+            relations = [
+                {
+                    "concept_a": source_concept,
+                    "concept_b": concepts[i].get('concept_name', ''),
+                    "claimed_relation": concepts[i].get('reasoning', '')
+                }
+                for i in indices
+            ]
+            timeout = None if deadline_at is None else max(0.0, deadline_at - loop.time())
+            try:
+                return await asyncio.wait_for(self.batch_verify(relations), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Batch verification timed out for {len(indices)} concepts")
+                return []
+            except Exception:
+                return []
+        
+        scores: List[Optional[Dict[str, Any]]] = [None] * len(concepts)
+        results = await asyncio.gather(*[score_chunk(indices) for indices in chunks])
+        for indices, chunk_results in zip(chunks, results):
+            for item in chunk_results:
+                position = item.get('index')
+                # 提示词中的编号从1开始
+                if isinstance(position, int) and 1 <= position <= len(indices):
+                    scores[indices[position - 1]] = item
+        
+        logger.info(f"Batch scored {sum(s is not None for s in scores)}/{len(concepts)} concepts in {len(chunks)} LLM calls")
+        return scores
+    
     async def verify_concepts(
         self,
         concepts: List[Dict[str, Any]],
-        source_concept: str
+        source_concept: str,
+        deadline: Optional[float] = None,
+        source_concurrency: Optional[Dict[str, int]] = None,
+        strategy: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         验证发现的概念列表
         
+        校验策略（见VerificationStrategy）：
+        - multi_source：所有概念同时开始多源校验，Wikipedia / Arxiv / LLM 三个证据来源
+          各自限制并发数，某个来源排队时不阻塞其他来源
+        - batch：按块批量LLM校验，批量结果缺失的概念改做多源校验
+        - tiered：先批量LLM校验，得分在可信度阈值附近（或缺失）的概念再做多源校验
+        
+        到达截止时间时未取到的证据（包括未返回的批量校验块）按缺失处理，已取到的证据照常评分，结果保持输入顺序。
+        
         Args:
             concepts: 概念列表
             source_concept: 源概念
+            deadline: 截止时间（秒），默认AgentConfig.VERIFY_DEADLINE
+            source_concurrency: 各来源最大并发数，默认AgentConfig.VERIFY_SOURCE_CONCURRENCY
+            strategy: 校验策略，默认AgentConfig.VERIFY_STRATEGY
             
         Returns:
             验证后的概念列表（可信度评分）
         """
-        logger.info(f"Verifying {len(concepts)} concepts")
-        
-        verified_concepts = []
+        strategy = strategy or AgentConfig.VERIFY_STRATEGY
+        if strategy not in VerificationStrategy.ALL:
+            raise ValueError(f"Unknown verification strategy: {strategy}")
+        logger.info(f"Verifying {len(concepts)} concepts (strategy={strategy})")
+        
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + (deadline or AgentConfig.VERIFY_DEADLINE)
+        verifications: List[Optional[Dict[str, Any]]] = [None] * len(concepts)
+        pending = list(range(len(concepts)))
+        
+        if strategy != VerificationStrategy.MULTI_SOURCE and concepts:
+            scores = await self.batch_score_concepts(concepts, source_concept, deadline_at=deadline_at)
+            pending = []
+            for i, score in enumerate(scores):
+                if score is None or (
+                    strategy == VerificationStrategy.TIERED
+                    and abs(score['credibility_score'] - self.credibility_threshold) <= AgentConfig.VERIFY_BORDERLINE_MARGIN
+                ):
+                    pending.append(i)
+                else:
+                    verifications[i] = {
+                        "credibility_score": score['credibility_score'],
+                        "is_valid": score['is_valid'],
+                        "evidence": [{
+                            "source_type": "llm_reasoning",
+                            "source_name": "LLM批量校验",
+                            "content": score['quick_reasoning'],
+                            "url": None,
+                            "confidence": score['credibility_score'],
+                            "timestamp": None
+                        }],
+                        "warnings": list(score['warnings'] or [])
+                    }
+            logger.info(f"{len(pending)}/{len(concepts)} concepts need multi-source verification")
+        
+        limits = {
+            source: asyncio.Semaphore(max(1, n))
+            for source, n in (source_concurrency or AgentConfig.VERIFY_SOURCE_CONCURRENCY).items()
+        }
         
-        for concept in concepts:
+        async def verify(concept: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            if loop.time() >= deadline_at:
+                return None
             try:
-                concept_name = concept.get('concept_name', '')
-                reasoning = concept.get('reasoning', '')
-                strength = concept.get('strength', 0.5)
-                
-                # 验证关联
-                verification = await self.verify_relation(
+                return await self.verify_relation(
                     concept_a=source_concept,
-                    concept_b=concept_name,
-                    claimed_relation=reasoning,
-                    strength=strength
+                    concept_b=concept.get('concept_name', ''),
+                    claimed_relation=concept.get('reasoning', ''),
+                    strength=concept.get('strength', 0.5),
+                    source_limits=limits,
+                    deadline=deadline_at
                 )
-                
-                # 更新可信度
-                concept['credibility'] = verification['credibility_score']
-                concept['verification'] = {
-                    "is_valid": verification['is_valid'],
-                    "evidence": verification['evidence'],
-                    "warnings": verification['warnings']
-                }
-                
-                # 只保留有效的概念
-                if verification['is_valid']:
-                    verified_concepts.append(concept)
-                else:
-                    logger.warning(f"Concept filtered: {concept_name} (credibility={verification['credibility_score']:.2f})")
-                
             except Exception as e:
                 logger.error(f"Failed to verify concept {concept.get('concept_name')}: {str(e)}")
+                return None
+        
+        results = await asyncio.gather(*[verify(concepts[i]) for i in pending])
+        for i, verification in zip(pending, results):
+            verifications[i] = verification
+        
+        verified_concepts = []
+        for concept, verification in zip(concepts, verifications):
+            if verification is None:
                 continue
+            
+            # 更新可信度
+            concept['credibility'] = verification['credibility_score']
+            concept['verification'] = {
+                "is_valid": verification['is_valid'],
+                "evidence": verification['evidence'],
+                "warnings": verification['warnings']
+            }
+            
+            # 只保留有效的概念
+            if verification['is_valid']:
+                verified_concepts.append(concept)
+            else:
+                logger.warning(f"Concept filtered: {concept.get('concept_name', '')} (credibility={verification['credibility_score']:.2f})")
         
         logger.info(f"Verification complete: {len(verified_concepts)}/{len(concepts)} passed")
         
@@ -402,7 +553,8 @@ class VerificationAgent:
             
             response = await self.llm_client.call_json(
                 prompt=prompt,
-                system_role="你是一个事实核查专家。"
+                system_role="你是一个事实核查专家。",
+                task="verify"
             )
             
             return response
@@ -1,11 +1,17 @@
 """算法模块"""
 
+from .embedding_store import EmbeddingStore, get_embedding_store
 from .semantic_similarity import SemanticSimilarity
 from .discipline_classifier import DisciplineClassifier
 from .data_crawler import DataCrawler
+from .wikipedia_client import WikipediaClient, get_wikipedia_client
 
 __all__ = [
+    "EmbeddingStore",
+    "get_embedding_store",
     "SemanticSimilarity",
     "DisciplineClassifier",
     "DataCrawler",
+    "WikipediaClient",
+    "get_wikipedia_client",
 ]
@@ -10,7 +10,11 @@ from typing import Dict, List, Optional, Any
 import aiohttp
 import re
 from urllib.parse import quote
-import wikipedia
+
+from algorithms.wikipedia_client import WikipediaClient
+from shared.arxiv_cache import get_arxiv_cache
+from shared.arxiv_scheduler import ArxivRequestError, get_arxiv_scheduler, parse_arxiv_feed
+from shared.circuit_breaker import CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +27,8 @@ class DataCrawler:
         wikipedia_api_url: Optional[str] = None,
         arxiv_api_url: Optional[str] = None,
         timeout: int = 30,
-        max_retries: int = 2
+        max_retries: int = 2,
+        session: Optional[aiohttp.ClientSession] = None
     ):
         """
         初始化数据抓取器
@@ -33,6 +38,7 @@ class DataCrawler:
             arxiv_api_url: Arxiv API URL
             timeout: 请求超时时间（秒）
             max_retries: 最大重试次数
+            session: 共享的aiohttp会话（连接池，由调用方负责关闭）；为空时每次请求临时创建
         """
         self.wikipedia_api_url = wikipedia_api_url or os.getenv(
             "WIKIPEDIA_API_URL",
@@ -44,6 +50,8 @@ class DataCrawler:
         )
         self.timeout = timeout
         self.max_retries = max_retries
+        self.session = session
+        self.wikipedia = WikipediaClient(api_url=self.wikipedia_api_url, timeout=timeout)
         
         logger.info("DataCrawler initialized")
     
@@ -66,18 +74,15 @@ class DataCrawler:
         """
         for attempt in range(self.max_retries + 1):
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        url,
-                        params=params,
-                        headers=headers,
-                        timeout=aiohttp.ClientTimeout(total=self.timeout)
-                    ) as response:
-                        if response.status == 200:
-                            return await response.text()
-                        else:
-                            logger.warning(f"HTTP {response.status} for {url}")
-                            
+                if self.session is not None and not self.session.closed:
+                    # 复用共享连接池（keep-alive）
+                    text = await self._get_text(self.session, url, params, headers)
+                else:
+                    async with aiohttp.ClientSession() as session:
+                        text = await self._get_text(session, url, params, headers)
+                if text is not None:
+                    return text
+                
             except asyncio.TimeoutError:
                 logger.warning(f"Timeout for {url} (attempt {attempt + 1})")
             except Exception as e:
@@ -88,13 +93,32 @@ class DataCrawler:
         
         return None
     
+    async def _get_text(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        params: Optional[Dict],
+        headers: Optional[Dict]
+    ) -> Optional[str]:
+        """发送一次GET请求，200时返回响应文本"""
+        async with session.get(
+            url,
+            params=params,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        ) as response:
+            if response.status == 200:
+                return await response.text()
+            logger.warning(f"HTTP {response.status} for {url}")
+            return None
+    
     async def search_wikipedia(
         self,
         concept: str,
         language: str = "zh"
     ) -> Optional[Dict[str, Any]]:
         """
-        在Wikipedia中搜索概念（使用wikipedia官方库）
+        在Wikipedia中搜索概念（REST summary接口，异步、无全局语言状态）
         
         Args:
             concept: 概念名称
@@ -109,46 +133,9 @@ class DataCrawler:
             }
         """
         try:
-            # 设置语言
-            wikipedia.set_lang(language)
-            
-            # 异步包装同步调用
-            loop = asyncio.get_event_loop()
-            
-            # 获取页面
-            try:
-                page = await loop.run_in_executor(None, wikipedia.page, concept)
-                
-                return {
-                    "title": page.title,
-                    "summary": page.summary[:500] if page.summary else "",
-                    "url": page.url,
-                    "exists": True
-                }
-                
-            except wikipedia.exceptions.DisambiguationError as e:
-                # 歧义页面，选择第一个选项
-                logger.info(f"Wikipedia disambiguation for '{concept}': {e.options[:3]}")
-                if e.options:
-                    page = await loop.run_in_executor(None, wikipedia.page, e.options[0])
-                    return {
-                        "title": page.title,
-                        "summary": page.summary[:500] if page.summary else "",
-                        "url": page.url,
-                        "exists": True
-                    }
-                else:
-                    raise
-                    
-            except wikipedia.exceptions.PageError:
-                logger.info(f"Wikipedia page not found: {concept}")
-                return {
-                    "title": concept,
-                    "summary": "",
-                    "url": "",
-                    "exists": False
-                }
-            
+            result = await self.wikipedia.get_summary(concept, lang=language)
+            result["summary"] = result["summary"][:500]
+            return result
         except Exception as e:
             logger.error(f"Failed to search Wikipedia: {e}")
             return {
@@ -173,17 +160,10 @@ class DataCrawler:
         Returns:
             定义文本
         """
-        result = await self.search_wikipedia(concept)
-        
-        if not result["exists"] or not result["summary"]:
-            # 尝试英文Wikipedia
-            result_en = await self.search_wikipedia(concept, language="en")
-            if result_en["exists"]:
-                summary = result_en["summary"]
-            else:
-                return ""
-        else:
-            summary = result["summary"]
+        result = await self.wikipedia.lookup(concept)
+        if not result["exists"]:
+            return ""
+        summary = result["summary"]
         
         # 截断到第一段或最大长度
         first_para = summary.split('\n')[0]
@@ -210,24 +190,19 @@ class DataCrawler:
                 "summary": str
             }
         """
-        # 先尝试中文
-        result_zh = await self.search_wikipedia(concept, language="zh")
-        if result_zh["exists"]:
-            return {
-                "exists": True,
-                "source": "zh-wiki",
-                "url": result_zh["url"],
-                "summary": result_zh["summary"][:200]
-            }
+        # 中文优先，英文对冲查找（见WikipediaClient.lookup）
+        try:
+            result = await self.wikipedia.lookup(concept)
+        except Exception as e:
+            logger.error(f"Failed to search Wikipedia: {e}")
+            result = {"exists": False}
         
-        # 再尝试英文
-        result_en = await self.search_wikipedia(concept, language="en")
-        if result_en["exists"]:
+        if result["exists"]:
             return {
                 "exists": True,
-                "source": "en-wiki",
-                "url": result_en["url"],
-                "summary": result_en["summary"][:200]
+                "source": f"{result['lang']}-wiki",
+                "url": result["url"],
+                "summary": result["summary"][:200]
             }
         
         return {
@@ -262,29 +237,26 @@ class DataCrawler:
                 ...
             ]
         """
+        arxiv_cache = get_arxiv_cache()
+        cached = await arxiv_cache.lookup("crawler", query, max_results)
+        if cached is not None:
+            return cached[0]
+        
         try:
-            params = {
-                "search_query": f"all:{query}",
-                "start": 0,
-                "max_results": max_results,
-                "sortBy": "relevance",
-                "sortOrder": "descending"
-            }
-            
-            response_text = await self._fetch_with_retry(
-                self.arxiv_api_url,
-                params=params
-            )
-            
-            if not response_text:
-                return []
-            
-            # 解析Arxiv的Atom XML响应
-            papers = self._parse_arxiv_xml(response_text)
+            # 经全局Arxiv调度器排队（请求间隔、查询合并、重试）；熔断期间直接返回空列表
+            papers = await get_arxiv_scheduler().search(query, max_results=max_results)
+            await arxiv_cache.store("crawler", query, max_results, papers)
             
             logger.info(f"Found {len(papers)} papers for '{query}'")
             return papers
             
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping Arxiv search for '{query}': {e}")
+            return []
+        except ArxivRequestError as e:
+            logger.warning(f"Arxiv search failed for '{query}': {e}")
+            await arxiv_cache.store("crawler", query, max_results, [], error=str(e))
+            return []
         except Exception as e:
             logger.error(f"Failed to search Arxiv: {e}")
             return []
@@ -300,48 +272,7 @@ class DataCrawler:
             论文列表
         """
         try:
-            import xml.etree.ElementTree as ET
-            
-            root = ET.fromstring(xml_text)
-            
-            # Atom命名空间
-            ns = {
-                'atom': 'http://www.w3.org/2005/Atom',
-                'arxiv': 'http://arxiv.org/schemas/atom'
-            }
-            
-            papers = []
-            for entry in root.findall('atom:entry', ns):
-                title = entry.find('atom:title', ns)
-                summary = entry.find('atom:summary', ns)
-                published = entry.find('atom:published', ns)
-                link = entry.find('atom:id', ns)
-                
-                authors = []
-                for author in entry.findall('atom:author', ns):
-                    name = author.find('atom:name', ns)
-                    if name is not None:
-                        authors.append(name.text.strip())
-                
-                categories = []
-                for category in entry.findall('atom:category', ns):
-                    term = category.get('term')
-                    if term:
-                        categories.append(term)
-                
-                paper = {
-                    "title": title.text.strip() if title is not None else "",
-                    "authors": authors,
-                    "summary": summary.text.strip() if summary is not None else "",
-                    "published": published.text.strip() if published is not None else "",
-                    "link": link.text.strip() if link is not None else "",
-                    "categories": categories
-                }
-                
-                papers.append(paper)
-            
-            return papers
-            
+            return parse_arxiv_feed(xml_text)
         except Exception as e:
             logger.error(f"Failed to parse Arxiv XML: {e}")
             return []
@@ -432,21 +363,35 @@ class DataCrawler:
         Returns:
             {概念: 验证结果, ...}
         """
-        tasks = [self.verify_concept_exists(concept) for concept in concepts]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
+        # 先批量查中文，未命中的再批量查英文（每批一次Action API请求）
         verified = {}
-        for concept, result in zip(concepts, results):
-            if isinstance(result, Exception):
-                logger.error(f"Verification failed for {concept}: {result}")
-                verified[concept] = {
-                    "exists": False,
-                    "source": None,
-                    "url": "",
-                    "summary": ""
-                }
-            else:
-                verified[concept] = result
+        remaining = list(concepts)
+        for language, source in (("zh", "zh-wiki"), ("en", "en-wiki")):
+            if not remaining:
+                break
+            try:
+                results = await self.wikipedia.get_summaries(remaining, lang=language)
+            except Exception as e:
+                logger.error(f"Batch verification failed ({language}): {e}")
+                results = {}
+            for concept in remaining:
+                result = results.get(concept)
+                if result and result["exists"]:
+                    verified[concept] = {
+                        "exists": True,
+                        "source": source,
+                        "url": result["url"],
+                        "summary": result["summary"][:200]
+                    }
+            remaining = [c for c in remaining if c not in verified]
+        
+        for concept in remaining:
+            verified[concept] = {
+                "exists": False,
+                "source": None,
+                "url": "",
+                "summary": ""
+            }
         
         return verified
     
@@ -7,7 +7,7 @@ import os
 import logging
 import re
 from typing import List, Dict, Optional, Tuple
-from openai import AsyncOpenAI
+from shared.openai_clients import get_openai_client
 from shared.constants import Discipline
 
 logger = logging.getLogger(__name__)
@@ -74,7 +74,7 @@ class DisciplineClassifier:
         self.confidence_threshold = confidence_threshold
         
         if self.use_llm:
-            self.client = AsyncOpenAI(api_key=self.api_key)
+            self.client = get_openai_client("classifier", api_key=self.api_key)
         else:
             self.client = None
             logger.warning("LLM not available, using rule-based classification only")
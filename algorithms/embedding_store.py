@@ -0,0 +1,293 @@
+"""
+Embedding存储模块 - 按(模型, 规范化文本)寻址的向量缓存
+
+两层结构：
+1. 进程内LRU层：最近使用的向量，容量有限
+2. 持久层（可选）：Redis Hash 或 本地mmap float32文件
+
+向量统一以float32打包字节存储，所有相似度计算路径共享同一个存储，
+同一个概念在同一模型下只会调用一次Embedding API。
+"""
+
+import os
+import hashlib
+import logging
+import asyncio
+import unicodedata
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """规范化文本：NFKC + 去除首尾空白 + 合并连续空白"""
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+def make_key(model: str, text: str) -> str:
+    """生成内容寻址的key（模型 + 规范化文本的SHA1）"""
+    digest = hashlib.sha1(f"{model}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+    return digest
+
+
+def pack_vector(vector: Sequence[float]) -> bytes:
+    """向量 -> float32字节"""
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def unpack_vector(data: bytes) -> np.ndarray:
+    """float32字节 -> 向量"""
+    return np.frombuffer(data, dtype=np.float32).copy()
+
+
+class RedisVectorTier:
+    """
+    Redis持久层：所有向量存放在一个Hash中（field=内容key, value=float32字节）
+
+    注意：必须使用decode_responses=False的连接，否则二进制数据会被解码破坏
+    """
+
+    def __init__(self, client, hash_key: str = "embeddings:v1"):
+        self.client = client
+        self.hash_key = hash_key
+
+    @classmethod
+    def from_url(cls, url: str, password: Optional[str] = None, hash_key: str = "embeddings:v1"):
+        import redis.asyncio as aioredis
+        client = aioredis.from_url(url, password=password or None, decode_responses=False)
+        return cls(client, hash_key=hash_key)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        if not keys:
+            return {}
+        values = await self.client.hmget(self.hash_key, keys)
+        return {k: unpack_vector(v) for k, v in zip(keys, values) if v}
+
+    async def put_many(self, items: Dict[str, np.ndarray]):
+        if items:
+            await self.client.hset(self.hash_key, mapping={k: pack_vector(v) for k, v in items.items()})
+
+    async def clear(self):
+        await self.client.delete(self.hash_key)
+
+    async def close(self):
+        await self.client.close()
+
+
+class LocalVectorTier:
+    """
+    本地文件持久层：向量追加写入float32数据文件，读取时通过np.memmap映射
+
+    索引文件每行记录 "key<TAB>偏移量<TAB>维度"，启动时加载到内存。
+    """
+
+    def __init__(self, path: str):
+        self.data_path = path
+        self.index_path = path + ".idx"
+        self._index: Dict[str, tuple] = {}
+        self._mmap: Optional[np.memmap] = None
+        self._lock = asyncio.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) == 3:
+                        self._index[parts[0]] = (int(parts[1]), int(parts[2]))
+        logger.info(f"LocalVectorTier loaded {len(self._index)} vectors from {path}")
+
+    def _view(self) -> Optional[np.memmap]:
+        """按当前文件大小重新映射（追加写入后映射会过期）"""
+        if not os.path.exists(self.data_path) or os.path.getsize(self.data_path) == 0:
+            return None
+        size = os.path.getsize(self.data_path) // 4
+        if self._mmap is None or self._mmap.shape[0] != size:
+            self._mmap = np.memmap(self.data_path, dtype=np.float32, mode="r", shape=(size,))
+        return self._mmap
+
+    async def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = [k for k in keys if k in self._index]
+        if not found:
+            return {}
+        view = self._view()
+        if view is None:
+            return {}
+        result = {}
+        for k in found:
+            offset, dim = self._index[k]
+            result[k] = np.array(view[offset:offset + dim])
+        return result
+
+    async def put_many(self, items: Dict[str, np.ndarray]):
+        async with self._lock:
+            new_items = {k: v for k, v in items.items() if k not in self._index}
+            if not new_items:
+                return
+            offset = os.path.getsize(self.data_path) // 4 if os.path.exists(self.data_path) else 0
+            lines = []
+            with open(self.data_path, "ab") as data_file:
+                for k, v in new_items.items():
+                    packed = pack_vector(v)
+                    data_file.write(packed)
+                    dim = len(packed) // 4
+                    self._index[k] = (offset, dim)
+                    lines.append(f"{k}\t{offset}\t{dim}\n")
+                    offset += dim
+            with open(self.index_path, "a", encoding="utf-8") as index_file:
+                index_file.writelines(lines)
+
+    async def clear(self):
+        async with self._lock:
+            self._index.clear()
+            self._mmap = None
+            for p in (self.data_path, self.index_path):
+                if os.path.exists(p):
+                    os.remove(p)
+
+    async def close(self):
+        self._mmap = None
+
+
+class EmbeddingStore:
+    """
+    共享Embedding存储
+
+    用法：
+        store = get_embedding_store()
+        vectors = await store.get_or_embed(model, texts, embed_fn)
+
+    embed_fn只会收到未命中的（已去重、已规范化的）文本，一次请求批量获取。
+    """
+
+    def __init__(self, max_entries: int = 4096, persistent=None):
+        self.max_entries = max_entries
+        self.persistent = persistent
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._stats = {"memory_hits": 0, "persistent_hits": 0, "misses": 0, "embedded": 0}
+
+    def attach_persistent(self, tier):
+        """挂载持久层（应用启动时调用）"""
+        self.persistent = tier
+        logger.info(f"EmbeddingStore persistent tier: {type(tier).__name__}")
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get_many(self, model: str, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        查询已存储的向量
+
+        Returns:
+            {规范化文本: 向量}，只包含命中的部分
+        """
+        wanted = {make_key(model, t): normalize_text(t) for t in texts}
+        result = {}
+        remaining = []
+        for key, text in wanted.items():
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                result[text] = vector
+            else:
+                remaining.append(key)
+
+        if remaining and self.persistent is not None:
+            try:
+                stored = await self.persistent.get_many(remaining)
+            except Exception as e:
+                logger.warning(f"Embedding persistent tier read failed: {e}")
+                stored = {}
+            for key, vector in stored.items():
+                self._stats["persistent_hits"] += 1
+                self._remember(key, vector)
+                result[wanted[key]] = vector
+
+        return result
+
+    async def put_many(self, model: str, vectors: Dict[str, Sequence[float]]):
+        """写入向量（两层同时写入）"""
+        items = {}
+        for text, vector in vectors.items():
+            key = make_key(model, text)
+            array = np.asarray(vector, dtype=np.float32)
+            self._remember(key, array)
+            items[key] = array
+
+        if items and self.persistent is not None:
+            try:
+                await self.persistent.put_many(items)
+            except Exception as e:
+                logger.warning(f"Embedding persistent tier write failed: {e}")
+
+    async def get_or_embed(
+        self,
+        model: str,
+        texts: Sequence[str],
+        embed_fn: Callable[[List[str]], Awaitable[List[Sequence[float]]]]
+    ) -> List[np.ndarray]:
+        """
+        获取一组文本的向量，未命中的部分通过embed_fn一次性批量获取
+
+        Args:
+            model: 模型名称
+            texts: 文本列表（可以有重复）
+            embed_fn: 批量embedding函数，输入规范化文本列表，返回同序向量列表
+
+        Returns:
+            与texts顺序一致的向量列表
+        """
+        normalized = [normalize_text(t) for t in texts]
+        found = await self.get_many(model, normalized)
+
+        missing = list(dict.fromkeys(t for t in normalized if t not in found))
+        self._stats["misses"] += len(missing)
+        if missing:
+            vectors = await embed_fn(missing)
+            if len(vectors) != len(missing):
+                raise ValueError(f"embed_fn returned {len(vectors)} vectors for {len(missing)} texts")
+            new_vectors = dict(zip(missing, vectors))
+            await self.put_many(model, new_vectors)
+            self._stats["embedded"] += len(missing)
+            for text, vector in new_vectors.items():
+                found[text] = np.asarray(vector, dtype=np.float32)
+
+        return [found[t] for t in normalized]
+
+    def clear_memory(self):
+        """清空进程内LRU层"""
+        self._memory.clear()
+
+    def memory_size(self) -> int:
+        return len(self._memory)
+
+    def get_stats(self) -> Dict[str, int]:
+        """命中统计"""
+        return {
+            **self._stats,
+            "memory_entries": len(self._memory),
+            "persistent_tier": type(self.persistent).__name__ if self.persistent else None
+        }
+
+
+# 全局实例
+_embedding_store: Optional[EmbeddingStore] = None
+
+
+def get_embedding_store() -> EmbeddingStore:
+    """获取全局Embedding存储（EMBEDDING_STORE_PATH设置时默认使用本地文件持久层）"""
+    global _embedding_store
+    if _embedding_store is None:
+        max_entries = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+        path = os.getenv("EMBEDDING_STORE_PATH")
+        persistent = LocalVectorTier(path) if path else None
+        _embedding_store = EmbeddingStore(max_entries=max_entries, persistent=persistent)
+    return _embedding_store
@@ -8,7 +8,11 @@ import os
 import logging
 from typing import List, Dict, Tuple, Optional
 import numpy as np
-from openai import AsyncOpenAI
+
+from shared.circuit_breaker import get_circuit_breaker
+from shared.openai_clients import get_openai_client
+
+from .embedding_store import EmbeddingStore, get_embedding_store
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +24,9 @@ class SemanticSimilarity:
         self,
         api_key: Optional[str] = None,
         model: str = "text-embedding-3-small",
-        dimension: int = 1536
+        dimension: int = 1536,
+        embedding_store: Optional[EmbeddingStore] = None,
+        batch_size: int = 256
     ):
         """
         初始化语义相似度计算器
@@ -29,10 +35,13 @@ class SemanticSimilarity:
             api_key: OpenAI API密钥
             model: 嵌入模型名称
             dimension: 向量维度
+            embedding_store: 向量存储（默认使用全局共享存储）
+            batch_size: 单次Embedding请求的最大文本数
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = model
         self.dimension = dimension
+        self.batch_size = max(1, batch_size)
         
         if not self.api_key:
             raise ValueError(
@@ -40,29 +49,89 @@ class SemanticSimilarity:
                 "Set OPENAI_API_KEY environment variable or pass api_key parameter."
             )
         
-        self.client = AsyncOpenAI(api_key=self.api_key)
-        self._embedding_cache: Dict[str, np.ndarray] = {}
+        self.client = get_openai_client("embedding", api_key=self.api_key)
+        self.embedding_store = embedding_store or get_embedding_store()
         
         logger.info(f"SemanticSimilarity initialized with {model}")
     
+    async def _embed(self, texts: List[str]) -> List[List[float]]:
+        """调用Embedding API（仅处理存储未命中的文本，按batch_size分批）"""
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            response = await get_circuit_breaker("embedding").call(
+                lambda: self.client.embeddings.create(input=batch, model=self.model)
+            )
+            vectors.extend(item.embedding for item in response.data)
+        return vectors
+    
     async def get_embedding(self, text: str) -> np.ndarray:
         """获取文本的向量嵌入"""
-        if text in self._embedding_cache:
-            return self._embedding_cache[text]
-        
         try:
-            response = await self.client.embeddings.create(
-                input=text,
-                model=self.model
-            )
-            embedding = np.array(response.data[0].embedding)
-            self._embedding_cache[text] = embedding
-            return embedding
+            vectors = await self.embedding_store.get_or_embed(self.model, [text], self._embed)
+            return vectors[0]
             
         except Exception as e:
             logger.error(f"Failed to get embedding for '{text}': {e}")
             raise
     
+    async def get_embedding_matrix(self, texts: List[str]) -> np.ndarray:
+        """
+        批量获取向量并L2归一化为矩阵
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            形状为 (len(texts), dim) 的float32矩阵，每行单位长度
+        """
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        
+        vectors = await self.embedding_store.get_or_embed(self.model, texts, self._embed)
+        matrix = np.vstack(vectors).astype(np.float32, copy=False)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+    
+    @staticmethod
+    def cosine_to_score(cosine: np.ndarray) -> np.ndarray:
+        """余弦相似度 [-1,1] 归一化到 [0,1]"""
+        return (cosine + 1) / 2
+    
+    @staticmethod
+    def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+        """
+        基于argpartition的top-k（O(n)选择 + O(k log k)排序）
+        
+        同分时保持原始顺序。
+        """
+        n = scores.shape[0]
+        if n == 0 or top_k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        if top_k < n:
+            idx = np.argpartition(-scores, top_k - 1)[:top_k]
+            idx.sort()
+        else:
+            idx = np.arange(n)
+        return idx[np.argsort(-scores[idx], kind="stable")]
+    
+    async def similarity_matrix(
+        self,
+        queries: List[str],
+        candidates: List[str]
+    ) -> np.ndarray:
+        """
+        计算 queries × candidates 的相似度矩阵（一次批量embedding + 一次矩阵乘法）
+        
+        Returns:
+            形状为 (len(queries), len(candidates)) 的矩阵，取值 [0,1]
+        """
+        matrix = await self.get_embedding_matrix(list(queries) + list(candidates))
+        query_matrix = matrix[:len(queries)]
+        candidate_matrix = matrix[len(queries):]
+        return self.cosine_to_score(query_matrix @ candidate_matrix.T)
+    
     async def compute_similarity(
         self,
         text1: str,
@@ -116,20 +185,15 @@ class SemanticSimilarity:
         candidates: List[str],
         top_k: int = 5
     ) -> List[Tuple[str, float]]:
-        """在候选列表中找出最相似的k个"""
-        query_emb = await self.get_embedding(query)
-        similarities = []
-        
-        for candidate in candidates:
-            cand_emb = await self.get_embedding(candidate)
-            sim = np.dot(query_emb, cand_emb) / (
-                np.linalg.norm(query_emb) * np.linalg.norm(cand_emb)
-            )
-            sim = (sim + 1) / 2  # 归一化
-            similarities.append((candidate, float(sim)))
+        """在候选列表中找出最相似的k个（批量embedding + 矩阵运算）"""
+        if not candidates:
+            return []
         
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return similarities[:top_k]
+        scores = (await self.similarity_matrix([query], candidates))[0]
+        return [
+            (candidates[i], float(scores[i]))
+            for i in self.top_k_indices(scores, top_k)
+        ]
     
     async def compute_concept_distance(
         self,
@@ -177,54 +241,68 @@ class SemanticSimilarity:
         发现"远亲概念"：语义相关但学科不同的概念
         
         这是跨学科概念搜索的核心算法
+        
+        所有概念和学科名一次性批量embedding，概念相似度和学科×学科相似度
+        各用一次矩阵乘法得到，评分规则与compute_concept_distance一致。
         """
-        distant_relatives = []
+        if not candidates:
+            return []
         
-        for candidate_concept, candidate_discipline in candidates:
-            # 跳过同学科
-            discipline_sim = await self.compute_similarity(
-                core_discipline,
-                candidate_discipline
-            )
-            
-            if discipline_sim > (1 - diversity_threshold):
-                continue
-            
-            # 计算跨学科距离
-            distance_info = await self.compute_concept_distance(
-                core_concept,
-                candidate_concept,
-                core_discipline,
-                candidate_discipline
-            )
-            
-            # 过滤低相似度
-            if distance_info["semantic_similarity"] < similarity_threshold:
-                continue
-            
-            distant_relatives.append((
-                candidate_concept,
-                candidate_discipline,
-                distance_info["final_score"]
-            ))
+        concepts = [c for c, _ in candidates]
+        disciplines = list(dict.fromkeys([core_discipline] + [d for _, d in candidates]))
+        
+        try:
+            matrix = await self.get_embedding_matrix([core_concept] + concepts + disciplines)
+        except Exception as e:
+            logger.error(f"Failed to compute similarity: {e}")
+            return []
+        
+        core_vec = matrix[0]
+        concept_matrix = matrix[1:1 + len(concepts)]
+        discipline_matrix = matrix[1 + len(concepts):]
+        
+        # 学科×学科相似度矩阵，取核心学科所在行
+        discipline_sims = self.cosine_to_score(discipline_matrix @ discipline_matrix.T)
+        discipline_index = {d: i for i, d in enumerate(disciplines)}
+        candidate_disc_idx = np.array([discipline_index[d] for _, d in candidates])
+        discipline_sim = discipline_sims[0, candidate_disc_idx]
+        
+        semantic_sim = self.cosine_to_score(concept_matrix @ core_vec)
+        
+        # 跨学科奖励（同compute_concept_distance）
+        cross_discipline_boost = 1 + (1 - discipline_sim) * 0.3
+        final_score = np.where(
+            discipline_sim > 0.8,
+            semantic_sim,
+            np.where(semantic_sim > 0.5, semantic_sim * cross_discipline_boost, semantic_sim * 0.8)
+        )
+        final_score = np.clip(final_score, 0.0, 1.0)
+        
+        # 跳过同学科、过滤低相似度
+        keep = (discipline_sim <= (1 - diversity_threshold)) & (semantic_sim >= similarity_threshold)
+        kept_idx = np.flatnonzero(keep)
+        order = kept_idx[self.top_k_indices(final_score[kept_idx], top_k)]
         
-        distant_relatives.sort(key=lambda x: x[2], reverse=True)
+        distant_relatives = [
+            (candidates[i][0], candidates[i][1], float(final_score[i]))
+            for i in order
+        ]
         
         logger.info(
             f"Found {len(distant_relatives)} distant relatives for "
             f"'{core_concept}' ({core_discipline})"
         )
         
-        return distant_relatives[:top_k]
+        return distant_relatives
     
     def clear_cache(self):
-        """清空缓存"""
-        self._embedding_cache.clear()
+        """清空进程内缓存（持久层保留）"""
+        self.embedding_store.clear_memory()
         logger.info("Embedding cache cleared")
     
     def get_cache_size(self) -> int:
-        """获取缓存大小"""
-        return len(self._embedding_cache)
+        """获取进程内缓存大小"""
+        return self.embedding_store.memory_size()
 
 
 # Alias for compatibility
@@ -0,0 +1,272 @@
+"""
+异步Wikipedia客户端
+基于REST summary接口（单条）和Action API（批量），按语言拼接URL，无全局状态
+"""
+
+import os
+import re
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import quote
+
+import httpx
+
+from shared.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from shared.http_pool import get_http_pools
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "ConceptGraphAI/1.0 (https://github.com/kaifenger/Final_Cloud_Computing)"
+BATCH_LIMIT = 20  # Action API extracts单次最多返回20条摘要
+
+
+def not_found(title: str, lang: str) -> Dict[str, Any]:
+    """未找到时的结果（与DataCrawler.search_wikipedia保持一致）"""
+    return {"title": title, "summary": "", "url": "", "exists": False, "lang": lang}
+
+
+class WikipediaClient:
+    """
+    异步Wikipedia客户端
+
+    - 语言作为参数传入，zh/en查询可并发进行
+    - 重定向：REST接口自动跟随；批量接口使用redirects=1
+    - 消歧义页：取消歧义页中的第一个条目链接再查一次
+    - HTTP请求复用应用级连接池（shared.http_pool的wikipedia客户端）
+    - 多语言查找（lookup）：sequential逐个语言回退；hedged对冲并发，优先语言在宽限期内命中则优先返回
+    - 请求经wikipedia熔断器，熔断期间直接返回未找到
+    """
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        timeout: float = 10.0,
+        languages: Sequence[str] = ("zh", "en"),
+        lookup_mode: Optional[str] = None,
+        hedge_delay: Optional[float] = None,
+        preferred_grace: Optional[float] = None
+    ):
+        self.api_url = (api_url or os.getenv(
+            "WIKIPEDIA_API_URL",
+            "https://zh.wikipedia.org/api/rest_v1"
+        )).rstrip("/")
+        self.timeout = timeout
+        self.languages = tuple(languages)
+        self.lookup_mode = lookup_mode or os.getenv("WIKIPEDIA_LOOKUP_MODE", "hedged")
+        # 对冲延迟：优先语言请求发出后多久再发备用语言（0表示同时发出）
+        self.hedge_delay = hedge_delay if hedge_delay is not None else float(os.getenv("WIKIPEDIA_HEDGE_DELAY", "0.3"))
+        # 宽限期：备用语言先命中后，再等待优先语言的最长时间
+        self.preferred_grace = preferred_grace if preferred_grace is not None else float(os.getenv("WIKIPEDIA_PREFERRED_GRACE", "0.5"))
+
+    def rest_base(self, lang: str) -> str:
+        """替换配置URL中的语言子域名，得到该语言的REST接口地址"""
+        return re.sub(r"//[a-z\-]+\.wikipedia\.org", f"//{lang}.wikipedia.org", self.api_url)
+
+    def action_url(self, lang: str) -> str:
+        return re.sub(r"/api/rest_v1$", "/w/api.php", self.rest_base(lang))
+
+    def _headers(self, lang: str) -> Dict[str, str]:
+        headers = {"User-Agent": USER_AGENT}
+        if lang == "zh":
+            headers["Accept-Language"] = "zh-CN"  # 返回简体
+        return headers
+
+    async def _get(self, url: str, lang: str, params: Optional[Dict] = None) -> Optional[httpx.Response]:
+        """经wikipedia熔断器发出请求（超时、连接错误和5xx计为失败；熔断时抛出CircuitOpenError）"""
+        async with get_http_pools().borrow("wikipedia") as client:
+            return await get_circuit_breaker("wikipedia").call(
+                lambda: client.get(url, params=params, headers=self._headers(lang), timeout=self.timeout),
+                failed=lambda response: response.status_code >= 500
+            )
+
+    async def get_summary(self, title: str, lang: str = "zh", follow_disambiguation: bool = True) -> Dict[str, Any]:
+        """
+        获取单个条目摘要
+
+        Returns:
+            {"title", "summary", "url", "exists", "lang"}
+        """
+        url = f"{self.rest_base(lang)}/page/summary/{quote(title.replace(' ', '_'), safe='')}"
+        try:
+            response = await self._get(url, lang, params={"redirect": "true"})
+            if response.status_code == 404:
+                logger.info(f"Wikipedia ({lang}) page not found: {title}")
+                return not_found(title, lang)
+            if response.status_code != 200:
+                logger.warning(f"Wikipedia ({lang}) HTTP {response.status_code} for '{title}'")
+                return not_found(title, lang)
+            data = response.json()
+        except CircuitOpenError:
+            return not_found(title, lang)
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning(f"Wikipedia ({lang}) request failed for '{title}': {type(e).__name__} {e}")
+            return not_found(title, lang)
+
+        if data.get("type") == "disambiguation":
+            options = await self.disambiguation_options(data.get("title", title), lang) if follow_disambiguation else []
+            logger.info(f"Wikipedia disambiguation for '{title}': {options[:3]}")
+            if options:
+                return await self.get_summary(options[0], lang, follow_disambiguation=False)
+            return not_found(title, lang)
+
+        extract = (data.get("extract") or "").strip()
+        if not extract:
+            return not_found(title, lang)
+        return {
+            "title": data.get("title", title),
+            "summary": extract,
+            "url": data.get("content_urls", {}).get("desktop", {}).get("page", ""),
+            "exists": True,
+            "lang": lang
+        }
+
+    async def lookup(self, title: str) -> Dict[str, Any]:
+        """按语言优先级查找条目（结果中的lang表示命中的语言）"""
+        if self.lookup_mode == "hedged" and len(self.languages) > 1:
+            return await self.lookup_hedged(title)
+        result = not_found(title, self.languages[0])
+        for lang in self.languages:
+            result = await self.get_summary(title, lang)
+            if result["exists"]:
+                return result
+        return not_found(title, self.languages[0])
+
+    async def lookup_hedged(self, title: str) -> Dict[str, Any]:
+        """
+        对冲查找：优先语言先发出，hedge_delay后（或其提前未命中时）发出备用语言
+
+        - 优先语言命中：立即返回，取消备用请求
+        - 备用语言先命中：再等待优先语言preferred_grace秒，仍未命中则返回备用结果
+        - 全部未命中：返回未找到
+        """
+        primary_lang, fallback_lang = self.languages[0], self.languages[1]
+        primary = asyncio.ensure_future(self.get_summary(title, primary_lang))
+        fallback: Optional[asyncio.Task] = None
+
+        try:
+            if self.hedge_delay > 0:
+                done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay)
+                if done and primary.result()["exists"]:
+                    return primary.result()
+            fallback = asyncio.ensure_future(self.get_summary(title, fallback_lang))
+
+            pending = {primary, fallback}
+            fallback_hit = None
+            while pending:
+                timeout = self.preferred_grace if fallback_hit is not None else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break  # 宽限期结束，优先语言仍未返回
+                if primary in done:
+                    if primary.result()["exists"]:
+                        return primary.result()
+                    if fallback_hit is not None:
+                        break
+                if fallback in done and fallback.result()["exists"]:
+                    fallback_hit = fallback.result()
+                    if primary.done():
+                        break
+
+            if fallback_hit is not None:
+                logger.info(f"Wikipedia hedged lookup for '{title}' answered by {fallback_lang}")
+                return fallback_hit
+            return not_found(title, primary_lang)
+        finally:
+            for task in (primary, fallback):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def disambiguation_options(self, title: str, lang: str, limit: int = 5) -> List[str]:
+        """消歧义页中的条目链接（主命名空间）"""
+        params = {
+            "action": "query",
+            "prop": "links",
+            "titles": title,
+            "plnamespace": 0,
+            "pllimit": limit,
+            "format": "json",
+            "formatversion": 2
+        }
+        try:
+            response = await self._get(self.action_url(lang), lang, params=params)
+            pages = response.json().get("query", {}).get("pages", [])
+        except Exception as e:
+            logger.warning(f"Wikipedia disambiguation lookup failed for '{title}': {e}")
+            return []
+        return [link["title"] for page in pages for link in page.get("links", [])]
+
+    async def get_summaries(self, titles: List[str], lang: str = "zh") -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取条目摘要（Action API，每批最多20个标题）
+
+        消歧义页单独通过get_summary跟随第一个条目。
+
+        Returns:
+            {输入标题: 摘要结果}
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        unique = list(dict.fromkeys(titles))
+        for offset in range(0, len(unique), BATCH_LIMIT):
+            chunk = unique[offset:offset + BATCH_LIMIT]
+            results.update(await self._query_batch(chunk, lang))
+        return results
+
+    async def _query_batch(self, titles: List[str], lang: str) -> Dict[str, Dict[str, Any]]:
+        params = {
+            "action": "query",
+            "prop": "extracts|info|pageprops",
+            "exintro": 1,
+            "explaintext": 1,
+            "exlimit": "max",
+            "inprop": "url",
+            "ppprop": "disambiguation",
+            "redirects": 1,
+            "titles": "|".join(titles),
+            "format": "json",
+            "formatversion": 2
+        }
+        try:
+            response = await self._get(self.action_url(lang), lang, params=params)
+            query = response.json().get("query", {})
+        except Exception as e:
+            logger.warning(f"Wikipedia ({lang}) batch lookup failed: {e}")
+            return {t: not_found(t, lang) for t in titles}
+
+        # 输入标题 -> 规范化标题 -> 重定向目标
+        resolved = {t: t for t in titles}
+        for mapping in ("normalized", "redirects"):
+            targets = {m["from"]: m["to"] for m in query.get(mapping, [])}
+            resolved = {t: targets.get(r, r) for t, r in resolved.items()}
+        pages = {page.get("title"): page for page in query.get("pages", [])}
+
+        results = {}
+        for title, page_title in resolved.items():
+            page = pages.get(page_title)
+            if not page or page.get("missing") or page.get("invalid"):
+                results[title] = not_found(title, lang)
+            elif "disambiguation" in page.get("pageprops", {}):
+                results[title] = await self.get_summary(page_title, lang)
+            elif (page.get("extract") or "").strip():
+                results[title] = {
+                    "title": page_title,
+                    "summary": page["extract"].strip(),
+                    "url": page.get("fullurl", ""),
+                    "exists": True,
+                    "lang": lang
+                }
+            else:
+                results[title] = not_found(title, lang)
+        return results
+
+
+# 全局实例
+_wikipedia_client: Optional[WikipediaClient] = None
+
+
+def get_wikipedia_client() -> WikipediaClient:
+    """获取全局Wikipedia客户端"""
+    global _wikipedia_client
+    if _wikipedia_client is None:
+        _wikipedia_client = WikipediaClient()
+    return _wikipedia_client
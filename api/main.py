@@ -9,6 +9,7 @@ from contextlib import asynccontextmanager
 
 from api.routes import router
 from shared.error_codes import ErrorCode, get_error_message
+from shared.http_pool import get_http_pools
 
 # 配置日志
 logging.basicConfig(
@@ -27,10 +28,14 @@ async def lifespan(app: FastAPI):
     logger.info(f"🔑 OpenAI API Key: {'已配置' if os.getenv('OPENAI_API_KEY') else '未配置'}")
     logger.info(f"🔑 OpenRouter API Key: {'已配置' if os.getenv('OPENROUTER_API_KEY') else '未配置'}")
     
+    # 共享HTTP连接池（Arxiv / Wikipedia / Embedding）
+    await get_http_pools().start()
+    
     yield
     
     # 关闭时
     logger.info("🛑 ConceptGraph AI API 关闭中...")
+    await get_http_pools().close()
 
 
 # 创建FastAPI应用
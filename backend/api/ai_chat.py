@@ -3,25 +3,17 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import Optional
 import asyncio
-import os
-from openai import AsyncOpenAI
+
+from shared.circuit_breaker import CircuitOpenError
+from shared.model_router import get_model_router
+from shared.openai_clients import get_openai_client
 
 router = APIRouter()
 
 # LLM客户端
-_llm_client = None
-
 def get_llm_client():
-    """获取LLM客户端单例"""
-    global _llm_client
-    if _llm_client is None:
-        api_key = os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY")
-        if api_key:
-            _llm_client = AsyncOpenAI(
-                api_key=api_key,
-                base_url=os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
-            )
-    return _llm_client
+    """获取AI问答的LLM客户端（共享连接池，见shared.openai_clients）"""
+    return get_openai_client("chat")
 
 
 class AIChatRequest(BaseModel):
@@ -65,19 +57,18 @@ async def ai_chat(request: AIChatRequest):
 
 请回答上述问题。"""
         
-        response = await asyncio.wait_for(
-            client.chat.completions.create(
-                model=os.getenv("LLM_MODEL", "google/gemini-3-flash-preview"),
+        response = await get_model_router().run("chat", lambda route: route.call(
+            lambda: client.chat.completions.create(
+                model=route.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.5,
-                max_tokens=300,
+                max_tokens=route.max_tokens,
                 extra_body={"reasoning": {"enabled": True}}
-            ),
-            timeout=30.0
-        )
+            )
+        ))
         
         if response and response.choices:
             answer = response.choices[0].message.content.strip()
@@ -95,6 +86,11 @@ async def ai_chat(request: AIChatRequest):
             status_code=504,
             detail="AI响应超时，请稍后重试"
         )
+    except CircuitOpenError:
+        raise HTTPException(
+            status_code=503,
+            detail="AI服务暂时不可用，请稍后重试"
+        )
     except Exception as e:
         print(f"[ERROR] AI问答失败: {str(e)}")
         raise HTTPException(
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM流式输出逐行解析
+
+候选生成类的提示词要求"每行一个候选"（如 概念名|学科|关系类型|跨学科原理），
+流式模式下每收到完整的一行就交给调用方解析，下游（Embedding、富化）不必等待整个回答结束。
+LLM_STREAMING=false 时退回一次性请求，产出的行完全相同。
+"""
+
+import os
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from shared.circuit_breaker import get_circuit_breaker
+
+
+def streaming_enabled() -> bool:
+    return os.getenv("LLM_STREAMING", "true").lower() == "true"
+
+
+async def iter_completion_lines(
+    client,
+    request_params: Dict[str, Any],
+    timeout: float,
+    stream: Optional[bool] = None
+) -> AsyncIterator[str]:
+    """
+    逐行产出LLM回答（去除首尾空白，跳过空行）
+
+    Args:
+        client: AsyncOpenAI客户端
+        request_params: chat.completions.create参数
+        timeout: 整个回答的截止时间（秒），超时抛出asyncio.TimeoutError，已产出的行仍然有效
+        stream: 是否流式，默认读取LLM_STREAMING
+    
+    LLM熔断器打开时立即抛出CircuitOpenError，调用方走各自的回退逻辑。
+    """
+    breaker = get_circuit_breaker("llm")
+    if not (streaming_enabled() if stream is None else stream):
+        response = await breaker.call(lambda: client.chat.completions.create(**request_params), timeout=timeout)
+        content = response.choices[0].message.content if response and response.choices else ""
+        for line in (content or "").split("\n"):
+            if line.strip():
+                yield line.strip()
+        return
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    def remaining() -> float:
+        left = deadline - loop.time()
+        if left <= 0:
+            raise asyncio.TimeoutError()
+        return left
+
+    async with breaker.guard():
+        response = await asyncio.wait_for(
+            client.chat.completions.create(**request_params, stream=True),
+            timeout=remaining()
+        )
+        chunks = response.__aiter__()
+        buffer = ""
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=remaining())
+                except StopAsyncIteration:
+                    break
+                if not chunk.choices:
+                    continue
+                buffer += chunk.choices[0].delta.content or ""
+                *lines, buffer = buffer.split("\n")
+                for line in lines:
+                    if line.strip():
+                        yield line.strip()
+            if buffer.strip():
+                yield buffer.strip()
+        finally:
+            # 提前结束（已收满候选、超时或调用方退出）时关闭连接，不再消耗token
+            await response.close()
+
+
+class CandidateBatcher:
+    """
+    候选预取合批：候选逐个到达，批量调用fetch
+
+    没有进行中的请求时立即发出；请求进行中到达的候选累积到下一批。
+    fetch失败只打印警告（预取只是优化，正式计算会重新获取）。
+    """
+
+    def __init__(self, fetch: Callable[[List[str]], Awaitable[Any]]):
+        self.fetch = fetch
+        self.batches = 0
+        self._pending: List[str] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, item: str):
+        self._pending.append(item)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while self._pending:
+            batch, self._pending = self._pending, []
+            self.batches += 1
+            try:
+                await self.fetch(batch)
+            except Exception as e:
+                print(f"[WARNING] 候选预取失败({len(batch)}个): {type(e).__name__} {e}")
+
+    async def drain(self):
+        """等待所有已加入的候选预取完成"""
+        while self._task is not None and not self._task.done():
+            await self._task
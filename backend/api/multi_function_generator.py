@@ -4,59 +4,54 @@
 功能2和功能3的核心生成器
 """
 
-import os
 import asyncio
 import re
-from typing import List, Dict, Any
+from contextlib import aclosing
+from typing import List, Dict, Any, Optional, Callable, AsyncIterator
 from pathlib import Path
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+
+from backend.api.llm_stream import iter_completion_lines
+from shared.circuit_breaker import CircuitOpenError
+from shared.model_router import Route, get_model_router
+from shared.openai_clients import get_openai_client
 
 # 加载环境变量
 env_path = Path(__file__).parent.parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
 # ==================== LLM客户端 ====================
-_llm_client = None
-
 def get_llm_client():
-    """获取LLM客户端"""
-    global _llm_client
-    if _llm_client is None:
-        api_key = os.getenv("OPENROUTER_API_KEY")
-        if api_key:
-            _llm_client = AsyncOpenAI(
-                api_key=api_key,
-                base_url=os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
-            )
-            print("[INFO] 多功能LLM客户端已初始化")
-    return _llm_client
+    """获取LLM客户端（共享连接池，见shared.openai_clients）"""
+    return get_openai_client("node_generation")
 
 
 # ==================== 功能2：指定学科的概念挖掘 ====================
 
-async def generate_concepts_with_disciplines(
-    parent_concept: str,
-    disciplines: List[str],
-    max_count: int = 10
-) -> List[Dict]:
-    """
-    功能2：生成指定学科的相关概念
+def parse_discipline_line(line: str, disciplines: List[str]) -> Optional[Dict]:
+    """解析一行功能2候选：概念名|学科|关系类型|关联原理（学科不在指定列表中时过滤）"""
+    parts = line.strip().split('|')
+    if len(parts) < 4:
+        return None
+    # 去除序号
+    concept_name = re.sub(r'^\d+\.\s*', '', parts[0].strip())
+    concept_discipline = parts[1].strip()
     
-    Args:
-        parent_concept: 输入概念，如"神经网络"
-        disciplines: 学科列表，如["生物学", "数学"]
-        max_count: 每个学科生成的概念数
-        
-    Returns:
-        概念列表，每个概念包含：name, discipline, relation, cross_principle
-    """
-    
-    client = get_llm_client()
-    if not client:
-        print("[WARNING] LLM客户端未初始化")
-        return []
+    # 验证学科是否在指定列表中
+    if concept_discipline not in disciplines:
+        print(f"[FILTER] 学科不匹配，已过滤: {concept_name} ({concept_discipline})")
+        return None
     
+    return {
+        "name": concept_name,
+        "discipline": concept_discipline,
+        "relation": parts[2].strip(),
+        "cross_principle": parts[3].strip()
+    }
+
+
+def _disciplined_request(parent_concept: str, disciplines: List[str], max_count: int, route: Route) -> Dict[str, Any]:
+    """构建功能2的LLM请求参数"""
     # 构建学科列表字符串
     discipline_list = "\n".join([f"- {d}" for d in disciplines])
     
@@ -98,88 +93,99 @@ async def generate_concepts_with_disciplines(
     
     system_prompt = f"你是跨学科知识挖掘专家。关键要求：必须严格生成{max_count}个概念，不能多也不能少。每个概念单独一行，格式：概念名|学科|关系类型|关联原理。不要任何解释、序号或额外内容。"
     
-    try:
-        response = await asyncio.wait_for(
-            client.chat.completions.create(
-                model=os.getenv("LLM_MODEL", "google/gemini-3-flash-preview"),
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.4,
-                max_tokens=2000,  # 增加到2000以支持20个概念
-                extra_body={"reasoning": {"enabled": False}}  # 关闭推理模式提高速度
-            ),
-            timeout=40.0  # 增加超时到40秒
-        )
-        
-        # 解析输出
-        if response and response.choices:
-            content = response.choices[0].message.content.strip()
-            concepts = []
-            
-            for line in content.split('\n'):
-                line = line.strip()
-                if '|' in line:
-                    parts = line.split('|')
-                    if len(parts) >= 4:
-                        # 去除序号
-                        concept_name = re.sub(r'^\d+\.\s*', '', parts[0].strip())
-                        concept_discipline = parts[1].strip()
-                        
-                        # 验证学科是否在指定列表中
-                        if concept_discipline not in disciplines:
-                            print(f"[FILTER] 学科不匹配，已过滤: {concept_name} ({concept_discipline})")
-                            continue
-                        
-                        concepts.append({
-                            "name": concept_name,
-                            "discipline": concept_discipline,
-                            "relation": parts[2].strip(),
-                            "cross_principle": parts[3].strip()
-                        })
-            
-            # 学术过滤已禁用
-            if concepts:
-                print(f"[SUCCESS] 功能2生成了{len(concepts)}个概念（限定学科：{', '.join(disciplines)}）")
-                return concepts
-            
-            return concepts
-    
-    except asyncio.TimeoutError:
-        print(f"[WARNING] 功能2生成超时")
-    except Exception as e:
-        print(f"[WARNING] 功能2生成失败: {str(e)}")
-    
-    return []
+    return dict(
+        model=route.model,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.4,
+        max_tokens=route.max_tokens,  # discover任务默认2000，支持20个概念
+        extra_body={"reasoning": {"enabled": False}}  # 关闭推理模式提高速度
+    )
 
 
-# ==================== 功能3：多概念桥梁发现 ====================
+async def stream_concepts_with_disciplines(
+    parent_concept: str,
+    disciplines: List[str],
+    max_count: int = 10,
+    timeout: Optional[float] = None
+) -> AsyncIterator[Dict]:
+    """功能2流式生成：LLM每输出完整一行就产出一个（学科匹配的）候选"""
+    client = get_llm_client()
+    if not client:
+        return
+    
+    route = get_model_router().route("discover")
+    request_params = _disciplined_request(parent_concept, disciplines, max_count, route)
+    async with route.track():
+        async with aclosing(iter_completion_lines(client, request_params, timeout or route.timeout)) as lines:
+            async for line in lines:
+                concept = parse_discipline_line(line, disciplines)
+                if concept is not None:
+                    yield concept
 
-async def find_bridge_concepts(
-    concepts: List[str],
-    max_bridges: int = 10
+
+async def generate_concepts_with_disciplines(
+    parent_concept: str,
+    disciplines: List[str],
+    max_count: int = 10,
+    on_candidate: Optional[Callable[[Dict], None]] = None
 ) -> List[Dict]:
     """
-    功能3：寻找多个概念之间的桥梁概念
+    功能2：生成指定学科的相关概念
     
     Args:
-        concepts: 输入概念列表，如["熵", "最小二乘法"]
-        max_bridges: 最大桥梁概念数
+        parent_concept: 输入概念，如"神经网络"
+        disciplines: 学科列表，如["生物学", "数学"]
+        max_count: 每个学科生成的概念数
+        on_candidate: 每解析出一个候选就立即回调
         
     Returns:
-        桥梁概念列表，每个包含：
-        - name: 桥梁概念名
-        - bridge_type: 桥梁类型（直接/间接/原理性）
-        - connected_concepts: 关联的输入概念列表
-        - connection_principle: 连接原理
+        概念列表，每个概念包含：name, discipline, relation, cross_principle
     """
     
-    client = get_llm_client()
-    if not client:
+    if not get_llm_client():
         print("[WARNING] LLM客户端未初始化")
         return []
     
+    concepts = []
+    try:
+        async with aclosing(stream_concepts_with_disciplines(parent_concept, disciplines, max_count)) as candidates:
+            async for concept in candidates:
+                concepts.append(concept)
+                if on_candidate:
+                    on_candidate(concept)
+    except asyncio.TimeoutError:
+        print(f"[WARNING] 功能2生成超时（已生成{len(concepts)}个概念）")
+    except CircuitOpenError:
+        print("[WARNING] LLM熔断中，功能2跳过生成")
+    except Exception as e:
+        print(f"[WARNING] 功能2生成失败: {str(e)}（已生成{len(concepts)}个概念）")
+    
+    # 学术过滤已禁用
+    if concepts:
+        print(f"[SUCCESS] 功能2生成了{len(concepts)}个概念（限定学科：{', '.join(disciplines)}）")
+    return concepts
+
+
+# ==================== 功能3：多概念桥梁发现 ====================
+
+def parse_bridge_line(line: str) -> Optional[Dict]:
+    """解析一行桥梁概念：概念名|桥梁类型|关联的输入概念|连接原理"""
+    parts = line.strip().split('|')
+    if len(parts) < 4:
+        return None
+    return {
+        "name": re.sub(r'^\d+\.\s*', '', parts[0].strip()),
+        "bridge_type": parts[1].strip(),
+        "connected_concepts": [c.strip() for c in parts[2].split(',')],
+        "connection_principle": parts[3].strip()
+    }
+
+
+def _bridge_request(concepts: List[str], max_bridges: int, route: Route) -> Dict[str, Any]:
+    """构建功能3的LLM请求参数"""
     # 构建概念列表字符串
     concept_list = "\n".join([f"- {c}" for c in concepts])
     
@@ -240,60 +246,87 @@ Transformer|间接桥梁|神经网络,深度学习|深度学习的新型神经
     
     system_prompt = f"你是跨学科概念连接专家。关键要求：必须严格生成至少{max_bridges}个桥梁概念，不能少！每个概念单独一行，格式：概念名|桥梁类型|关联的输入概念|连接原理。不要任何解释、序号或额外内容。"
     
-    try:
-        response = await asyncio.wait_for(
-            client.chat.completions.create(
-                model=os.getenv("LLM_MODEL", "google/gemini-3-flash-preview"),
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,  # 提高temperature鼓励更多样化的输出
-                max_tokens=2000,  # 增加token限制以容纳更多概念
-                extra_body={"reasoning": {"enabled": True}}
-            ),
-            timeout=40.0  # 增加超时时间
-        )
+    return dict(
+        model=route.model,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.7,  # 提高temperature鼓励更多样化的输出
+        max_tokens=route.max_tokens,  # bridge任务默认2000，容纳更多概念
+        extra_body={"reasoning": {"enabled": True}}
+    )
+
+
+async def stream_bridge_concepts(
+    concepts: List[str],
+    max_bridges: int = 10,
+    timeout: Optional[float] = None
+) -> AsyncIterator[Dict]:
+    """功能3流式生成：LLM每输出完整一行就产出一个桥梁概念（按输出顺序，未排序）"""
+    client = get_llm_client()
+    if not client:
+        return
+    
+    route = get_model_router().route("bridge")
+    request_params = _bridge_request(concepts, max_bridges, route)
+    async with route.track():
+        async with aclosing(iter_completion_lines(client, request_params, timeout or route.timeout)) as lines:
+            async for line in lines:
+                bridge = parse_bridge_line(line)
+                if bridge is not None:
+                    print(f"[DEBUG] 解析到桥梁概念: {bridge['name']} ({bridge['bridge_type']})")
+                    yield bridge
+
+
+async def find_bridge_concepts(
+    concepts: List[str],
+    max_bridges: int = 10,
+    on_candidate: Optional[Callable[[Dict], None]] = None
+) -> List[Dict]:
+    """
+    功能3：寻找多个概念之间的桥梁概念
+    
+    Args:
+        concepts: 输入概念列表，如["熵", "最小二乘法"]
+        max_bridges: 最大桥梁概念数
+        on_candidate: 每解析出一个桥梁概念就立即回调（排序截断之前）
         
-        # 解析输出
-        if response and response.choices:
-            content = response.choices[0].message.content.strip()
-            print(f"[DEBUG] 功能3 LLM原始响应:\n{content}\n")
-            bridges = []
-            
-            for line in content.split('\n'):
-                line = line.strip()
-                if '|' in line:
-                    parts = line.split('|')
-                    if len(parts) >= 4:
-                        bridge_name = re.sub(r'^\d+\.\s*', '', parts[0].strip())
-                        bridge_type = parts[1].strip()
-                        connected = [c.strip() for c in parts[2].split(',')]
-                        principle = parts[3].strip()
-                        
-                        bridges.append({
-                            "name": bridge_name,
-                            "bridge_type": bridge_type,
-                            "connected_concepts": connected,
-                            "connection_principle": principle
-                        })
-                        print(f"[DEBUG] 解析到桥梁概念: {bridge_name} ({bridge_type})")
-            
-            print(f"[DEBUG] 共解析出 {len(bridges)} 个桥梁概念")
-            
-            # 按桥梁类型排序：直接桥梁 > 间接桥梁 > 原理性桥梁
-            priority = {"直接桥梁": 1, "间接桥梁": 2, "原理性桥梁": 3}
-            bridges.sort(key=lambda x: priority.get(x["bridge_type"], 999))
-            
-            print(f"[SUCCESS] 功能3找到了{len(bridges)}个桥梁概念")
-            return bridges[:max_bridges]
+    Returns:
+        桥梁概念列表，每个包含：
+        - name: 桥梁概念名
+        - bridge_type: 桥梁类型（直接/间接/原理性）
+        - connected_concepts: 关联的输入概念列表
+        - connection_principle: 连接原理
+    """
     
+    if not get_llm_client():
+        print("[WARNING] LLM客户端未初始化")
+        return []
+    
+    bridges = []
+    try:
+        async with aclosing(stream_bridge_concepts(concepts, max_bridges)) as candidates:
+            async for bridge in candidates:
+                bridges.append(bridge)
+                if on_candidate:
+                    on_candidate(bridge)
     except asyncio.TimeoutError:
-        print(f"[WARNING] 功能3生成超时")
+        print(f"[WARNING] 功能3生成超时（已生成{len(bridges)}个桥梁概念）")
+    except CircuitOpenError:
+        print("[WARNING] LLM熔断中，功能3跳过生成")
     except Exception as e:
-        print(f"[WARNING] 功能3生成失败: {str(e)}")
+        print(f"[WARNING] 功能3生成失败: {str(e)}（已生成{len(bridges)}个桥梁概念）")
+    
+    print(f"[DEBUG] 共解析出 {len(bridges)} 个桥梁概念")
+    
+    # 按桥梁类型排序：直接桥梁 > 间接桥梁 > 原理性桥梁
+    priority = {"直接桥梁": 1, "间接桥梁": 2, "原理性桥梁": 3}
+    bridges.sort(key=lambda x: priority.get(x["bridge_type"], 999))
     
-    return []
+    if bridges:
+        print(f"[SUCCESS] 功能3找到了{len(bridges)}个桥梁概念")
+    return bridges[:max_bridges]
 
 
 # ==================== 测试代码 ====================
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+节点富化阶段 - 有界并发地为候选概念获取Wikipedia定义、可信度和简介
+
+每个候选概念的富化结果先用回退值填充，外部调用完成一项就覆盖一项；
+到达截止时间仍未完成的候选保留已完成的部分，其余字段使用回退值。
+"""
+
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# 默认值（可通过settings.ENRICH_CONCURRENCY / ENRICH_DEADLINE覆盖）
+DEFAULT_CONCURRENCY = 8
+DEFAULT_DEADLINE = 20.0
+
+
+def wiki_miss() -> Dict[str, Any]:
+    """Wikipedia未命中时的默认结果（与get_wikipedia_definition保持一致）"""
+    return {"definition": "", "exists": False, "url": "", "source": "LLM"}
+
+
+@dataclass
+class ConceptEnrichment:
+    """单个概念的富化结果"""
+    concept: str
+    similarity: Optional[float] = None  # 已计算的语义相似度（用于可信度）
+    wiki: Dict[str, Any] = field(default_factory=wiki_miss)
+    credibility: Optional[float] = None
+    brief_summary: Optional[str] = None
+    completed: bool = False
+
+
+class EnrichmentStage:
+    """
+    有界并发的富化阶段
+
+    - 所有外部调用共享同一个信号量，限制单个请求的并发数
+    - 截止时间从创建阶段时开始计时（在富化即将开始时创建），多次gather()和批量简介共享剩余时间，
+      超时任务被取消并保留部分结果
+    - 结果顺序与输入顺序一致
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, deadline: float = DEFAULT_DEADLINE):
+        self.concurrency = max(1, int(concurrency))
+        self.deadline = float(deadline)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._deadline_at = time.monotonic() + self.deadline
+
+    def remaining(self) -> float:
+        """请求截止时间的剩余秒数（不小于0）"""
+        return max(0.0, self._deadline_at - time.monotonic())
+
+    async def call(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """在并发限制下执行一次外部调用"""
+        async with self._semaphore:
+            return await factory()
+
+    async def gather(
+        self,
+        records: List[ConceptEnrichment],
+        job: Callable[[ConceptEnrichment], Awaitable[None]]
+    ) -> List[ConceptEnrichment]:
+        """
+        并发执行每个记录的富化任务，超过请求截止时间的任务被取消
+
+        Args:
+            records: 预先填充了回退值的富化记录
+            job: 富化协程，直接修改传入的记录
+
+        Returns:
+            与输入顺序一致的记录列表
+        """
+        if not records:
+            return records
+
+        timeout = self.remaining()
+        tasks = [asyncio.ensure_future(job(record)) for record in records]
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            stragglers = [r.concept for r, t in zip(records, tasks) if t in pending]
+            print(f"[WARNING] 富化超时(剩余{timeout:.1f}s/{self.deadline}s)，{len(stragglers)}个概念使用部分结果: {stragglers}")
+
+        for record, task in zip(records, tasks):
+            if task in done and not task.cancelled() and task.exception() is not None:
+                print(f"[WARNING] 富化失败: {record.concept}, {task.exception()}")
+            elif task in done:
+                record.completed = True
+
+        return records
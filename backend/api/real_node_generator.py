@@ -4,83 +4,69 @@
 真实节点生成器 - 使用LLM和语义相似度
 """
 
-import os
+import re
 import asyncio
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from contextlib import aclosing
+from typing import List, Dict, Any, Tuple, Optional, Callable, AsyncIterator
 from pathlib import Path
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+
+from algorithms.embedding_store import get_embedding_store
+from shared.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from shared.llm_cache import get_llm_cache
+from shared.llm_hedge import get_hedge_policy
+from shared.model_router import Route, get_model_router
+from shared.openai_clients import get_openai_client
+from shared.rate_limiter import is_rate_limit_error
+from backend.api.llm_stream import iter_completion_lines
 
 # 加载环境变量
 env_path = Path(__file__).parent.parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
 # ==================== LLM客户端 ====================
-_llm_client = None
-_embedding_client = None
-_last_embedding_time = 0  # 记录上次embedding请求时间
-_embedding_min_interval = 0.2  # 最小请求间隔（秒）
+EMBEDDING_MODEL = "text-embedding-3-small"
 
 def get_llm_client():
-    """获取LLM客户端（用于文本生成）"""
-    global _llm_client
-    if _llm_client is None:
-        api_key = os.getenv("OPENROUTER_API_KEY")
-        if api_key:
-            _llm_client = AsyncOpenAI(
-                api_key=api_key,
-                base_url=os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
-            )
-            print("[INFO] LLM客户端已初始化（文本生成）")
-    return _llm_client
+    """获取LLM客户端（用于文本生成，共享连接池，见shared.openai_clients）"""
+    return get_openai_client("node_generation")
 
 
 def get_embedding_client():
-    """获取Embedding客户端（用于相似度计算）"""
-    global _embedding_client
-    if _embedding_client is None:
-        api_key = os.getenv("OPENAI_API_KEY")
-        if api_key:
-            import httpx
-            # 配置HTTP客户端：增加超时和连接限制
-            http_client = httpx.AsyncClient(
-                timeout=httpx.Timeout(60.0, connect=10.0),  # 总超时60秒，连接超时10秒
-                limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
-            )
-            _embedding_client = AsyncOpenAI(
-                api_key=api_key,
-                http_client=http_client
-            )
-            print("[INFO] Embedding客户端已初始化（OpenAI，超时60秒）")
-        else:
-            print("[WARNING] OPENAI_API_KEY未设置，相似度计算将使用默认值")
-    return _embedding_client
+    """获取Embedding客户端（用于相似度计算，超时60秒，共享连接池）"""
+    client = get_openai_client("embedding")
+    if client is None:
+        print("[WARNING] OPENAI_API_KEY未设置，相似度计算将使用默认值")
+    return client
 
 
 # ==================== LLM生成相关概念 ====================
 
-async def generate_related_concepts(
-    parent_concept: str,
-    existing_concepts: List[str],
-    max_count: int = 5
-) -> List[Dict[str, str]]:
+def parse_concept_line(line: str) -> Optional[Dict[str, str]]:
     """
-    使用LLM生成相关概念
+    解析一行候选概念：概念名|学科|关系类型|跨学科原理（兼容旧格式 概念名|学科|关系类型）
     
-    Args:
-        parent_concept: 父概念名称
-        existing_concepts: 已存在的概念列表
-        max_count: 最大生成数量
-        
     Returns:
-        [{"name": "概念名", "discipline": "学科", "relation": "关系类型"}, ...]
+        {"name", "discipline", "relation", "cross_principle"}，格式不符时返回None
     """
-    client = get_llm_client()
-    if not client:
-        print("[WARNING] LLM客户端未初始化，使用预定义概念")
-        return _get_fallback_concepts(parent_concept)
-    
+    parts = line.strip().split('|')
+    if len(parts) < 3:
+        return None
+    # 去除概念名前的序号（如"1. 反向传播" -> "反向传播"）
+    concept_name = re.sub(r'^\d+\.\s*', '', parts[0].strip())
+    if not concept_name:
+        return None
+    return {
+        "name": concept_name,
+        "discipline": parts[1].strip(),
+        "relation": parts[2].strip(),
+        "cross_principle": parts[3].strip() if len(parts) >= 4 else "学科交叉概念"
+    }
+
+
+def _related_concepts_request(parent_concept: str, existing_concepts: List[str], max_count: int, route: Route) -> Dict[str, Any]:
+    """构建相关概念生成的LLM请求参数"""
     # 构建跨学科提示词
     existing_str = "、".join(existing_concepts) if existing_concepts else "无"
     prompt = f"""为概念"{parent_concept}"生成{max_count}个跨学科强相关概念。
@@ -141,66 +127,107 @@ async def generate_related_concepts(
 
 【最后强调】务必输出{max_count}个概念，每个概念必须与"{parent_concept}"有**清晰可验证**的直接关联。直接输出，不要解释和额外文字。"""
 
-    try:
-        response = await asyncio.wait_for(
-            client.chat.completions.create(
-                model=os.getenv("LLM_MODEL", "google/gemini-3-flash-preview"),
-                messages=[
-                    {"role": "system", "content": f"你是跨学科知识挖掘专家。关键要求：必须严格生成{max_count}个概念，不能多也不能少。每个概念单独一行，格式：概念名|学科|关系类型|跨学科原理。不要任何解释、序号或额外内容。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-                max_tokens=2000,
-                extra_body={"reasoning": {"enabled": False}}
-            ),
-            timeout=40.0
-        )
+    return dict(
+        model=route.model,
+        messages=[
+            {"role": "system", "content": f"你是跨学科知识挖掘专家。关键要求：必须严格生成{max_count}个概念，不能多也不能少。每个概念单独一行，格式：概念名|学科|关系类型|跨学科原理。不要任何解释、序号或额外内容。"},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.5,
+        max_tokens=route.max_tokens,
+        extra_body={"reasoning": {"enabled": False}}
+    )
+
+
+async def stream_related_concepts(
+    parent_concept: str,
+    existing_concepts: List[str],
+    max_count: int = 5,
+    timeout: Optional[float] = None
+) -> AsyncIterator[Dict[str, str]]:
+    """
+    流式生成相关概念：LLM每输出完整一行就产出一个候选，收满max_count个后停止
+    
+    LLM客户端未初始化时不产出任何候选；超时（默认使用discover任务的配置）抛出asyncio.TimeoutError。
+    """
+    client = get_llm_client()
+    if not client:
+        return
+    
+    count = 0
+    route = get_model_router().route("discover")
+    timeout = timeout or route.timeout
+    request_params = _related_concepts_request(parent_concept, existing_concepts, max_count, route)
+    hedge = get_hedge_policy("related_concepts")
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    # 首个候选迟迟不到时对冲：备份请求共用同一截止时间，先产出候选的一方胜出
+    candidates = hedge.stream(
+        lambda: _parse_concepts(client, request_params, timeout),
+        lambda: _parse_concepts(client, hedge.backup_params(request_params), deadline - loop.time()),
+        deadline=timeout
+    )
+    async with aclosing(candidates) as candidates:
+        async for concept in candidates:
+            yield concept
+            count += 1
+            if count >= max_count:
+                break
+
+
+async def _parse_concepts(client, request_params: Dict[str, Any], timeout: float) -> AsyncIterator[Dict[str, str]]:
+    """逐行解析LLM回答，只产出格式正确的候选（结果计入模型路由统计）"""
+    async with get_model_router().track("discover", request_params["model"]):
+        async with aclosing(iter_completion_lines(client, request_params, timeout)) as lines:
+            async for line in lines:
+                concept = parse_concept_line(line)
+                if concept is not None:
+                    yield concept
+
+
+async def generate_related_concepts(
+    parent_concept: str,
+    existing_concepts: List[str],
+    max_count: int = 5,
+    on_candidate: Optional[Callable[[Dict[str, str]], None]] = None
+) -> List[Dict[str, str]]:
+    """
+    使用LLM生成相关概念
+    
+    Args:
+        parent_concept: 父概念名称
+        existing_concepts: 已存在的概念列表
+        max_count: 最大生成数量
+        on_candidate: 每解析出一个候选就立即回调（流式模式下下游可提前开始处理）
         
-        if response and response.choices:
-            content = response.choices[0].message.content.strip()
-            concepts = []
-            
-            for line in content.split('\n'):
-                line = line.strip()
-                if '|' in line:
-                    parts = line.split('|')
-                    if len(parts) >= 4:
-                        # 新格式：概念名|学科|关系类型|跨学科原理
-                        # 去除概念名前的序号（如"1. 反向传播" -> "反向传播"）
-                        concept_name = parts[0].strip()
-                        # 移除开头的数字+点号模式
-                        import re
-                        concept_name = re.sub(r'^\d+\.\s*', '', concept_name)
-                        
-                        concepts.append({
-                            "name": concept_name,
-                            "discipline": parts[1].strip(),
-                            "relation": parts[2].strip(),
-                            "cross_principle": parts[3].strip()
-                        })
-                    elif len(parts) >= 3:
-                        # 兼容旧格式：概念名|学科|关系类型
-                        concept_name = parts[0].strip()
-                        import re
-                        concept_name = re.sub(r'^\d+\.\s*', '', concept_name)
-                        
-                        concepts.append({
-                            "name": concept_name,
-                            "discipline": parts[1].strip(),
-                            "relation": parts[2].strip(),
-                            "cross_principle": "学科交叉概念"
-                        })
-            
-            if concepts:
-                print(f"[SUCCESS] LLM生成了{len(concepts)}个相关概念")
-                # 学术过滤已禁用，直接返回LLM生成的概念
-                return concepts[:max_count]
+    Returns:
+        [{"name": "概念名", "discipline": "学科", "relation": "关系类型"}, ...]
+    """
+    client = get_llm_client()
+    if not client:
+        print("[WARNING] LLM客户端未初始化，使用预定义概念")
+        return _get_fallback_concepts(parent_concept)
     
+    concepts = []
+    try:
+        async with aclosing(stream_related_concepts(parent_concept, existing_concepts, max_count)) as candidates:
+            async for concept in candidates:
+                concepts.append(concept)
+                if on_candidate:
+                    on_candidate(concept)
     except asyncio.TimeoutError:
-        print(f"[WARNING] LLM生成超时，使用预定义概念")
+        print(f"[WARNING] LLM生成超时（已生成{len(concepts)}个概念）")
+    except CircuitOpenError:
+        print("[WARNING] LLM熔断中，跳过生成")
     except Exception as e:
-        print(f"[WARNING] LLM生成失败: {str(e)}，使用预定义概念")
+        print(f"[WARNING] LLM生成失败: {str(e)}（已生成{len(concepts)}个概念）")
     
+    if concepts:
+        print(f"[SUCCESS] LLM生成了{len(concepts)}个相关概念")
+        # 学术过滤已禁用，直接返回LLM生成的概念
+        return concepts[:max_count]
+    
+    print("[WARNING] LLM未生成可用概念，使用预定义概念")
     return _get_fallback_concepts(parent_concept)
 
 
@@ -232,6 +259,24 @@ def _get_fallback_concepts(parent_concept: str) -> List[Dict[str, str]]:
 
 # ==================== 语义相似度计算 ====================
 
+async def _embed_texts(texts: List[str], timeout: float = 30.0) -> List[List[float]]:
+    """
+    调用Embedding API（速率由embedding限流器在HTTP层控制，故障由embedding熔断器统计）
+    
+    只有共享向量存储未命中的文本才会走到这里。
+    """
+    client = get_embedding_client()
+    
+    response = await get_circuit_breaker("embedding").call(
+        lambda: client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=texts
+        ),
+        timeout=timeout
+    )
+    return [item.embedding for item in response.data]
+
+
 async def compute_similarity(concept1: str, concept2: str) -> float:
     """
     计算两个概念的语义相似度（带智能重试和请求控制）
@@ -243,39 +288,22 @@ async def compute_similarity(concept1: str, concept2: str) -> float:
     Returns:
         相似度分数 [0, 1]
     """
-    global _last_embedding_time
-    
     client = get_embedding_client()
     if not client:
         print("[WARNING] Embedding客户端未初始化，返回默认相似度")
         return 0.75
     
-    # 请求速率控制：避免并发请求过多
-    import time
-    current_time = time.time()
-    time_since_last = current_time - _last_embedding_time
-    if time_since_last < _embedding_min_interval:
-        wait_time = _embedding_min_interval - time_since_last
-        await asyncio.sleep(wait_time)
-    
-    _last_embedding_time = time.time()
-    
     # 智能重试：最多2次
     max_retries = 2
     for attempt in range(max_retries + 1):
         try:
-            # 获取embeddings
-            response = await asyncio.wait_for(
-                client.embeddings.create(
-                    model="text-embedding-3-small",
-                    input=[concept1, concept2]
-                ),
-                timeout=30.0  # 增加超时到30秒
+            # 获取embeddings（共享存储命中时不调用API）
+            emb1, emb2 = await get_embedding_store().get_or_embed(
+                EMBEDDING_MODEL,
+                [concept1, concept2],
+                lambda texts: _embed_texts(texts, timeout=30.0)  # 增加超时到30秒
             )
             
-            emb1 = np.array(response.data[0].embedding)
-            emb2 = np.array(response.data[1].embedding)
-            
             # 计算余弦相似度
             similarity = np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2))
             
@@ -285,6 +313,9 @@ async def compute_similarity(concept1: str, concept2: str) -> float:
             print(f"[SUCCESS] 相似度计算: {concept1} <-> {concept2} = {normalized:.3f}")
             return float(normalized)
         
+        except CircuitOpenError:
+            print(f"[FALLBACK] Embedding熔断中，使用默认相似度0.75")
+            return 0.75
         except asyncio.TimeoutError:
             if attempt < max_retries:
                 print(f"[RETRY] 超时重试...（第{attempt + 1}次）")
@@ -302,10 +333,13 @@ async def compute_similarity(concept1: str, concept2: str) -> float:
                 else:
                     print(f"[FALLBACK] 使用默认相似度0.75（网络问题）")
                     return 0.75
-            elif "rate_limit" in error_msg.lower() or "429" in error_msg:
-                print(f"[FALLBACK] API速率限制，使用默认相似度0.75")
-                await asyncio.sleep(2.0)  # 速率限制等待2秒
-                return 0.75
+            elif is_rate_limit_error(e):
+                # 限流器已收紧并发（并按Retry-After暂停），重试会在限流器中排队
+                if attempt < max_retries:
+                    print(f"[RETRY] API速率限制，限流器排队后重试...（第{attempt + 1}次）")
+                else:
+                    print(f"[FALLBACK] API速率限制，使用默认相似度0.75")
+                    return 0.75
             elif "invalid" in error_msg.lower() or "key" in error_msg.lower():
                 print(f"[ERROR] API Key问题: {error_msg}")
                 return 0.75
@@ -320,6 +354,21 @@ async def compute_similarity(concept1: str, concept2: str) -> float:
     return 0.75
 
 
+async def prefetch_embeddings(concepts: List[str]):
+    """
+    预先获取一批概念的embedding并写入共享向量存储
+    
+    流式生成时候选逐个到达，提前取embedding后compute_similarities_batch只需读取存储。
+    """
+    if not concepts or not get_embedding_client() or not get_circuit_breaker("embedding").available:
+        return
+    await get_embedding_store().get_or_embed(
+        EMBEDDING_MODEL,
+        concepts,
+        lambda texts: _embed_texts(texts, timeout=60.0)
+    )
+
+
 async def compute_similarities_batch(concepts: list[str], reference_concept: str) -> list[float]:
     """
     批量计算多个概念与参考概念的相似度（减少API调用）
@@ -349,26 +398,24 @@ async def compute_similarities_batch(concepts: list[str], reference_concept: str
         return [0.75] * len(concepts)
     
     try:
-        # 一次性获取所有概念的embedding
+        # 一次性获取所有概念的embedding（已存储的概念不再请求API）
         all_texts = [reference_concept] + concepts
         
         print(f"[INFO] 批量计算{len(concepts)}个概念的相似度（超时60秒）...")
         
-        response = await asyncio.wait_for(
-            client.embeddings.create(
-                model="text-embedding-3-small",
-                input=all_texts
-            ),
-            timeout=60.0  # 增加批量计算超时到60秒
+        embeddings = await get_embedding_store().get_or_embed(
+            EMBEDDING_MODEL,
+            all_texts,
+            lambda texts: _embed_texts(texts, timeout=60.0)  # 增加批量计算超时到60秒
         )
         
         # 参考概念的embedding
-        ref_emb = np.array(response.data[0].embedding)
+        ref_emb = embeddings[0]
         
         # 计算所有相似度
         similarities = []
         for i in range(len(concepts)):
-            concept_emb = np.array(response.data[i + 1].embedding)
+            concept_emb = embeddings[i + 1]
             similarity = np.dot(ref_emb, concept_emb) / (np.linalg.norm(ref_emb) * np.linalg.norm(concept_emb))
             normalized = (similarity + 1) / 2
             similarities.append(float(normalized))
@@ -376,6 +423,9 @@ async def compute_similarities_batch(concepts: list[str], reference_concept: str
         print(f"[SUCCESS] 批量相似度计算完成: 平均相似度 = {np.mean(similarities):.3f}")
         return similarities
         
+    except CircuitOpenError:
+        print(f"[FALLBACK] Embedding熔断中，{len(concepts)}个概念使用默认相似度0.75")
+        return [0.75] * len(concepts)
     except asyncio.TimeoutError:
         print(f"[WARNING] 批量相似度计算超时（60秒），回退到逐个计算")
         # 回退到逐个计算
@@ -445,29 +495,33 @@ async def is_academic_concept(concept: str) -> bool:
     if not client:
         return True  # 默认允许
     
-    try:
-        response = await asyncio.wait_for(
-            client.chat.completions.create(
-                model=os.getenv("LLM_MODEL", "google/gemini-3-flash-preview"),
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "你是学术概念过滤器。判断输入是否为学术概念。只回答'是'或'否'。"
-                    },
-                    {
-                        "role": "user",
-                        "content": f"'{concept}' 是学术概念吗？"
-                    }
-                ],
-                temperature=0.1,
-                max_tokens=10,
-                extra_body={"reasoning": {"enabled": True}}
-            ),
-            timeout=5.0
+    async def attempt(route: Route):
+        request_params = dict(
+            model=route.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "你是学术概念过滤器。判断输入是否为学术概念。只回答'是'或'否'。"
+                },
+                {
+                    "role": "user",
+                    "content": f"'{concept}' 是学术概念吗？"
+                }
+            ],
+            temperature=0.1,
+            max_tokens=route.max_tokens,
+            extra_body={"reasoning": {"enabled": True}}
+        )
+        return await get_llm_cache().complete(
+            "academic_filter", request_params,
+            lambda: route.call(lambda: client.chat.completions.create(**request_params))
         )
+    
+    try:
+        content = await get_model_router().run("filter", attempt)
         
-        if response and response.choices:
-            answer = response.choices[0].message.content.strip()
+        if content:
+            answer = content.strip()
             is_academic = "是" in answer or "yes" in answer.lower()
             print(f"[INFO] 学术过滤: {concept} = {'学术概念' if is_academic else '非学术'}")
             return is_academic
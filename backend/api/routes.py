@@ -2,123 +2,323 @@
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
-import httpx
 import uuid
 import sys
 import asyncio
+import json
 import os
-import wikipedia
 from pathlib import Path
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+
+from shared.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from shared.llm_cache import get_llm_cache
+from shared.arxiv_cache import get_arxiv_cache
+from shared.arxiv_scheduler import ArxivRequestError, get_arxiv_scheduler
+from shared.model_router import Route, get_model_router
+from shared.openai_clients import get_openai_client
+from shared.term_translator import get_term_translator
 
 # 加载环境变量
 env_path = Path(__file__).parent.parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
 # ==================== LLM客户端 ====================
-_llm_client = None
-
 def get_llm_client():
-    """获取LLM客户端单例"""
-    global _llm_client
-    if _llm_client is None:
-        api_key = os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY")
-        if api_key:
-            _llm_client = AsyncOpenAI(
-                api_key=api_key,
-                base_url=os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
-            )
-            print("[INFO] LLM客户端已初始化")
-    return _llm_client
+    """获取LLM客户端（共享连接池，见shared.openai_clients）"""
+    return get_openai_client("generation")
 
 
 async def translate_to_english(chinese_text: str) -> str:
-    """使用LLM将中文学术术语翻译成英文"""
+    """将中文学术术语翻译成英文（术语表 → 翻译缓存 → 批量LLM，见shared.term_translator）"""
+    translation = await get_term_translator().translate(chinese_text)
+    if translation != chinese_text:
+        print(f"[SUCCESS] 翻译: {chinese_text} -> {translation}")
+    else:
+        print(f"[WARNING] 翻译失败: {chinese_text}")
+    return translation
+
+
+def fallback_brief_summary(concept: str, wiki_definition: str = "") -> str:
+    """LLM不可用时的简介回退：截取Wikipedia定义或使用默认文本"""
+    if wiki_definition:
+        return wiki_definition[:100] + "..." if len(wiki_definition) > 100 else wiki_definition
+    return f"{concept}是一个重要的跨学科概念。"
+
+
+def _brief_summary_request(concept: str, wiki_definition: str, route: Route) -> Dict[str, Any]:
+    """单个概念简介的LLM请求参数（也是批量生成时每个概念的缓存key）"""
+    prompt = f"""请为学术概念"{concept}"生成一句完整的简介说明（40-100字），要求：
+1. 必须是完整的句子，有明确的主谓宾结构
+2. 简洁精准，突出核心特征和应用价值
+3. 通俗易懂，适合非专业读者理解
+4. 不要使用"是指"、"是一种"等生硬开头
+5. 确保句子完整，不要中途截断
+
+{f'参考定义：{wiki_definition[:200]}' if wiki_definition else ''}
+
+直接输出完整的简介句子，不要引号和其他标点。"""
+    return dict(
+        model=route.model,
+        messages=[
+            {"role": "system", "content": "你是一个学术概念解释专家，擅长用简洁的语言解释复杂概念。务必输出完整句子，不要截断。"},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        max_tokens=route.max_tokens,
+        extra_body={"reasoning": {"enabled": False}}
+    )
+
+
+def clean_brief_summary(summary: str) -> str:
+    """清理LLM简介中的引号、草稿标记和星号"""
+    summary = summary.strip()
+    # 清理各种不需要的标记和格式
+    summary = summary.strip('"\'""\'\'')
+    # 移除可能的草稿标记
+    summary = summary.replace("*Draft*:", "").replace("*Draft 2*:", "").replace("*Draft 1*:", "")
+    summary = summary.replace("Draft:", "").replace("Draft 2:", "").replace("Draft 1:", "")
+    # 移除星号
+    summary = summary.replace("*", "").strip()
+    # 如果以"："或":"开头，移除它
+    return summary.lstrip("：:").strip()
+
+
+def valid_brief_summary(summary: Any) -> bool:
+    """批量结果校验：非空字符串，长度在合理范围内"""
+    return isinstance(summary, str) and 10 <= len(clean_brief_summary(summary)) <= 300
+
+
+async def generate_brief_summary(concept: str, wiki_definition: str = "") -> str:
+    """使用LLM生成一句话简介"""
     client = get_llm_client()
     if not client:
-        return chinese_text
+        return fallback_brief_summary(concept, wiki_definition)
+    
+    async def attempt(route: Route):
+        request_params = _brief_summary_request(concept, wiki_definition, route)
+        return await get_llm_cache().complete(
+            "brief_summary", request_params,
+            lambda: route.call(lambda: client.chat.completions.create(**request_params))
+        )
+    
+    try:
+        content = await get_model_router().run("summarize", attempt)
+        
+        if content:
+            summary = clean_brief_summary(content)
+            print(f"[SUCCESS] LLM生成简介: {concept} -> {summary[:50]}...")
+            return summary
+    except asyncio.TimeoutError:
+        print(f"[WARNING] LLM生成简介超时: {concept}")
+    except Exception as e:
+        print(f"[WARNING] LLM生成简介失败: {concept}, {str(e)}")
+    
+    return fallback_brief_summary(concept, wiki_definition)
+
+
+async def _complete_json_batch(
+    client,
+    route: Route,
+    system_prompt: str,
+    prompt: str,
+    field: str,
+    ids: List[int],
+    temperature: float,
+    max_tokens: int,
+    label: str,
+    timeout: float = 20.0
+) -> Dict[int, Any]:
+    """
+    批量生成的一次LLM调用：要求输出 [{"id": 编号, field: ...}] 形式的JSON数组
     
+    Returns:
+        {编号: field值}，只包含请求中存在的编号；调用或解析失败时返回空字典
+    """
     try:
-        response = await asyncio.wait_for(
-            client.chat.completions.create(
-                model=os.getenv("LLM_MODEL", "google/gemini-3-flash-preview"),
+        response = await route.call(
+            lambda: client.chat.completions.create(
+                model=route.model,
                 messages=[
-                    {"role": "system", "content": "你是一个专业的学术翻译助手，擅长将中文学术术语翻译成精准的英文。"},
-                    {"role": "user", "content": f"将以下中文学术术语翻译成英文（只输出英文，不要解释）：{chinese_text}"}
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
                 ],
-                temperature=0.1,
-                max_tokens=50,
-                extra_body={"reasoning": {"enabled": True}}
+                temperature=temperature,
+                max_tokens=max_tokens,
+                extra_body={"reasoning": {"enabled": False}}
             ),
-            timeout=10.0
+            timeout=timeout
         )
-        
-        if response and response.choices:
-            translation = response.choices[0].message.content.strip().strip('"\'""\'\'')
-            print(f"[SUCCESS] 翻译: {chinese_text} -> {translation}")
-            return translation
+        content = response.choices[0].message.content if response and response.choices else ""
+        content = (content or "").strip()
+        if content.startswith("```"):
+            content = content.split("\n", 1)[-1].rsplit("```", 1)[0]
+        entries = json.loads(content)
+    except asyncio.TimeoutError:
+        print(f"[WARNING] 批量生成{label}超时（{len(ids)}项）")
+        return {}
     except Exception as e:
-        print(f"[WARNING] 翻译失败: {chinese_text}, {str(e)}")
+        print(f"[WARNING] 批量生成{label}失败（{len(ids)}项）: {type(e).__name__} {e}")
+        return {}
     
-    return chinese_text
+    expected = set(ids)
+    return {
+        entry["id"]: entry.get(field)
+        for entry in (entries if isinstance(entries, list) else [])
+        if isinstance(entry, dict) and entry.get("id") in expected
+    }
 
 
-async def generate_brief_summary(concept: str, wiki_definition: str = "") -> str:
-    """使用LLM生成一句话简介"""
-    client = get_llm_client()
-    if not client:
-        if wiki_definition:
-            return wiki_definition[:100] + "..." if len(wiki_definition) > 100 else wiki_definition
-        return f"{concept}是一个重要的跨学科概念。"
+def chunk_summary_items(items: List[tuple], max_items: int, max_chars: int) -> List[List[tuple]]:
+    """按条数和提示词长度（概念名+截断后的定义）切分批次，保持原顺序"""
+    chunks, current, size = [], [], 0
+    for item in items:
+        concept, wiki_definition = item[1], item[2]
+        item_size = len(concept) + min(len(wiki_definition), 200) + 20
+        if current and (len(current) >= max_items or size + item_size > max_chars):
+            chunks.append(current)
+            current, size = [], 0
+        current.append(item)
+        size += item_size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def _summarize_chunk(client, route: Route, chunk: List[tuple]) -> Dict[int, str]:
+    """
+    一次LLM调用为一批概念生成简介
     
-    try:
-        prompt = f"""请为学术概念"{concept}"生成一句完整的简介说明（40-100字），要求：
+    Args:
+        chunk: [(序号, 概念, 参考定义), ...]
+        
+    Returns:
+        {序号: 简介}，只包含通过校验的条目
+    """
+    listing = "\n".join(
+        f"{idx}. {concept}" + (f"（参考定义：{wiki_definition[:200]}）" if wiki_definition else "")
+        for idx, concept, wiki_definition in chunk
+    )
+    prompt = f"""请为以下每个学术概念分别生成一句完整的简介说明（40-100字），要求：
 1. 必须是完整的句子，有明确的主谓宾结构
 2. 简洁精准，突出核心特征和应用价值
 3. 通俗易懂，适合非专业读者理解
 4. 不要使用"是指"、"是一种"等生硬开头
 5. 确保句子完整，不要中途截断
 
-{f'参考定义：{wiki_definition[:200]}' if wiki_definition else ''}
+概念列表：
+{listing}
 
-直接输出完整的简介句子，不要引号和其他标点。"""
+只输出JSON数组，每个概念一项，id为概念前的编号：
+[{{"id": 编号, "summary": "简介"}}]"""
+    
+    entries = await _complete_json_batch(
+        client,
+        route,
+        system_prompt="你是一个学术概念解释专家，擅长用简洁的语言解释复杂概念。只输出JSON，不要其他内容。",
+        prompt=prompt,
+        field="summary",
+        ids=[idx for idx, _, _ in chunk],
+        temperature=0.3,
+        max_tokens=min(8000, 300 * len(chunk) + 200),
+        label="简介"
+    )
+    return {
+        idx: clean_brief_summary(summary)
+        for idx, summary in entries.items()
+        if valid_brief_summary(summary)
+    }
 
-        response = await asyncio.wait_for(
-            client.chat.completions.create(
-                model=os.getenv("LLM_MODEL", "google/gemini-3-flash-preview"),
-                messages=[
-                    {"role": "system", "content": "你是一个学术概念解释专家，擅长用简洁的语言解释复杂概念。务必输出完整句子，不要截断。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=500,
-                extra_body={"reasoning": {"enabled": False}}
-            ),
-            timeout=15.0
-        )
+
+async def generate_brief_summaries(items: List[tuple]) -> List[str]:
+    """
+    批量生成一句话简介：一次LLM调用返回多个概念的简介
+    
+    - 每个概念单独缓存（与generate_brief_summary共用缓存key），只为未命中的概念请求LLM
+    - 提示词过长时自动分批，各批并发执行
+    - 批量结果中缺失或校验失败的概念逐个回退到generate_brief_summary
+    
+    Args:
+        items: [(概念, Wikipedia定义), ...]
         
-        if response and response.choices:
-            summary = response.choices[0].message.content.strip()
-            # 清理各种不需要的标记和格式
-            summary = summary.strip('"\'""\'\'')
-            # 移除可能的草稿标记
-            summary = summary.replace("*Draft*:", "").replace("*Draft 2*:", "").replace("*Draft 1*:", "")
-            summary = summary.replace("Draft:", "").replace("Draft 2:", "").replace("Draft 1:", "")
-            # 移除星号
-            summary = summary.replace("*", "").strip()
-            # 如果以"："或":"开头，移除它
-            summary = summary.lstrip("：:").strip()
-            print(f"[SUCCESS] LLM生成简介: {concept} -> {summary[:50]}...")
-            return summary
-    except asyncio.TimeoutError:
-        print(f"[WARNING] LLM生成简介超时: {concept}")
-    except Exception as e:
-        print(f"[WARNING] LLM生成简介失败: {concept}, {str(e)}")
+    Returns:
+        与items顺序一致的简介列表
+    """
+    client = get_llm_client()
+    if not client:
+        return [fallback_brief_summary(c, d) for c, d in items]
+    
+    unique = list(dict.fromkeys((c, d or "") for c, d in items))
+    if len(unique) == 1:
+        summary = await generate_brief_summary(*unique[0])
+        return [summary] * len(items)
+    
+    cache = get_llm_cache()
+    route = get_model_router().route("summarize")
+    summaries: Dict[tuple, str] = {}
+    misses = []
+    for key in unique:
+        cached = await cache.lookup("brief_summary", _brief_summary_request(*key, route))
+        if cached is not None:
+            summaries[key] = clean_brief_summary(cached)
+        else:
+            misses.append(key)
     
-    if wiki_definition:
-        return wiki_definition[:100] + "..." if len(wiki_definition) > 100 else wiki_definition
-    return f"{concept}是一个重要的跨学科概念。"
+    if len(misses) > 1:
+        chunks = chunk_summary_items(
+            [(i, c, d) for i, (c, d) in enumerate(misses, 1)],
+            max_items=getattr(settings, "BRIEF_SUMMARY_BATCH_SIZE", 10),
+            max_chars=getattr(settings, "BRIEF_SUMMARY_BATCH_MAX_CHARS", 4000)
+        )
+        results = await asyncio.gather(*[_summarize_chunk(client, route, chunk) for chunk in chunks])
+        for batch in results:
+            for idx, summary in batch.items():
+                key = misses[idx - 1]
+                summaries[key] = summary
+                await cache.store("brief_summary", _brief_summary_request(*key, route), summary)
+        print(f"[SUCCESS] 批量生成简介: {sum(len(b) for b in results)}/{len(misses)}个（{len(chunks)}次调用，缓存命中{len(unique) - len(misses)}个）")
+    
+    # 单个未命中或批量校验失败的概念逐个生成
+    retry = [key for key in misses if key not in summaries]
+    if retry:
+        singles = await asyncio.gather(*[generate_brief_summary(c, d) for c, d in retry])
+        summaries.update(zip(retry, singles))
+    
+    return [summaries[(c, d or "")] for c, d in items]
+
+
+def _bridge_reasoning_request(input_concept: str, bridge_concept: str, overall_principle: str, route: Route) -> Dict[str, Any]:
+    """单条桥接边reasoning的LLM请求参数（也是批量生成时每条边的缓存key）"""
+    prompt = f"""请用一句话（30-60字）精确解释"{input_concept}"如何与"{bridge_concept}"相关联。
+
+整体背景：{overall_principle}
+
+要求：
+1. **必须明确说明{input_concept}在这个关联中的具体作用或特点**
+2. 突出{input_concept}与{bridge_concept}之间的独特关系
+3. 不要泛泛而谈，要针对{input_concept}这个特定概念
+4. 简洁精准，30-60字
+5. **必须是完整句子，句号结尾**
+
+直接输出解释，不要引号和额外文字。"""
+    return dict(
+        model=route.model,
+        messages=[
+            {"role": "system", "content": f"你是跨学科知识专家。请专门解释'{input_concept}'与'{bridge_concept}'的关联，确保每个输入概念的解释都是独特的。输出必须是完整的句子。"},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.5,
+        max_tokens=route.max_tokens,
+        extra_body={"reasoning": {"enabled": False}}
+    )
+
+
+def valid_edge_reasoning(reasoning: Any) -> bool:
+    """边reasoning校验：10-150字的字符串"""
+    return isinstance(reasoning, str) and 10 < len(reasoning.strip().strip('"\'""\'\'')) <= 150
+
+
+def fallback_edge_reasoning(input_concept: str, bridge_concept: str, overall_principle: str) -> str:
+    return overall_principle if overall_principle else f"{input_concept}通过{bridge_concept}建立跨学科联系"
 
 
 async def generate_bridge_edge_reasoning(
@@ -141,36 +341,18 @@ async def generate_bridge_edge_reasoning(
     if not client:
         return f"{input_concept}通过{bridge_concept}建立跨学科联系"
     
-    try:
-        prompt = f"""请用一句话（30-60字）精确解释"{input_concept}"如何与"{bridge_concept}"相关联。
-
-整体背景：{overall_principle}
-
-要求：
-1. **必须明确说明{input_concept}在这个关联中的具体作用或特点**
-2. 突出{input_concept}与{bridge_concept}之间的独特关系
-3. 不要泛泛而谈，要针对{input_concept}这个特定概念
-4. 简洁精准，30-60字
-5. **必须是完整句子，句号结尾**
-
-直接输出解释，不要引号和额外文字。"""
-
-        response = await asyncio.wait_for(
-            client.chat.completions.create(
-                model=os.getenv("LLM_MODEL", "google/gemini-3-flash-preview"),
-                messages=[
-                    {"role": "system", "content": f"你是跨学科知识专家。请专门解释'{input_concept}'与'{bridge_concept}'的关联，确保每个输入概念的解释都是独特的。输出必须是完整的句子。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-                max_tokens=1000,
-                extra_body={"reasoning": {"enabled": False}}
-            ),
-            timeout=15.0
+    async def attempt(route: Route):
+        request_params = _bridge_reasoning_request(input_concept, bridge_concept, overall_principle, route)
+        return await get_llm_cache().complete(
+            "bridge_reasoning", request_params,
+            lambda: route.call(lambda: client.chat.completions.create(**request_params))
         )
+    
+    try:
+        content = await get_model_router().run("bridge_reasoning", attempt)
         
-        if response and response.choices:
-            reasoning = response.choices[0].message.content.strip().strip('"\'""\'\'')
+        if content:
+            reasoning = content.strip().strip('"\'""\'\'')
             print(f"[DEBUG] LLM原始返回 ({input_concept}->{bridge_concept}): '{reasoning}' (长度: {len(reasoning)})")
             if reasoning and len(reasoning) > 10:
                 return reasoning
@@ -180,7 +362,98 @@ async def generate_bridge_edge_reasoning(
         print(f"[WARNING] 生成边reasoning失败: {input_concept}-{bridge_concept}, 错误类型: {type(e).__name__}, 详情: {str(e)}")
     
     # 使用overall_principle或默认值
-    return overall_principle if overall_principle else f"{input_concept}通过{bridge_concept}建立跨学科联系"
+    return fallback_edge_reasoning(input_concept, bridge_concept, overall_principle)
+
+
+async def _reason_chunk(client, route: Route, chunk: List[tuple]) -> Dict[int, str]:
+    """
+    一次LLM调用为一批（输入概念, 桥梁概念）边生成reasoning
+    
+    Args:
+        chunk: [(序号, 输入概念, 桥梁概念, 整体连接原理), ...]
+        
+    Returns:
+        {序号: reasoning}，只包含通过校验的条目
+    """
+    listing = "\n".join(
+        f'{idx}. "{input_concept}" → "{bridge_concept}"（整体背景：{principle}）'
+        for idx, input_concept, bridge_concept, principle in chunk
+    )
+    prompt = f"""请为以下每一对概念分别用一句话（30-60字）精确解释前者如何与后者相关联。
+
+要求：
+1. **必须明确说明输入概念在这个关联中的具体作用或特点**
+2. 同一桥梁概念连接不同输入概念时，每条解释必须针对各自的输入概念，不能雷同
+3. 不要泛泛而谈，简洁精准，30-60字
+4. **必须是完整句子，句号结尾**
+
+概念对列表：
+{listing}
+
+只输出JSON数组，每对概念一项，id为概念对前的编号：
+[{{"id": 编号, "reasoning": "解释"}}]"""
+    
+    entries = await _complete_json_batch(
+        client,
+        route,
+        system_prompt="你是跨学科知识专家，擅长解释概念之间的具体关联。只输出JSON，不要其他内容。",
+        prompt=prompt,
+        field="reasoning",
+        ids=[item[0] for item in chunk],
+        temperature=0.5,
+        max_tokens=min(8000, 200 * len(chunk) + 200),
+        label="边reasoning"
+    )
+    return {
+        idx: reasoning.strip().strip('"\'""\'\'')
+        for idx, reasoning in entries.items()
+        if valid_edge_reasoning(reasoning)
+    }
+
+
+async def generate_bridge_edge_reasonings(pairs: List[tuple]) -> List[str]:
+    """
+    批量生成桥接边reasoning：一次（或按批数分几次并发）LLM调用覆盖所有（输入概念, 桥梁概念）对
+    
+    - 每条边单独缓存（与generate_bridge_edge_reasoning共用缓存key），只为未命中的边请求LLM
+    - 缺失或校验失败的边回退到整体连接原理（connection_principle）
+    
+    Args:
+        pairs: [(输入概念, 桥梁概念, 整体连接原理), ...]
+        
+    Returns:
+        与pairs顺序一致的reasoning列表
+    """
+    client = get_llm_client()
+    unique = list(dict.fromkeys(pairs))
+    if not client or not unique:
+        return [fallback_edge_reasoning(*pair) for pair in pairs]
+    
+    cache = get_llm_cache()
+    route = get_model_router().route("bridge_reasoning")
+    reasonings: Dict[tuple, str] = {}
+    misses = []
+    for pair in unique:
+        cached = await cache.lookup("bridge_reasoning", _bridge_reasoning_request(*pair, route))
+        if cached is not None:
+            reasonings[pair] = cached.strip().strip('"\'""\'\'')
+        else:
+            misses.append(pair)
+    
+    if misses:
+        batch_size = getattr(settings, "BRIDGE_REASONING_BATCH_SIZE", 15)
+        indexed = [(i, *pair) for i, pair in enumerate(misses, 1)]
+        chunks = [indexed[i:i + batch_size] for i in range(0, len(indexed), batch_size)]
+        results = await asyncio.gather(*[_reason_chunk(client, route, chunk) for chunk in chunks])
+        for batch in results:
+            for idx, reasoning in batch.items():
+                pair = misses[idx - 1]
+                reasonings[pair] = reasoning
+                await cache.store("bridge_reasoning", _bridge_reasoning_request(*pair, route), reasoning)
+        generated = sum(len(b) for b in results)
+        print(f"[SUCCESS] 批量生成边reasoning: {generated}/{len(misses)}条（{len(chunks)}次调用，缓存命中{len(unique) - len(misses)}条）")
+    
+    return [reasonings.get(pair) or fallback_edge_reasoning(*pair) for pair in pairs]
 
 
 # 添加项目路径
@@ -209,11 +482,28 @@ except ImportError:
     class MockSettings:
         AGENT_API_URL = "http://localhost:5000"
         REDIS_CACHE_TTL = 3600
+        ENRICH_CONCURRENCY = 8
+        ENRICH_DEADLINE = 20.0
+        BRIEF_SUMMARY_BATCH_SIZE = 10
+        BRIEF_SUMMARY_BATCH_MAX_CHARS = 4000
+        BRIDGE_REASONING_BATCH_SIZE = 15
+        WRITE_BEHIND_MAX_PENDING = 2000
+        WRITE_BEHIND_BATCH_SIZE = 500
+        WRITE_BEHIND_FLUSH_INTERVAL = 0.5
+        WRITE_BEHIND_MAX_RETRIES = 3
+        SINGLE_FLIGHT_LOCK_TTL = 120.0
+        SINGLE_FLIGHT_WAIT_TIMEOUT = 90.0
     settings = MockSettings()
     
     ConceptNode = dict
     ConceptEdge = dict
 
+from backend.api.node_enrichment import ConceptEnrichment, EnrichmentStage
+from backend.api.llm_stream import CandidateBatcher
+from backend.api.single_flight import SingleFlight
+from backend.database.write_behind import WriteBehindQueue
+from algorithms.wikipedia_client import get_wikipedia_client
+
 router = APIRouter()
 
 
@@ -222,164 +512,81 @@ async def get_wikipedia_definition(concept: str, max_length: int = 500) -> Dict[
     if not ENABLE_EXTERNAL_VERIFICATION:
         return {"definition": "", "exists": False, "url": "", "source": "LLM"}
     
-    print(f"[INFO] 正在查询Wikipedia: {concept}")
-    loop = asyncio.get_event_loop()
+    if not get_circuit_breaker("wikipedia").available:
+        print(f"[WARNING] Wikipedia熔断中，跳过查询: {concept}")
+        return {"definition": "", "exists": False, "url": "", "source": "LLM"}
     
-    try:
-        # 添加10秒超时
-        wikipedia.set_lang("zh")
-        page = await asyncio.wait_for(
-            loop.run_in_executor(None, wikipedia.page, concept),
-            timeout=10.0
-        )
-        summary = page.summary[:max_length] if len(page.summary) > max_length else page.summary
-        print(f"[SUCCESS] 中文Wikipedia找到: {concept}")
-        return {"definition": summary, "exists": True, "url": page.url, "source": "Wikipedia"}
-    except asyncio.TimeoutError:
-        print(f"[WARNING] 中文Wikipedia查询超时: {concept}")
-    except wikipedia.exceptions.DisambiguationError as e:
-        if e.options:
-            try:
-                page = await asyncio.wait_for(
-                    loop.run_in_executor(None, wikipedia.page, e.options[0]),
-                    timeout=10.0
-                )
-                summary = page.summary[:max_length] if len(page.summary) > max_length else page.summary
-                return {"definition": summary, "exists": True, "url": page.url, "source": "Wikipedia"}
-            except Exception:
-                pass
-    except wikipedia.exceptions.PageError:
-        pass
-    except Exception as e:
-        print(f"[WARNING] 中文Wikipedia查询失败: {e}")
+    print(f"[INFO] 正在查询Wikipedia: {concept}")
+    client = get_wikipedia_client()
     
+    # 中文优先，英文对冲（WIKIPEDIA_LOOKUP_MODE=sequential时逐个回退）
     try:
-        wikipedia.set_lang("en")
-        page = await asyncio.wait_for(
-            loop.run_in_executor(None, wikipedia.page, concept),
-            timeout=10.0
-        )
-        summary = page.summary[:max_length] if len(page.summary) > max_length else page.summary
-        print(f"[SUCCESS] 英文Wikipedia找到: {concept}")
-        return {"definition": summary, "exists": True, "url": page.url, "source": "Wikipedia"}
+        page = await asyncio.wait_for(client.lookup(concept), timeout=15.0)
+        if page["exists"]:
+            print(f"[SUCCESS] {'中文' if page['lang'] == 'zh' else '英文'}Wikipedia找到: {concept}")
+            return {"definition": page["summary"][:max_length], "exists": True, "url": page["url"], "source": "Wikipedia"}
     except asyncio.TimeoutError:
-        print(f"[WARNING] 英文Wikipedia查询超时: {concept}")
-    except wikipedia.exceptions.DisambiguationError as e:
-        if e.options:
-            try:
-                page = await asyncio.wait_for(
-                    loop.run_in_executor(None, wikipedia.page, e.options[0]),
-                    timeout=10.0
-                )
-                summary = page.summary[:max_length] if len(page.summary) > max_length else page.summary
-                return {"definition": summary, "exists": True, "url": page.url, "source": "Wikipedia"}
-            except Exception:
-                pass
-    except wikipedia.exceptions.PageError:
-        pass
+        print(f"[WARNING] Wikipedia查询超时: {concept}")
     except Exception as e:
-        print(f"[WARNING] 英文Wikipedia查询失败: {e}")
+        print(f"[WARNING] Wikipedia查询失败: {e}")
     
     print(f"[WARNING] Wikipedia未找到: {concept}")
     return {"definition": "", "exists": False, "url": "", "source": "LLM"}
 
 
-async def search_arxiv_papers(query: str, max_results: int = 5, max_retries: int = 2) -> tuple[List[Dict[str, Any]], str]:
-    """在Arxiv搜索相关论文（带重试机制）"""
+ARXIV_CIRCUIT_OPEN_MESSAGE = "Arxiv服务暂时不可用（熔断中）"
+
+
+async def search_arxiv_papers(query: str, max_results: int = 5) -> tuple[List[Dict[str, Any]], str]:
+    """在Arxiv搜索相关论文（经Arxiv调度器排队、重试，结果按查询缓存）"""
     if not ENABLE_EXTERNAL_VERIFICATION:
         return [], "Arxiv查询已禁用"
     
+    arxiv_cache = get_arxiv_cache()
+    cached = await arxiv_cache.lookup("api", query, max_results)
+    if cached is not None:
+        print(f"[INFO] Arxiv缓存命中: {query}")
+        return cached
+    
+    if not get_circuit_breaker("arxiv").available:
+        print(f"[WARNING] Arxiv熔断中，跳过查询: {query}")
+        return [], ARXIV_CIRCUIT_OPEN_MESSAGE
+    
+    search_query = query
     if any('\u4e00' <= char <= '\u9fff' for char in query):
         print(f"[INFO] 检测到中文查询，正在翻译: {query}")
-        query = await translate_to_english(query)
-        print(f"[INFO] 翻译后查询: {query}")
-    
-    print(f"[INFO] 正在查询Arxiv论文: {query}")
-    import xml.etree.ElementTree as ET
-    
-    arxiv_url = "https://export.arxiv.org/api/query"
-    params = {
-        "search_query": f"all:{query}",
-        "start": 0,
-        "max_results": max_results,
-        "sortBy": "relevance",
-        "sortOrder": "descending"
-    }
-    
-    for attempt in range(max_retries):
-        try:
-            # 使用细粒度超时配置
-            timeout = httpx.Timeout(
-                connect=5.0,  # 连接超时
-                read=15.0,    # 读取超时
-                write=5.0,    # 写入超时
-                pool=5.0      # 连接池超时
-            )
-            
-            async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-                response = await client.get(arxiv_url, params=params)
-                if response.status_code != 200:
-                    error_msg = f"Arxiv API返回状态码 {response.status_code}"
-                    print(f"[WARNING] {error_msg}")
-                    if attempt < max_retries - 1:
-                        await asyncio.sleep(1.0 * (attempt + 1))  # 指数退避
-                        continue
-                    return [], error_msg
-                
-                root = ET.fromstring(response.text)
-                ns = {
-                    'atom': 'http://www.w3.org/2005/Atom',
-                    'arxiv': 'http://arxiv.org/schemas/atom'
-                }
-                
-                papers = []
-                for entry in root.findall('atom:entry', ns):
-                    title = entry.find('atom:title', ns)
-                    summary = entry.find('atom:summary', ns)
-                    link = entry.find('atom:id', ns)
-                    published = entry.find('atom:published', ns)
-                    
-                    authors = []
-                    for author in entry.findall('atom:author', ns):
-                        name = author.find('atom:name', ns)
-                        if name is not None:
-                            authors.append(name.text.strip())
-                    
-                    papers.append({
-                        "title": title.text.strip() if title is not None else "",
-                        "authors": authors[:3],
-                        "summary": (summary.text.strip()[:200] + "...") if summary is not None and len(summary.text.strip()) > 200 else (summary.text.strip() if summary is not None else ""),
-                        "link": link.text.strip() if link is not None else "",
-                        "published": published.text.strip()[:10] if published is not None else ""
-                    })
-                
-                print(f"[SUCCESS] Arxiv查询成功，找到{len(papers)}篇论文")
-                return papers, None
-                
-        except (httpx.TimeoutException, httpx.ConnectError) as e:
-            error_msg = f"Arxiv API超时/连接错误: {str(e)}"
-            print(f"[ERROR] {error_msg} (尝试 {attempt + 1}/{max_retries})")
-            if attempt < max_retries - 1:
-                await asyncio.sleep(1.0 * (attempt + 1))  # 指数退避
-                continue
-            return [], error_msg
-        except httpx.HTTPError as e:
-            error_msg = f"Arxiv API网络错误: {str(e)}"
-            print(f"[ERROR] {error_msg}")
-            if attempt < max_retries - 1:
-                await asyncio.sleep(1.0 * (attempt + 1))
-                continue
-            return [], error_msg
-        except ET.ParseError as e:
-            error_msg = f"Arxiv XML解析错误: {str(e)}"
-            print(f"[ERROR] {error_msg}")
-            return [], error_msg
-        except Exception as e:
-            error_msg = f"Arxiv搜索异常: {str(e)}"
-            print(f"[ERROR] {error_msg}")
-            return [], error_msg
+        search_query = await translate_to_english(query)
+        print(f"[INFO] 翻译后查询: {search_query}")
     
-    return [], "Arxiv查询失败，已达最大重试次数"
+    print(f"[INFO] 正在查询Arxiv论文: {search_query}")
+    try:
+        entries = await get_arxiv_scheduler().search(search_query, max_results=max_results)
+    except CircuitOpenError:
+        # 熔断不是Arxiv返回的结果，不缓存
+        print(f"[WARNING] Arxiv熔断中，放弃查询: {search_query}")
+        return [], ARXIV_CIRCUIT_OPEN_MESSAGE
+    except ArxivRequestError as e:
+        print(f"[ERROR] {e}")
+        await arxiv_cache.store("api", query, max_results, [], str(e))
+        return [], str(e)
+    except Exception as e:
+        error_msg = f"Arxiv搜索异常: {str(e)}"
+        print(f"[ERROR] {error_msg}")
+        return [], error_msg
+    
+    papers = [
+        {
+            "title": entry["title"],
+            "authors": entry["authors"][:3],
+            "summary": entry["summary"][:200] + "..." if len(entry["summary"]) > 200 else entry["summary"],
+            "link": entry["link"],
+            "published": entry["published"][:10]
+        }
+        for entry in entries
+    ]
+    print(f"[SUCCESS] Arxiv查询成功，找到{len(papers)}篇论文")
+    await arxiv_cache.store("api", query, max_results, papers)
+    return papers, None
 
 
 def truncate_definition(text: str, max_length: int = 500) -> str:
@@ -391,6 +598,139 @@ def truncate_definition(text: str, max_length: int = 500) -> str:
     return text[:max_length - 3] + "..."
 
 
+def fallback_credibility(has_wikipedia: bool, similarity: Optional[float] = None) -> float:
+    """可信度回退：与compute_credibility相同的公式，缺少相似度时使用默认值0.75"""
+    base = 0.95 if has_wikipedia else 0.70
+    return base * (0.7 + 0.3 * (similarity if similarity is not None else 0.75))
+
+
+# 相同缓存key的并发发现请求只计算一次（Redis锁在应用启动时按配置挂载）
+discovery_flight = SingleFlight(
+    lock_ttl=getattr(settings, "SINGLE_FLIGHT_LOCK_TTL", 120.0),
+    wait_timeout=getattr(settings, "SINGLE_FLIGHT_WAIT_TIMEOUT", 90.0)
+)
+
+
+# 发现结果的持久化（Redis缓存 + Neo4j）在后台批量写入，不占用请求延迟（由应用启动时start）
+persistence_queue = WriteBehindQueue(
+    neo4j_client,
+    redis_client,
+    max_pending=getattr(settings, "WRITE_BEHIND_MAX_PENDING", 2000),
+    batch_size=getattr(settings, "WRITE_BEHIND_BATCH_SIZE", 500),
+    flush_interval=getattr(settings, "WRITE_BEHIND_FLUSH_INTERVAL", 0.5),
+    max_retries=getattr(settings, "WRITE_BEHIND_MAX_RETRIES", 3)
+)
+
+
+async def get_cached_result(cache_key: str):
+    """读取缓存：先查写后队列中尚未落盘的结果，再查Redis"""
+    pending = persistence_queue.get_cached(cache_key)
+    if pending is not None:
+        return pending
+    return await redis_client.get(cache_key)
+
+
+def cached_result_lookup(cache_key: str):
+    """返回读取Redis缓存的函数，命中时包装成与计算结果相同的结构"""
+    async def lookup():
+        try:
+            cached = await get_cached_result(cache_key)
+        except Exception:
+            return None
+        return {"status": "success", "data": cached} if cached else None
+    return lookup
+
+
+def get_enrichment_stage() -> EnrichmentStage:
+    """
+    按配置创建一个富化阶段（截止时间从创建时开始计时）
+    
+    应在即将富化时创建：候选概念的阶段在LLM生成完成后创建，
+    与生成并行的中心节点富化使用各自的阶段，生成耗时不占用候选的富化时间。
+    """
+    return EnrichmentStage(
+        concurrency=getattr(settings, "ENRICH_CONCURRENCY", 8),
+        deadline=getattr(settings, "ENRICH_DEADLINE", 20.0)
+    )
+
+
+def embedding_prefetcher(reference_concept: str) -> CandidateBatcher:
+    """流式生成时按批预取候选概念（及参考概念）的embedding"""
+    from backend.api.real_node_generator import prefetch_embeddings
+    return CandidateBatcher(lambda names: prefetch_embeddings([reference_concept] + names))
+
+
+async def enrich_concepts(
+    stage: EnrichmentStage,
+    terms: List[str],
+    parent_concept: Optional[str] = None,
+    similarities: Optional[List[Optional[float]]] = None,
+    credibility_fn=None,
+    wiki_tasks: Optional[Dict[str, asyncio.Future]] = None
+) -> List[ConceptEnrichment]:
+    """
+    并发获取一组概念的Wikipedia定义、可信度和简介
+    
+    每个概念：先查Wikipedia，再计算可信度；不同概念之间并行执行，共享stage的并发限制和截止时间。
+    所有概念的定义就绪后，简介通过一次批量LLM调用生成（generate_brief_summaries）。
+    
+    Args:
+        stage: 富化阶段
+        terms: 概念列表
+        parent_concept: 父概念（计算可信度时使用）
+        similarities: 与terms对应的已计算相似度
+        credibility_fn: 可信度计算函数（如compute_credibility），为None时不计算
+        wiki_tasks: 已提前发起的Wikipedia查询（概念 -> 任务），命中时不再重复查询
+        
+    Returns:
+        与terms顺序一致的富化结果，超时或失败的字段已填充回退值
+    """
+    similarities = similarities or [None] * len(terms)
+    records = [ConceptEnrichment(concept=t, similarity=s) for t, s in zip(terms, similarities)]
+    wiki_tasks = wiki_tasks or {}
+    
+    async def enrich_one(record: ConceptEnrichment):
+        if record.concept in wiki_tasks:
+            record.wiki = await wiki_tasks[record.concept]
+        else:
+            record.wiki = await stage.call(lambda: get_wikipedia_definition(record.concept, max_length=500))
+        
+        if credibility_fn and parent_concept:
+            record.credibility = await stage.call(lambda: credibility_fn(
+                concept=record.concept,
+                parent_concept=parent_concept,
+                has_wikipedia=record.wiki["exists"],
+                similarity=record.similarity
+            ))
+    
+    await stage.gather(records, enrich_one)
+    
+    # 批量简介：只使用请求截止时间的剩余部分，已到截止时间时直接使用回退简介
+    budget = stage.remaining()
+    if records and budget <= 0:
+        print(f"[WARNING] 已到富化截止时间，{len(records)}个概念使用回退简介")
+    elif records:
+        try:
+            summaries = await asyncio.wait_for(
+                stage.call(lambda: generate_brief_summaries(
+                    [(r.concept, r.wiki.get("definition", "")) for r in records]
+                )),
+                timeout=budget
+            )
+            for record, summary in zip(records, summaries):
+                record.brief_summary = summary
+        except asyncio.TimeoutError:
+            print(f"[WARNING] 批量简介超时({budget:.1f}s)，{len(records)}个概念使用回退简介")
+    
+    for record in records:
+        if record.brief_summary is None:
+            record.brief_summary = fallback_brief_summary(record.concept, record.wiki.get("definition", ""))
+        if credibility_fn and record.credibility is None:
+            record.credibility = fallback_credibility(record.wiki["exists"], record.similarity)
+    
+    return records
+
+
 async def get_real_discovery_result(concept: str, max_concepts: int = 5) -> dict:
     """
     使用真实LLM生成概念挖掘结果 + 语义相似度排序
@@ -419,31 +759,22 @@ async def get_real_discovery_result(concept: str, max_concepts: int = 5) -> dict
     
     nodes = []
     
-    # 添加中心节点（输入概念本身）
-    center_wiki = await get_wikipedia_definition(concept, max_length=500)
-    center_node = {
-        "id": f"{concept.replace(' ', '_')}_跨学科_0",
-        "label": concept,
-        "discipline": "跨学科",
-        "definition": center_wiki["definition"] if center_wiki["exists"] else f"{concept}是一个跨学科的学术概念。",
-        "brief_summary": await generate_brief_summary(concept, center_wiki.get("definition", "")),
-        "credibility": 0.95 if center_wiki["exists"] else 0.80,
-        "similarity": 1.0,  # 中心节点相似度为1
-        "source": "Wikipedia" if center_wiki["exists"] else "LLM",
-        "wiki_url": center_wiki.get("url", ""),
-        "depth": 0
-    }
-    nodes.append(center_node)
+    # 中心节点（输入概念本身）的富化与LLM候选生成并行进行（使用单独的富化阶段）
+    center_task = asyncio.ensure_future(enrich_concepts(get_enrichment_stage(), [concept]))
     
     if use_real_llm:
         # 使用真实LLM生成相关概念
         try:
             # 固定生成20个候选概念，确保有足够样本进行相似度筛选
+            # 流式生成：候选逐个到达时即开始获取embedding
+            prefetch = embedding_prefetcher(concept)
             candidates = await generate_related_concepts(
                 parent_concept=concept,
                 existing_concepts=[concept],
-                max_count=20  # 固定生成20个，后续通过相似度筛选
+                max_count=20,  # 固定生成20个，后续通过相似度筛选
+                on_candidate=lambda c: prefetch.add(c["name"])
             )
+            await prefetch.drain()
             
             if candidates:
                 print(f"[INFO] LLM生成了{len(candidates)}个候选概念")
@@ -493,26 +824,24 @@ async def get_real_discovery_result(concept: str, max_concepts: int = 5) -> dict
                 for c in top_candidates:
                     print(f"   - {c['name']} (语义相似度: {c['similarity']:.3f}, 学科: {c['discipline']})")
                 
+                # 并发获取Wikipedia定义、动态可信度（传入已有的相似度，避免重复计算）和简介
+                enrichments = await enrich_concepts(
+                    get_enrichment_stage(),
+                    [c["name"] for c in top_candidates],
+                    parent_concept=concept,
+                    similarities=[c["similarity"] for c in top_candidates],
+                    credibility_fn=compute_credibility
+                )
+                
                 # 为每个候选概念创建节点
-                for idx, candidate in enumerate(top_candidates, 1):
+                for idx, (candidate, enrichment) in enumerate(zip(top_candidates, enrichments), 1):
                     term = candidate["name"]
                     discipline = candidate["discipline"]
                     similarity_score = candidate["similarity"]  # 使用已计算的相似度
                     cross_principle = candidate.get("cross_principle", "")  # 获取跨学科原理
-                    
-                    # 获取Wikipedia定义
-                    term_wiki = await get_wikipedia_definition(term, max_length=500)
-                    
-                    # 计算动态可信度（传入已有的相似度，避免重复计算）
-                    credibility = await compute_credibility(
-                        concept=term,
-                        parent_concept=concept,
-                        has_wikipedia=term_wiki["exists"],
-                        similarity=similarity_score  # 传入已计算的相似度
-                    )
-                    
-                    # 生成简介
-                    brief_summary = await generate_brief_summary(term, term_wiki.get("definition", ""))
+                    term_wiki = enrichment.wiki
+                    credibility = enrichment.credibility
+                    brief_summary = enrichment.brief_summary
                     
                     node_id = f"{term.replace(' ', '_')}_{discipline.replace(' ', '_')}_{idx}"
                     
@@ -539,6 +868,23 @@ async def get_real_discovery_result(concept: str, max_concepts: int = 5) -> dict
             traceback.print_exc()
             use_real_llm = False
     
+    # 添加中心节点（放在首位）
+    center = (await center_task)[0]
+    center_wiki = center.wiki
+    center_node = {
+        "id": f"{concept.replace(' ', '_')}_跨学科_0",
+        "label": concept,
+        "discipline": "跨学科",
+        "definition": center_wiki["definition"] if center_wiki["exists"] else f"{concept}是一个跨学科的学术概念。",
+        "brief_summary": center.brief_summary,
+        "credibility": 0.95 if center_wiki["exists"] else 0.80,
+        "similarity": 1.0,  # 中心节点相似度为1
+        "source": "Wikipedia" if center_wiki["exists"] else "LLM",
+        "wiki_url": center_wiki.get("url", ""),
+        "depth": 0
+    }
+    nodes.insert(0, center_node)
+    
     # 如果LLM失败，使用预定义概念作为回退
     if not use_real_llm or len(nodes) == 1:
         print("[INFO] 使用预定义概念回退方案")
@@ -546,11 +892,13 @@ async def get_real_discovery_result(concept: str, max_concepts: int = 5) -> dict
             {"label": f"{concept}理论", "discipline": "理论基础"},
             {"label": f"{concept}应用", "discipline": "应用领域"},
             {"label": f"{concept}方法", "discipline": "方法论"},
-        ]
+        ][:max_concepts - 1]
+        
+        enrichments = await enrich_concepts(get_enrichment_stage(), [item["label"] for item in predefined])
         
-        for idx, item in enumerate(predefined[:max_concepts - 1], 1):
+        for idx, (item, enrichment) in enumerate(zip(predefined, enrichments), 1):
             term = item["label"]
-            term_wiki = await get_wikipedia_definition(term, max_length=500)
+            term_wiki = enrichment.wiki
             
             node_id = f"{term.replace(' ', '_')}_{item['discipline'].replace(' ', '_')}_{idx}"
             
@@ -559,7 +907,7 @@ async def get_real_discovery_result(concept: str, max_concepts: int = 5) -> dict
                 "label": term,
                 "discipline": item["discipline"],
                 "definition": term_wiki["definition"] if term_wiki["exists"] else f"{term}是与{concept}相关的概念。",
-                "brief_summary": await generate_brief_summary(term, term_wiki.get("definition", "")),
+                "brief_summary": enrichment.brief_summary,
                 "credibility": 0.90 if term_wiki["exists"] else 0.70,
                 "similarity": 0.75,  # 预定义概念固定相似度
                 "source": "Wikipedia" if term_wiki["exists"] else "LLM",
@@ -657,6 +1005,25 @@ class ExpandRequest(BaseModel):
     max_new_nodes: int = Field(default=10, ge=1, le=20)
 
 
+async def _generate_discovery(request: DiscoverRequest, cache_key: str) -> dict:
+    """功能1：LLM生成 + 持久化 + 写入缓存（由discovery_flight保证同一key只执行一次）"""
+    print(f"[INFO] 步骤3：缓存未命中，使用LLM生成: {request.concept}")
+    
+    # 使用真实LLM生成（取代mock数据）
+    result = await get_real_discovery_result(request.concept, max_concepts=min(request.max_concepts, 10))
+    
+    if result.get("status") == "success":
+        # Redis缓存（1小时）同步写入，保证其他worker等待的合并请求能读到；Neo4j持久化走写后队列
+        await persistence_queue.submit(
+            cache_key, result["data"],
+            nodes=result["data"]["nodes"], edges=result["data"]["edges"], ex=3600,
+            cache_write_through=True
+        )
+        print(f"[INFO] ✅ 已提交持久化（Neo4j + Redis缓存）")
+    
+    return result
+
+
 @router.post("/discover", response_model=DiscoverResponse)
 async def discover_concepts(request: DiscoverRequest):
     """概念挖掘接口 - 使用真实LLM生成 + 语义相似度排序"""
@@ -685,7 +1052,7 @@ async def discover_concepts(request: DiscoverRequest):
     # 2. Neo4j未命中，检查Redis缓存（临时缓存）
     cache_key = f"discover:v2:{request.concept}"
     print(f"[INFO] 步骤2：检查Redis缓存: {cache_key}")
-    cached = await redis_client.get(cache_key)
+    cached = await get_cached_result(cache_key)
     if cached:
         print(f"[SUCCESS] ✅ Redis缓存命中！: {request.concept}")
         print(f"[INFO] 跳过LLM调用，节省时间和成本")
@@ -695,67 +1062,18 @@ async def discover_concepts(request: DiscoverRequest):
             data=cached
         )
     
-    # 3. 缓存都未命中，使用LLM生成新数据
-    print(f"[INFO] 步骤3：缓存未命中，使用LLM生成: {request.concept}")
-    
-    # 使用真实LLM生成（取代mock数据）
-    result = await get_real_discovery_result(request.concept, max_concepts=min(request.max_concepts, 10))
-    
-    if result.get("status") == "success":
-        nodes = result["data"]["nodes"]
-        edges = result["data"]["edges"]
-        
-        # 保存到Neo4j（持久化存储）
-        try:
-            saved = await neo4j_client.save_graph_data(nodes, edges)
-            if saved:
-                print(f"[SUCCESS] ✅ 已保存到Neo4j持久化存储")
-        except Exception as e:
-            print(f"[WARNING] Neo4j保存失败: {e}")
-        
-        # 保存到Redis缓存（临时缓存，1小时）
-        try:
-            await redis_client.set(cache_key, result["data"], ex=3600)
-            print(f"[SUCCESS] ✅ 已保存到Redis缓存")
-        except Exception as e:
-            print(f"[WARNING] Redis缓存失败: {e}")
+    # 3. 缓存都未命中，使用LLM生成新数据（相同概念的并发请求合并为一次计算）
+    result = await discovery_flight.do(
+        cache_key,
+        lambda: _generate_discovery(request, cache_key),
+        cache_lookup=cached_result_lookup(cache_key)
+    )
     
     return DiscoverResponse(status=result.get("status", "success"), request_id=request_id, data=result.get("data", {}))
 
 
-@router.post("/discover/disciplined", response_model=DiscoverResponse)
-async def discover_concepts_disciplined(request: DiscoverDisciplinedRequest):
-    """
-    功能2：指定学科的概念挖掘
-    
-    输入：
-    - concept: 单个概念（如"神经网络"）
-    - disciplines: 学科列表（如["生物学", "数学"]）
-    
-    逻辑：只在指定学科中挖掘关联概念
-    """
-    print(f"[INFO] 功能2 - 指定学科挖掘: {request.concept}, 学科: {request.disciplines}")
-    
-    # 生成缓存key（包含concept和disciplines的组合）
-    sorted_disciplines = sorted(request.disciplines)  # 排序保证一致性
-    disciplines_str = "_".join(sorted_disciplines)
-    cache_key = f"discover:disciplined:v2:{request.concept}:{disciplines_str}"
-    
-    # 检查Redis缓存
-    try:
-        cached_result = await redis_client.get(cache_key)
-        if cached_result:
-            print(f"[SUCCESS] ✅ 缓存命中 - 功能2: {cache_key}")
-            return DiscoverResponse(
-                status="success",
-                request_id=str(uuid.uuid4()),
-                data=cached_result
-            )
-        else:
-            print(f"[INFO] ❌ 缓存未命中 - 功能2: {cache_key}")
-    except Exception as e:
-        print(f"[WARNING] Redis缓存读取失败: {e}")
-    
+async def _generate_disciplined_discovery(request: DiscoverDisciplinedRequest, cache_key: str) -> dict:
+    """功能2：LLM生成 + 富化 + 写入缓存（由discovery_flight保证同一key只执行一次）"""
     # 导入功能2生成器
     try:
         from backend.api.multi_function_generator import generate_concepts_with_disciplines
@@ -763,16 +1081,27 @@ async def discover_concepts_disciplined(request: DiscoverDisciplinedRequest):
     except ImportError as e:
         raise HTTPException(status_code=500, detail=f"生成器导入失败: {str(e)}")
     
-    request_id = str(uuid.uuid4())
+    # 1. 中心节点富化与LLM生成并行进行（使用单独的富化阶段）
+    center_task = asyncio.ensure_future(enrich_concepts(get_enrichment_stage(), [request.concept]))
+    
+    # 2. LLM生成指定学科的概念（强制生成20个候选），候选到达时即开始获取embedding
+    prefetch = embedding_prefetcher(request.concept)
+    candidates = await generate_concepts_with_disciplines(
+        parent_concept=request.concept,
+        disciplines=request.disciplines,
+        max_count=20,  # 强制生成20个候选概念
+        on_candidate=lambda c: prefetch.add(c["name"])
+    )
+    await prefetch.drain()
     
-    # 1. 添加中心节点
-    center_wiki = await get_wikipedia_definition(request.concept, max_length=500)
+    center = (await center_task)[0]
+    center_wiki = center.wiki
     center_node = {
         "id": f"{request.concept.replace(' ', '_')}_center",
         "label": request.concept,
         "discipline": "跨学科",
         "definition": center_wiki["definition"] if center_wiki["exists"] else f"{request.concept}是一个跨学科的学术概念。",
-        "brief_summary": await generate_brief_summary(request.concept, center_wiki.get("definition", "")),
+        "brief_summary": center.brief_summary,
         "credibility": 0.95 if center_wiki["exists"] else 0.80,
         "similarity": 1.0,
         "source": "Wikipedia" if center_wiki["exists"] else "LLM",
@@ -783,19 +1112,8 @@ async def discover_concepts_disciplined(request: DiscoverDisciplinedRequest):
     nodes = [center_node]
     edges = []
     
-    # 2. LLM生成指定学科的概念（强制生成20个候选）
-    candidates = await generate_concepts_with_disciplines(
-        parent_concept=request.concept,
-        disciplines=request.disciplines,
-        max_count=20  # 强制生成20个候选概念
-    )
-    
     if not candidates:
-        return DiscoverResponse(
-            status="error",
-            request_id=request_id,
-            data={"message": "未生成任何概念，请检查学科设置"}
-        )
+        return {"status": "error", "data": {"message": "未生成任何概念，请检查学科设置"}}
     
     print(f"[INFO] LLM生成了{len(candidates)}个候选概念")
     
@@ -840,20 +1158,22 @@ async def discover_concepts_disciplined(request: DiscoverDisciplinedRequest):
     for c in top_candidates:
         print(f"   - {c['name']} (语义相似度: {c['similarity']:.3f}, 学科: {c['discipline']})")
     
-    # 4. 为每个概念创建节点
-    for idx, candidate in enumerate(top_candidates, 1):
+    # 4. 并发富化后为每个概念创建节点（富化截止时间从此处开始计时）
+    enrichments = await enrich_concepts(
+        get_enrichment_stage(),
+        [c["name"] for c in top_candidates],
+        parent_concept=request.concept,
+        similarities=[c["similarity"] for c in top_candidates],  # 传入已计算的相似度
+        credibility_fn=compute_credibility
+    )
+    
+    for idx, (candidate, enrichment) in enumerate(zip(top_candidates, enrichments), 1):
         term = candidate["name"]
         discipline = candidate["discipline"]
         similarity_score = candidate["similarity"]  # 使用已计算的相似度
-        
-        term_wiki = await get_wikipedia_definition(term, max_length=500)
-        credibility = await compute_credibility(
-            concept=term,
-            parent_concept=request.concept,
-            has_wikipedia=term_wiki["exists"],
-            similarity=similarity_score  # 传入已计算的相似度
-        )
-        brief_summary = await generate_brief_summary(term, term_wiki.get("definition", ""))
+        term_wiki = enrichment.wiki
+        credibility = enrichment.credibility
+        brief_summary = enrichment.brief_summary
         
         node_id = f"{term.replace(' ', '_')}_{discipline.replace(' ', '_')}_{idx}"
         
@@ -891,72 +1211,74 @@ async def discover_concepts_disciplined(request: DiscoverDisciplinedRequest):
     
     print(f"[SUCCESS] 功能2完成: 生成{len(nodes)-1}个概念")
     
-    # 保存到Redis缓存（3600秒 = 1小时）
-    try:
-        await redis_client.set(cache_key, result, ex=3600)
-        print(f"[INFO] ✅ 已缓存功能2结果: {cache_key}")
-    except Exception as e:
-        print(f"[WARNING] Redis缓存保存失败: {e}")
-    
-    # 保存到Neo4j（如果配置了）
-    try:
-        if hasattr(neo4j_client, 'save_graph_data'):
-            await neo4j_client.save_graph_data(nodes, edges)
-            print(f"[INFO] ✅ 已保存到Neo4j")
-    except Exception as e:
-        print(f"[WARNING] Neo4j保存失败: {e}")
+    # Redis缓存（3600秒 = 1小时）同步写入（跨worker请求合并依赖），Neo4j持久化走写后队列
+    await persistence_queue.submit(cache_key, result, nodes=nodes, edges=edges, ex=3600, cache_write_through=True)
+    print(f"[INFO] ✅ 已提交功能2结果持久化: {cache_key}")
     
-    return DiscoverResponse(status="success", request_id=request_id, data=result)
+    return {"status": "success", "data": result}
 
 
-@router.post("/discover/bridge", response_model=DiscoverResponse)
-async def discover_bridge_concepts(request: BridgeRequest):
+@router.post("/discover/disciplined", response_model=DiscoverResponse)
+async def discover_concepts_disciplined(request: DiscoverDisciplinedRequest):
     """
-    功能3：多概念桥梁发现
+    功能2：指定学科的概念挖掘
     
     输入：
-    - concepts: 多个概念（如["熵", "最小二乘法"]）
+    - concept: 单个概念（如"神经网络"）
+    - disciplines: 学科列表（如["生物学", "数学"]）
     
-    逻辑：寻找连接这些概念的"桥梁概念"节点
+    逻辑：只在指定学科中挖掘关联概念
     """
-    print(f"[INFO] 功能3 - 桥梁发现: {request.concepts}")
+    print(f"[INFO] 功能2 - 指定学科挖掘: {request.concept}, 学科: {request.disciplines}")
     
-    # 生成缓存key（包含所有concepts的组合）
-    sorted_concepts = sorted(request.concepts)  # 排序保证一致性
-    concepts_str = "_".join(sorted_concepts)
-    cache_key = f"discover:bridge:v2:{concepts_str}:{request.max_bridges}"
+    # 生成缓存key（包含concept和disciplines的组合）
+    sorted_disciplines = sorted(request.disciplines)  # 排序保证一致性
+    disciplines_str = "_".join(sorted_disciplines)
+    cache_key = f"discover:disciplined:v2:{request.concept}:{disciplines_str}"
     
     # 检查Redis缓存
     try:
-        cached_result = await redis_client.get(cache_key)
+        cached_result = await get_cached_result(cache_key)
         if cached_result:
-            print(f"[SUCCESS] ✅ 缓存命中 - 功能3: {cache_key}")
+            print(f"[SUCCESS] ✅ 缓存命中 - 功能2: {cache_key}")
             return DiscoverResponse(
                 status="success",
                 request_id=str(uuid.uuid4()),
                 data=cached_result
             )
         else:
-            print(f"[INFO] ❌ 缓存未命中 - 功能3: {cache_key}")
+            print(f"[INFO] ❌ 缓存未命中 - 功能2: {cache_key}")
     except Exception as e:
         print(f"[WARNING] Redis缓存读取失败: {e}")
     
+    # 缓存未命中：相同key的并发请求合并为一次计算
+    result = await discovery_flight.do(
+        cache_key,
+        lambda: _generate_disciplined_discovery(request, cache_key),
+        cache_lookup=cached_result_lookup(cache_key)
+    )
+    
+    return DiscoverResponse(status=result["status"], request_id=str(uuid.uuid4()), data=result["data"])
+
+
+async def _generate_bridge_discovery(request: BridgeRequest, cache_key: str) -> dict:
+    """功能3：LLM生成桥梁概念 + 富化 + 写入缓存（由discovery_flight保证同一key只执行一次）"""
     # 导入功能3生成器
     try:
         from backend.api.multi_function_generator import find_bridge_concepts
-        from backend.api.real_node_generator import compute_similarity, compute_credibility
+        from backend.api.real_node_generator import compute_similarities_batch, compute_credibility
     except ImportError as e:
         raise HTTPException(status_code=500, detail=f"生成器导入失败: {str(e)}")
     
-    request_id = str(uuid.uuid4())
-    
     nodes = []
     edges = []
     
     # 1. 为每个输入概念创建中心节点
     center_nodes = []
-    for i, concept in enumerate(request.concepts):
-        wiki = await get_wikipedia_definition(concept, max_length=500)
+    center_stage = get_enrichment_stage()
+    center_enrichments = await enrich_concepts(center_stage, request.concepts)
+    for i, (concept, enrichment) in enumerate(zip(request.concepts, center_enrichments)):
+        wiki = enrichment.wiki
         node_id = f"{concept.replace(' ', '_')}_input_{i}"
         
         center_node = {
@@ -964,7 +1286,7 @@ async def discover_bridge_concepts(request: BridgeRequest):
             "label": concept,
             "discipline": "输入概念",
             "definition": wiki["definition"] if wiki["exists"] else f"{concept}是一个学术概念。",
-            "brief_summary": await generate_brief_summary(concept, wiki.get("definition", "")),
+            "brief_summary": enrichment.brief_summary,
             "credibility": 0.95 if wiki["exists"] else 0.80,
             "source": "Wikipedia" if wiki["exists"] else "LLM",
             "wiki_url": wiki.get("url", ""),
@@ -975,36 +1297,79 @@ async def discover_bridge_concepts(request: BridgeRequest):
         center_nodes.append(center_node)
         nodes.append(center_node)
     
-    # 2. LLM生成桥梁概念
+    # 2. LLM流式生成桥梁概念：每个桥梁概念到达时即开始查询Wikipedia定义
+    prefetched: Dict[str, asyncio.Future] = {}
+    
+    def prefetch_bridge(bridge: dict):
+        if bridge["name"] not in prefetched:
+            prefetched[bridge["name"]] = asyncio.ensure_future(
+                center_stage.call(lambda: get_wikipedia_definition(bridge["name"], max_length=500))
+            )
+    
     bridges = await find_bridge_concepts(
         concepts=request.concepts,
-        max_bridges=request.max_bridges
+        max_bridges=request.max_bridges,
+        on_candidate=prefetch_bridge
     )
     
+    # 排序截断后未入选的桥梁概念不再查询
+    selected = {bridge["name"] for bridge in bridges}
+    for name, task in prefetched.items():
+        if name not in selected:
+            task.cancel()
+    
     if not bridges:
-        return DiscoverResponse(
-            status="error",
-            request_id=request_id,
-            data={"message": "未找到桥梁概念，请尝试其他概念组合"}
-        )
+        return {"status": "error", "data": {"message": "未找到桥梁概念，请尝试其他概念组合"}}
+    
+    bridge_names = list(dict.fromkeys(bridge["name"] for bridge in bridges))
+    
+    # 每条边对应一个（输入概念, 桥梁概念）对
+    edge_specs = []
+    for idx, bridge in enumerate(bridges):
+        for input_concept in bridge["connected_concepts"]:
+            # 找到对应的输入节点
+            source_node = next((n for n in center_nodes if n["label"] == input_concept.strip()), None)
+            if source_node:
+                edge_specs.append((idx, source_node, input_concept.strip()))
+    
+    async def bridge_similarities():
+        # 逐个输入概念计算：第一次之后桥梁概念的embedding已在共享存储中
+        return [await compute_similarities_batch(bridge_names, c) for c in request.concepts]
+    
+    # 简介、边reasoning、相似度互不依赖，并发进行（简介与reasoning各为一次批量LLM调用）
+    # 桥梁概念的富化截止时间在生成完成后才开始计时
+    bridge_enrichments, edge_reasonings, similarity_rows = await asyncio.gather(
+        enrich_concepts(get_enrichment_stage(), bridge_names, wiki_tasks=prefetched),
+        generate_bridge_edge_reasonings([
+            (input_concept, bridges[idx]["name"], bridges[idx]["connection_principle"])
+            for idx, _, input_concept in edge_specs
+        ]),
+        bridge_similarities()
+    )
+    enrichment_by_name = {e.concept: e for e in bridge_enrichments}
     
     # 3. 为每个桥梁概念创建节点
+    bridge_node_ids = []
     for idx, bridge in enumerate(bridges):
         bridge_name = bridge["name"]
         bridge_type = bridge["bridge_type"]
         
-        wiki = await get_wikipedia_definition(bridge_name, max_length=500)
-        brief_summary = await generate_brief_summary(bridge_name, wiki.get("definition", ""))
+        enrichment = enrichment_by_name[bridge_name]
+        wiki = enrichment.wiki
+        brief_summary = enrichment.brief_summary
         
         node_id = f"{bridge_name.replace(' ', '_')}_bridge_{idx}"
+        bridge_node_ids.append(node_id)
         
-        # 计算平均可信度（基于与所有输入概念的关联）
+        # 计算平均可信度（基于与所有输入概念的相似度）
+        name_idx = bridge_names.index(bridge_name)
         avg_credibility = 0.0
-        for input_concept in request.concepts:
+        for input_concept, row in zip(request.concepts, similarity_rows):
             cred = await compute_credibility(
                 concept=bridge_name,
                 parent_concept=input_concept,
-                has_wikipedia=wiki["exists"]
+                has_wikipedia=wiki["exists"],
+                similarity=row[name_idx]
             )
             avg_credibility += cred
         avg_credibility /= len(request.concepts)
@@ -1023,28 +1388,19 @@ async def discover_bridge_concepts(request: BridgeRequest):
             "is_bridge": True,
             "connection_principle": bridge["connection_principle"]
         })
+    
+    # 4. 创建边：每个输入概念到桥梁概念使用单独的reasoning
+    for (idx, source_node, input_concept), edge_reasoning in zip(edge_specs, edge_reasonings):
+        bridge_type = bridges[idx]["bridge_type"]
+        print(f"[DEBUG] 边 {input_concept} → {bridges[idx]['name']} 的reasoning: {edge_reasoning}")
         
-        # 4. 创建边：为每个输入概念到桥梁概念生成单独的reasoning
-        for input_concept in bridge["connected_concepts"]:
-            # 找到对应的输入节点
-            source_node = next((n for n in center_nodes if n["label"] == input_concept.strip()), None)
-            if source_node:
-                # 为这条边生成专门的reasoning，解释这个输入概念与桥梁概念的关系
-                edge_reasoning = await generate_bridge_edge_reasoning(
-                    input_concept=input_concept.strip(),
-                    bridge_concept=bridge_name,
-                    overall_principle=bridge["connection_principle"]
-                )
-                
-                print(f"[DEBUG] 边 {input_concept} → {bridge_name} 的reasoning: {edge_reasoning}")
-                
-                edges.append({
-                    "source": source_node["id"],
-                    "target": node_id,
-                    "relation": "桥梁连接",
-                    "weight": 0.85 if bridge_type == "直接桥梁" else (0.75 if bridge_type == "间接桥梁" else 0.65),
-                    "reasoning": edge_reasoning
-                })
+        edges.append({
+            "source": source_node["id"],
+            "target": bridge_node_ids[idx],
+            "relation": "桥梁连接",
+            "weight": 0.85 if bridge_type == "直接桥梁" else (0.75 if bridge_type == "间接桥梁" else 0.65),
+            "reasoning": edge_reasoning
+        })
     
     # 5. 构建桥接路径分析数据（用于前端展示）
     bridges_by_type = {}
@@ -1079,22 +1435,53 @@ async def discover_bridge_concepts(request: BridgeRequest):
         }
     }
     
-    # 保存到Redis缓存（3600秒 = 1小时）
-    try:
-        await redis_client.set(cache_key, result, ex=3600)
-        print(f"[INFO] ✅ 已缓存功能3结果: {cache_key}")
-    except Exception as e:
-        print(f"[WARNING] Redis缓存保存失败: {e}")
+    # Redis缓存（3600秒 = 1小时）同步写入（跨worker请求合并依赖），Neo4j持久化走写后队列
+    await persistence_queue.submit(cache_key, result, nodes=nodes, edges=edges, ex=3600, cache_write_through=True)
+    print(f"[INFO] ✅ 已提交功能3结果持久化: {cache_key}")
+    
+    return {"status": "success", "data": result}
+
+
+@router.post("/discover/bridge", response_model=DiscoverResponse)
+async def discover_bridge_concepts(request: BridgeRequest):
+    """
+    功能3：多概念桥梁发现
+    
+    输入：
+    - concepts: 多个概念（如["熵", "最小二乘法"]）
+    
+    逻辑：寻找连接这些概念的"桥梁概念"节点
+    """
+    print(f"[INFO] 功能3 - 桥梁发现: {request.concepts}")
     
-    # 保存到Neo4j（如果配置了）
+    # 生成缓存key（包含所有concepts的组合）
+    sorted_concepts = sorted(request.concepts)  # 排序保证一致性
+    concepts_str = "_".join(sorted_concepts)
+    cache_key = f"discover:bridge:v2:{concepts_str}:{request.max_bridges}"
+    
+    # 检查Redis缓存
     try:
-        if hasattr(neo4j_client, 'save_graph_data'):
-            await neo4j_client.save_graph_data(nodes, edges)
-            print(f"[INFO] ✅ 已保存到Neo4j")
+        cached_result = await get_cached_result(cache_key)
+        if cached_result:
+            print(f"[SUCCESS] ✅ 缓存命中 - 功能3: {cache_key}")
+            return DiscoverResponse(
+                status="success",
+                request_id=str(uuid.uuid4()),
+                data=cached_result
+            )
+        else:
+            print(f"[INFO] ❌ 缓存未命中 - 功能3: {cache_key}")
     except Exception as e:
-        print(f"[WARNING] Neo4j保存失败: {e}")
+        print(f"[WARNING] Redis缓存读取失败: {e}")
+    
+    # 缓存未命中：相同key的并发请求合并为一次计算
+    result = await discovery_flight.do(
+        cache_key,
+        lambda: _generate_bridge_discovery(request, cache_key),
+        cache_lookup=cached_result_lookup(cache_key)
+    )
     
-    return DiscoverResponse(status="success", request_id=request_id, data=result)
+    return DiscoverResponse(status=result["status"], request_id=str(uuid.uuid4()), data=result["data"])
 
 
 @router.get("/graph/{concept_id}", response_model=GraphResponse)
@@ -1144,12 +1531,15 @@ async def expand_node(request: ExpandRequest):
         return await _expand_node_fallback(request)
     
     try:
-        # 步骤1: LLM生成相关概念（生成比需要更多的候选）
+        # 步骤1: LLM生成相关概念（生成比需要更多的候选），候选到达时即开始获取embedding
+        prefetch = embedding_prefetcher(request.node_label)
         candidates = await generate_related_concepts(
             parent_concept=request.node_label,
             existing_concepts=request.existing_nodes,
-            max_count=request.max_new_nodes * 2  # 生成2倍候选
+            max_count=request.max_new_nodes * 2,  # 生成2倍候选
+            on_candidate=lambda c: prefetch.add(c["name"])
         )
+        await prefetch.drain()
         
         if not candidates:
             print("[WARNING] LLM未生成任何概念，使用预定义")
@@ -1199,29 +1589,28 @@ async def expand_node(request: ExpandRequest):
         for c in top_candidates:
             print(f"   - {c['name']} (相似度: {c['similarity']:.3f})")
         
-        # 步骤4-6: 为每个概念获取定义并计算动态可信度
+        # 步骤4-6: 并发获取定义并计算动态可信度（基于来源和已计算的相似度）
         new_nodes = []
         new_edges = []
         
-        for i, candidate in enumerate(top_candidates):
+        selected = [
+            (f"{request.node_id}_expand_{i}", candidate)
+            for i, candidate in enumerate(top_candidates)
+            if f"{request.node_id}_expand_{i}" not in request.existing_nodes
+        ]
+        enrichments = await enrich_concepts(
+            get_enrichment_stage(),
+            [candidate["name"] for _, candidate in selected],
+            parent_concept=request.node_label,
+            similarities=[candidate["similarity"] for _, candidate in selected],
+            credibility_fn=compute_credibility
+        )
+        
+        for (node_id, candidate), enrichment in zip(selected, enrichments):
             term = candidate["name"]
-            node_id = f"{request.node_id}_expand_{i}"
-            
-            if node_id in request.existing_nodes:
-                continue
-            
-            # 获取Wikipedia定义
-            term_wiki = await get_wikipedia_definition(term, max_length=500)
-            
-            # 计算动态可信度（基于来源和相似度）
-            credibility = await compute_credibility(
-                concept=term,
-                parent_concept=request.node_label,
-                has_wikipedia=term_wiki["exists"]
-            )
-            
-            # 生成简介
-            brief_summary = await generate_brief_summary(term, term_wiki.get("definition", ""))
+            term_wiki = enrichment.wiki
+            credibility = enrichment.credibility
+            brief_summary = enrichment.brief_summary
             
             new_nodes.append({
                 "id": node_id,
@@ -1327,18 +1716,18 @@ async def ai_chat(request: dict):
     try:
         system_prompt = f"""你是专业学术助手，擅长解答关于"{concept}"的问题。回答要准确简洁（150字以内）。"""
         
-        response = await asyncio.wait_for(
-            client.chat.completions.create(
-                model=os.getenv("LLM_MODEL", "google/gemini-3-flash-preview"),
+        response = await get_model_router().run("chat", lambda route: route.call(
+            lambda: client.chat.completions.create(
+                model=route.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": question}
                 ],
                 temperature=0.5,
-                max_tokens=300
+                max_tokens=route.max_tokens
             ),
             timeout=20.0
-        )
+        ))
         
         if response and response.choices:
             answer = response.choices[0].message.content.strip()
@@ -1359,8 +1748,27 @@ async def clear_cache(pattern: str = "*"):
       - "discover:v2:*": 清除功能1缓存
       - "discover:disciplined:v2:*": 清除功能2缓存
       - "discover:bridge:v2:*": 清除功能3缓存
+      - "llm:*": 清除LLM响应缓存
+      - "arxiv:*": 清除Arxiv查询结果缓存
+      - "translation:*": 清除术语翻译缓存
+      - "embeddings:*": 清除Embedding缓存（Redis持久层）
+    
+    写后队列中尚未写入Redis的匹配结果一并丢弃，进程内缓存层随对应前缀清空。
     """
     try:
+        dropped = persistence_queue.discard_cache(pattern)
+        if dropped:
+            print(f"[INFO] 已丢弃写后队列中匹配 '{pattern}' 的未写入缓存 ({dropped}个key)")
+        if pattern == "*" or pattern.startswith("llm:"):
+            get_llm_cache().clear_memory()
+        if pattern == "*" or pattern.startswith("arxiv:"):
+            get_arxiv_cache().clear_memory()
+        if pattern == "*" or pattern.startswith("translation:"):
+            get_term_translator().clear_memory()
+        if pattern == "*" or pattern.startswith("embeddings:"):
+            from algorithms.embedding_store import get_embedding_store
+            get_embedding_store().clear_memory()
+        
         if redis_client.mock_mode:
             # Mock模式：清除内存缓存
             if pattern == "*":
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求合并（single-flight）- 相同缓存key的并发请求只计算一次
+
+进程内：同一个key的第一个请求启动计算任务，后续请求等待同一个任务的结果。
+计算任务独立于发起请求运行，某个请求断开不会取消其他等待者共享的计算。
+
+跨进程（可选）：提供Redis锁时，计算前先抢占 lock:<key>，
+抢不到锁说明其他worker正在计算，轮询缓存直到结果写入或锁释放。
+"""
+
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# 只有持有者才能释放锁（比较token后删除）
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    按key合并并发计算
+
+    用法：
+        flight = SingleFlight()
+        result = await flight.do(cache_key, lambda: compute(...), cache_lookup=read_cache)
+
+    cache_lookup只在启用Redis锁时使用：等待其他worker期间用它读取已写入的缓存，
+    返回None表示尚未写入。
+    """
+
+    def __init__(
+        self,
+        lock_client=None,
+        lock_ttl: float = 120.0,
+        wait_timeout: float = 90.0,
+        poll_interval: float = 0.25
+    ):
+        self.lock_client = lock_client
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {"leaders": 0, "shared": 0, "remote_waits": 0, "remote_hits": 0}
+
+    def attach_lock_client(self, client):
+        """挂载Redis客户端（redis.asyncio），启用跨worker合并"""
+        self.lock_client = client
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        cache_lookup: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> Any:
+        """执行或加入key对应的计算，返回共享结果（异常同样共享）"""
+        task = self._inflight.get(key)
+        if task is None:
+            self._stats["leaders"] += 1
+            task = asyncio.ensure_future(self._run(key, fn, cache_lookup))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self._stats["shared"] += 1
+            print(f"[INFO] 合并相同请求，等待进行中的计算: {key}")
+        return await asyncio.shield(task)
+
+    async def _run(self, key: str, fn, cache_lookup) -> Any:
+        if self.lock_client is None or cache_lookup is None:
+            return await fn()
+
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.lock_client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except Exception as e:
+            print(f"[WARNING] 获取Redis锁失败，直接计算: {e}")
+            return await fn()
+
+        if acquired:
+            try:
+                return await fn()
+            finally:
+                try:
+                    await self.lock_client.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+                except Exception as e:
+                    print(f"[WARNING] 释放Redis锁失败: {e}")
+
+        # 其他worker正在计算：轮询缓存，锁释放或超时后自行计算
+        self._stats["remote_waits"] += 1
+        print(f"[INFO] 其他worker正在计算，等待缓存写入: {key}")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_timeout
+        while loop.time() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            cached = await cache_lookup()
+            if cached is not None:
+                self._stats["remote_hits"] += 1
+                return cached
+            try:
+                if not await self.lock_client.exists(lock_key):
+                    break
+            except Exception:
+                break
+
+        cached = await cache_lookup()
+        if cached is not None:
+            self._stats["remote_hits"] += 1
+            return cached
+        return await fn()
+
+    def inflight_count(self) -> int:
+        return len(self._inflight)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self._stats, "inflight": len(self._inflight)}
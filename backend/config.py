@@ -47,6 +47,25 @@ class Settings:
     
     # Agent服务地址
     AGENT_API_URL: str = os.getenv("AGENT_API_URL", "http://localhost:5000")
+    
+    # 节点富化配置（Wikipedia定义 + 可信度 + 简介）
+    ENRICH_CONCURRENCY: int = int(os.getenv("ENRICH_CONCURRENCY", "8"))  # 单个请求的最大并发外部调用数
+    ENRICH_DEADLINE: float = float(os.getenv("ENRICH_DEADLINE", "20"))  # 富化阶段截止时间（秒）
+    BRIEF_SUMMARY_BATCH_SIZE: int = int(os.getenv("BRIEF_SUMMARY_BATCH_SIZE", "10"))  # 单次LLM调用最多生成的简介数
+    BRIEF_SUMMARY_BATCH_MAX_CHARS: int = int(os.getenv("BRIEF_SUMMARY_BATCH_MAX_CHARS", "4000"))  # 单批提示词中概念+定义的最大字符数
+    BRIDGE_REASONING_BATCH_SIZE: int = int(os.getenv("BRIDGE_REASONING_BATCH_SIZE", "15"))  # 单次LLM调用最多生成的桥接边reasoning数
+    
+    # 请求合并配置（相同缓存key的并发发现请求只计算一次）
+    SINGLE_FLIGHT_REDIS_LOCK: bool = os.getenv("SINGLE_FLIGHT_REDIS_LOCK", "false").lower() == "true"  # 多worker间通过Redis锁合并
+    SINGLE_FLIGHT_LOCK_TTL: float = float(os.getenv("SINGLE_FLIGHT_LOCK_TTL", "120"))  # 锁过期时间（秒），防止持有者崩溃后死锁
+    SINGLE_FLIGHT_WAIT_TIMEOUT: float = float(os.getenv("SINGLE_FLIGHT_WAIT_TIMEOUT", "90"))  # 等待其他worker结果的最长时间（秒）
+    
+    # 写后持久化队列配置（发现结果在后台批量写入Neo4j和Redis）
+    WRITE_BEHIND_ENABLED: bool = os.getenv("WRITE_BEHIND_ENABLED", "true").lower() == "true"  # false时在请求内同步写入
+    WRITE_BEHIND_MAX_PENDING: int = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "2000"))  # 积压上限（条），超过后提交方等待
+    WRITE_BEHIND_BATCH_SIZE: int = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "500"))  # 积压达到该条数立即刷新
+    WRITE_BEHIND_FLUSH_INTERVAL: float = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "0.5"))  # 刷新间隔（秒）
+    WRITE_BEHIND_MAX_RETRIES: int = int(os.getenv("WRITE_BEHIND_MAX_RETRIES", "3"))  # Neo4j写入失败重试次数
 
 
 settings = Settings()
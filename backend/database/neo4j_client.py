@@ -1,8 +1,54 @@
 """Neo4j图数据库客户端"""
 import os
+import time
 from typing import List, Dict, Any, Optional
 from loguru import logger
 
+# 批量写入：每行一个节点/边，通过UNWIND展开
+SAVE_NODES_CYPHER = """
+UNWIND $rows AS row
+MERGE (c:Concept {id: row.id})
+ON CREATE SET c.created_at = timestamp()
+SET c.label = row.label,
+    c.discipline = row.discipline,
+    c.definition = row.definition,
+    c.brief_summary = row.brief_summary,
+    c.credibility = row.credibility,
+    c.source = row.source,
+    c.wiki_url = row.wiki_url,
+    c.updated_at = timestamp()
+"""
+
+SAVE_EDGES_CYPHER = """
+UNWIND $rows AS row
+MATCH (s:Concept {id: row.source})
+MATCH (t:Concept {id: row.target})
+MERGE (s)-[r:RELATES]->(t)
+ON CREATE SET r.created_at = timestamp()
+SET r.relation = row.relation,
+    r.weight = row.weight,
+    r.reasoning = row.reasoning,
+    r.updated_at = timestamp()
+"""
+
+# Schema迁移：按版本号递增，只执行高于当前版本的步骤（语句本身均幂等）
+FULLTEXT_INDEX_NAME = "concept_fulltext"
+SCHEMA_MIGRATIONS = [
+    (1, [
+        "CREATE CONSTRAINT concept_id_unique IF NOT EXISTS FOR (c:Concept) REQUIRE c.id IS UNIQUE",
+        "CREATE INDEX concept_label_index IF NOT EXISTS FOR (c:Concept) ON (c.label)",
+        "CREATE INDEX concept_discipline_index IF NOT EXISTS FOR (c:Concept) ON (c.discipline)",
+        f"CREATE FULLTEXT INDEX {FULLTEXT_INDEX_NAME} IF NOT EXISTS FOR (c:Concept) ON EACH [c.label, c.definition]",
+    ]),
+]
+SCHEMA_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+
+def fulltext_phrase(keyword: str) -> str:
+    """关键词 -> Lucene短语查询（转义引号和反斜杠，短语匹配近似CONTAINS语义）"""
+    escaped = keyword.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
 
 class Neo4jClient:
     """Neo4j数据库客户端（支持Mock模式）"""
@@ -15,6 +61,10 @@ class Neo4jClient:
         self.driver = None
         self.mock_mode = os.getenv("MOCK_DB", "true").lower() == "true"
         self._connected = False  # 添加连接状态标记
+        self.write_batch_size = int(os.getenv("NEO4J_WRITE_BATCH_SIZE", "500"))  # 单次UNWIND的最大行数
+        self.last_save_stats: Optional[Dict[str, Any]] = None  # 最近一次批量写入的分批耗时
+        self.schema_version = 0  # 已应用的Schema迁移版本
+        self._fulltext_online = False  # 全文索引已确认ONLINE（填充完成）
         
     async def connect(self):
         """连接到Neo4j数据库"""
@@ -38,6 +88,7 @@ class Neo4jClient:
                 await session.run("RETURN 1")
             logger.info(f"已连接到Neo4j: {self.uri}")
             self._connected = True
+            await self.ensure_schema()
         except ImportError:
             logger.warning("neo4j包未安装，切换到Mock模式")
             self.mock_mode = True
@@ -47,6 +98,75 @@ class Neo4jClient:
             self.mock_mode = True
             self._connected = True
     
+    async def ensure_schema(self) -> int:
+        """
+        启动时执行Schema迁移（约束 + 索引），返回迁移后的版本号
+        
+        当前版本记录在(:SchemaVersion {id: "concept_graph"})节点上；
+        迁移失败只记录日志，不影响服务启动（查询退化为扫描）。
+        """
+        if self.mock_mode or not self.driver:
+            return SCHEMA_VERSION
+        
+        try:
+            async with self.driver.session(database=self.database) as session:
+                result = await session.run(
+                    "MATCH (v:SchemaVersion {id: 'concept_graph'}) RETURN v.version AS version"
+                )
+                record = await result.single()
+                current = record["version"] if record and record["version"] is not None else 0
+                
+                for version, statements in SCHEMA_MIGRATIONS:
+                    if version <= current:
+                        continue
+                    for statement in statements:
+                        result = await session.run(statement)
+                        await result.consume()
+                    result = await session.run(
+                        "MERGE (v:SchemaVersion {id: 'concept_graph'}) "
+                        "SET v.version = $version, v.updated_at = timestamp()",
+                        {"version": version}
+                    )
+                    await result.consume()
+                    current = version
+                    logger.info(f"Neo4j Schema已迁移到版本{version}")
+            
+            self.schema_version = current
+            return current
+        except Exception as e:
+            logger.error(f"Neo4j Schema迁移失败: {e}")
+            return self.schema_version
+    
+    async def get_schema_status(self) -> Dict[str, Any]:
+        """Schema版本与索引填充状态（用于/ready）"""
+        if self.mock_mode:
+            return {"mode": "mock", "version": SCHEMA_VERSION}
+        if not self.driver:
+            return {"mode": "disconnected"}
+        
+        try:
+            rows = await self.query(
+                "SHOW INDEXES YIELD name, type, state, populationPercent "
+                "WHERE name STARTS WITH 'concept_' "
+                "RETURN name, type, state, populationPercent"
+            )
+            indexes = {
+                row["name"]: {
+                    "type": row["type"],
+                    "state": row["state"],
+                    "population": row["populationPercent"]
+                }
+                for row in rows
+            }
+            return {
+                "version": self.schema_version,
+                "target_version": SCHEMA_VERSION,
+                "indexes": indexes,
+                "online": bool(indexes) and all(i["state"] == "ONLINE" for i in indexes.values())
+            }
+        except Exception as e:
+            return {"version": self.schema_version, "error": str(e)}
+    
     async def disconnect(self):
         """断开连接"""
         if self.driver:
@@ -223,6 +343,23 @@ class Neo4jClient:
                 }
             ]
         
+        # 优先使用全文索引（短语查询）；索引未ONLINE（如仍在填充）、查询失败或没有命中时
+        # 退回CONTAINS扫描（分词匹配不到的部分词语仍能按子串命中）
+        if await self._fulltext_ready():
+            try:
+                result = await self.query(
+                    """
+                    CALL db.index.fulltext.queryNodes($index, $query) YIELD node, score
+                    RETURN node AS c
+                    LIMIT $limit
+                    """,
+                    {"index": FULLTEXT_INDEX_NAME, "query": fulltext_phrase(keyword), "limit": limit}
+                )
+                if result:
+                    return [r["c"] for r in result]
+            except Exception as e:
+                logger.warning(f"全文索引查询失败，退回CONTAINS: {e}")
+        
         cypher = """
         MATCH (c:Concept)
         WHERE c.label CONTAINS $keyword OR c.definition CONTAINS $keyword
@@ -232,6 +369,14 @@ class Neo4jClient:
         result = await self.query(cypher, {"keyword": keyword, "limit": limit})
         return [r["c"] for r in result]
     
+    async def _fulltext_ready(self) -> bool:
+        """全文索引是否已ONLINE（确认后不再查询索引状态）"""
+        if not self._fulltext_online:
+            status = await self.get_schema_status()
+            index = status.get("indexes", {}).get(FULLTEXT_INDEX_NAME)
+            self._fulltext_online = bool(index) and index["state"] == "ONLINE"
+        return self._fulltext_online
+    
     async def get_all_disciplines(self) -> List[str]:
         """获取所有学科列表"""
         if self.mock_mode:
@@ -244,8 +389,18 @@ class Neo4jClient:
         result = await self.query(cypher)
         return [r["discipline"] for r in result if r.get("discipline")]
     
-    async def save_graph_data(self, nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]) -> bool:
-        """批量保存图数据（节点和边）"""
+    async def save_graph_data(
+        self,
+        nodes: List[Dict[str, Any]],
+        edges: List[Dict[str, Any]],
+        batch_size: Optional[int] = None
+    ) -> bool:
+        """
+        批量保存图数据（节点和边）
+        
+        节点和边分别作为参数列表通过UNWIND写入，超过batch_size时分批，
+        所有批次在同一个写事务中提交。每批耗时记录在last_save_stats中。
+        """
         if self.mock_mode:
             logger.debug(f"[MOCK] 保存图数据: {len(nodes)}个节点, {len(edges)}条边")
             return True
@@ -259,57 +414,77 @@ class Neo4jClient:
             logger.error("Neo4j未连接，无法保存数据")
             return False
         
+        node_rows = [self._node_row(node) for node in nodes]
+        edge_rows = [self._edge_row(edge) for edge in edges]
+        batch_size = batch_size or self.write_batch_size
+        
         try:
+            start = time.perf_counter()
             async with self.driver.session(database=self.database) as session:
-                # 批量创建节点
-                for node in nodes:
-                    await session.run("""
-                        MERGE (c:Concept {id: $id})
-                        SET c.label = $label,
-                            c.discipline = $discipline,
-                            c.definition = $definition,
-                            c.brief_summary = $brief_summary,
-                            c.credibility = $credibility,
-                            c.source = $source,
-                            c.wiki_url = $wiki_url,
-                            c.updated_at = timestamp()
-                        ON CREATE SET c.created_at = timestamp()
-                    """, {
-                        "id": node.get("id"),
-                        "label": node.get("label"),
-                        "discipline": node.get("discipline", "未分类"),
-                        "definition": node.get("definition", ""),
-                        "brief_summary": node.get("brief_summary", ""),
-                        "credibility": node.get("credibility", 0.5),
-                        "source": node.get("source", "LLM"),
-                        "wiki_url": node.get("wiki_url", "")
-                    })
-                
-                # 批量创建边
-                for edge in edges:
-                    await session.run("""
-                        MATCH (s:Concept {id: $source})
-                        MATCH (t:Concept {id: $target})
-                        MERGE (s)-[r:RELATES]->(t)
-                        SET r.relation = $relation,
-                            r.weight = $weight,
-                            r.reasoning = $reasoning,
-                            r.updated_at = timestamp()
-                        ON CREATE SET r.created_at = timestamp()
-                    """, {
-                        "source": edge.get("source"),
-                        "target": edge.get("target"),
-                        "relation": edge.get("relation", "related_to"),
-                        "weight": edge.get("weight", 0.5),
-                        "reasoning": edge.get("reasoning", "")
-                    })
-                
-                logger.info(f"成功保存到Neo4j: {len(nodes)}个节点, {len(edges)}条边")
-                return True
+                # 单个托管写事务：失败时整体回滚，瞬时错误由驱动自动重试
+                timings = await session.execute_write(
+                    self._write_graph_batches, node_rows, edge_rows, batch_size
+                )
+            total_ms = (time.perf_counter() - start) * 1000
+            self.last_save_stats = {
+                "nodes": len(node_rows),
+                "edges": len(edge_rows),
+                "batches": timings,
+                "total_ms": round(total_ms, 1)
+            }
+            batch_desc = ", ".join(f"{b['kind']}[{b['size']}]={b['ms']}ms" for b in timings)
+            logger.info(f"成功保存到Neo4j: {len(nodes)}个节点, {len(edges)}条边, 耗时{total_ms:.1f}ms ({batch_desc})")
+            return True
         except Exception as e:
             logger.error(f"保存到Neo4j失败: {e}")
             return False
     
+    @staticmethod
+    def _node_row(node: Dict[str, Any]) -> Dict[str, Any]:
+        """节点 -> UNWIND参数行"""
+        return {
+            "id": node.get("id"),
+            "label": node.get("label"),
+            "discipline": node.get("discipline", "未分类"),
+            "definition": node.get("definition", ""),
+            "brief_summary": node.get("brief_summary", ""),
+            "credibility": node.get("credibility", 0.5),
+            "source": node.get("source", "LLM"),
+            "wiki_url": node.get("wiki_url", "")
+        }
+    
+    @staticmethod
+    def _edge_row(edge: Dict[str, Any]) -> Dict[str, Any]:
+        """边 -> UNWIND参数行"""
+        return {
+            "source": edge.get("source"),
+            "target": edge.get("target"),
+            "relation": edge.get("relation", "related_to"),
+            "weight": edge.get("weight", 0.5),
+            "reasoning": edge.get("reasoning", "")
+        }
+    
+    @staticmethod
+    async def _write_graph_batches(tx, node_rows: List[Dict], edge_rows: List[Dict], batch_size: int) -> List[Dict[str, Any]]:
+        """
+        事务函数：节点先于边写入，每批一次UNWIND
+        
+        可能被驱动重试，因此耗时记录在函数内重新收集
+        """
+        timings = []
+        for kind, cypher, rows in (("nodes", SAVE_NODES_CYPHER, node_rows), ("edges", SAVE_EDGES_CYPHER, edge_rows)):
+            for offset in range(0, len(rows), batch_size):
+                chunk = rows[offset:offset + batch_size]
+                start = time.perf_counter()
+                result = await tx.run(cypher, rows=chunk)
+                await result.consume()
+                timings.append({
+                    "kind": kind,
+                    "size": len(chunk),
+                    "ms": round((time.perf_counter() - start) * 1000, 1)
+                })
+        return timings
+    
     async def get_graph_by_concept(self, concept: str, max_depth: int = 2) -> Optional[Dict[str, Any]]:
         """根据概念标签获取完整子图（包含节点和边）"""
         if self.mock_mode:
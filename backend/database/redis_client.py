@@ -1,7 +1,7 @@
 """Redis缓存客户端"""
 import os
 import json
-from typing import Optional, Any
+from typing import Optional, Any, Dict, Tuple
 from loguru import logger
 
 
@@ -131,6 +131,32 @@ class RedisClient:
             logger.error(f"[Redis] SET异常: {e}")
             return False
     
+    async def set_many(self, items: Dict[str, Tuple[Any, Optional[int]]]) -> bool:
+        """批量设置缓存值（key -> (值, 过期秒)），一次pipeline往返"""
+        if self.mock_mode:
+            for key, (value, ex) in items.items():
+                self._mock_cache[key] = value
+            logger.debug(f"[MOCK] SET {len(items)} keys (pipeline)")
+            return True
+        
+        if not self.client:
+            await self.connect()
+        if not self.client:
+            logger.warning(f"[Redis] 批量SET失败: client为空, {len(items)}个key")
+            return False
+        
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, (value, ex) in items.items():
+                serialized = json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+                pipe.set(key, serialized, ex=ex)
+            await pipe.execute()
+            logger.info(f"[Redis] 批量SET成功: {len(items)}个key")
+            return True
+        except Exception as e:
+            logger.error(f"[Redis] 批量SET异常: {e}")
+            return False
+    
     async def delete(self, key: str):
         """删除缓存"""
         if self.mock_mode:
@@ -0,0 +1,264 @@
+"""写后（write-behind）持久化队列 - 在后台批量写入Neo4j和Redis"""
+import asyncio
+import fnmatch
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+class WriteBehindQueue:
+    """
+    写后持久化队列
+
+    - 合并：同一节点ID / 同一条边 / 同一缓存key只保留最新的一份
+    - 批量：后台任务每隔flush_interval（或积压达到batch_size时）一次性写入
+    - 重试：Neo4j写入失败按指数退避重试max_retries次
+    - 背压：积压超过max_pending时，提交方等待直到刷新腾出空间
+    - 排空：stop()会把剩余数据全部写完再返回
+
+    - 写穿：cache_write_through=True时缓存同步写入Redis再返回（跨worker的请求合并依赖
+      计算结束时缓存已可见），只有图数据走写后队列
+
+    未启动（start()之前或已stop()）时，submit直接同步写入。
+    """
+
+    def __init__(
+        self,
+        neo4j_client,
+        redis_client,
+        max_pending: int = 2000,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5
+    ):
+        self.neo4j = neo4j_client
+        self.redis = redis_client
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self._nodes: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._edges: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._cache: "OrderedDict[str, Tuple[Any, Optional[int]]]" = OrderedDict()
+        self._writing_cache: Dict[str, Tuple[Any, Optional[int]]] = {}  # 正在写入Redis的缓存
+        self._oldest: Optional[float] = None  # 最早一条未写入数据的提交时间
+
+        self._wake = asyncio.Event()
+        self._space = asyncio.Condition()
+        self._worker: Optional[asyncio.Task] = None
+        self._running = False
+
+        self._stats = {
+            "submitted": 0,
+            "coalesced": 0,
+            "flushes": 0,
+            "retries": 0,
+            "failed_batches": 0,
+            "backpressure_waits": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def depth(self) -> int:
+        """当前积压条数（节点 + 边 + 缓存）"""
+        return len(self._nodes) + len(self._edges) + len(self._cache)
+
+    async def start(self):
+        """启动后台刷新任务（应用启动时调用）"""
+        if self._running:
+            return
+        self._running = True
+        self._worker = asyncio.create_task(self._run())
+        logger.info(f"写后持久化队列已启动 (batch_size={self.batch_size}, interval={self.flush_interval}s)")
+
+    async def stop(self, timeout: float = 30.0):
+        """停止并排空队列（应用关闭时调用）"""
+        if not self._running:
+            return
+        self._running = False
+        self._wake.set()
+        try:
+            await asyncio.wait_for(self._worker, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"写后队列排空超时，丢弃{self.depth()}条未写入数据")
+            self._worker.cancel()
+        self._worker = None
+        logger.info("写后持久化队列已停止")
+
+    def get_cached(self, key: str) -> Optional[Any]:
+        """读取尚未写入Redis的缓存值（保证写后读一致）"""
+        entry = self._cache.get(key) or self._writing_cache.get(key)
+        return entry[0] if entry else None
+
+    def discard_cache(self, pattern: str = "*") -> int:
+        """
+        丢弃匹配pattern（Redis glob语法）的未写入缓存，返回丢弃的key数
+
+        清除缓存（/cache/clear）时调用，避免积压的旧结果继续被get_cached读到；图数据不受影响。
+        """
+        dropped = 0
+        for entries in (self._cache, self._writing_cache):
+            for key in [k for k in entries if fnmatch.fnmatchcase(k, pattern)]:
+                del entries[key]
+                dropped += 1
+        return dropped
+
+    async def submit(
+        self,
+        cache_key: Optional[str] = None,
+        cache_value: Any = None,
+        nodes: Optional[List[Dict[str, Any]]] = None,
+        edges: Optional[List[Dict[str, Any]]] = None,
+        ex: Optional[int] = 3600,
+        cache_write_through: bool = False
+    ):
+        """
+        提交一个持久化任务（缓存结果 + 图数据）
+
+        Args:
+            cache_write_through: 缓存是否同步写入Redis（返回时其他worker即可读到）
+        """
+        nodes = nodes or []
+        edges = edges or []
+
+        if cache_write_through and cache_key is not None:
+            # 覆盖队列中可能尚未写入的旧值
+            self._cache.pop(cache_key, None)
+            await self._write_cache({cache_key: (cache_value, ex)})
+            cache_key = None
+
+        if not self._running:
+            if cache_key is not None:
+                await self._write_cache({cache_key: (cache_value, ex)})
+            if nodes or edges:
+                await self._write_graph(list(nodes), list(edges))
+            return
+
+        incoming = len(nodes) + len(edges) + (1 if cache_key is not None else 0)
+        await self._wait_for_space(incoming)
+
+        for node in nodes:
+            self._merge(self._nodes, node.get("id"), node)
+        for edge in edges:
+            self._merge(self._edges, (edge.get("source"), edge.get("target")), edge)
+        if cache_key is not None:
+            self._merge(self._cache, cache_key, (cache_value, ex))
+
+        self._stats["submitted"] += incoming
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        if self.depth() >= self.batch_size:
+            self._wake.set()
+
+    def _merge(self, pending: OrderedDict, key, value):
+        if key in pending:
+            self._stats["coalesced"] += 1
+            pending.move_to_end(key)
+        pending[key] = value
+
+    async def _wait_for_space(self, incoming: int):
+        """背压：积压超过上限时等待（单个超大任务在队列清空后放行）"""
+        async with self._space:
+            if self.depth() + incoming > self.max_pending and self.depth() > 0:
+                self._stats["backpressure_waits"] += 1
+                self._wake.set()
+                await self._space.wait_for(
+                    lambda: self.depth() + incoming <= self.max_pending or self.depth() == 0
+                )
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            if self.depth():
+                await self.flush()
+
+            if not self._running and not self.depth():
+                break
+
+    async def flush(self):
+        """写入当前全部积压数据"""
+        nodes = list(self._nodes.values())
+        edges = list(self._edges.values())
+        cache = dict(self._cache)
+        self._nodes.clear()
+        self._edges.clear()
+        self._cache.clear()
+        self._oldest = None
+
+        async with self._space:
+            self._space.notify_all()
+
+        start = time.perf_counter()
+        if cache:
+            self._writing_cache = cache
+            try:
+                await self._write_cache(cache)
+            finally:
+                self._writing_cache = {}
+        if nodes or edges:
+            await self._write_graph(nodes, edges)
+
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+        self._stats["flushes"] += 1
+        self._stats["last_flush_ms"] = elapsed_ms
+        self._stats["max_flush_ms"] = max(self._stats["max_flush_ms"], elapsed_ms)
+        logger.debug(f"写后队列刷新: {len(nodes)}个节点, {len(edges)}条边, {len(cache)}个缓存, 耗时{elapsed_ms}ms")
+
+    async def _write_cache(self, items: Dict[str, Tuple[Any, Optional[int]]]):
+        """写入缓存：支持set_many时一次pipeline往返写入全部key"""
+        set_many = getattr(self.redis, "set_many", None)
+        if set_many is not None:
+            try:
+                await set_many(items)
+            except Exception as e:
+                logger.warning(f"写后队列Redis批量写入失败: {len(items)}个key, {e}")
+            return
+        for key, (value, ex) in items.items():
+            try:
+                await self.redis.set(key, value, ex=ex)
+            except Exception as e:
+                logger.warning(f"写后队列Redis写入失败: {key}, {e}")
+
+    async def _write_graph(self, nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]):
+        save = getattr(self.neo4j, "save_graph_data", None)
+        if save is None:
+            return
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                if await save(nodes, edges, batch_size=self.batch_size):
+                    return
+            except Exception as e:
+                logger.warning(f"写后队列Neo4j写入异常: {e}")
+            if attempt < self.max_retries:
+                self._stats["retries"] += 1
+                await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+
+        self._stats["failed_batches"] += 1
+        logger.error(f"写后队列Neo4j写入失败（已重试{self.max_retries}次），丢弃{len(nodes)}个节点, {len(edges)}条边")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """队列深度、滞后时间与刷新耗时"""
+        return {
+            **self._stats,
+            "running": self._running,
+            "depth": self.depth(),
+            "pending_nodes": len(self._nodes),
+            "pending_edges": len(self._edges),
+            "pending_cache": len(self._cache),
+            "lag_seconds": round(time.monotonic() - self._oldest, 3) if self._oldest else 0.0
+        }
@@ -68,12 +68,95 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"[WARNING] Redis连接失败: {e}")
     
+    # Embedding存储持久层：Redis可用时使用Redis Hash（float32字节）
+    try:
+        from algorithms.embedding_store import get_embedding_store, RedisVectorTier
+        if not getattr(redis_client, "mock_mode", True):
+            get_embedding_store().attach_persistent(RedisVectorTier.from_url(
+                f"redis://{redis_client.host}:{redis_client.port}/{redis_client.db}",
+                password=redis_client.password
+            ))
+            print("[SUCCESS] Embedding存储已挂载Redis持久层")
+    except Exception as e:
+        print(f"[WARNING] Embedding存储持久层初始化失败: {e}")
+    
+    # 共享HTTP连接池：Arxiv / Wikipedia / Embedding请求复用keep-alive连接
+    try:
+        from shared.http_pool import get_http_pools
+        await get_http_pools().start()
+        print("[SUCCESS] HTTP连接池已创建")
+    except Exception as e:
+        print(f"[WARNING] HTTP连接池创建失败: {e}")
+    
+    # LLM响应缓存：Redis可用时作为共享层
+    try:
+        from shared.llm_cache import get_llm_cache
+        if not getattr(redis_client, "mock_mode", True):
+            get_llm_cache().attach_redis(redis_client.client)
+            print("[SUCCESS] LLM响应缓存已挂载Redis层")
+    except Exception as e:
+        print(f"[WARNING] LLM响应缓存Redis层初始化失败: {e}")
+    
+    # Arxiv查询结果缓存：Redis可用时作为共享层
+    try:
+        from shared.arxiv_cache import get_arxiv_cache
+        if not getattr(redis_client, "mock_mode", True):
+            get_arxiv_cache().attach_redis(redis_client.client)
+            print("[SUCCESS] Arxiv查询缓存已挂载Redis层")
+    except Exception as e:
+        print(f"[WARNING] Arxiv查询缓存Redis层初始化失败: {e}")
+    
+    # 术语翻译缓存：Redis可用时持久保存LLM译文
+    try:
+        from shared.term_translator import get_term_translator
+        if not getattr(redis_client, "mock_mode", True):
+            get_term_translator().attach_redis(redis_client.client)
+            print("[SUCCESS] 术语翻译缓存已挂载Redis层")
+    except Exception as e:
+        print(f"[WARNING] 术语翻译缓存Redis层初始化失败: {e}")
+    
+    # 请求合并：多worker部署时通过Redis锁合并相同的发现请求
+    try:
+        if getattr(settings, "SINGLE_FLIGHT_REDIS_LOCK", False) and routes_router and not getattr(redis_client, "mock_mode", True):
+            backend_routes_module.discovery_flight.attach_lock_client(redis_client.client)
+            print("[SUCCESS] 请求合并已启用Redis锁")
+    except Exception as e:
+        print(f"[WARNING] 请求合并Redis锁初始化失败: {e}")
+    
+    # 写后持久化队列：发现结果在后台批量写入Neo4j和Redis
+    try:
+        if getattr(settings, "WRITE_BEHIND_ENABLED", True) and routes_router:
+            await backend_routes_module.persistence_queue.start()
+            print("[SUCCESS] 写后持久化队列已启动")
+    except Exception as e:
+        print(f"[WARNING] 写后持久化队列启动失败: {e}")
+    
     yield
     
     # 关闭时清理资源
     print("[INFO] 关闭应用，清理资源...")
+    if routes_router:
+        # 先排空写后队列，再断开数据库连接
+        await backend_routes_module.persistence_queue.stop()
     await neo4j_client.disconnect()
     await redis_client.disconnect()
+    try:
+        from shared.http_pool import get_http_pools
+        await get_http_pools().close()
+    except Exception:
+        pass
+    try:
+        from shared.openai_clients import get_client_factory
+        await get_client_factory().close()
+    except Exception:
+        pass
+    try:
+        from algorithms.embedding_store import get_embedding_store
+        store = get_embedding_store()
+        if store.persistent is not None:
+            await store.persistent.close()
+    except Exception:
+        pass
     print("[SUCCESS] 资源清理完成")
 
 
@@ -122,13 +205,88 @@ async def health_check():
     """健康检查 - 用于Docker/K8S健康探针"""
     return {"status": "healthy"}
 
+# 运行指标接口
+@app.get("/metrics")
+async def metrics():
+    """运行指标 - 写后队列深度/刷新耗时、请求合并、HTTP连接池、Embedding缓存命中、LLM缓存命中"""
+    data = {}
+    if routes_router:
+        data["write_behind"] = backend_routes_module.persistence_queue.get_stats()
+        data["single_flight"] = backend_routes_module.discovery_flight.get_stats()
+    try:
+        from shared.http_pool import get_http_pools
+        data["http_pools"] = get_http_pools().get_stats()
+    except Exception:
+        pass
+    try:
+        from shared.openai_clients import get_client_factory
+        data["openai_pools"] = get_client_factory().get_stats()
+    except Exception:
+        pass
+    try:
+        from algorithms.embedding_store import get_embedding_store
+        data["embedding_store"] = get_embedding_store().get_stats()
+    except Exception:
+        pass
+    try:
+        from shared.llm_cache import get_llm_cache
+        data["llm_cache"] = get_llm_cache().get_stats()
+    except Exception:
+        pass
+    try:
+        from shared.arxiv_cache import get_arxiv_cache
+        data["arxiv_cache"] = get_arxiv_cache().get_stats()
+    except Exception:
+        pass
+    try:
+        from shared.arxiv_scheduler import get_arxiv_scheduler
+        data["arxiv_scheduler"] = get_arxiv_scheduler().get_stats()
+    except Exception:
+        pass
+    try:
+        from shared.term_translator import get_term_translator
+        data["translation"] = get_term_translator().get_stats()
+    except Exception:
+        pass
+    try:
+        from shared.rate_limiter import get_rate_limit_stats
+        data["rate_limits"] = get_rate_limit_stats()
+    except Exception:
+        pass
+    try:
+        from shared.circuit_breaker import get_circuit_breaker_stats
+        data["circuit_breakers"] = get_circuit_breaker_stats()
+    except Exception:
+        pass
+    try:
+        from agents.llm_client import get_json_path_stats
+        data["llm_json"] = get_json_path_stats()
+    except Exception:
+        pass
+    try:
+        from shared.llm_hedge import get_hedge_stats
+        data["llm_hedging"] = get_hedge_stats()
+    except Exception:
+        pass
+    try:
+        from shared.model_router import get_model_router
+        data["model_routing"] = get_model_router().get_stats()
+    except Exception:
+        pass
+    return data
+
 # 就绪检查接口
 @app.get("/ready")
 async def readiness_check():
     """就绪检查 - 检查依赖服务是否可用"""
+    # 外部依赖（LLM/Embedding/Wikipedia/Arxiv）熔断状态：熔断时走回退逻辑，不影响就绪
+    from shared.circuit_breaker import get_circuit_breaker
+    circuits = {name: get_circuit_breaker(name).state for name in ("llm", "embedding", "wikipedia", "arxiv")}
     try:
         neo4j_ok = await neo4j_client.is_connected()
         redis_ok = await redis_client.is_connected()
+        # Schema版本与索引填充状态（索引未ONLINE时查询仍可用，但会退化为扫描）
+        schema = await neo4j_client.get_schema_status() if neo4j_ok else None
         
         if neo4j_ok and redis_ok:
             return {
@@ -136,7 +294,9 @@ async def readiness_check():
                 "services": {
                     "neo4j": "connected",
                     "redis": "connected"
-                }
+                },
+                "schema": schema,
+                "circuits": circuits
             }
         
         return {
@@ -144,10 +304,12 @@ async def readiness_check():
             "services": {
                 "neo4j": "connected" if neo4j_ok else "disconnected",
                 "redis": "connected" if redis_ok else "disconnected"
-            }
+            },
+            "schema": schema,
+            "circuits": circuits
         }, 503
     except:
-        return {"status": "ready", "services": {"neo4j": "mock", "redis": "mock"}}
+        return {"status": "ready", "services": {"neo4j": "mock", "redis": "mock"}, "circuits": circuits}
 
 
 if __name__ == "__main__":
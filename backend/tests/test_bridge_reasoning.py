@@ -0,0 +1,106 @@
+"""
+测试模块 - 功能3批量边reasoning
+"""
+import json
+import re
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.api import routes, multi_function_generator
+from shared.llm_cache import LLMResponseCache
+
+BRIDGE_LINES = "\n".join([
+    "信息论|直接桥梁|熵,最小二乘法|信息损失最小化",
+    "优化理论|原理性桥梁|熵,最小二乘法|都是优化问题",
+    "概率分布|间接桥梁|熵|熵描述分布不确定性",
+])
+
+
+def reply(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+class BridgeLLM:
+    """按提示词类型返回：桥梁概念列表 / 批量简介 / 批量边reasoning"""
+
+    def __init__(self, broken_pairs=()):
+        self.broken_pairs = set(broken_pairs)
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, messages, stream=False, **params):
+        prompt = messages[-1]["content"]
+        if "概念对列表" in prompt:
+            self.calls.append("reasoning")
+            listing = prompt.split("概念对列表：")[1].split("只输出JSON")[0]
+            pairs = re.findall(r'^(\d+)\. "(.+?)" → "(.+?)"', listing, flags=re.M)
+            return reply(json.dumps([
+                {"id": int(i), "reasoning": "短" if (a, b) in self.broken_pairs else f"{a}在{b}中扮演具体而独特的角色。"}
+                for i, a, b in pairs
+            ], ensure_ascii=False))
+        if "概念列表" in prompt:
+            self.calls.append("summary")
+            listing = prompt.split("概念列表：")[1].split("只输出JSON")[0]
+            names = re.findall(r"^(\d+)\. ([^（\n]+)", listing, flags=re.M)
+            return reply(json.dumps([
+                {"id": int(i), "summary": f"{n}是批量生成的一句完整的概念简介说明。"} for i, n in names
+            ], ensure_ascii=False))
+        self.calls.append("bridges")
+        return reply(BRIDGE_LINES)
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    client = BridgeLLM(broken_pairs={("熵", "优化理论")})
+    cache = LLMResponseCache()
+    monkeypatch.setenv("LLM_STREAMING", "false")
+    monkeypatch.setattr(routes, "get_llm_client", lambda: client)
+    monkeypatch.setattr(multi_function_generator, "get_llm_client", lambda: client)
+    monkeypatch.setattr(routes, "get_llm_cache", lambda: cache)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_batched_reasonings_with_per_edge_fallback(llm):
+    pairs = [("熵", "信息论", "信息损失最小化"), ("熵", "优化理论", "都是优化问题"), ("最小二乘法", "信息论", "")]
+
+    reasonings = await routes.generate_bridge_edge_reasonings(pairs)
+
+    assert llm.calls == ["reasoning"]
+    assert reasonings[0] == "熵在信息论中扮演具体而独特的角色。"
+    assert reasonings[1] == "都是优化问题"  # 校验失败：回退到connection_principle
+    assert reasonings[2].startswith("最小二乘法在信息论中")
+
+    # 已缓存的边不再请求；单条接口与批量共用缓存
+    assert await routes.generate_bridge_edge_reasonings(pairs[:1]) == reasonings[:1]
+    assert await routes.generate_bridge_edge_reasoning(*pairs[2]) == reasonings[2]
+    assert llm.calls == ["reasoning"]
+
+
+@pytest.mark.asyncio
+async def test_bridge_discovery_uses_constant_llm_round_trips(llm, monkeypatch):
+    async def fake_wiki(concept, max_length=500):
+        return {"definition": "", "exists": False, "url": "", "source": "LLM"}
+
+    async def fake_submit(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(routes, "get_wikipedia_definition", fake_wiki)
+    monkeypatch.setattr(routes.persistence_queue, "submit", fake_submit)
+
+    result = await routes._generate_bridge_discovery(
+        routes.BridgeRequest(concepts=["熵", "最小二乘法"], max_bridges=10), "test:bridge"
+    )
+
+    assert result["status"] == "success"
+    edges = result["data"]["edges"]
+    assert len(edges) == 5
+    assert sorted(llm.calls) == ["bridges", "reasoning", "summary", "summary"]  # 输入节点简介 + 桥梁简介
+    assert {e["reasoning"] for e in edges if e["target"].startswith("优化理论")} == {
+        "都是优化问题", "最小二乘法在优化理论中扮演具体而独特的角色。"
+    }
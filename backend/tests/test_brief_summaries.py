@@ -0,0 +1,95 @@
+"""
+测试模块 - 批量简介生成
+"""
+import json
+import re
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.api import routes
+from shared.llm_cache import LLMResponseCache
+
+
+def reply(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+class SummaryLLM:
+    """批量请求返回JSON数组（可指定需要返回无效结果的概念），单个请求返回纯文本"""
+
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+        self.batches = []
+        self.singles = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, messages, **params):
+        prompt = messages[-1]["content"]
+        if "概念列表" not in prompt:
+            concept = re.search(r'学术概念"(.+?)"', prompt).group(1)
+            self.singles.append(concept)
+            return reply(f"{concept}是单独生成的一句完整的概念简介说明。")
+        listing = prompt.split("概念列表：")[1].split("只输出JSON")[0]
+        entries = re.findall(r"^(\d+)\. ([^（\n]+)", listing, flags=re.M)
+        self.batches.append([name for _, name in entries])
+        return reply("```json\n" + json.dumps([
+            {"id": int(idx), "summary": "太短" if name in self.broken else f"{name}是批量生成的一句完整的概念简介说明。"}
+            for idx, name in entries
+        ], ensure_ascii=False) + "\n```")
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    client = SummaryLLM(broken={"坏概念"})
+    cache = LLMResponseCache()
+    monkeypatch.setattr(routes, "get_llm_client", lambda: client)
+    monkeypatch.setattr(routes, "get_llm_cache", lambda: cache)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_single_call_for_all_items_with_per_item_fallback(llm):
+    items = [("熵", "熵是……"), ("信息论", ""), ("坏概念", ""), ("熵", "熵是……")]
+
+    summaries = await routes.generate_brief_summaries(items)
+
+    assert llm.batches == [["熵", "信息论", "坏概念"]]
+    assert llm.singles == ["坏概念"]
+    assert summaries[0] == summaries[3] == "熵是批量生成的一句完整的概念简介说明。"
+    assert summaries[2].startswith("坏概念是单独生成")
+
+
+@pytest.mark.asyncio
+async def test_cached_items_are_not_requested_again(llm):
+    await routes.generate_brief_summaries([("熵", ""), ("信息论", "")])
+    await routes.generate_brief_summaries([("熵", ""), ("信息论", ""), ("热力学", ""), ("统计力学", "")])
+
+    assert llm.batches == [["熵", "信息论"], ["热力学", "统计力学"]]
+    # 单个生成与批量生成共用缓存
+    assert await routes.generate_brief_summary("熵") == "熵是批量生成的一句完整的概念简介说明。"
+    assert llm.singles == []
+
+
+@pytest.mark.asyncio
+async def test_long_prompts_are_chunked(llm, monkeypatch):
+    monkeypatch.setattr(routes.settings, "BRIEF_SUMMARY_BATCH_SIZE", 3, raising=False)
+    items = [(f"概念{i}", "定义" * 150) for i in range(7)]
+
+    summaries = await routes.generate_brief_summaries(items)
+
+    assert [len(batch) for batch in llm.batches] == [3, 3, 1]
+    assert all("批量生成" in s for s in summaries)
+
+    chunks = routes.chunk_summary_items([(i, "x", "y" * 500) for i in range(5)], max_items=10, max_chars=500)
+    assert [len(c) for c in chunks] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_without_client_uses_fallback(monkeypatch):
+    monkeypatch.setattr(routes, "get_llm_client", lambda: None)
+    assert await routes.generate_brief_summaries([("熵", "")]) == ["熵是一个重要的跨学科概念。"]
@@ -0,0 +1,63 @@
+"""
+测试模块 - /cache/clear 清除所有缓存层（含写后队列中未写入的结果）
+"""
+import sys
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.api import routes
+from backend.database.write_behind import WriteBehindQueue
+from algorithms.embedding_store import EmbeddingStore
+from shared.term_translator import TermTranslator
+
+
+class FakeRedis:
+    async def set(self, key, value, ex=None):
+        return True
+
+
+@pytest_asyncio.fixture
+async def layers(monkeypatch):
+    queue = WriteBehindQueue(None, FakeRedis(), flush_interval=10)
+    await queue.start()  # 刷新间隔很长，提交的结果留在积压中
+    store = EmbeddingStore()
+    translator = TermTranslator()
+    monkeypatch.setattr(routes, "persistence_queue", queue)
+    monkeypatch.setattr(routes, "get_term_translator", lambda: translator)
+    monkeypatch.setattr("algorithms.embedding_store._embedding_store", store)
+    monkeypatch.setattr(routes.redis_client, "_mock_cache", {}, raising=False)
+    yield queue, store, translator
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_clear_drops_pending_results_for_pattern(layers):
+    queue, store, translator = layers
+    await queue.submit("discover:v2:熵:30", {"v": 1})
+    await queue.submit("discover:bridge:v2:熵_信息:10", {"v": 2})
+    translator._remember("熵", "entropy")
+
+    await routes.clear_cache("discover:v2:*")
+
+    assert await routes.get_cached_result("discover:v2:熵:30") is None
+    assert await routes.get_cached_result("discover:bridge:v2:熵_信息:10") == {"v": 2}
+    assert translator._memory  # 其他前缀的缓存不受影响
+
+
+@pytest.mark.asyncio
+async def test_clear_all_empties_memory_tiers(layers):
+    queue, store, translator = layers
+    await queue.submit("discover:v2:熵:30", {"v": 1})
+    translator._remember("熵", "entropy")
+    await store.put_many("model", {"熵": [0.1, 0.2]})
+
+    result = await routes.clear_cache("*")
+
+    assert result["status"] == "success"
+    assert queue.get_cached("discover:v2:熵:30") is None
+    assert store.memory_size() == 0
+    assert translator.get_stats()["memory_entries"] == 0
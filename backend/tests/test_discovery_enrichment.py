@@ -0,0 +1,93 @@
+"""
+测试模块 - 概念发现路由的富化截止时间（LLM生成耗时不占用候选概念的富化时间）
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.api import routes, real_node_generator, multi_function_generator
+
+CANDIDATES = [
+    {"name": "信息论", "discipline": "数学", "cross_principle": "熵度量信息量"},
+    {"name": "热力学", "discipline": "物理学", "cross_principle": "熵描述无序度"},
+    {"name": "统计力学", "discipline": "物理学", "cross_principle": "熵的微观解释"},
+]
+
+
+class NoPrefetch:
+    def add(self, name):
+        pass
+
+    async def drain(self):
+        pass
+
+
+class FakeQueue:
+    def __init__(self):
+        self.submitted = []
+
+    async def submit(self, cache_key, result, **kwargs):
+        self.submitted.append(cache_key)
+
+
+@pytest.fixture
+def slow_generation(monkeypatch):
+    """LLM生成耗时超过富化截止时间，其余外部调用立即返回"""
+    monkeypatch.setattr(routes.settings, "ENRICH_DEADLINE", 0.2)
+
+    async def generate(*args, **kwargs):
+        await asyncio.sleep(0.4)
+        return [dict(c) for c in CANDIDATES]
+
+    async def similarities(names, reference):
+        return [0.9 - 0.05 * i for i in range(len(names))]
+
+    async def credibility(concept, parent_concept, has_wikipedia=False, similarity=None):
+        return 0.77
+
+    async def wikipedia(concept, max_length=500):
+        return {"definition": f"{concept}的百科定义", "exists": True, "url": f"https://zh.wikipedia.org/wiki/{concept}", "source": "Wikipedia"}
+
+    async def summaries(items):
+        return [f"{name}的批量简介" for name, _ in items]
+
+    monkeypatch.setattr(real_node_generator, "generate_related_concepts", generate)
+    monkeypatch.setattr(multi_function_generator, "generate_concepts_with_disciplines", generate)
+    monkeypatch.setattr(real_node_generator, "compute_similarities_batch", similarities)
+    monkeypatch.setattr(real_node_generator, "compute_credibility", credibility)
+    monkeypatch.setattr(routes, "get_wikipedia_definition", wikipedia)
+    monkeypatch.setattr(routes, "generate_brief_summaries", summaries)
+    monkeypatch.setattr(routes, "embedding_prefetcher", lambda concept: NoPrefetch())
+    monkeypatch.setattr(routes, "persistence_queue", FakeQueue())
+
+
+def assert_enriched(candidate_nodes):
+    assert [n["label"] for n in candidate_nodes] == [c["name"] for c in CANDIDATES]
+    for node in candidate_nodes:
+        assert node["definition"] == f"{node['label']}的百科定义"
+        assert node["source"] == "Wikipedia"
+        assert node["credibility"] == 0.77
+        assert node["brief_summary"] == f"{node['label']}的批量简介"
+
+
+@pytest.mark.asyncio
+async def test_discovery_candidates_enriched_after_slow_generation(slow_generation):
+    result = await routes.get_real_discovery_result("熵", max_concepts=5)
+
+    nodes = result["data"]["nodes"]
+    assert nodes[0]["label"] == "熵" and nodes[0]["brief_summary"] == "熵的批量简介"
+    assert_enriched(nodes[1:])
+
+
+@pytest.mark.asyncio
+async def test_disciplined_candidates_enriched_after_slow_generation(slow_generation):
+    request = routes.DiscoverDisciplinedRequest(concept="熵", disciplines=["数学", "物理学"], max_concepts=5)
+
+    result = await routes._generate_disciplined_discovery(request, "discover:disciplined:v2:test")
+
+    assert result["status"] == "success"
+    assert_enriched(result["data"]["nodes"][1:])
@@ -0,0 +1,164 @@
+"""
+测试模块 - LLM流式输出逐行解析
+"""
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.api import real_node_generator, multi_function_generator
+from backend.api.llm_stream import CandidateBatcher, iter_completion_lines
+from shared import circuit_breaker
+
+LINES = [
+    "信息熵|信息论|mathematical_identity|H=-Σp·log(p)",
+    "2. 吉布斯分布|统计物理|energy_based_model|玻尔兹曼因子",
+    "说明文字",
+    "交叉熵损失|机器学习|direct_application|分类损失",
+]
+
+
+class FakeStream:
+    """模拟openai.AsyncStream：按小片段逐个返回，记录是否被关闭"""
+
+    def __init__(self, text, delay=0.0, piece=7):
+        self.pieces = [text[i:i + piece] for i in range(0, len(text), piece)]
+        self.delay = delay
+        self.sent = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        for piece in self.pieces:
+            await asyncio.sleep(self.delay)
+            self.sent += 1
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    def __init__(self, text, delay=0.0):
+        self.text = text
+        self.delay = delay
+        self.streams = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, stream=False, **params):
+        if not stream:
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.text))])
+        self.streams.append(FakeStream(self.text, self.delay))
+        return self.streams[-1]
+
+
+@pytest.mark.asyncio
+async def test_stream_and_blocking_modes_yield_same_lines():
+    client = FakeClient("\n".join(LINES) + "\n\n")
+
+    streamed = [line async for line in iter_completion_lines(client, {}, timeout=5, stream=True)]
+    blocking = [line async for line in iter_completion_lines(client, {}, timeout=5, stream=False)]
+
+    assert streamed == blocking == LINES
+    assert client.streams[0].closed
+
+
+@pytest.mark.asyncio
+async def test_first_candidate_arrives_before_stream_ends(monkeypatch):
+    """第一个候选在模型输出完之前就交给下游"""
+    client = FakeClient("\n".join(LINES), delay=0.01)
+    monkeypatch.setattr(real_node_generator, "get_llm_client", lambda: client)
+    progress = []
+
+    concepts = await real_node_generator.generate_related_concepts(
+        "熵", [], max_count=10,
+        on_candidate=lambda c: progress.append((c["name"], client.streams[0].sent))
+    )
+
+    assert [c["name"] for c in concepts] == ["信息熵", "吉布斯分布", "交叉熵损失"]
+    assert progress[0][1] < len(client.streams[0].pieces)
+
+
+@pytest.mark.asyncio
+async def test_stops_reading_after_max_count(monkeypatch):
+    client = FakeClient("\n".join(LINES * 5))
+    monkeypatch.setattr(real_node_generator, "get_llm_client", lambda: client)
+
+    concepts = await real_node_generator.generate_related_concepts("熵", [], max_count=2)
+
+    assert len(concepts) == 2
+    assert client.streams[0].closed
+    assert client.streams[0].sent < len(client.streams[0].pieces)
+
+
+@pytest.mark.asyncio
+async def test_timeout_keeps_parsed_candidates(monkeypatch):
+    """超时前已解析的候选保留，不再整体回退到预定义概念"""
+    client = FakeClient("\n".join(LINES), delay=0.05)
+    monkeypatch.setattr(multi_function_generator, "get_llm_client", lambda: client)
+
+    async def collect():
+        found = []
+        async for bridge in multi_function_generator.stream_bridge_concepts(["熵"], timeout=0.6):
+            found.append(bridge["name"])
+        return found
+
+    with pytest.raises(asyncio.TimeoutError):
+        await collect()
+
+    bridges = []
+    original = multi_function_generator.stream_bridge_concepts
+    monkeypatch.setattr(
+        multi_function_generator, "stream_bridge_concepts",
+        lambda concepts, max_bridges: original(concepts, max_bridges, timeout=0.6)
+    )
+    result = await multi_function_generator.find_bridge_concepts(["熵"], on_candidate=bridges.append)
+
+    assert 0 < len(result) < 3
+    assert result == bridges
+
+
+@pytest.mark.asyncio
+async def test_batcher_coalesces_while_fetch_in_flight():
+    batches = []
+
+    async def fetch(names):
+        batches.append(list(names))
+        await asyncio.sleep(0.02)
+
+    batcher = CandidateBatcher(fetch)
+    batcher.add("a")
+    await asyncio.sleep(0)
+    for name in "bcd":
+        batcher.add(name)
+    await batcher.drain()
+
+    assert batches == [["a"], ["b", "c", "d"]]
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_skips_llm_and_uses_fallback(monkeypatch):
+    """LLM熔断后不再等待超时，直接使用预定义概念"""
+    breaker = circuit_breaker.CircuitBreaker("llm", min_calls=1, open_seconds=30)
+    monkeypatch.setitem(circuit_breaker._breakers, "llm", breaker)
+    client = FakeClient("\n".join(LINES))
+    monkeypatch.setattr(real_node_generator, "get_llm_client", lambda: client)
+
+    async def failing_create(stream=False, **params):
+        raise ConnectionError("provider down")
+
+    client.chat.completions.create = failing_create
+    first = await real_node_generator.generate_related_concepts("熵", [], max_count=3)
+    assert breaker.state == "open"
+
+    client.chat.completions.create = FakeClient.create.__get__(client)
+    second = await real_node_generator.generate_related_concepts("熵", [], max_count=3)
+
+    assert first == second == real_node_generator._get_fallback_concepts("熵")
+    assert breaker.stats["rejected"] == 1
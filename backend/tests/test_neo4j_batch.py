@@ -0,0 +1,106 @@
+"""
+测试模块 - Neo4j批量写入（UNWIND + 单个写事务）
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.database.neo4j_client import Neo4jClient, SAVE_NODES_CYPHER, SAVE_EDGES_CYPHER
+
+
+class FakeResult:
+    async def consume(self):
+        return None
+
+
+class FakeTx:
+    def __init__(self, runs):
+        self.runs = runs
+
+    async def run(self, cypher, **params):
+        self.runs.append((cypher, params))
+        return FakeResult()
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute_write(self, fn, *args):
+        self.driver.transactions += 1
+        return await fn(FakeTx(self.driver.runs), *args)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.runs = []
+        self.transactions = 0
+
+    def session(self, database=None):
+        return FakeSession(self)
+
+
+def make_client(batch_size=500):
+    client = Neo4jClient()
+    client.mock_mode = False
+    client.driver = FakeDriver()
+    client.write_batch_size = batch_size
+    return client
+
+
+def make_graph(n_nodes, n_edges):
+    nodes = [{"id": f"n{i}", "label": f"概念{i}"} for i in range(n_nodes)]
+    edges = [{"source": "n0", "target": f"n{i % n_nodes}", "weight": 0.8} for i in range(n_edges)]
+    return nodes, edges
+
+
+@pytest.mark.asyncio
+async def test_small_graph_is_two_round_trips():
+    """20个节点 + 30条边：一个事务，两次UNWIND"""
+    client = make_client()
+    nodes, edges = make_graph(20, 30)
+
+    assert await client.save_graph_data(nodes, edges) is True
+
+    runs = client.driver.runs
+    assert client.driver.transactions == 1
+    assert [cypher for cypher, _ in runs] == [SAVE_NODES_CYPHER, SAVE_EDGES_CYPHER]
+    assert len(runs[0][1]["rows"]) == 20
+    assert runs[0][1]["rows"][0]["discipline"] == "未分类"  # 缺省字段填充
+    assert runs[1][1]["rows"][0]["relation"] == "related_to"
+
+
+@pytest.mark.asyncio
+async def test_large_graph_is_chunked_with_timings():
+    client = make_client(batch_size=8)
+    nodes, edges = make_graph(20, 10)
+
+    await client.save_graph_data(nodes, edges)
+
+    sizes = [(b["kind"], b["size"]) for b in client.last_save_stats["batches"]]
+    assert sizes == [("nodes", 8), ("nodes", 8), ("nodes", 4), ("edges", 8), ("edges", 2)]
+    assert client.driver.transactions == 1
+    assert all(b["ms"] >= 0 for b in client.last_save_stats["batches"])
+
+
+@pytest.mark.asyncio
+async def test_write_failure_returns_false():
+    client = make_client()
+
+    async def failing_write(fn, *args):
+        raise RuntimeError("连接中断")
+
+    session = FakeSession(client.driver)
+    session.execute_write = failing_write
+    client.driver.session = lambda database=None: session
+
+    assert await client.save_graph_data(*make_graph(2, 1)) is False
@@ -0,0 +1,141 @@
+"""
+测试模块 - Neo4j Schema迁移与全文检索
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.database.neo4j_client import Neo4jClient, SCHEMA_VERSION, FULLTEXT_INDEX_NAME
+
+
+class FakeResult:
+    def __init__(self, records=None):
+        self.records = records or []
+
+    async def single(self):
+        return self.records[0] if self.records else None
+
+    async def consume(self):
+        return None
+
+    def __aiter__(self):
+        async def gen():
+            for r in self.records:
+                yield r
+        return gen()
+
+
+class FakeRecord(dict):
+    def data(self):
+        return dict(self)
+
+
+class FakeDatabase:
+    """记录执行过的语句，模拟SchemaVersion节点"""
+
+    def __init__(self, version=None):
+        self.version = version
+        self.statements = []
+        self.fail_fulltext = False
+        self.fulltext_hits = True
+        self.index_state = "ONLINE"
+
+    def session(self, database=None):
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, db):
+        self.db = db
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, cypher, parameters=None):
+        self.db.statements.append(cypher)
+        if "RETURN v.version" in cypher:
+            return FakeResult([FakeRecord(version=self.db.version)] if self.db.version else [])
+        if "SET v.version" in cypher:
+            self.db.version = parameters["version"]
+        if "SHOW INDEXES" in cypher:
+            return FakeResult([FakeRecord(name=FULLTEXT_INDEX_NAME, type="FULLTEXT", state=self.db.index_state, populationPercent=100.0)])
+        if "fulltext.queryNodes" in cypher:
+            if self.db.fail_fulltext:
+                raise RuntimeError("index not online")
+            if not self.db.fulltext_hits:
+                return FakeResult()
+            return FakeResult([FakeRecord(c={"id": "熵", "label": "熵", "q": parameters["query"]})])
+        if "CONTAINS" in cypher:
+            return FakeResult([FakeRecord(c={"id": "fallback"})])
+        return FakeResult()
+
+
+def make_client(db):
+    client = Neo4jClient()
+    client.mock_mode = False
+    client.driver = db
+    return client
+
+
+@pytest.mark.asyncio
+async def test_migration_runs_once_and_records_version():
+    db = FakeDatabase()
+    client = make_client(db)
+
+    assert await client.ensure_schema() == SCHEMA_VERSION
+    created = [s for s in db.statements if s.startswith("CREATE")]
+    assert len(created) == 4
+    assert all("IF NOT EXISTS" in s for s in created)
+    assert db.version == SCHEMA_VERSION
+
+    db.statements.clear()
+    await make_client(db).ensure_schema()
+    assert not any(s.startswith("CREATE") for s in db.statements)
+
+
+@pytest.mark.asyncio
+async def test_search_uses_fulltext_phrase_query():
+    db = FakeDatabase()
+    client = make_client(db)
+
+    result = await client.search_concepts("神经网络", limit=5)
+
+    assert result[0]["q"] == '"神经网络"'
+    assert any(FULLTEXT_INDEX_NAME in str(s) or "fulltext" in s for s in db.statements)
+
+
+@pytest.mark.asyncio
+async def test_search_falls_back_to_contains():
+    db = FakeDatabase()
+    db.fail_fulltext = True
+
+    result = await make_client(db).search_concepts("熵")
+
+    assert result == [{"id": "fallback"}]
+
+
+@pytest.mark.asyncio
+async def test_search_falls_back_when_fulltext_is_empty_or_populating():
+    db = FakeDatabase()
+    db.fulltext_hits = False
+    client = make_client(db)
+
+    # 部分词语（如"熵"匹配"信息熵"）全文索引没有命中时仍按子串查找
+    assert await client.search_concepts("熵") == [{"id": "fallback"}]
+
+    db.fulltext_hits = True
+    db.index_state = "POPULATING"
+    db.statements.clear()
+    client = make_client(db)
+    assert await client.search_concepts("熵") == [{"id": "fallback"}]
+    assert not any("fulltext.queryNodes" in s for s in db.statements)
+
+    # 填充完成后使用全文索引
+    db.index_state = "ONLINE"
+    assert (await client.search_concepts("熵"))[0]["id"] == "熵"
@@ -0,0 +1,108 @@
+"""
+测试模块 - 节点富化阶段（有界并发 + 截止时间）
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.api.node_enrichment import ConceptEnrichment, EnrichmentStage
+
+
+@pytest.mark.asyncio
+async def test_gather_keeps_input_order():
+    """结果顺序与输入一致，与完成顺序无关"""
+    stage = EnrichmentStage(concurrency=4, deadline=5.0)
+    records = [ConceptEnrichment(concept=name) for name in ["熵", "信息论", "热力学"]]
+    delays = {"熵": 0.03, "信息论": 0.01, "热力学": 0.02}
+
+    async def job(record):
+        await stage.call(lambda: asyncio.sleep(delays[record.concept]))
+        record.brief_summary = f"{record.concept}简介"
+
+    result = await stage.gather(records, job)
+
+    assert [r.concept for r in result] == ["熵", "信息论", "热力学"]
+    assert all(r.completed for r in result)
+    assert result[1].brief_summary == "信息论简介"
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    """同时进行的外部调用数不超过concurrency"""
+    stage = EnrichmentStage(concurrency=2, deadline=5.0)
+    active = 0
+    peak = 0
+
+    async def fake_call():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    async def job(record):
+        await stage.call(fake_call)
+
+    await stage.gather([ConceptEnrichment(concept=str(i)) for i in range(6)], job)
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_deadline_keeps_partial_results():
+    """超过截止时间的任务被取消，已完成的字段保留，其余保持回退值"""
+    stage = EnrichmentStage(concurrency=4, deadline=0.05)
+
+    async def job(record):
+        record.wiki = {"definition": "定义", "exists": True, "url": "", "source": "Wikipedia"}
+        if record.concept == "慢概念":
+            await asyncio.sleep(1.0)
+        record.brief_summary = "简介"
+
+    fast, slow = await stage.gather(
+        [ConceptEnrichment(concept="快概念"), ConceptEnrichment(concept="慢概念")],
+        job
+    )
+
+    assert fast.completed and fast.brief_summary == "简介"
+    assert not slow.completed
+    assert slow.wiki["exists"] is True
+    assert slow.brief_summary is None
+
+
+@pytest.mark.asyncio
+async def test_failed_job_does_not_break_others():
+    """单个任务异常不影响其他候选"""
+    stage = EnrichmentStage(concurrency=4, deadline=1.0)
+
+    async def job(record):
+        if record.concept == "坏":
+            raise RuntimeError("boom")
+        record.brief_summary = "ok"
+
+    good, bad = await stage.gather([ConceptEnrichment(concept="好"), ConceptEnrichment(concept="坏")], job)
+
+    assert good.completed and good.brief_summary == "ok"
+    assert not bad.completed
+    assert bad.wiki["exists"] is False
+
+
+@pytest.mark.asyncio
+async def test_deadline_is_shared_across_gathers():
+    """截止时间属于整个请求：后一次gather只能使用剩余时间"""
+    stage = EnrichmentStage(concurrency=4, deadline=0.1)
+
+    async def job(record):
+        await asyncio.sleep(0.06)
+        record.brief_summary = "简介"
+
+    first, = await stage.gather([ConceptEnrichment(concept="中心")], job)
+    second, = await stage.gather([ConceptEnrichment(concept="候选")], job)
+
+    assert first.completed
+    assert not second.completed and second.brief_summary is None
+    assert stage.remaining() == 0.0
@@ -0,0 +1,130 @@
+"""
+测试模块 - 请求合并（single-flight）
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.api.single_flight import SingleFlight
+
+
+class FakeLockClient:
+    """模拟redis.asyncio的SET NX / EXISTS / EVAL"""
+
+    def __init__(self):
+        self.store = {}
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    async def exists(self, key):
+        return int(key in self.store)
+
+    async def eval(self, script, numkeys, key, token):
+        if self.store.get(key) == token:
+            del self.store[key]
+            return 1
+        return 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_computation():
+    """相同key的并发请求只执行一次计算"""
+    flight = SingleFlight()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return {"status": "success", "data": {"nodes": [1]}}
+
+    results = await asyncio.gather(*[flight.do("discover:v2:熵", compute) for _ in range(5)])
+
+    assert calls == 1
+    assert all(r == results[0] for r in results)
+    assert flight.get_stats()["shared"] == 4
+    assert flight.inflight_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_exception_shared_and_key_released():
+    """异常传递给所有等待者，之后同一key可以重新计算"""
+    flight = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("LLM失败")
+
+    results = await asyncio.gather(flight.do("k", boom), flight.do("k", boom), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def ok():
+        return "ok"
+
+    assert await flight.do("k", ok) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_computation():
+    """某个请求断开时，其他等待者仍拿到结果"""
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("k", compute))
+    second = asyncio.ensure_future(flight.do("k", compute))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == "done"
+
+
+@pytest.mark.asyncio
+async def test_redis_lock_waits_for_other_worker():
+    """锁被其他worker持有时，轮询缓存而不是重复计算"""
+    lock = FakeLockClient()
+    lock.store["lock:k"] = "other-worker"
+    flight = SingleFlight(lock_client=lock, wait_timeout=1.0, poll_interval=0.01)
+    cache = {}
+
+    async def lookup():
+        return cache.get("k")
+
+    async def compute():
+        raise AssertionError("不应重复计算")
+
+    async def other_worker_finishes():
+        await asyncio.sleep(0.03)
+        cache["k"] = {"status": "success", "data": {"nodes": []}}
+        del lock.store["lock:k"]
+
+    result, _ = await asyncio.gather(flight.do("k", compute, cache_lookup=lookup), other_worker_finishes())
+
+    assert result["status"] == "success"
+    assert flight.get_stats()["remote_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_lock_acquired_and_released():
+    lock = FakeLockClient()
+    flight = SingleFlight(lock_client=lock)
+
+    async def lookup():
+        return None
+
+    async def compute():
+        assert "lock:k" in lock.store
+        return "fresh"
+
+    assert await flight.do("k", compute, cache_lookup=lookup) == "fresh"
+    assert "lock:k" not in lock.store
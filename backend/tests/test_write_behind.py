@@ -0,0 +1,157 @@
+"""
+测试模块 - 写后持久化队列
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.database.write_behind import WriteBehindQueue
+
+
+class FakeNeo4j:
+    def __init__(self, fail_times=0, delay=0.0):
+        self.saves = []
+        self.fail_times = fail_times
+        self.delay = delay
+
+    async def save_graph_data(self, nodes, edges, batch_size=None):
+        await asyncio.sleep(self.delay)
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            return False
+        self.saves.append((list(nodes), list(edges)))
+        return True
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        return True
+
+
+def make_queue(neo4j=None, **kwargs):
+    kwargs.setdefault("flush_interval", 0.01)
+    kwargs.setdefault("retry_backoff", 0.001)
+    return WriteBehindQueue(neo4j or FakeNeo4j(), FakeRedis(), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_not_started_writes_inline():
+    queue = make_queue()
+    await queue.submit("k", {"nodes": []}, nodes=[{"id": "a"}], edges=[])
+
+    assert queue.redis.data["k"] == {"nodes": []}
+    assert queue.neo4j.saves == [([{"id": "a"}], [])]
+
+
+@pytest.mark.asyncio
+async def test_coalesces_and_drains_on_stop():
+    """同一节点ID只写最新版本，stop时全部写完"""
+    queue = make_queue(flush_interval=10)
+    await queue.start()
+
+    await queue.submit("k1", 1, nodes=[{"id": "a", "v": 1}, {"id": "b"}], edges=[{"source": "a", "target": "b"}])
+    await queue.submit("k2", 2, nodes=[{"id": "a", "v": 2}], edges=[{"source": "a", "target": "b", "w": 2}])
+    assert queue.get_cached("k1") == 1  # 写入前可读到
+    assert queue.get_stats()["depth"] == 5
+
+    await queue.stop()
+
+    nodes, edges = queue.neo4j.saves[0]
+    assert len(queue.neo4j.saves) == 1
+    assert {n["id"]: n.get("v") for n in nodes} == {"a": 2, "b": None}
+    assert edges == [{"source": "a", "target": "b", "w": 2}]
+    assert queue.redis.data == {"k1": 1, "k2": 2}
+    assert queue.get_stats()["coalesced"] == 2
+    assert queue.get_stats()["depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_retries_failed_writes():
+    queue = make_queue(neo4j=FakeNeo4j(fail_times=2), max_retries=3)
+    await queue.start()
+    await queue.submit(nodes=[{"id": "a"}])
+    await queue.stop()
+
+    assert len(queue.neo4j.saves) == 1
+    assert queue.get_stats()["retries"] == 2
+    assert queue.get_stats()["failed_batches"] == 0
+
+
+@pytest.mark.asyncio
+async def test_backpressure_blocks_until_flushed():
+    """积压超过上限时提交方等待刷新"""
+    queue = make_queue(neo4j=FakeNeo4j(delay=0.02), max_pending=3, flush_interval=10)
+    await queue.start()
+
+    await queue.submit(nodes=[{"id": "a"}, {"id": "b"}])
+    await asyncio.wait_for(queue.submit(nodes=[{"id": "c"}, {"id": "d"}]), timeout=1.0)
+    await queue.stop()
+
+    assert queue.get_stats()["backpressure_waits"] == 1
+    written = [n["id"] for nodes, _ in queue.neo4j.saves for n in nodes]
+    assert written == ["a", "b", "c", "d"]
+
+
+class PipelineRedis(FakeRedis):
+    """支持set_many的Redis替身，记录每次批量写入的key"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    async def set_many(self, items):
+        self.batches.append(sorted(items))
+        for key, (value, ex) in items.items():
+            self.data[key] = value
+        return True
+
+
+@pytest.mark.asyncio
+async def test_write_through_cache_is_visible_before_flush():
+    """写穿：submit返回时缓存已在Redis中（其他worker可读），图数据仍走队列"""
+    queue = WriteBehindQueue(FakeNeo4j(), PipelineRedis(), flush_interval=10)
+    await queue.start()
+
+    await queue.submit("k", {"v": 1}, nodes=[{"id": "a"}], cache_write_through=True)
+
+    assert queue.redis.data == {"k": {"v": 1}}
+    assert queue.neo4j.saves == []
+    assert queue.get_stats()["pending_cache"] == 0 and queue.get_stats()["pending_nodes"] == 1
+    await queue.stop()
+    assert queue.neo4j.saves == [([{"id": "a"}], [])]
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_cache_in_one_pipeline():
+    queue = WriteBehindQueue(FakeNeo4j(), PipelineRedis(), flush_interval=10)
+    await queue.start()
+    for i in range(3):
+        await queue.submit(f"k{i}", i)
+    await queue.stop()
+
+    assert queue.redis.batches == [["k0", "k1", "k2"]]
+
+
+@pytest.mark.asyncio
+async def test_discard_cache_drops_matching_pending_entries():
+    """清除缓存时丢弃匹配的未写入缓存，图数据照常写入"""
+    queue = WriteBehindQueue(FakeNeo4j(), FakeRedis(), flush_interval=10)
+    await queue.start()
+    await queue.submit("discover:v2:熵:30", {"v": 1}, nodes=[{"id": "a"}])
+    await queue.submit("discover:bridge:v2:熵_信息:10", {"v": 2})
+
+    assert queue.discard_cache("discover:v2:*") == 1
+    assert queue.get_cached("discover:v2:熵:30") is None
+    assert queue.get_cached("discover:bridge:v2:熵_信息:10") == {"v": 2}
+
+    await queue.stop()
+    assert queue.redis.data == {"discover:bridge:v2:熵_信息:10": {"v": 2}}
+    assert queue.neo4j.saves == [([{"id": "a"}], [])]
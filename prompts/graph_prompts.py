@@ -4,6 +4,44 @@
 class GraphPrompt:
     """图谱构建Prompt"""
     
+    # 图谱构建输出的JSON Schema（支持结构化输出的模型使用）
+    GRAPH_SCHEMA = {
+        "title": "knowledge_graph",
+        "type": "object",
+        "properties": {
+            "nodes": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "string"},
+                        "label": {"type": "string"},
+                        "discipline": {"type": "string"},
+                        "definition": {"type": "string"},
+                        "credibility": {"type": "number"}
+                    },
+                    "required": ["id", "label", "discipline"]
+                }
+            },
+            "edges": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "source": {"type": "string"},
+                        "target": {"type": "string"},
+                        "relation": {"type": "string"},
+                        "weight": {"type": "number"},
+                        "reasoning": {"type": "string"}
+                    },
+                    "required": ["source", "target", "relation"]
+                }
+            },
+            "metadata": {"type": "object"}
+        },
+        "required": ["nodes", "edges"]
+    }
+    
     @staticmethod
     def get_graph_builder_prompt(verified_concepts: list) -> str:
         """
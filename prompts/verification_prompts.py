@@ -4,6 +4,31 @@
 class VerificationPrompt:
     """概念验证Prompt"""
     
+    # 单条验证输出的JSON Schema（支持结构化输出的模型使用）
+    VERIFICATION_SCHEMA = {
+        "title": "relation_verification",
+        "type": "object",
+        "properties": {
+            "credibility_score": {"type": "number"},
+            "is_valid": {"type": "boolean"},
+            "evidence": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "source": {"type": "string"},
+                        "url": {"type": "string"},
+                        "snippet": {"type": "string"}
+                    },
+                    "required": ["source", "snippet"]
+                }
+            },
+            "logical_reasoning": {"type": "string"},
+            "warnings": {"type": "array", "items": {"type": "string"}}
+        },
+        "required": ["credibility_score", "is_valid", "evidence", "logical_reasoning", "warnings"]
+    }
+    
     @staticmethod
     def get_verification_prompt(concept_a: str, concept_b: str, claimed_relation: str, strength: float) -> str:
         """
@@ -0,0 +1,203 @@
+"""
+Arxiv查询结果缓存 - 相同查询在TTL内复用已解析的论文列表，不再请求export.arxiv.org
+
+两层结构（与LLM响应缓存相同）：
+1. 进程内LRU层：带过期时间，容量有限
+2. Redis层（可选）：应用启动时挂载，多worker共享
+
+key由调用点（两处解析格式不同）和规范化后的查询（小写、合并空白）组成，不含max_results：
+条目记录当时请求的max_results，较大的结果集可直接截断后服务较小的请求；
+返回结果少于请求数时说明结果已取全，可服务任意max_results。
+
+负缓存：空结果使用较短的TTL，请求失败（超时、非200等）使用更短的TTL，
+且不覆盖已有的条目（进程内层检查，Redis层使用SET NX）；
+熔断、查询被禁用等不是由Arxiv返回的结果不缓存。
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "arxiv:v1:"
+
+
+def normalize_query(query: str) -> str:
+    """查询规范化：小写、合并空白"""
+    return " ".join(query.lower().split())
+
+
+def make_cache_key(site: str, query: str) -> str:
+    payload = f"{site}:{normalize_query(query)}"
+    return KEY_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ArxivCache:
+    """
+    Arxiv查询结果缓存
+
+    用法：
+        cached = await get_arxiv_cache().lookup("api", query, max_results)
+        if cached is not None:
+            papers, error = cached
+        ...
+        await get_arxiv_cache().store("api", query, max_results, papers, error)
+
+    Args:
+        max_entries: 进程内层容量
+        ttl: 非空结果的TTL（秒）
+        negative_ttl: 空结果的TTL（秒）
+        error_ttl: 请求失败的TTL（秒），0表示不缓存失败
+        enabled: 是否启用
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: int = 24 * 3600,
+        negative_ttl: int = 3600,
+        error_ttl: int = 120,
+        enabled: bool = True,
+        redis=None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.error_ttl = error_ttl
+        self.enabled = enabled
+        self.redis = redis
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (过期时间, 条目)
+        self.stats = {"memory_hits": 0, "redis_hits": 0, "negative_hits": 0, "misses": 0}
+
+    def attach_redis(self, client):
+        """挂载Redis层（redis.asyncio客户端，decode_responses=True）"""
+        self.redis = client
+        logger.info("Arxiv cache: Redis tier attached")
+
+    def _remember(self, key: str, entry: Dict[str, Any], ttl: int):
+        self._memory[key] = (time.monotonic() + ttl, entry)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def _get(self, key: str) -> tuple:
+        """返回(条目, 命中层)，未命中返回(None, None)"""
+        cached = self._memory.get(key)
+        if cached is not None:
+            expires_at, entry = cached
+            if expires_at > time.monotonic():
+                self._memory.move_to_end(key)
+                return entry, "memory"
+            del self._memory[key]
+
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(key)
+                ttl = await self.redis.ttl(key) if raw else 0
+            except Exception as e:
+                logger.warning(f"Arxiv cache Redis read failed: {e}")
+                raw = None
+            if raw:
+                entry = json.loads(raw)
+                if ttl and ttl > 0:
+                    self._remember(key, entry, ttl)
+                return entry, "redis"
+        return None, None
+
+    @staticmethod
+    def _covers(entry: Dict[str, Any], max_results: int) -> bool:
+        """条目能否服务该max_results的请求"""
+        if entry.get("error") is not None:
+            return True
+        return entry["max_results"] >= max_results or len(entry["papers"]) < entry["max_results"]
+
+    async def lookup(self, site: str, query: str, max_results: int) -> Optional[tuple]:
+        """
+        查询缓存
+
+        Returns:
+            (论文列表, 错误信息)；未命中或缓存的结果集不够大时返回None
+        """
+        if not self.enabled:
+            return None
+        entry, tier = await self._get(make_cache_key(site, query))
+        if entry is None or not self._covers(entry, max_results):
+            self.stats["misses"] += 1
+            return None
+        if entry.get("error") is not None or not entry["papers"]:
+            self.stats["negative_hits"] += 1
+        else:
+            self.stats[f"{tier}_hits"] += 1
+        return entry["papers"][:max_results], entry.get("error")
+
+    async def store(
+        self,
+        site: str,
+        query: str,
+        max_results: int,
+        papers: List[Dict[str, Any]],
+        error: Optional[str] = None
+    ):
+        """写入一次查询结果（error不为空表示请求失败）"""
+        if not self.enabled:
+            return
+        if error is not None:
+            ttl = self.error_ttl
+        else:
+            ttl = self.ttl if papers else self.negative_ttl
+        if ttl <= 0:
+            return
+
+        key = make_cache_key(site, query)
+        cached = self._memory.get(key)
+        if error is not None and cached is not None and cached[0] > time.monotonic() and cached[1].get("error") is None:
+            # 已有成功结果时不用失败覆盖
+            return
+
+        entry = {"max_results": max_results, "papers": papers, "error": error}
+        if self.redis is not None:
+            try:
+                # 失败结果只在Redis中没有条目时写入（SET NX），不覆盖其他worker写入的成功结果
+                written = await self.redis.set(
+                    key, json.dumps(entry, ensure_ascii=False), ex=ttl, nx=error is not None
+                )
+                if error is not None and not written:
+                    return
+            except Exception as e:
+                logger.warning(f"Arxiv cache Redis write failed: {e}")
+        self._remember(key, entry, ttl)
+
+    def clear_memory(self):
+        """清空进程内层（Redis层随/cache/clear一起清除）"""
+        self._memory.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._memory),
+            "redis_tier": self.redis is not None,
+            **self.stats
+        }
+
+
+# 全局实例
+_arxiv_cache: Optional[ArxivCache] = None
+
+
+def get_arxiv_cache() -> ArxivCache:
+    """获取全局Arxiv查询结果缓存"""
+    global _arxiv_cache
+    if _arxiv_cache is None:
+        _arxiv_cache = ArxivCache(
+            max_entries=int(os.getenv("ARXIV_CACHE_SIZE", "1024")),
+            ttl=int(os.getenv("ARXIV_CACHE_TTL", str(24 * 3600))),
+            negative_ttl=int(os.getenv("ARXIV_CACHE_NEGATIVE_TTL", "3600")),
+            error_ttl=int(os.getenv("ARXIV_CACHE_ERROR_TTL", "120")),
+            enabled=os.getenv("ARXIV_CACHE_ENABLED", "true").lower() == "true"
+        )
+    return _arxiv_cache
@@ -0,0 +1,299 @@
+"""
+Arxiv请求调度器 - 所有Arxiv查询经过同一个队列，按arXiv API的要求间隔发出
+
+1. 单一队列、单个发送协程：相邻两次请求至少间隔 ARXIV_MIN_INTERVAL 秒（arXiv建议3秒）
+2. 查询合并：发送时把队列中多个简单查询（只含词语）合并为一个布尔OR查询，
+   按相关度把返回的条目分回各个等待方。负载越高，每次请求合并的查询越多，
+   间隔限制下的吞吐随负载上升而不是排队变长。简单查询无论是否合并都按
+   "各词AND"（all:词1 AND all:词2）检索，两种形式语义一致
+3. 合并请求返回了完整的一页、而某个查询分到的条目少于其max_results时，该查询
+   单独重新排队（按原顺序排在队首）；合并请求不足一页说明已取全，直接返回。
+   保证"结果少于max_results即已取全"的语义（Arxiv查询缓存依赖这一点）
+4. 失败（超时、5xx等）在调度器内按间隔重试，仍失败时以ArxivRequestError通知所有等待方；
+   每次HTTP请求经过arxiv熔断器，熔断时等待方收到CircuitOpenError
+
+返回完整解析的条目，截断、格式化由调用方负责。
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from shared.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from shared.http_pool import get_http_pools
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "https://export.arxiv.org/api/query"
+
+ATOM_NS = {
+    'atom': 'http://www.w3.org/2005/Atom',
+    'arxiv': 'http://arxiv.org/schemas/atom'
+}
+
+# 可以合并的查询：只含词语、空格和连字符（不含字段前缀、引号、布尔运算符）
+_SIMPLE_QUERY = re.compile(r"^[\w\s\-]+$")
+_BOOLEAN_WORDS = {"and", "or", "andnot"}
+
+
+class ArxivRequestError(Exception):
+    """Arxiv请求重试后仍失败（超时、非200、XML解析错误等）"""
+
+
+def parse_arxiv_feed(xml_text: str) -> List[Dict[str, Any]]:
+    """
+    解析Arxiv的Atom XML响应
+
+    Raises:
+        ET.ParseError: XML格式错误
+    """
+    root = ET.fromstring(xml_text)
+    papers = []
+    for entry in root.findall('atom:entry', ATOM_NS):
+        title = entry.find('atom:title', ATOM_NS)
+        summary = entry.find('atom:summary', ATOM_NS)
+        published = entry.find('atom:published', ATOM_NS)
+        link = entry.find('atom:id', ATOM_NS)
+
+        authors = []
+        for author in entry.findall('atom:author', ATOM_NS):
+            name = author.find('atom:name', ATOM_NS)
+            if name is not None and name.text:
+                authors.append(name.text.strip())
+
+        papers.append({
+            "title": title.text.strip() if title is not None and title.text else "",
+            "authors": authors,
+            "summary": summary.text.strip() if summary is not None and summary.text else "",
+            "published": published.text.strip() if published is not None and published.text else "",
+            "link": link.text.strip() if link is not None and link.text else "",
+            "categories": [c.get('term') for c in entry.findall('atom:category', ATOM_NS) if c.get('term')]
+        })
+    return papers
+
+
+# 条目的相关度不低于该值才分给某个查询（即查询词至少在摘要中全部出现，或一半出现在标题中）
+MIN_RELEVANCE = 0.5
+
+
+def query_terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+def _stem(word: str) -> str:
+    """粗略的词干：去掉英文复数s，使network/networks能互相匹配"""
+    return word[:-1] if len(word) > 3 and word.endswith("s") else word
+
+
+def is_multiplexable(query: str) -> bool:
+    terms = query_terms(query)
+    return bool(terms) and bool(_SIMPLE_QUERY.match(query)) and not _BOOLEAN_WORDS.intersection(terms)
+
+
+def relevance(terms: List[str], paper: Dict[str, Any]) -> float:
+    """查询词在条目中的覆盖率（标题命中计双倍）"""
+    if not terms:
+        return 0.0
+    title = {_stem(w) for w in query_terms(paper.get("title", ""))}
+    summary = {_stem(w) for w in query_terms(paper.get("summary", ""))}
+    stems = [_stem(t) for t in terms]
+    score = sum(2.0 if t in title else 1.0 if t in summary else 0.0 for t in stems)
+    return score / (2.0 * len(terms))
+
+
+@dataclass
+class _Waiter:
+    query: str
+    max_results: int
+    future: asyncio.Future
+    solo: bool = False
+    terms: List[str] = field(default_factory=list)
+
+
+class ArxivScheduler:
+    """
+    Arxiv请求调度器
+
+    Args:
+        api_url: Arxiv查询接口
+        min_interval: 相邻两次请求的最小间隔（秒）
+        max_batch: 一次请求最多合并的查询数，1表示不合并
+        max_combined_results: 合并请求的max_results上限
+        max_retries: 单次请求的最大尝试次数
+    """
+
+    def __init__(
+        self,
+        api_url: str = DEFAULT_API_URL,
+        min_interval: float = 3.0,
+        max_batch: int = 5,
+        max_combined_results: int = 50,
+        max_retries: int = 2
+    ):
+        self.api_url = api_url
+        self.min_interval = min_interval
+        self.max_batch = max(1, max_batch)
+        self.max_combined_results = max_combined_results
+        self.max_retries = max(1, max_retries)
+
+        self._queue: List[_Waiter] = []
+        self._worker: Optional[asyncio.Task] = None
+        self._last_request = 0.0
+        self.stats = {"queries": 0, "requests": 0, "multiplexed_queries": 0, "requeued": 0, "errors": 0}
+
+    async def search(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        排队执行一次查询
+
+        Returns:
+            按相关度排序的条目（不超过max_results）
+
+        Raises:
+            ArxivRequestError: 重试后仍失败
+            CircuitOpenError: arxiv熔断中
+        """
+        self.stats["queries"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append(_Waiter(query, max_results, future, terms=query_terms(query)))
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not asyncio.get_running_loop():
+            self._worker = asyncio.ensure_future(self._run())
+        return await future
+
+    # ---------- 发送协程 ----------
+
+    def _take_batch(self) -> List[_Waiter]:
+        """取出队首查询，以及队列中可以与之合并的查询"""
+        head = self._queue.pop(0)
+        batch = [head]
+        if head.solo or self.max_batch == 1 or not is_multiplexable(head.query):
+            return batch
+        for waiter in list(self._queue):
+            if len(batch) >= self.max_batch:
+                break
+            if not waiter.solo and is_multiplexable(waiter.query):
+                self._queue.remove(waiter)
+                batch.append(waiter)
+        return batch
+
+    async def _run(self):
+        while self._queue:
+            batch = [w for w in self._take_batch() if not w.future.done()]
+            if not batch:
+                continue
+            try:
+                await self._dispatch(batch)
+            except Exception as e:
+                for waiter in batch:
+                    if not waiter.future.done():
+                        waiter.future.set_exception(e)
+
+    async def _wait_turn(self):
+        delay = self._last_request + self.min_interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._last_request = time.monotonic()
+
+    @staticmethod
+    def _terms_query(waiter: _Waiter) -> str:
+        return " AND ".join(f"all:{t}" for t in waiter.terms)
+
+    def _search_query(self, batch: List[_Waiter]) -> str:
+        if len(batch) == 1:
+            waiter = batch[0]
+            return self._terms_query(waiter) if is_multiplexable(waiter.query) else f"all:{waiter.query}"
+        return " OR ".join(f"({self._terms_query(w)})" for w in batch)
+
+    async def _dispatch(self, batch: List[_Waiter]):
+        if len(batch) > 1:
+            self.stats["multiplexed_queries"] += len(batch)
+        requested = min(sum(w.max_results for w in batch), self.max_combined_results) if len(batch) > 1 else batch[0].max_results
+        papers = await self._fetch({
+            "search_query": self._search_query(batch),
+            "start": 0,
+            "max_results": requested,
+            "sortBy": "relevance",
+            "sortOrder": "descending"
+        })
+
+        if len(batch) == 1:
+            if not batch[0].future.done():
+                batch[0].future.set_result(papers[:batch[0].max_results])
+            return
+
+        # 合并查询返回的条目不足requested时，OR查询已取全，各查询分到的即为全部结果
+        full = len(papers) >= requested
+        requeued = []
+        for waiter in batch:
+            scored = [(relevance(waiter.terms, paper), rank, paper) for rank, paper in enumerate(papers)]
+            matched = [paper for score, _, paper in sorted(scored, key=lambda s: (-s[0], s[1])) if score >= MIN_RELEVANCE]
+            if full and len(matched) < waiter.max_results:
+                # 合并结果已满而分到的条目不足：可能被其他查询占满，单独再查一次
+                waiter.solo = True
+                self.stats["requeued"] += 1
+                requeued.append(waiter)
+            elif not waiter.future.done():
+                waiter.future.set_result(matched[:waiter.max_results])
+        # 重新排队的查询放在队首，保持原先的先后顺序
+        self._queue[0:0] = requeued
+
+    async def _fetch(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        breaker = get_circuit_breaker("arxiv")
+        error = "Arxiv查询失败"
+        for attempt in range(self.max_retries):
+            await self._wait_turn()
+            self.stats["requests"] += 1
+            try:
+                async with get_http_pools().borrow("arxiv") as client:
+                    response = await breaker.call(
+                        lambda: client.get(self.api_url, params=params),
+                        failed=lambda r: r.status_code >= 500
+                    )
+                if response.status_code == 200:
+                    return parse_arxiv_feed(response.text)
+                error = f"Arxiv API返回状态码 {response.status_code}"
+            except CircuitOpenError:
+                raise
+            except (httpx.TimeoutException, httpx.ConnectError) as e:
+                error = f"Arxiv API超时/连接错误: {e}"
+            except httpx.HTTPError as e:
+                error = f"Arxiv API网络错误: {e}"
+            except ET.ParseError as e:
+                self.stats["errors"] += 1
+                raise ArxivRequestError(f"Arxiv XML解析错误: {e}")
+            logger.warning(f"{error} (attempt {attempt + 1}/{self.max_retries})")
+        self.stats["errors"] += 1
+        raise ArxivRequestError(error)
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats["requests"]
+        return {
+            "min_interval": self.min_interval,
+            "max_batch": self.max_batch,
+            "queued": len(self._queue),
+            "queries_per_request": round(self.stats["queries"] / requests, 2) if requests else 0.0,
+            **self.stats
+        }
+
+
+# 全局实例
+_scheduler: Optional[ArxivScheduler] = None
+
+
+def get_arxiv_scheduler() -> ArxivScheduler:
+    """获取全局Arxiv请求调度器"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = ArxivScheduler(
+            min_interval=float(os.getenv("ARXIV_MIN_INTERVAL", "3.0")),
+            max_batch=int(os.getenv("ARXIV_MAX_BATCH", "5")),
+            max_combined_results=int(os.getenv("ARXIV_MAX_COMBINED_RESULTS", "50")),
+            max_retries=int(os.getenv("ARXIV_MAX_RETRIES", "2"))
+        )
+    return _scheduler
@@ -0,0 +1,254 @@
+"""
+熔断器 - 外部依赖（LLM、Embedding、Wikipedia、Arxiv）故障时快速失败
+
+三种状态：
+1. closed：正常放行，在滑动时间窗口内统计失败率
+2. open：失败率超过阈值后打开，open_seconds内所有调用立即抛出CircuitOpenError，
+   调用方直接走已有的回退逻辑（预定义概念、默认相似度、跳过Wikipedia等）
+3. half_open：冷却结束后放行少量探测请求，全部成功则关闭，任一失败则重新打开
+
+只统计依赖本身的故障（超时、连接错误、5xx），4xx/429不计入（429由限流器处理）。
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """熔断器打开时拒绝调用"""
+
+    def __init__(self, name: str, retry_in: float = 0.0):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(f"Circuit '{name}' is open (retry in {retry_in:.1f}s)")
+
+
+def is_dependency_failure(error: BaseException) -> bool:
+    """异常是否表示依赖故障：超时/连接错误/5xx计入，4xx（含429）不计入"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status >= 500
+    return True
+
+
+class CircuitBreaker:
+    """
+    单个依赖的熔断器
+
+    Args:
+        name: 依赖名称
+        failure_rate: 窗口内失败率达到该值时打开
+        window_seconds: 滑动统计窗口（秒）
+        min_calls: 窗口内调用数不少于该值才判断失败率
+        open_seconds: 打开后多久进入半开状态
+        half_open_probes: 半开状态允许同时进行的探测请求数
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        window_seconds: float = 60.0,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        enabled: bool = True
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.window_seconds = window_seconds
+        self.min_calls = max(1, min_calls)
+        self.open_seconds = open_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self.enabled = enabled
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._outcomes: deque = deque()  # (时间, 是否失败)
+        self._probes = 0
+        self._probe_successes = 0
+        self.stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    # ---------- 状态 ----------
+
+    def _retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.open_seconds - time.monotonic())
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        logger.warning(f"Circuit '{self.name}': {self.state} -> {state}")
+        self.state = state
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+            self.stats["opened"] += 1
+        elif state == CLOSED:
+            self._outcomes.clear()
+        self._probes = 0
+        self._probe_successes = 0
+
+    @property
+    def available(self) -> bool:
+        """是否可能放行（不占用探测名额，用于跳过调用前的准备工作）"""
+        return not self.enabled or self.state != OPEN or self._retry_in() == 0
+
+    def allow_request(self) -> bool:
+        """判断是否放行；半开状态下放行即占用一个探测名额，调用结束后必须记录结果"""
+        if not self.enabled:
+            return True
+        if self.state == OPEN:
+            if self._retry_in() > 0:
+                return False
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_probes:
+                return False
+            self._probes += 1
+        return True
+
+    # ---------- 记录结果 ----------
+
+    def record_success(self):
+        self.stats["calls"] += 1
+        if self.state == HALF_OPEN:
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_probes:
+                self._transition(CLOSED)
+            return
+        self._record(False)
+
+    def record_failure(self):
+        self.stats["calls"] += 1
+        self.stats["failures"] += 1
+        if self.state == HALF_OPEN:
+            self._transition(OPEN)
+            return
+        self._record(True)
+        total = len(self._outcomes)
+        failures = sum(1 for _, failed in self._outcomes if failed)
+        if self.state == CLOSED and total >= self.min_calls and failures / total >= self.failure_rate:
+            self._transition(OPEN)
+
+    def record_ignored(self):
+        """调用被取消等不计入统计的结果：归还半开探测名额"""
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def _record(self, failed: bool):
+        now = time.monotonic()
+        self._outcomes.append((now, failed))
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    # ---------- 调用包装 ----------
+
+    def _reject(self):
+        self.stats["rejected"] += 1
+        raise CircuitOpenError(self.name, self._retry_in())
+
+    @asynccontextmanager
+    async def guard(self):
+        """
+        保护一段调用：打开时抛出CircuitOpenError；正常结束记成功，依赖故障记失败
+
+        用于流式读取等无法包装成单个协程的调用；生成器提前关闭（GeneratorExit）记为成功。
+        """
+        if not self.allow_request():
+            self._reject()
+        try:
+            yield
+        except GeneratorExit:
+            self.record_success()
+            raise
+        except asyncio.CancelledError:
+            self.record_ignored()
+            raise
+        except Exception as e:
+            if is_dependency_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        else:
+            self.record_success()
+
+    async def call(
+        self,
+        factory: Callable[[], Awaitable[Any]],
+        timeout: Optional[float] = None,
+        failed: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        执行一次受保护的调用
+
+        Args:
+            factory: 无参协程工厂
+            timeout: 调用超时（秒），超时计为失败并抛出asyncio.TimeoutError
+            failed: 根据返回值判断是否失败（如HTTP 5xx响应），失败时仍返回结果
+        """
+        if not self.allow_request():
+            self._reject()
+        try:
+            result = await (asyncio.wait_for(factory(), timeout) if timeout else factory())
+        except asyncio.CancelledError:
+            self.record_ignored()
+            raise
+        except Exception as e:
+            if is_dependency_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        if failed is not None and failed(result):
+            self.record_failure()
+        else:
+            self.record_success()
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = len(self._outcomes)
+        failures = sum(1 for _, failed in self._outcomes if failed)
+        return {
+            "state": self.state if self.enabled else "disabled",
+            "failure_rate": round(failures / total, 3) if total else 0.0,
+            "window_calls": total,
+            "retry_in": round(self._retry_in(), 1) if self.state == OPEN else 0.0,
+            **self.stats
+        }
+
+
+# 依赖名称：llm / embedding / wikipedia / arxiv，参数可通过 CIRCUIT_<名称>_* 环境变量覆盖
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """获取依赖的全局熔断器"""
+    if name not in _breakers:
+        prefix = f"CIRCUIT_{name.upper()}"
+        _breakers[name] = CircuitBreaker(
+            name,
+            failure_rate=float(os.getenv(f"{prefix}_FAILURE_RATE", "0.5")),
+            window_seconds=float(os.getenv(f"{prefix}_WINDOW_SECONDS", "60")),
+            min_calls=int(os.getenv(f"{prefix}_MIN_CALLS", "5")),
+            open_seconds=float(os.getenv(f"{prefix}_OPEN_SECONDS", "30")),
+            half_open_probes=int(os.getenv(f"{prefix}_HALF_OPEN_PROBES", "1")),
+            enabled=os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+        )
+    return _breakers[name]
+
+
+def get_circuit_breaker_stats() -> Dict[str, Any]:
+    return {name: breaker.get_stats() for name, breaker in _breakers.items()}
@@ -61,6 +61,16 @@ class RelationType:
     }
 
 
+class VerificationStrategy:
+    """概念校验策略"""
+    
+    MULTI_SOURCE = "multi_source"  # 逐个概念收集Wikipedia + Arxiv + LLM证据
+    BATCH = "batch"                # 按块批量LLM校验，一次调用评估多条关联
+    TIERED = "tiered"              # 先批量LLM校验，只对阈值附近的概念做多源校验
+    
+    ALL = [MULTI_SOURCE, BATCH, TIERED]
+
+
 class AgentConfig:
     """Agent配置常量"""
     
@@ -87,3 +97,22 @@ class AgentConfig:
     
     # 默认最大Token数
     DEFAULT_MAX_TOKENS = 2000
+    
+    # 概念校验：各证据来源同时进行的最大调用数
+    VERIFY_SOURCE_CONCURRENCY = {
+        "wikipedia": 8,
+        "arxiv": 3,
+        "llm": 5
+    }
+    
+    # 概念校验截止时间（秒），超时未取到的证据来源按缺失处理
+    VERIFY_DEADLINE = 60
+    
+    # 默认校验策略（见VerificationStrategy）：批量LLM校验后只对阈值附近的概念多源校验
+    VERIFY_STRATEGY = VerificationStrategy.TIERED
+    
+    # 批量校验：单次LLM调用校验的关联数
+    VERIFY_BATCH_SIZE = 10
+    
+    # 分级校验：批量得分与可信度阈值相差不超过该值的概念再做多源校验
+    VERIFY_BORDERLINE_MARGIN = 0.15
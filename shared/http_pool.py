@@ -0,0 +1,278 @@
+"""
+HTTP连接池 - 应用级共享的httpx/aiohttp客户端
+
+每个上游（arxiv / wikipedia）使用独立的httpx.AsyncClient，
+连接数上限即为该主机的连接上限；aiohttp会话供DataCrawler使用，按主机限流。
+连接池在应用启动（lifespan）时创建、关闭时释放；未启动时borrow()退回临时客户端。
+httpx连接池的请求统计由MeteredTransport在传输层完成（OpenAI兼容接口的连接池同样使用）。
+OpenAI兼容接口（LLM / Embedding）的连接池见 shared.openai_clients。
+"""
+
+import os
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+import httpx
+
+from shared.rate_limiter import ReleasingStream
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  httpx的HTTP/2支持依赖h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# 上游名称 -> 默认超时
+UPSTREAMS = {
+    "arxiv": httpx.Timeout(20.0, connect=5.0),
+    "wikipedia": httpx.Timeout(10.0, connect=5.0),
+}
+
+
+class PoolMetrics:
+    """单个连接池的请求/新建连接/耗时统计"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.connections_created = 0
+        self.total_ms = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        completed = self.requests - self.in_flight
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "connections_created": self.connections_created,
+            "connection_reuse_ratio": round(1 - self.connections_created / self.requests, 3) if self.requests else 0.0,
+            "avg_ms": round(self.total_ms / completed, 1) if completed > 0 else 0.0
+        }
+
+
+class SaturationMetrics(PoolMetrics):
+    """连接池统计，额外记录并发峰值和超过连接上限（需要排队等连接）的请求数"""
+
+    def __init__(self, max_connections: int):
+        super().__init__()
+        self.max_connections = max_connections
+        self.peak_in_flight = 0
+        self.queued = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = super().snapshot()
+        data.update({
+            "max_connections": self.max_connections,
+            "peak_in_flight": self.peak_in_flight,
+            "queued": self.queued,
+            "saturation": round(self.in_flight / self.max_connections, 3)
+        })
+        return data
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """统计连接池使用情况的传输层包装（流式响应在流关闭时才算结束）"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, metrics: SaturationMetrics):
+        self.transport = transport
+        self.metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        metrics = self.metrics
+
+        async def trace(event_name: str, info: Dict[str, Any]):
+            if event_name == "connection.connect_tcp.complete":
+                metrics.connections_created += 1
+
+        request.extensions["trace"] = trace
+        metrics.requests += 1
+        if metrics.in_flight >= metrics.max_connections:
+            metrics.queued += 1
+        metrics.in_flight += 1
+        metrics.peak_in_flight = max(metrics.peak_in_flight, metrics.in_flight)
+        start = time.perf_counter()
+        finished = False
+
+        def finish():
+            nonlocal finished
+            if not finished:
+                finished = True
+                metrics.in_flight -= 1
+                metrics.total_ms += (time.perf_counter() - start) * 1000
+
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            metrics.errors += 1
+            finish()
+            raise
+        if response.status_code >= 400:
+            metrics.errors += 1
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=ReleasingStream(response.stream, finish),
+            extensions=response.extensions
+        )
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class HttpPools:
+    """应用级HTTP连接池集合"""
+
+    def __init__(
+        self,
+        max_connections_per_host: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None
+    ):
+        self.max_connections_per_host = max_connections_per_host or int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "20"))
+        self.max_keepalive = max_keepalive or int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "10"))
+        self.keepalive_expiry = keepalive_expiry or float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "30"))
+        if http2 is None:
+            http2 = os.getenv("HTTP_POOL_HTTP2", "true").lower() == "true"
+        self.http2 = http2 and HTTP2_AVAILABLE
+
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._aiohttp_session = None
+        self._metrics: Dict[str, PoolMetrics] = {}
+
+    @property
+    def started(self) -> bool:
+        return bool(self._clients)
+
+    def _metrics_for(self, name: str) -> PoolMetrics:
+        if name not in self._metrics:
+            self._metrics[name] = PoolMetrics()
+        return self._metrics[name]
+
+    def _build_client(self, name: str) -> httpx.AsyncClient:
+        # 请求计数、耗时和失败统计都在传输层完成（异常、超时、取消也只结算一次）
+        metrics = self._metrics.setdefault(name, SaturationMetrics(self.max_connections_per_host))
+        transport = MeteredTransport(
+            httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections_per_host,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                http2=self.http2
+            ),
+            metrics
+        )
+        return httpx.AsyncClient(
+            timeout=UPSTREAMS.get(name, httpx.Timeout(30.0, connect=5.0)),
+            transport=transport,
+            follow_redirects=True
+        )
+
+    async def start(self):
+        """创建所有连接池（应用启动时调用）"""
+        if self.started:
+            return
+        for name in UPSTREAMS:
+            self._clients[name] = self._build_client(name)
+        logger.info(
+            f"HTTP pools started: {list(self._clients)} "
+            f"(per-host={self.max_connections_per_host}, keepalive={self.max_keepalive}, http2={self.http2})"
+        )
+
+    async def close(self):
+        """关闭所有连接池（应用关闭时调用）"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+        if self._aiohttp_session is not None:
+            await self._aiohttp_session.close()
+            self._aiohttp_session = None
+        logger.info("HTTP pools closed")
+
+    def get_client(self, name: str) -> Optional[httpx.AsyncClient]:
+        """获取共享httpx客户端（未启动时返回None）"""
+        return self._clients.get(name)
+
+    @asynccontextmanager
+    async def borrow(self, name: str):
+        """
+        借用上游客户端：已启动时返回共享客户端（不关闭），否则创建临时客户端并在退出时关闭
+
+        共享池的请求统计由传输层（MeteredTransport）负责。
+        """
+        client = self._clients.get(name)
+        if client is not None:
+            yield client
+            return
+
+        async with httpx.AsyncClient(timeout=UPSTREAMS.get(name), follow_redirects=True) as temporary:
+            yield temporary
+
+    def aiohttp_session(self):
+        """获取共享aiohttp会话（按主机限流、DNS缓存），未启动时返回None"""
+        if not self.started:
+            return None
+        if self._aiohttp_session is None or self._aiohttp_session.closed:
+            import aiohttp
+
+            metrics = self._metrics_for("aiohttp")
+
+            async def on_request_start(session, ctx, params):
+                metrics.requests += 1
+                metrics.in_flight += 1
+                ctx.start = time.perf_counter()
+
+            async def on_request_end(session, ctx, params):
+                metrics.in_flight -= 1
+                metrics.total_ms += (time.perf_counter() - ctx.start) * 1000
+                if params.response.status >= 400:
+                    metrics.errors += 1
+
+            async def on_request_exception(session, ctx, params):
+                metrics.in_flight -= 1
+                metrics.errors += 1
+
+            async def on_connection_create_end(session, ctx, params):
+                metrics.connections_created += 1
+
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_request_start.append(on_request_start)
+            trace_config.on_request_end.append(on_request_end)
+            trace_config.on_request_exception.append(on_request_exception)
+            trace_config.on_connection_create_end.append(on_connection_create_end)
+
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections_per_host * len(UPSTREAMS),
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_expiry,
+                ttl_dns_cache=300
+            )
+            self._aiohttp_session = aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+        return self._aiohttp_session
+
+    def get_stats(self) -> Dict[str, Any]:
+        """各连接池统计（请求数、新建连接数、连接复用率、平均耗时）"""
+        return {
+            "started": self.started,
+            "http2": self.http2,
+            "max_connections_per_host": self.max_connections_per_host,
+            "pools": {name: m.snapshot() for name, m in self._metrics.items()}
+        }
+
+
+# 全局实例
+_http_pools: Optional[HttpPools] = None
+
+
+def get_http_pools() -> HttpPools:
+    """获取全局HTTP连接池（由应用lifespan负责start/close）"""
+    global _http_pools
+    if _http_pools is None:
+        _http_pools = HttpPools()
+    return _http_pools
@@ -0,0 +1,183 @@
+"""
+LLM响应缓存 - 相同请求（模型、消息、温度、max_tokens、extra_body）复用上一次的回答
+
+两层结构：
+1. 进程内LRU层：带过期时间，容量有限
+2. Redis层（可选）：应用启动时挂载，多worker共享
+
+每个调用点（site）有独立的TTL，TTL为0表示该调用点不缓存（如AI问答）。
+只缓存回答文本，不缓存完整响应对象。
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "llm:v1:"
+
+# 各调用点默认TTL（秒），可通过环境变量 LLM_CACHE_TTL_<SITE大写> 覆盖
+DEFAULT_SITE_TTLS = {
+    "translate": 7 * 24 * 3600,       # 术语翻译几乎不变
+    "brief_summary": 24 * 3600,
+    "bridge_reasoning": 24 * 3600,
+    "academic_filter": 7 * 24 * 3600,
+    "agent": 3600,                    # LLMClient.call_with_retry
+    "chat": 0,                        # AI问答：不缓存
+}
+
+CACHED_FIELDS = ("model", "messages", "temperature", "max_tokens", "extra_body")
+
+
+def make_cache_key(request_params: Dict[str, Any]) -> str:
+    """按请求参数生成缓存key（只取影响回答的字段）"""
+    material = {field: request_params.get(field) for field in CACHED_FIELDS}
+    payload = json.dumps(material, ensure_ascii=False, sort_keys=True, default=str)
+    return KEY_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def response_text(response: Any) -> Optional[str]:
+    """从chat.completions响应中取出回答文本"""
+    if response and getattr(response, "choices", None):
+        return response.choices[0].message.content
+    return None
+
+
+class LLMResponseCache:
+    """
+    LLM响应缓存
+
+    用法：
+        content = await get_llm_cache().complete(
+            "translate", request_params,
+            lambda: client.chat.completions.create(**request_params)
+        )
+    """
+
+    def __init__(self, max_entries: int = 2048, enabled: bool = True, redis=None):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.redis = redis
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (过期时间, 文本)
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def attach_redis(self, client):
+        """挂载Redis层（redis.asyncio客户端，decode_responses=True）"""
+        self.redis = client
+        logger.info("LLM response cache: Redis tier attached")
+
+    def ttl_for(self, site: str) -> int:
+        env_value = os.getenv(f"LLM_CACHE_TTL_{site.upper()}")
+        if env_value is not None:
+            return int(env_value)
+        return DEFAULT_SITE_TTLS.get(site, 3600)
+
+    def _count(self, site: str, field: str):
+        stats = self._stats.setdefault(site, {"memory_hits": 0, "redis_hits": 0, "misses": 0, "bypass": 0})
+        stats[field] += 1
+
+    def _remember(self, key: str, content: str, ttl: int):
+        self._memory[key] = (time.monotonic() + ttl, content)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str, ttl: int) -> tuple:
+        """返回(文本, 命中层)，未命中返回(None, None)"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, content = entry
+            if expires_at > time.monotonic():
+                self._memory.move_to_end(key)
+                return content, "memory"
+            del self._memory[key]
+
+        if self.redis is not None:
+            try:
+                content = await self.redis.get(key)
+            except Exception as e:
+                logger.warning(f"LLM cache Redis read failed: {e}")
+                content = None
+            if content:
+                self._remember(key, content, ttl)
+                return content, "redis"
+        return None, None
+
+    async def set(self, key: str, content: str, ttl: int):
+        self._remember(key, content, ttl)
+        if self.redis is not None:
+            try:
+                await self.redis.set(key, content, ex=ttl)
+            except Exception as e:
+                logger.warning(f"LLM cache Redis write failed: {e}")
+
+    def cacheable(self, site: str) -> bool:
+        return self.enabled and self.ttl_for(site) > 0
+
+    async def lookup(self, site: str, request_params: Dict[str, Any]) -> Optional[str]:
+        """查询缓存并计数；调用点不缓存时返回None（计为bypass）"""
+        if not self.cacheable(site):
+            self._count(site, "bypass")
+            return None
+        content, tier = await self.get(make_cache_key(request_params), self.ttl_for(site))
+        self._count(site, f"{tier}_hits" if content is not None else "misses")
+        return content
+
+    async def store(self, site: str, request_params: Dict[str, Any], content: Optional[str]):
+        """写入缓存（空回答不缓存）"""
+        if content and self.cacheable(site):
+            await self.set(make_cache_key(request_params), content, self.ttl_for(site))
+
+    async def complete(
+        self,
+        site: str,
+        request_params: Dict[str, Any],
+        call: Callable[[], Awaitable[Any]]
+    ) -> Optional[str]:
+        """
+        带缓存地执行一次chat.completions调用，返回回答文本
+
+        Args:
+            site: 调用点名称（决定TTL和统计分组）
+            request_params: 请求参数（用于生成key）
+            call: 无参协程工厂，未命中时调用，返回原始响应
+        """
+        content = await self.lookup(site, request_params)
+        if content is not None:
+            return content
+        content = response_text(await call())
+        await self.store(site, request_params, content)
+        return content
+
+    def clear_memory(self):
+        """清空进程内层（Redis层随/cache/clear一起清除）"""
+        self._memory.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """按调用点统计命中/未命中"""
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._memory),
+            "redis_tier": self.redis is not None,
+            "sites": {site: dict(stats) for site, stats in self._stats.items()}
+        }
+
+
+# 全局实例
+_llm_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """获取全局LLM响应缓存"""
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMResponseCache(
+            max_entries=int(os.getenv("LLM_CACHE_SIZE", "2048")),
+            enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        )
+    return _llm_cache
@@ -0,0 +1,263 @@
+"""
+LLM对冲请求 - 主请求迟迟不返回时发出备份请求，取先得到的有效结果
+
+1. 每个调用点（site）统计最近的主请求延迟（流式为首个有效候选的到达时间），
+   主请求超过该调用点的p90（LLM_HEDGE_QUANTILE）仍未返回时发出备份请求
+2. 备份请求发给同一模型，或 LLM_HEDGE_BACKUP_MODEL 配置的更快模型
+3. 先得到有效结果的一方胜出，另一方立即取消（流式请求关闭连接，不再消耗token）
+4. 对冲预算：每个主请求积累 LLM_HEDGE_BUDGET 个令牌，每次对冲消耗1个，
+   即额外请求不超过主请求数的该比例
+5. 截止时间感知：剩余时间不足以让备份请求完成（小于延迟中位数）时不对冲
+
+默认关闭（LLM_HEDGE_ENABLED），关闭时只统计延迟，开启后立即有p90可用。
+"""
+
+import os
+import time
+import asyncio
+import logging
+import statistics
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 对冲令牌上限（允许短时间内连续对冲的次数）
+_BUDGET_BURST = 5.0
+# 流结束（没有任何有效候选）的标记
+_END = object()
+
+
+async def _next_item(stream: AsyncIterator) -> Any:
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return _END
+
+
+class HedgePolicy:
+    """
+    单个调用点的对冲策略
+
+    Args:
+        site: 调用点名称
+        enabled: 是否对冲（关闭时只记录延迟）
+        quantile: 以该分位数延迟作为对冲等待时间
+        budget: 额外请求占主请求数的比例上限
+        backup_model: 备份请求使用的模型，None表示与主请求相同
+        min_samples: 延迟样本数不少于该值才对冲
+        window: 保留的延迟样本数
+    """
+
+    def __init__(
+        self,
+        site: str,
+        enabled: bool = False,
+        quantile: float = 0.9,
+        budget: float = 0.1,
+        backup_model: Optional[str] = None,
+        min_samples: int = 20,
+        window: int = 200
+    ):
+        self.site = site
+        self.enabled = enabled
+        self.quantile = quantile
+        self.budget = budget
+        self.backup_model = backup_model or None
+        self.min_samples = max(2, min_samples)
+
+        self._latencies: deque = deque(maxlen=window)
+        self._tokens = 1.0
+        self.stats = {
+            "requests": 0, "hedged": 0, "backup_wins": 0,
+            "budget_denied": 0, "deadline_skipped": 0, "saved_ms": 0.0
+        }
+
+    # ---------- 延迟与预算 ----------
+
+    def _percentile(self, q: float) -> float:
+        samples = sorted(self._latencies)
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def hedge_delay(self, deadline: Optional[float] = None) -> Optional[float]:
+        """
+        主请求发出多久后对冲（秒）；不对冲时返回None
+
+        Args:
+            deadline: 本次调用剩余的截止时间（秒）
+        """
+        if not self.enabled or len(self._latencies) < self.min_samples:
+            return None
+        delay = self._percentile(self.quantile)
+        if deadline is not None and deadline - delay < self._percentile(0.5):
+            self.stats["deadline_skipped"] += 1
+            return None
+        return delay
+
+    def _take_budget(self) -> bool:
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        self.stats["budget_denied"] += 1
+        return False
+
+    def _start(self):
+        self.stats["requests"] += 1
+        self._tokens = min(_BUDGET_BURST, self._tokens + self.budget)
+
+    def _finish(self, winner: int, elapsed: float):
+        """
+        记录一次调用：只有主请求胜出时记录延迟样本
+
+        备份胜出时elapsed是备份的完成时间（而主请求被取消、真实延迟未知），
+        记入样本会把p90越拉越低、对冲越来越频繁，因此丢弃。
+        """
+        if winner == 1:
+            self.stats["backup_wins"] += 1
+            # 节省的延迟按历史上比elapsed更慢的主请求的中位数估算
+            slower = [latency for latency in self._latencies if latency > elapsed]
+            if slower:
+                self.stats["saved_ms"] += (statistics.median(slower) - elapsed) * 1000
+            return
+        self._latencies.append(elapsed)
+
+    def backup_params(self, request_params: Dict[str, Any]) -> Dict[str, Any]:
+        """备份请求的chat.completions参数（按配置替换模型）"""
+        if self.backup_model:
+            return dict(request_params, model=self.backup_model)
+        return request_params
+
+    # ---------- 竞速 ----------
+
+    async def _race(self, tasks: List[asyncio.Task], valid: Callable[[Any], bool]) -> int:
+        """等待第一个有效结果，返回其下标；都无效时返回主请求下标（异常由调用方取结果时抛出）"""
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=tasks.index):
+                if not task.exception() and valid(task.result()):
+                    return tasks.index(task)
+        return 0
+
+    async def _launch_backup(self, tasks: List[asyncio.Task], start_backup: Callable[[], asyncio.Task], delay: Optional[float]):
+        if delay is None:
+            return
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done and self._take_budget():
+            self.stats["hedged"] += 1
+            tasks.append(start_backup())
+            logger.debug(f"Hedging LLM request at {self.site} after {delay:.2f}s")
+
+    async def run(
+        self,
+        primary: Callable[[], Awaitable[Any]],
+        backup: Callable[[], Awaitable[Any]],
+        valid: Callable[[Any], bool] = lambda result: result is not None,
+        deadline: Optional[float] = None
+    ) -> Any:
+        """
+        执行一次可对冲的请求
+
+        Args:
+            primary: 主请求的协程工厂
+            backup: 备份请求的协程工厂
+            valid: 结果是否有效（无效结果不会胜出，继续等另一方）
+            deadline: 本次调用剩余的截止时间（秒）
+
+        Returns:
+            先得到的有效结果；都无效时返回主请求的结果或抛出主请求的异常
+        """
+        self._start()
+        start = time.monotonic()
+        tasks = [asyncio.ensure_future(primary())]
+        try:
+            await self._launch_backup(tasks, lambda: asyncio.ensure_future(backup()), self.hedge_delay(deadline))
+            winner = await self._race(tasks, valid)
+            self._finish(winner, time.monotonic() - start)
+            return tasks[winner].result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stream(
+        self,
+        primary: Callable[[], AsyncIterator[Any]],
+        backup: Callable[[], AsyncIterator[Any]],
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[Any]:
+        """
+        可对冲的流：以首个产出的时间竞速，胜出的流继续产出，另一条流立即关闭
+
+        Args:
+            primary: 主请求的流工厂（只产出有效项，如解析好的候选）
+            backup: 备份请求的流工厂
+            deadline: 本次调用剩余的截止时间（秒）
+        """
+        self._start()
+        start = time.monotonic()
+        streams = [primary()]
+        tasks = [asyncio.ensure_future(_next_item(streams[0]))]
+
+        def start_backup() -> asyncio.Task:
+            streams.append(backup())
+            return asyncio.ensure_future(_next_item(streams[1]))
+
+        try:
+            await self._launch_backup(tasks, start_backup, self.hedge_delay(deadline))
+            winner = await self._race(tasks, lambda item: item is not _END)
+            self._finish(winner, time.monotonic() - start)
+            for i, task in enumerate(tasks):
+                if i != winner:
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for i, stream in enumerate(streams):
+                if i != winner:
+                    await stream.aclose()
+
+            first = tasks[winner].result()
+            if first is _END:
+                return
+            yield first
+            async for item in streams[winner]:
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for stream in streams:
+                await stream.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats["requests"]
+        return {
+            "enabled": self.enabled,
+            "backup_model": self.backup_model,
+            "hedge_delay_ms": round(self._percentile(self.quantile) * 1000, 1) if self._latencies else None,
+            "hedge_rate": round(self.stats["hedged"] / requests, 3) if requests else 0.0,
+            **self.stats,
+            "saved_ms": round(self.stats["saved_ms"], 1)
+        }
+
+
+# 调用点 -> 对冲策略；LLM_HEDGE_SITES 之外的调用点只统计延迟
+_policies: Dict[str, HedgePolicy] = {}
+
+
+def get_hedge_policy(site: str) -> HedgePolicy:
+    """获取调用点的全局对冲策略"""
+    if site not in _policies:
+        sites = [s.strip() for s in os.getenv("LLM_HEDGE_SITES", "related_concepts,graph_builder").split(",")]
+        _policies[site] = HedgePolicy(
+            site,
+            enabled=os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true" and site in sites,
+            quantile=float(os.getenv("LLM_HEDGE_QUANTILE", "0.9")),
+            budget=float(os.getenv("LLM_HEDGE_BUDGET", "0.1")),
+            backup_model=os.getenv("LLM_HEDGE_BACKUP_MODEL") or None,
+            min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+        )
+    return _policies[site]
+
+
+def get_hedge_stats() -> Dict[str, Any]:
+    return {site: policy.get_stats() for site, policy in _policies.items()}
@@ -0,0 +1,252 @@
+"""
+按任务路由LLM模型
+
+每类任务（翻译、简介、过滤、发现、桥接、验证、建图、问答）对应一组候选模型和
+max_tokens / 超时配置：
+1. 候选模型按档位取默认值：fast档（翻译、过滤、简介）用 LLM_MODEL_FAST，strong档用 LLM_MODEL，
+   LLM_MODEL_FALLBACK 追加为所有任务的最后一个候选；LLM_ROUTE_<TASK>_MODELS 可整体覆盖
+2. 按滑动窗口内的成功率和延迟选择：成功率过低的模型暂不使用；有足够样本的模型之间
+   选 延迟/成功率 最小的；没有样本时使用排在最前的候选
+3. 调用失败时按顺序换下一个候选重试（Router.run）
+
+不配置任何环境变量时所有任务仍使用 LLM_MODEL，与原行为一致。
+"""
+
+import os
+import time
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from shared.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from shared.rate_limiter import is_rate_limit_error
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "google/gemini-3-flash-preview"
+
+# 任务 -> (档位, max_tokens, 超时秒)，可通过 LLM_ROUTE_<TASK>_MAX_TOKENS / LLM_ROUTE_<TASK>_TIMEOUT 覆盖
+TASK_PROFILES = {
+    "translate": ("fast", 50, 10.0),      # 术语中译英
+    "filter": ("fast", 10, 5.0),          # 学术概念是/否判断
+    "summarize": ("fast", 500, 15.0),     # 一句话简介
+    "bridge_reasoning": ("fast", 1000, 15.0),  # 桥接边reasoning
+    "discover": ("strong", 2000, 40.0),   # 相关概念 / 按学科生成候选
+    "bridge": ("strong", 2000, 40.0),     # 桥梁概念
+    "verify": ("strong", 2000, 90.0),     # VerificationAgent
+    "graph_build": ("strong", 2000, 90.0),
+    "chat": ("strong", 300, 30.0),        # AI问答
+}
+
+# 成功率低于该值（且样本足够）的模型暂不使用
+MIN_SUCCESS_RATE = 0.5
+
+
+@dataclass
+class ModelStats:
+    """单个（任务, 模型）在滑动窗口内的调用结果"""
+    window_seconds: float = 300.0
+    outcomes: deque = field(default_factory=deque)  # (时间, 是否成功, 延迟秒)
+
+    def record(self, ok: bool, latency: float):
+        now = time.monotonic()
+        self.outcomes.append((now, ok, latency))
+        while self.outcomes and now - self.outcomes[0][0] > self.window_seconds:
+            self.outcomes.popleft()
+
+    @property
+    def calls(self) -> int:
+        return len(self.outcomes)
+
+    @property
+    def success_rate(self) -> float:
+        return sum(1 for _, ok, _ in self.outcomes if ok) / self.calls if self.calls else 1.0
+
+    @property
+    def latency(self) -> Optional[float]:
+        """成功调用的平均延迟（秒）"""
+        latencies = [latency for _, ok, latency in self.outcomes if ok]
+        return sum(latencies) / len(latencies) if latencies else None
+
+
+@dataclass
+class Route:
+    """一次调用选定的模型和参数"""
+    task: str
+    model: str
+    max_tokens: int
+    timeout: float
+    router: "ModelRouter" = field(repr=False)
+
+    def track(self):
+        """统计一段调用（流式读取等）的结果，见ModelRouter.track"""
+        return self.router.track(self.task, self.model)
+
+    async def call(self, factory: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """经过LLM熔断器执行一次调用并记录结果（timeout默认使用任务配置的超时）"""
+        async with self.track():
+            return await get_circuit_breaker("llm").call(factory, timeout=timeout or self.timeout)
+
+
+class ModelRouter:
+    """
+    按任务选择模型
+
+    Args:
+        min_samples: 模型在窗口内的调用数不少于该值才按统计数据比较
+        window_seconds: 统计窗口（秒），过期后失败过的模型重新获得机会
+    """
+
+    def __init__(self, min_samples: int = 5, window_seconds: float = 300.0):
+        self.min_samples = max(1, min_samples)
+        self.window_seconds = window_seconds
+        self._stats: Dict[tuple, ModelStats] = {}
+
+    # ---------- 路由表 ----------
+
+    @staticmethod
+    def candidates(task: str, default_model: Optional[str] = None) -> List[str]:
+        """任务的候选模型（按优先顺序，去重）"""
+        tier = TASK_PROFILES.get(task, ("strong",))[0]
+        configured = [m for m in os.getenv(f"LLM_ROUTE_{task.upper()}_MODELS", "").split(",") if m.strip()]
+        if configured:
+            models = configured
+        else:
+            strong = default_model or os.getenv("LLM_MODEL") or DEFAULT_MODEL
+            models = [os.getenv("LLM_MODEL_FAST", ""), strong] if tier == "fast" else [strong]
+            models.append(os.getenv("LLM_MODEL_FALLBACK", ""))
+        return list(dict.fromkeys(m.strip() for m in models if m and m.strip()))
+
+    @staticmethod
+    def profile(task: str) -> tuple:
+        """任务的(max_tokens, 超时秒)"""
+        _, max_tokens, timeout = TASK_PROFILES.get(task, ("strong", 2000, 60.0))
+        max_tokens = int(os.getenv(f"LLM_ROUTE_{task.upper()}_MAX_TOKENS", max_tokens))
+        timeout = float(os.getenv(f"LLM_ROUTE_{task.upper()}_TIMEOUT", timeout))
+        return max_tokens, timeout
+
+    # ---------- 选择 ----------
+
+    def _model_stats(self, task: str, model: str) -> ModelStats:
+        key = (task, model)
+        if key not in self._stats:
+            self._stats[key] = ModelStats(window_seconds=self.window_seconds)
+        return self._stats[key]
+
+    def _healthy(self, task: str, model: str) -> bool:
+        stats = self._model_stats(task, model)
+        return stats.calls < self.min_samples or stats.success_rate >= MIN_SUCCESS_RATE
+
+    def route(
+        self,
+        task: str,
+        default_model: Optional[str] = None,
+        exclude: Iterable[str] = ()
+    ) -> Optional[Route]:
+        """
+        为一次调用选择模型
+
+        Args:
+            task: 任务类型（见TASK_PROFILES）
+            default_model: strong档的默认模型（默认LLM_MODEL）
+            exclude: 本次调用已经失败过的模型
+
+        Returns:
+            Route；候选都已排除时返回None
+        """
+        excluded = set(exclude)
+        models = [m for m in self.candidates(task, default_model) if m not in excluded]
+        if not models:
+            return None
+        eligible = [m for m in models if self._healthy(task, m)] or models
+
+        def score(model: str) -> float:
+            stats = self._model_stats(task, model)
+            if stats.calls >= self.min_samples and stats.latency is not None:
+                return stats.latency / max(stats.success_rate, 0.01)
+            # 样本不足：排在最前的候选优先，其余候选只在作为回退被调用后才参与比较
+            return 0.0 if model == eligible[0] else float("inf")
+
+        max_tokens, timeout = self.profile(task)
+        return Route(task, min(eligible, key=score), max_tokens, timeout, self)
+
+    # ---------- 记录 ----------
+
+    def record(self, task: str, model: str, ok: bool, latency: float):
+        self._model_stats(task, model).record(ok, latency)
+
+    @asynccontextmanager
+    async def track(self, task: str, model: str):
+        """
+        记录一段调用的结果：正常结束（含生成器提前关闭）记成功，异常记失败
+
+        熔断、限流（429）和取消与模型本身无关，不计入。
+        """
+        start = time.monotonic()
+        try:
+            yield
+        except GeneratorExit:
+            self.record(task, model, True, time.monotonic() - start)
+            raise
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            if not is_rate_limit_error(e):
+                self.record(task, model, False, time.monotonic() - start)
+            raise
+        else:
+            self.record(task, model, True, time.monotonic() - start)
+
+    async def run(
+        self,
+        task: str,
+        attempt: Callable[[Route], Awaitable[Any]],
+        default_model: Optional[str] = None
+    ) -> Any:
+        """
+        按路由执行调用，失败时依次换下一个候选模型（熔断时直接抛出）
+
+        Args:
+            attempt: 接收Route、发出请求的协程函数（内部用route.call记录结果）
+        """
+        tried: List[str] = []
+        while True:
+            route = self.route(task, default_model, exclude=tried)
+            if route is None:
+                raise ValueError(f"No model configured for LLM task {task}")
+            try:
+                return await attempt(route)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                tried.append(route.model)
+                if self.route(task, default_model, exclude=tried) is None:
+                    raise
+                logger.warning(f"LLM task {task} failed on {route.model}, falling back: {type(e).__name__} {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        for (task, model), stats in self._stats.items():
+            latency = stats.latency
+            data.setdefault(task, {})[model] = {
+                "calls": stats.calls,
+                "success_rate": round(stats.success_rate, 3),
+                "avg_latency_ms": round(latency * 1000, 1) if latency is not None else None
+            }
+        return data
+
+
+# 全局实例
+_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    global _router
+    if _router is None:
+        _router = ModelRouter(
+            min_samples=int(os.getenv("LLM_ROUTE_MIN_SAMPLES", "5")),
+            window_seconds=float(os.getenv("LLM_ROUTE_WINDOW_SECONDS", "300"))
+        )
+    return _router
@@ -0,0 +1,163 @@
+"""
+OpenAI兼容客户端工厂 - 所有AsyncOpenAI客户端的统一入口
+
+1. 每个base URL共享一个httpx连接池（连接上限、keep-alive、HTTP/2可配置），
+   同一服务的不同调用点、不同API Key复用同一组连接
+2. 连接池之上按提供方（llm / embedding）和上游主机接入自适应限流器
+3. 按调用点（site）统一SDK层超时和重试次数，可通过 OPENAI_CLIENT_TIMEOUT_<SITE> /
+   OPENAI_CLIENT_RETRIES_<SITE> 覆盖；调用方自己的截止时间（asyncio超时、熔断器）仍然生效
+4. 每个连接池统计并发峰值、排队次数和饱和度（/metrics 的 openai_pools）
+"""
+
+import os
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+
+from shared.http_pool import HTTP2_AVAILABLE, MeteredTransport, SaturationMetrics
+from shared.rate_limiter import RateLimitedTransport, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# 服务 -> (API Key环境变量（按顺序取第一个）, base URL环境变量, 默认base URL)
+SERVICES = {
+    "openrouter": (("OPENROUTER_API_KEY", "OPENAI_API_KEY"), "OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"),
+    # 只认OPENROUTER_API_KEY（节点生成器一直如此，避免误把OpenAI的Key发给OpenRouter）
+    "openrouter_only": (("OPENROUTER_API_KEY",), "OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"),
+    "openai": (("OPENAI_API_KEY",), "OPENAI_BASE_URL", "https://api.openai.com/v1"),
+}
+
+# 调用点 -> (服务, 限流提供方, SDK超时秒, SDK重试次数)
+CALL_SITES = {
+    "generation": ("openrouter", "llm", 60.0, 1),    # 后端候选生成、简介、翻译、边reasoning（调用方另有更短的截止时间）
+    "node_generation": ("openrouter_only", "llm", 60.0, 1),  # real_node_generator / multi_function_generator
+    "chat": ("openrouter", "llm", 30.0, 1),          # AI问答
+    "agent": ("openrouter", "llm", 90.0, 0),         # LLMClient，自带重试
+    "classifier": ("openai", "llm", 30.0, 1),        # DisciplineClassifier
+    "embedding": ("openai", "embedding", 60.0, 2),
+}
+
+
+class OpenAIClientFactory:
+    """按base URL共享连接池、按调用点配置超时重试的AsyncOpenAI客户端工厂"""
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None
+    ):
+        self.max_connections = max_connections or int(os.getenv("OPENAI_POOL_MAX_CONNECTIONS", "50"))
+        self.max_keepalive = max_keepalive or int(os.getenv("OPENAI_POOL_MAX_KEEPALIVE", "20"))
+        self.keepalive_expiry = keepalive_expiry or float(os.getenv("OPENAI_POOL_KEEPALIVE_EXPIRY", "60"))
+        if http2 is None:
+            http2 = os.getenv("HTTP_POOL_HTTP2", "true").lower() == "true"
+        self.http2 = http2 and HTTP2_AVAILABLE
+
+        self._pools: Dict[str, MeteredTransport] = {}                     # base URL -> 连接池
+        self._http_clients: Dict[Tuple[str, str], httpx.AsyncClient] = {}  # (base URL, 提供方) -> httpx客户端
+        self._clients: Dict[Tuple[str, str, str], AsyncOpenAI] = {}        # (调用点, base URL, API Key) -> 客户端
+
+    def _pool(self, base_url: str) -> MeteredTransport:
+        if base_url not in self._pools:
+            self._pools[base_url] = MeteredTransport(
+                httpx.AsyncHTTPTransport(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_keepalive,
+                        keepalive_expiry=self.keepalive_expiry
+                    ),
+                    http2=self.http2
+                ),
+                SaturationMetrics(self.max_connections)
+            )
+        return self._pools[base_url]
+
+    def http_client(self, base_url: str, provider: str) -> httpx.AsyncClient:
+        """
+        同一base URL的所有提供方共享连接池，各自经过对应的限流器
+
+        限流器按(提供方, 主机)区分：OpenRouter与OpenAI的429、拥塞互不影响
+        """
+        key = (base_url, provider)
+        if key not in self._http_clients:
+            limiter = get_rate_limiter(f"{provider}:{httpx.URL(base_url).host}")
+            self._http_clients[key] = httpx.AsyncClient(
+                transport=RateLimitedTransport(limiter, self._pool(base_url)),
+                follow_redirects=True
+            )
+        return self._http_clients[key]
+
+    @staticmethod
+    def site_options(site: str) -> Tuple[str, str, float, int]:
+        """调用点的(服务, 限流提供方, 超时, 重试次数)"""
+        service, provider, timeout, retries = CALL_SITES.get(site, ("openrouter", "llm", 60.0, 1))
+        timeout = float(os.getenv(f"OPENAI_CLIENT_TIMEOUT_{site.upper()}", timeout))
+        retries = int(os.getenv(f"OPENAI_CLIENT_RETRIES_{site.upper()}", retries))
+        return service, provider, timeout, retries
+
+    def get_client(self, site: str, api_key: Optional[str] = None, base_url: Optional[str] = None) -> Optional[AsyncOpenAI]:
+        """
+        获取调用点的客户端
+
+        Args:
+            site: 调用点（见CALL_SITES）
+            api_key: 默认按调用点所属服务读取环境变量（见SERVICES）
+            base_url: 同上
+
+        Returns:
+            AsyncOpenAI客户端；没有可用的API Key时返回None
+        """
+        service, provider, timeout, retries = self.site_options(site)
+        key_envs, base_url_env, default_base_url = SERVICES[service]
+        api_key = api_key or next((os.getenv(env) for env in key_envs if os.getenv(env)), None)
+        base_url = base_url or os.getenv(base_url_env, default_base_url)
+        if not api_key:
+            return None
+
+        base_url = base_url.rstrip("/")
+        key = (site, base_url, api_key)
+        if key not in self._clients:
+            self._clients[key] = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=httpx.Timeout(timeout, connect=10.0),
+                max_retries=retries,
+                http_client=self.http_client(base_url, provider)
+            )
+            logger.info(f"OpenAI client created: site={site}, base_url={base_url}, timeout={timeout}s, retries={retries}")
+        return self._clients[key]
+
+    async def close(self):
+        """关闭所有连接池（应用关闭时调用），之后再获取客户端会重新创建"""
+        for pool in self._pools.values():
+            await pool.aclose()
+        self._pools.clear()
+        self._http_clients.clear()
+        self._clients.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "clients": len(self._clients),
+            "pools": {base_url: pool.metrics.snapshot() for base_url, pool in self._pools.items()}
+        }
+
+
+# 全局实例
+_factory: Optional[OpenAIClientFactory] = None
+
+
+def get_client_factory() -> OpenAIClientFactory:
+    global _factory
+    if _factory is None:
+        _factory = OpenAIClientFactory()
+    return _factory
+
+
+def get_openai_client(site: str, api_key: Optional[str] = None, base_url: Optional[str] = None) -> Optional[AsyncOpenAI]:
+    """获取调用点的共享AsyncOpenAI客户端（见OpenAIClientFactory.get_client）"""
+    return get_client_factory().get_client(site, api_key=api_key, base_url=base_url)
@@ -0,0 +1,350 @@
+"""
+自适应限流 - LLM / Embedding调用的全局限流器
+
+每个提供方一个限流器，按"类别:主机"区分（如 llm:openrouter.ai、llm:api.openai.com），
+不同上游的429和拥塞互不影响；配置按类别（llm / embedding）读取：
+1. 并发上限按AIMD调整：成功时加性增长，收到429（或首字节延迟明显变长）时乘性减小；
+   首字节延迟按请求类别（流式 / 非流式按max_tokens分档）分别求均值，
+   避免长输出的调用被当成拥塞信号
+2. 令牌桶：请求数（RPS）和token数（TPM，按请求体估算）两个桶
+3. 优先级通道：等待并发名额时interactive优先于background
+
+通过httpx传输层接入（RateLimitedTransport，由shared.openai_clients装配），所有走该客户端的请求
+（含OpenAI SDK自身的重试、流式响应）都会被限流；流式响应在流关闭时才释放名额。
+"""
+
+import os
+import json
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"interactive": 0, "background": 1}
+
+# 当前请求的优先级（默认interactive），后台任务用 with request_priority("background") 包裹
+_priority: ContextVar[str] = ContextVar("rate_limit_priority", default="interactive")
+
+
+@contextmanager
+def request_priority(lane: str):
+    """在with块内发出的LLM/Embedding请求使用指定优先级通道"""
+    token = _priority.set(lane)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """判断异常是否为上游限流（429）"""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or "rate_limit" in str(error).lower() or "429" in str(error)
+
+
+class TokenBucket:
+    """令牌桶：rate为每秒补充量，capacity为桶容量；rate<=0表示不限"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        """取出amount个令牌；超过容量的请求在桶满时放行（余额变为负数，后续请求等待补齐）"""
+        if self.rate <= 0:
+            return
+        while True:
+            self._refill()
+            if self.tokens >= min(amount, self.capacity):
+                self.tokens -= amount
+                return
+            await asyncio.sleep((min(amount, self.capacity) - self.tokens) / self.rate)
+
+
+class AdaptiveLimiter:
+    """
+    单个提供方的限流器
+
+    Args:
+        name: 提供方名称
+        max_concurrency: 并发上限的上界（AIMD不会超过）
+        min_concurrency: 并发上限的下界
+        requests_per_second: 请求令牌桶速率（<=0不限）
+        tokens_per_minute: token令牌桶速率（<=0不限）
+        decrease_factor: 429时并发上限的乘性系数
+        latency_factor: 首字节延迟超过同类请求均值的该倍数时视为拥塞
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        requests_per_second: float = 0,
+        tokens_per_minute: float = 0,
+        decrease_factor: float = 0.5,
+        latency_factor: float = 3.0
+    ):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = float(self.max_concurrency)
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+
+        self.requests = TokenBucket(requests_per_second, max(requests_per_second, 1))
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute / 6.0 if tokens_per_minute > 0 else 1)
+
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None         # 所有请求，用于拥塞窗口长度
+        self._class_latency: Dict[str, float] = {}        # 请求类别 -> 延迟均值，用于判断拥塞
+        self.paused_until = 0.0
+        self._last_decrease = 0.0
+        self._waiters: list = []  # (优先级, 序号, future)
+        self._seq = itertools.count()
+        self.stats = {"requests": 0, "rate_limited": 0, "decreases": 0, "queued": {lane: 0 for lane in PRIORITIES}}
+
+    # ---------- 并发名额 ----------
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < max(self.min_concurrency, int(self.limit))
+
+    def _wake(self):
+        while self._waiters and self._has_capacity():
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    async def acquire(self, priority: Optional[str] = None, tokens: float = 0):
+        """按优先级获取并发名额，再扣减请求/ token令牌桶"""
+        lane = priority or _priority.get()
+        pause = self.paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+        if self._has_capacity() and not self._waiters:
+            self.in_flight += 1
+        else:
+            self.stats["queued"][lane] = self.stats["queued"].get(lane, 0) + 1
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (PRIORITIES.get(lane, 0), next(self._seq), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self.release()
+                raise
+
+        try:
+            await self.requests.acquire(1)
+            if tokens:
+                await self.tokens.acquire(tokens)
+        except BaseException:
+            self.release()
+            raise
+        self.stats["requests"] += 1
+
+    def release(self):
+        self.in_flight = max(0, self.in_flight - 1)
+        self._wake()
+
+    # ---------- AIMD ----------
+
+    def on_success(self, latency: float, latency_class: str = "default"):
+        """成功：延迟正常时加性增长（约每个并发窗口+1），延迟异常时轻微回退"""
+        baseline = self._class_latency.get(latency_class, latency)
+        congested = latency > baseline * self.latency_factor
+        self._class_latency[latency_class] = 0.8 * baseline + 0.2 * latency
+        self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+        if congested:
+            self._decrease(0.9)
+        else:
+            self.limit = min(float(self.max_concurrency), self.limit + 1.0 / max(self.limit, 1.0))
+            self._wake()
+
+    def on_rate_limited(self, retry_after: Optional[float] = None):
+        """收到429：乘性减小并发上限，并按Retry-After暂停新请求"""
+        self.stats["rate_limited"] += 1
+        self._decrease(self.decrease_factor)
+        if retry_after:
+            self.paused_until = max(self.paused_until, time.monotonic() + min(retry_after, 60.0))
+
+    def _decrease(self, factor: float):
+        # 同一拥塞窗口（约一个平均延迟）内只减小一次
+        now = time.monotonic()
+        if now - self._last_decrease < (self.latency_ewma or 1.0):
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_concurrency), self.limit * factor)
+        self.stats["decreases"] += 1
+        logger.warning(f"Rate limiter '{self.name}': concurrency limit -> {self.limit:.1f}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": len([w for w in self._waiters if not w[2].done()]),
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma else None,
+            "latency_by_class_ms": {k: round(v * 1000, 1) for k, v in self._class_latency.items()},
+            **self.stats
+        }
+
+
+def _request_body(request: httpx.Request) -> bytes:
+    try:
+        return request.content
+    except httpx.RequestNotRead:
+        return b""
+
+
+def _request_json(body: bytes) -> Dict[str, Any]:
+    try:
+        payload = json.loads(body) if body else {}
+    except ValueError:
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def estimate_tokens(request: httpx.Request) -> int:
+    """按请求体估算token数：提示词约每2个字符1个token，加上max_tokens"""
+    body = _request_body(request)
+    if not body:
+        return 0
+    estimate = len(body.decode("utf-8", errors="ignore")) // 2
+    try:
+        estimate += int(_request_json(body).get("max_tokens") or 0)
+    except (TypeError, ValueError):
+        pass
+    return estimate
+
+
+def latency_class(request: httpx.Request) -> str:
+    """
+    请求的延迟类别：首字节延迟只在同类请求之间比较
+
+    流式请求的首字节延迟与输出长度无关；非流式请求要等全部输出生成完，
+    按max_tokens以2的幂分档（256、512、1024...）
+    """
+    payload = _request_json(_request_body(request))
+    if payload.get("stream"):
+        return "stream"
+    try:
+        max_tokens = int(payload.get("max_tokens") or payload.get("max_completion_tokens") or 0)
+    except (TypeError, ValueError):
+        max_tokens = 0
+    if max_tokens <= 0:
+        return "default"
+    return f"max_tokens<={max(256, 1 << (max_tokens - 1).bit_length())}"
+
+
+class ReleasingStream(httpx.AsyncByteStream):
+    """响应流关闭时执行回调（如释放并发名额；流式响应在读取完之前一直占用）"""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """httpx传输层包装：请求前获取限流名额，按响应状态和首字节延迟调整并发上限"""
+
+    def __init__(self, limiter: AdaptiveLimiter, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.limiter = limiter
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self.limiter.acquire(tokens=estimate_tokens(request))
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.limiter.release()
+
+        start = time.monotonic()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+
+        if response.status_code == 429:
+            retry_after = response.headers.get("retry-after")
+            try:
+                retry_after = float(retry_after) if retry_after else None
+            except ValueError:
+                retry_after = None
+            self.limiter.on_rate_limited(retry_after)
+        elif response.status_code < 500:
+            self.limiter.on_success(time.monotonic() - start, latency_class(request))
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=ReleasingStream(response.stream, release),
+            extensions=response.extensions
+        )
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+# 类别默认配置：(最大并发, RPS, TPM)，可通过 RATE_LIMIT_<类别>_* 环境变量覆盖（同一类别的各主机分别计量）
+DEFAULT_LIMITS = {
+    "llm": (16, 10, 0),
+    "embedding": (8, 10, 0),
+}
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+
+
+def get_rate_limiter(provider: str) -> AdaptiveLimiter:
+    """
+    获取提供方的全局限流器
+
+    Args:
+        provider: 类别（llm / embedding），或"类别:主机"（每个上游主机一个限流器）
+    """
+    if provider not in _limiters:
+        kind = provider.split(":", 1)[0]
+        concurrency, rps, tpm = DEFAULT_LIMITS.get(kind, (8, 0, 0))
+        prefix = f"RATE_LIMIT_{kind.upper()}"
+        _limiters[provider] = AdaptiveLimiter(
+            provider,
+            max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", concurrency)),
+            min_concurrency=int(os.getenv(f"{prefix}_MIN_CONCURRENCY", 1)),
+            requests_per_second=float(os.getenv(f"{prefix}_RPS", rps)),
+            tokens_per_minute=float(os.getenv(f"{prefix}_TPM", tpm))
+        )
+    return _limiters[provider]
+
+
+def get_rate_limit_stats() -> Dict[str, Any]:
+    return {name: limiter.get_stats() for name, limiter in _limiters.items()}
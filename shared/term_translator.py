@@ -0,0 +1,379 @@
+"""
+学术术语中译英 - 术语表优先，其次翻译缓存，最后批量调用LLM
+
+1. 术语表：随代码发布的常用学术术语（shared/data/academic_glossary_zh_en.json），
+   TRANSLATION_GLOSSARY_PATH 可追加/覆盖（逗号分隔的多个JSON文件）。只有整体命中
+   （含术语表中明确列出的复合术语）才直接使用，不调用LLM
+2. 翻译缓存：LLM译文按术语保存在进程内和Redis Hash中（不过期，术语译法基本不变）
+3. 批量翻译：未命中的术语在很短的窗口（TRANSLATION_BATCH_WINDOW）内攒批，
+   一次LLM调用翻译多个术语；同一术语在攒批或翻译中时共用一个结果
+
+逐词拼接的译文常常不地道（"拓扑绝缘体"会拼成"topology insulator"），
+因此复合术语按字符前缀树最长匹配切分出的逐词译文只作为LLM的参考，
+LLM失败时才作为兜底。都失败时返回原文，不缓存。
+"""
+
+import os
+import re
+import json
+import asyncio
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from shared.llm_cache import get_llm_cache
+from shared.model_router import Route, get_model_router
+from shared.openai_clients import get_openai_client
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_GLOSSARY = Path(__file__).parent / "data" / "academic_glossary_zh_en.json"
+
+# Redis Hash：术语 -> 英文译文
+REDIS_KEY = "translation:zh-en:v1"
+
+# 切分时可以跳过或直接翻译的连接词
+CONNECTORS = {"的": "", "与": "and", "和": "and", "及": "and"}
+
+_CJK = re.compile(r"[\u4e00-\u9fff]")
+_END = ""  # 前缀树中的终止标记
+
+
+def has_cjk(text: str) -> bool:
+    return bool(_CJK.search(text))
+
+
+class Glossary:
+    """中英术语表（精确查找 + 前缀树最长匹配逐词切分）"""
+
+    def __init__(self, terms: Optional[Dict[str, str]] = None):
+        self.terms: Dict[str, str] = {}
+        self._trie: Dict[str, dict] = {}
+        for zh, en in (terms or {}).items():
+            self.add(zh, en)
+
+    @classmethod
+    def load(cls, paths: Iterable[Path]) -> "Glossary":
+        """按顺序加载JSON术语表（{"中文": "English"}），后加载的覆盖先加载的"""
+        glossary = cls()
+        for path in paths:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    for zh, en in json.load(f).items():
+                        glossary.add(zh, en)
+            except Exception as e:
+                logger.warning(f"Failed to load glossary {path}: {e}")
+        return glossary
+
+    def add(self, zh: str, en: str):
+        zh, en = zh.strip(), en.strip()
+        if not zh or not en:
+            return
+        self.terms[zh] = en
+        node = self._trie
+        for char in zh:
+            node = node.setdefault(char, {})
+        node[_END] = en
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _longest_match(self, text: str, start: int) -> tuple:
+        """从start开始的最长术语，返回(结束位置, 译文)，没有匹配时返回(start, None)"""
+        node, end, translation = self._trie, start, None
+        for i in range(start, len(text)):
+            node = node.get(text[i])
+            if node is None:
+                break
+            if _END in node:
+                end, translation = i + 1, node[_END]
+        return end, translation
+
+    def translate(self, text: str) -> Optional[str]:
+        """术语表中的译文（只认整体命中），未收录时返回None"""
+        return self.terms.get(text.strip())
+
+    def segment(self, text: str) -> Optional[str]:
+        """
+        逐词译文：切分为术语（及连接词、非中文片段）后拼接，不保证是地道译法
+
+        Returns:
+            逐词译文；有中文部分无法匹配时返回None
+        """
+        text = text.strip()
+        if text in self.terms:
+            return self.terms[text]
+
+        words: List[str] = []
+        for chunk in text.split():
+            i = 0
+            while i < len(chunk):
+                end, translation = self._longest_match(chunk, i)
+                if translation is not None:
+                    words.append(translation)
+                    i = end
+                elif chunk[i] in CONNECTORS:
+                    words.append(CONNECTORS[chunk[i]])
+                    i += 1
+                elif not _CJK.match(chunk[i]):
+                    # 非中文片段（英文缩写、数字等）原样保留
+                    j = i
+                    while j < len(chunk) and not _CJK.match(chunk[j]):
+                        j += 1
+                    words.append(chunk[i:j])
+                    i = j
+                else:
+                    return None
+        return " ".join(w for w in words if w) or None
+
+
+class TermTranslator:
+    """
+    术语翻译器
+
+    Args:
+        glossary: 术语表
+        batch_window: 未命中术语的攒批等待时间（秒）
+        max_batch: 单次LLM调用最多翻译的术语数
+        max_entries: 进程内翻译缓存容量
+    """
+
+    def __init__(
+        self,
+        glossary: Optional[Glossary] = None,
+        batch_window: float = 0.05,
+        max_batch: int = 20,
+        max_entries: int = 10000,
+        redis=None
+    ):
+        self.glossary = glossary or Glossary()
+        self.batch_window = batch_window
+        self.max_batch = max(1, max_batch)
+        self.max_entries = max_entries
+        self.redis = redis
+
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}    # 攒批中
+        self._in_flight: Dict[str, asyncio.Future] = {}  # 已发出、LLM尚未返回
+        self._hints: Dict[str, str] = {}                  # 术语 -> 逐词译文（LLM参考与兜底）
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {
+            "glossary_hits": 0, "memory_hits": 0, "redis_hits": 0,
+            "llm_terms": 0, "llm_calls": 0, "gloss_fallbacks": 0, "failures": 0
+        }
+
+    def attach_redis(self, client):
+        """挂载Redis层（redis.asyncio客户端，decode_responses=True）"""
+        self.redis = client
+        logger.info("Term translator: Redis tier attached")
+
+    # ---------- 缓存 ----------
+
+    def _remember(self, term: str, translation: str):
+        self._memory[term] = translation
+        self._memory.move_to_end(term)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def _cached(self, term: str) -> Optional[str]:
+        if term in self._memory:
+            self._memory.move_to_end(term)
+            self.stats["memory_hits"] += 1
+            return self._memory[term]
+        if self.redis is not None:
+            try:
+                translation = await self.redis.hget(REDIS_KEY, term)
+            except Exception as e:
+                logger.warning(f"Translation cache Redis read failed: {e}")
+                translation = None
+            if translation:
+                self._remember(term, translation)
+                self.stats["redis_hits"] += 1
+                return translation
+        return None
+
+    async def _store(self, translations: Dict[str, str]):
+        for term, translation in translations.items():
+            self._remember(term, translation)
+        if self.redis is not None and translations:
+            try:
+                await self.redis.hset(REDIS_KEY, mapping=translations)
+            except Exception as e:
+                logger.warning(f"Translation cache Redis write failed: {e}")
+
+    # ---------- 翻译 ----------
+
+    async def translate(self, text: str) -> str:
+        """翻译单个中文术语；不含中文或翻译失败时返回原文"""
+        return (await self.translate_many([text]))[text]
+
+    async def translate_many(self, texts: Iterable[str]) -> Dict[str, str]:
+        """
+        翻译多个术语，未命中的术语合并为一次（或按max_batch分为几次）LLM调用
+
+        Returns:
+            原文 -> 译文（失败时为原文）
+        """
+        results: Dict[str, str] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        for text in dict.fromkeys(texts):
+            term = text.strip()
+            if not has_cjk(term):
+                results[text] = text
+                continue
+            translation = self.glossary.translate(term)
+            if translation is not None:
+                self.stats["glossary_hits"] += 1
+                results[text] = translation
+                continue
+            translation = await self._cached(term)
+            if translation is not None:
+                results[text] = translation
+                continue
+            waiting[text] = self._enqueue(term, self.glossary.segment(term))
+
+        for text, future in waiting.items():
+            # 共用的future可能还有其他等待方，本调用被取消时不能连带取消它
+            translation = await asyncio.shield(future)
+            results[text] = translation if translation else text
+        return results
+
+    def _enqueue(self, term: str, hint: Optional[str] = None) -> asyncio.Future:
+        """加入攒批队列（相同术语在攒批或翻译中时共用一个结果）"""
+        if term in self._in_flight:
+            return self._in_flight[term]
+        if term not in self._pending:
+            if hint:
+                self._hints[term] = hint
+            self._pending[term] = asyncio.get_running_loop().create_future()
+            if len(self._pending) >= self.max_batch:
+                asyncio.ensure_future(self._flush())
+            elif self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.ensure_future(self._flush_later())
+        return self._pending[term]
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.batch_window)
+        await self._flush()
+
+    async def _flush(self):
+        while self._pending:
+            batch = dict(list(self._pending.items())[:self.max_batch])
+            hints = {}
+            for term in batch:
+                self._in_flight[term] = self._pending.pop(term)
+                if term in self._hints:
+                    hints[term] = self._hints.pop(term)
+            translations: Dict[str, str] = {}
+            try:
+                translations = await self._llm_translate(list(batch), hints)
+                await self._store(translations)
+            except Exception as e:
+                logger.warning(f"Batch translation failed for {len(batch)} terms: {e}")
+            finally:
+                self._resolve(batch, translations, hints)
+
+    def _resolve(self, batch: Dict[str, asyncio.Future], translations: Dict[str, str], hints: Dict[str, str]):
+        """设置一批术语的结果：LLM译文，其次逐词译文（不缓存，下次仍交给LLM），都没有时为None"""
+        for term, future in batch.items():
+            translation = translations.get(term)
+            if translation is None and term in hints:
+                translation = hints[term]
+                self.stats["gloss_fallbacks"] += 1
+            elif translation is None:
+                self.stats["failures"] += 1
+            if not future.done():
+                future.set_result(translation)
+            if self._in_flight.get(term) is future:
+                del self._in_flight[term]
+
+    async def _llm_translate(self, terms: List[str], hints: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        一次LLM调用翻译多个术语，返回成功翻译的部分
+
+        Args:
+            terms: 待翻译术语
+            hints: 术语 -> 术语表逐词译文，作为参考附在提示词中
+        """
+        client = get_openai_client("generation")
+        if not client:
+            return {}
+
+        hints = {t: hints[t] for t in terms if hints and hints.get(t)}
+        if len(terms) == 1:
+            instruction = f"将以下中文学术术语翻译成英文（只输出英文，不要解释）：{terms[0]}"
+        else:
+            listing = "\n".join(terms)
+            instruction = (
+                "将以下中文学术术语逐个翻译成英文，输出JSON对象，键为原中文术语，值为英文译文，不要解释：\n"
+                f"{listing}"
+            )
+        if hints:
+            reference = "\n".join(f"{t}: {hint}" for t, hint in hints.items())
+            instruction += f"\n\n参考（术语表逐词直译，可能不是规范译法，请给出该领域的规范术语）：\n{reference}"
+
+        async def attempt(route: Route) -> Optional[str]:
+            request_params = dict(
+                model=route.model,
+                messages=[
+                    {"role": "system", "content": "你是一个专业的学术翻译助手，擅长将中文学术术语翻译成精准的英文。"},
+                    {"role": "user", "content": instruction}
+                ],
+                temperature=0.1,
+                max_tokens=route.max_tokens * len(terms),
+                extra_body={"reasoning": {"enabled": False}}
+            )
+            return await get_llm_cache().complete(
+                "translate", request_params,
+                lambda: route.call(lambda: client.chat.completions.create(**request_params))
+            )
+
+        self.stats["llm_calls"] += 1
+        content = await get_model_router().run("translate", attempt)
+        if not content:
+            return {}
+
+        if len(terms) == 1:
+            translations = {terms[0]: content}
+        else:
+            start, end = content.find("{"), content.rfind("}")
+            translations = json.loads(content[start:end + 1]) if start != -1 and end > start else {}
+
+        cleaned = {}
+        for term in terms:
+            translation = str(translations.get(term) or "").strip().strip(' "\'“”‘’')
+            if translation and not has_cjk(translation):
+                cleaned[term] = translation
+        self.stats["llm_terms"] += len(cleaned)
+        return cleaned
+
+    def clear_memory(self):
+        """清空进程内翻译缓存（Redis层随/cache/clear一起清除）"""
+        self._memory.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "glossary_terms": len(self.glossary),
+            "memory_entries": len(self._memory),
+            "redis_tier": self.redis is not None,
+            **self.stats
+        }
+
+
+# 全局实例
+_translator: Optional[TermTranslator] = None
+
+
+def get_term_translator() -> TermTranslator:
+    """获取全局术语翻译器"""
+    global _translator
+    if _translator is None:
+        extra = [Path(p.strip()) for p in os.getenv("TRANSLATION_GLOSSARY_PATH", "").split(",") if p.strip()]
+        _translator = TermTranslator(
+            glossary=Glossary.load([BUNDLED_GLOSSARY, *extra]),
+            batch_window=float(os.getenv("TRANSLATION_BATCH_WINDOW", "0.05")),
+            max_batch=int(os.getenv("TRANSLATION_MAX_BATCH", "20")),
+            max_entries=int(os.getenv("TRANSLATION_CACHE_SIZE", "10000"))
+        )
+    return _translator
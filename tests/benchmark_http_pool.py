@@ -0,0 +1,67 @@
+"""
+HTTP连接池基准测试：重复Arxiv查询的单次耗时（每次新建客户端 vs 共享连接池）
+
+运行：python tests/benchmark_http_pool.py [查询次数] [URL]
+"""
+
+import sys
+import time
+import asyncio
+import statistics
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared.http_pool import HttpPools
+
+ARXIV_URL = "https://export.arxiv.org/api/query"
+QUERIES = ["entropy", "least squares", "neural network", "information theory", "thermodynamics"]
+
+
+async def per_call_client(url: str, rounds: int) -> list:
+    """原实现：每次查询创建新的httpx.AsyncClient（每次TCP+TLS握手）"""
+    timings = []
+    for i in range(rounds):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=20.0, follow_redirects=True) as client:
+            await client.get(url, params={"search_query": f"all:{QUERIES[i % len(QUERIES)]}", "max_results": 1})
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def pooled_client(url: str, rounds: int) -> tuple:
+    """共享连接池：keep-alive复用连接"""
+    pools = HttpPools()
+    await pools.start()
+    timings = []
+    try:
+        for i in range(rounds):
+            start = time.perf_counter()
+            async with pools.borrow("arxiv") as client:
+                await client.get(url, params={"search_query": f"all:{QUERIES[i % len(QUERIES)]}", "max_results": 1})
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings, pools.get_stats()["pools"]["arxiv"]
+    finally:
+        await pools.close()
+
+
+def describe(name: str, timings: list):
+    print(f"{name:<12} median={statistics.median(timings):7.1f}ms  mean={statistics.mean(timings):7.1f}ms  "
+          f"first={timings[0]:7.1f}ms  rest_median={statistics.median(timings[1:]) if len(timings) > 1 else 0:7.1f}ms")
+
+
+async def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    url = sys.argv[2] if len(sys.argv) > 2 else ARXIV_URL
+
+    print(f"目标: {url}, 每组{rounds}次查询\n")
+    describe("per-call", await per_call_client(url, rounds))
+    timings, stats = await pooled_client(url, rounds)
+    describe("pooled", timings)
+    print(f"\n连接池统计: {stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""Arxiv查询结果缓存单元测试"""
+
+import sys
+import json
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared import arxiv_cache
+from shared.arxiv_cache import ArxivCache, make_cache_key
+from algorithms import data_crawler
+from algorithms.data_crawler import DataCrawler
+from shared.arxiv_scheduler import ArxivRequestError
+
+
+class DictRedis:
+    """最小的异步Redis替身（get/set/ttl，set支持nx）"""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def ttl(self, key):
+        return self.expiry.get(key, -2)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        self.expiry[key] = ex
+        return True
+
+
+def papers(n):
+    return [{"title": f"paper {i}", "link": f"https://arxiv.org/abs/{i}"} for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_larger_result_set_serves_smaller_requests():
+    cache = ArxivCache()
+    assert make_cache_key("api", "  Quantum   Entanglement ") == make_cache_key("api", "quantum entanglement")
+    assert make_cache_key("api", "entropy") != make_cache_key("crawler", "entropy")
+
+    await cache.store("api", "Entropy", 10, papers(10))
+    assert await cache.lookup("api", "entropy", 3) == (papers(3), None)
+    assert await cache.lookup("api", "entropy", 10) == (papers(10), None)
+    assert await cache.lookup("api", "entropy", 20) is None  # 可能还有更多结果
+
+    # 结果少于请求数说明已取全
+    await cache.store("api", "rare topic", 10, papers(4))
+    assert await cache.lookup("api", "rare topic", 50) == (papers(4), None)
+    assert cache.stats["memory_hits"] == 3 and cache.stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_negative_entries_use_shorter_ttls():
+    redis = DictRedis()
+    cache = ArxivCache(ttl=100, negative_ttl=10, error_ttl=2, redis=redis)
+
+    await cache.store("api", "found", 5, papers(5))
+    await cache.store("api", "nothing", 5, [])
+    await cache.store("api", "broken", 5, [], error="Arxiv API返回状态码 503")
+    assert [redis.expiry[make_cache_key("api", q)] for q in ("found", "nothing", "broken")] == [100, 10, 2]
+
+    assert await cache.lookup("api", "nothing", 50) == ([], None)
+    assert await cache.lookup("api", "broken", 5) == ([], "Arxiv API返回状态码 503")
+    assert cache.stats["negative_hits"] == 2
+
+    # 失败不覆盖仍有效的成功结果
+    await cache.store("api", "found", 5, [], error="timeout")
+    assert await cache.lookup("api", "found", 5) == (papers(5), None)
+
+    # 其他worker从Redis层读到
+    other = ArxivCache(redis=redis)
+    assert await other.lookup("api", "found", 2) == (papers(2), None)
+    assert other.stats["redis_hits"] == 1
+    assert json.loads(redis.data[make_cache_key("api", "found")])["max_results"] == 5
+
+    # 其他worker的失败（进程内层没有该条目）同样不覆盖Redis中的成功结果
+    await ArxivCache(redis=redis).store("api", "found", 5, [], error="timeout")
+    assert json.loads(redis.data[make_cache_key("api", "found")])["error"] is None
+    assert await ArxivCache(redis=redis).lookup("api", "found", 5) == (papers(5), None)
+
+    assert await ArxivCache(error_ttl=0).store("api", "x", 5, [], error="e") is None
+    assert await ArxivCache(enabled=False).lookup("api", "found", 5) is None
+
+
+@pytest.mark.asyncio
+async def test_data_crawler_reuses_cached_results(monkeypatch):
+    monkeypatch.setattr(arxiv_cache, "_arxiv_cache", ArxivCache())
+    crawler = DataCrawler()
+    requests = []
+
+    class Scheduler:
+        async def search(self, query, max_results=5):
+            requests.append(query)
+            if "fail" in query:
+                raise ArxivRequestError("Arxiv API返回状态码 503")
+            return []
+
+    monkeypatch.setattr(data_crawler, "get_arxiv_scheduler", Scheduler)
+
+    assert await crawler.search_arxiv("Entropy") == []
+    assert await crawler.search_arxiv("entropy ", max_results=3) == []
+    assert await crawler.search_arxiv("fail") == []
+    assert await crawler.search_arxiv("fail") == []
+    assert requests == ["Entropy", "fail"]
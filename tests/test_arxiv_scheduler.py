@@ -0,0 +1,158 @@
+"""Arxiv请求调度器单元测试（HTTP为本地替身）"""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared import arxiv_scheduler, circuit_breaker
+from shared.arxiv_scheduler import ArxivRequestError, ArxivScheduler, is_multiplexable
+
+
+def feed(*titles):
+    entries = "".join(
+        f"<entry><id>https://arxiv.org/abs/{i}</id><title>{t}</title><summary>About {t}</summary></entry>"
+        for i, t in enumerate(titles)
+    )
+    return f"<feed xmlns='http://www.w3.org/2005/Atom'>{entries}</feed>"
+
+
+class FakeArxiv:
+    """按search_query返回预设响应，记录请求时间"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    async def get(self, url, params=None):
+        self.requests.append((time.monotonic(), params["search_query"], params["max_results"]))
+        status, text = self.responses(params["search_query"])
+        return SimpleNamespace(status_code=status, text=text)
+
+    @asynccontextmanager
+    async def borrow(self, name):
+        yield self
+
+
+@pytest.fixture
+def fake_arxiv(monkeypatch):
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+
+    def install(responses):
+        arxiv = FakeArxiv(responses)
+        monkeypatch.setattr(arxiv_scheduler, "get_http_pools", lambda: arxiv)
+        return arxiv
+    return install
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_share_one_request(fake_arxiv):
+    arxiv = fake_arxiv(lambda q: (200, feed(
+        "Quantum entanglement", "Neural networks", "Entropy of black holes",
+        "Quantum entanglement witnesses", "Graph neural networks", "Black hole entropy bounds"
+    )))
+    scheduler = ArxivScheduler(min_interval=0.0)
+
+    results = await asyncio.gather(
+        scheduler.search("quantum entanglement", max_results=2),
+        scheduler.search("neural network", max_results=2),
+        scheduler.search("black hole entropy", max_results=2)
+    )
+
+    assert len(arxiv.requests) == 1
+    _, query, max_results = arxiv.requests[0]
+    assert query == "(all:quantum AND all:entanglement) OR (all:neural AND all:network) OR (all:black AND all:hole AND all:entropy)"
+    assert max_results == 6
+    assert [[p["title"] for p in papers] for papers in results] == [
+        ["Quantum entanglement", "Quantum entanglement witnesses"],
+        ["Neural networks", "Graph neural networks"],
+        ["Entropy of black holes", "Black hole entropy bounds"]
+    ]
+    assert scheduler.get_stats()["queries_per_request"] == 3.0
+
+
+@pytest.mark.asyncio
+async def test_requests_are_spaced_and_short_matches_requeue(fake_arxiv):
+    def responses(query):
+        if " OR " in query:
+            return 200, feed("Topology A", "Topology B")  # 合并结果被一个查询占满
+        return 200, feed(f"Solo result for {query}")
+    arxiv = fake_arxiv(responses)
+    scheduler = ArxivScheduler(min_interval=0.05)
+
+    topology, graphs = await asyncio.gather(
+        scheduler.search("topology", max_results=1),
+        scheduler.search("graph", max_results=1)
+    )
+
+    assert [q for _, q, _ in arxiv.requests] == ["(all:topology) OR (all:graph)", "all:graph"]
+    assert topology[0]["title"] == "Topology A"
+    assert graphs[0]["title"] == "Solo result for all:graph"  # 单词查询的AND形式即all:graph
+    assert arxiv.requests[1][0] - arxiv.requests[0][0] >= 0.05
+    assert scheduler.stats["requeued"] == 1
+
+
+@pytest.mark.asyncio
+async def test_short_combined_feed_is_complete(fake_arxiv):
+    """合并结果不足一页说明OR查询已取全：分到的条目不足也不再单独查询"""
+    arxiv = fake_arxiv(lambda q: (200, feed("Spin orbit coupling", "Dark matter halos", "Dark matter detection")))
+    scheduler = ArxivScheduler(min_interval=0.0)
+
+    spin, dark = await asyncio.gather(
+        scheduler.search("spin-orbit coupling", max_results=2),
+        scheduler.search("dark matter", max_results=2)
+    )
+
+    assert [q for _, q, _ in arxiv.requests] == [
+        "(all:spin AND all:orbit AND all:coupling) OR (all:dark AND all:matter)"
+    ]
+    assert [p["title"] for p in spin] == ["Spin orbit coupling"]
+    assert [p["title"] for p in dark] == ["Dark matter halos", "Dark matter detection"]
+    assert scheduler.stats["requeued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_requeued_queries_keep_their_order(fake_arxiv):
+    """合并结果已满时，分到条目不足的查询按原先的顺序重新排在队首"""
+    def responses(query):
+        if " OR " in query:
+            return 200, feed("Dark matter halos", "Dark matter detection", "Dark matter maps")
+        return 200, feed(f"Solo result for {query}")
+    arxiv = fake_arxiv(responses)
+    scheduler = ArxivScheduler(min_interval=0.0)
+
+    await asyncio.gather(
+        scheduler.search("topology", max_results=1),
+        scheduler.search("graph", max_results=1),
+        scheduler.search("dark matter", max_results=1)
+    )
+
+    assert [q for _, q, _ in arxiv.requests] == [
+        "(all:topology) OR (all:graph) OR (all:dark AND all:matter)",
+        "all:topology",
+        "all:graph"
+    ]
+    assert scheduler.stats["requeued"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failures_retry_then_reach_every_waiter(fake_arxiv):
+    arxiv = fake_arxiv(lambda q: (503, ""))
+    scheduler = ArxivScheduler(min_interval=0.0, max_retries=2)
+
+    results = await asyncio.gather(
+        scheduler.search("entropy"), scheduler.search("all:cat AND all:dog"),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(r, ArxivRequestError) and "503" in str(r) for r in results)
+    # 带字段前缀/布尔运算的查询不合并：两个查询各重试一次
+    assert len(arxiv.requests) == 4
+    assert not is_multiplexable("all:cat AND all:dog") and not is_multiplexable("cats or dogs")
+    assert is_multiplexable("spin-orbit coupling")
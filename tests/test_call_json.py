@@ -0,0 +1,119 @@
+"""LLMClient.call_json 结构化输出与JSON修复单元测试"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents import llm_client
+from agents.llm_client import LLMClient
+from agents.utils import parse_json_tolerant
+from prompts.graph_prompts import GraphPrompt
+from shared import circuit_breaker
+from shared.llm_cache import LLMResponseCache
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+def completion(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+def test_truncated_output_keeps_complete_elements():
+    data, path = parse_json_tolerant('[{"name": "熵", "tags": ["a,]"]}, {"name": "信息论"}, {"name": "香')
+    assert path == "salvaged"
+    assert data == [{"name": "熵", "tags": ["a,]"]}, {"name": "信息论"}]
+
+    # 嵌套的半个对象整体丢弃，不留下缺字段的元素
+    data, _ = parse_json_tolerant('{"nodes": [{"id": "a"}], "edges": [{"source": "a", "target"')
+    assert data == {"nodes": [{"id": "a"}]}
+    data, _ = parse_json_tolerant('[{"id": 1, "refs": [1, 2]}, {"id": 2, "refs": [3,')
+    assert data == [{"id": 1, "refs": [1, 2]}]
+
+    assert parse_json_tolerant('[{"a": 1}]')[1] == "direct"
+    assert parse_json_tolerant('[{"a": 1},]')[1] == "repaired"
+    with pytest.raises(ValueError):
+        parse_json_tolerant('[{"a":')
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(llm_client, "get_llm_cache", lambda: LLMResponseCache())
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})  # 不受其他用例打开的熔断器影响
+    monkeypatch.setattr(llm_client, "_json_path_stats", {})
+    monkeypatch.setattr(llm_client, "_structured_unsupported", set())
+    monkeypatch.setenv("LLM_STRUCTURED_OUTPUT", "auto")
+    client = LLMClient(api_key="test", model="google/gemini-3-flash-preview")
+    client.requests = []
+    client.replies = []
+
+    async def create(**params):
+        client.requests.append(params)
+        reply = client.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return completion(reply)
+
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_truncated_reply_is_salvaged_without_reasking(client):
+    client.replies = ['```json\n[{"concept_name": "信息熵"}, {"concept_name": "交叉']
+
+    result = await client.call_json("熵")
+
+    assert result == [{"concept_name": "信息熵"}]
+    assert len(client.requests) == 1
+    assert llm_client.get_json_path_stats() == {"salvaged": 1}
+
+
+@pytest.mark.asyncio
+async def test_salvage_missing_required_keys_is_regenerated(client):
+    """截断后只剩nodes、缺少schema要求的edges：不返回残缺结果，重新请求"""
+    client.model = "other/model-x"
+    client.replies = [
+        '{"nodes": [{"id": "a"}], "edges": [{"source": "a", "target"',
+        '{"nodes": [{"id": "a"}], "edges": []}'
+    ]
+
+    result = await client.call_json("图谱", schema=GraphPrompt.GRAPH_SCHEMA)
+
+    assert result == {"nodes": [{"id": "a"}], "edges": []}
+    assert len(client.requests) == 2
+    assert llm_client.get_json_path_stats() == {"salvaged": 1, "salvage_rejected": 1, "regenerated": 1, "direct": 1}
+
+
+@pytest.mark.asyncio
+async def test_unparseable_reply_is_regenerated(client):
+    client.replies = ["抱歉，我无法回答", '[{"concept_name": "信息熵"}]']
+
+    assert await client.call_json("熵") == [{"concept_name": "信息熵"}]
+    assert len(client.requests) == 2
+    assert llm_client.get_json_path_stats() == {"regenerated": 1, "direct": 1}
+
+
+@pytest.mark.asyncio
+async def test_structured_output_with_fallback_when_rejected(client):
+    client.replies = ['{"nodes": [], "edges": []}']
+    assert await client.call_json("图谱", schema=GraphPrompt.GRAPH_SCHEMA) == {"nodes": [], "edges": []}
+    assert client.requests[0]["response_format"]["json_schema"]["name"] == "knowledge_graph"
+
+    # 提供方拒绝response_format：当次改走普通请求，之后该模型不再尝试
+    client.model = "other/model-x"
+    client.requests.clear()
+    client.replies = [BadRequest("response_format not supported"), '{"nodes": [1], "edges": []}', '{"nodes": [2], "edges": []}']
+    assert client.supports_structured_output() is False
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("LLM_STRUCTURED_OUTPUT", "on")
+        assert (await client.call_json("图谱", schema=GraphPrompt.GRAPH_SCHEMA))["nodes"] == [1]
+        assert (await client.call_json("图谱2", schema=GraphPrompt.GRAPH_SCHEMA))["nodes"] == [2]
+
+    assert ["response_format" in r for r in client.requests] == [True, False, False]
+    assert llm_client.get_json_path_stats() == {"structured_direct": 1, "structured_unsupported": 1, "direct": 2}
@@ -0,0 +1,123 @@
+"""外部依赖熔断器单元测试"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class HTTPStatusError(Exception):
+    def __init__(self, status_code):
+        self.status_code = status_code
+        super().__init__(f"HTTP {status_code}")
+
+
+async def fail(error=None):
+    raise error or ConnectionError("down")
+
+
+async def ok():
+    return "ok"
+
+
+async def trip(breaker, calls):
+    for _ in range(calls):
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail)
+
+
+@pytest.mark.asyncio
+async def test_opens_on_failure_rate_and_rejects_immediately():
+    breaker = CircuitBreaker("test", failure_rate=0.5, min_calls=4, open_seconds=30)
+    await breaker.call(ok)
+    await breaker.call(ok)
+    await trip(breaker, 1)
+    assert breaker.state == "closed"  # 调用数不足min_calls
+
+    await trip(breaker, 1)
+    assert breaker.state == "open"
+
+    called = []
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(lambda: called.append(1) or ok())
+    assert called == []
+    assert breaker.stats["rejected"] == 1
+    assert not breaker.available
+
+
+@pytest.mark.asyncio
+async def test_client_errors_and_timeouts():
+    breaker = CircuitBreaker("test", min_calls=2)
+    for _ in range(3):
+        with pytest.raises(HTTPStatusError):
+            await breaker.call(lambda: fail(HTTPStatusError(429)))
+    assert breaker.state == "closed"  # 4xx/429不是依赖故障
+
+    for _ in range(2):
+        with pytest.raises(asyncio.TimeoutError):
+            await breaker.call(lambda: asyncio.sleep(1), timeout=0.01)
+    assert breaker.get_stats()["failures"] == 2
+
+    assert await breaker.call(ok, failed=lambda result: result == "ok") == "ok"  # 返回值判定失败，结果照常返回
+    assert breaker.state == "open"
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=0.05, half_open_probes=1)
+    await trip(breaker, 1)
+    await asyncio.sleep(0.06)
+
+    # 半开：只放行一个探测，探测失败重新打开
+    probe = asyncio.ensure_future(breaker.call(lambda: asyncio.sleep(0.02)))
+    await asyncio.sleep(0)
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(ok)
+    await probe
+    assert breaker.state == "closed"
+
+    await trip(breaker, 1)
+    await asyncio.sleep(0.06)
+    await trip(breaker, 1)
+    assert breaker.state == "open"
+    assert breaker.stats["opened"] == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_is_returned():
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=0.01)
+    await trip(breaker, 1)
+    await asyncio.sleep(0.02)
+
+    probe = asyncio.ensure_future(breaker.call(lambda: asyncio.sleep(1)))
+    await asyncio.sleep(0)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert breaker.state == "half_open"
+    assert await breaker.call(ok) == "ok"
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_guard_counts_early_generator_close_as_success():
+    breaker = CircuitBreaker("test", min_calls=1)
+
+    async def lines():
+        async with breaker.guard():
+            for i in range(10):
+                yield i
+
+    gen = lines()
+    assert await gen.__anext__() == 0
+    await gen.aclose()
+
+    assert breaker.get_stats()["calls"] == 1
+    assert breaker.state == "closed"
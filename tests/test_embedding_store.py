@@ -0,0 +1,91 @@
+"""Embedding存储单元测试"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from algorithms.embedding_store import (
+    EmbeddingStore,
+    LocalVectorTier,
+    make_key,
+    pack_vector,
+    unpack_vector,
+)
+
+MODEL = "text-embedding-3-small"
+
+
+class FakeEmbedder:
+    """记录调用次数的假Embedding函数"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0, 0.5] for t in texts]
+
+
+def test_key_uses_normalized_text():
+    """全角/多余空白不影响key，不同模型key不同"""
+    assert make_key(MODEL, " 机器  学习 ") == make_key(MODEL, "机器 学习")
+    assert make_key(MODEL, "ＡＢＣ") == make_key(MODEL, "ABC")
+    assert make_key(MODEL, "熵") != make_key("other-model", "熵")
+
+
+def test_pack_roundtrip_float32():
+    vector = [0.1, -0.2, 0.3]
+    packed = pack_vector(vector)
+    assert len(packed) == 12
+    np.testing.assert_allclose(unpack_vector(packed), vector, rtol=1e-6)
+
+
+@pytest.mark.asyncio
+async def test_repeated_concepts_embedded_once():
+    """重复概念只请求一次API，批量请求只包含未命中的文本"""
+    store = EmbeddingStore()
+    embed = FakeEmbedder()
+
+    first = await store.get_or_embed(MODEL, ["熵", "机器学习", "熵"], embed)
+    second = await store.get_or_embed(MODEL, ["机器学习", "信息论"], embed)
+
+    assert embed.calls == [["熵", "机器学习"], ["信息论"]]
+    np.testing.assert_array_equal(first[0], first[2])
+    np.testing.assert_array_equal(first[1], second[0])
+    assert store.get_stats()["embedded"] == 3
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_oldest():
+    store = EmbeddingStore(max_entries=2)
+    embed = FakeEmbedder()
+
+    await store.get_or_embed(MODEL, ["a", "b"], embed)
+    await store.get_or_embed(MODEL, ["a"], embed)  # a变为最近使用
+    await store.get_or_embed(MODEL, ["c"], embed)  # 淘汰b
+
+    assert store.memory_size() == 2
+    await store.get_or_embed(MODEL, ["b"], embed)
+    assert embed.calls[-1] == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_local_tier_survives_restart(tmp_path):
+    """本地mmap文件持久层：新进程（新实例）可直接读取"""
+    path = str(tmp_path / "vectors.f32")
+    embed = FakeEmbedder()
+
+    store = EmbeddingStore(persistent=LocalVectorTier(path))
+    original = await store.get_or_embed(MODEL, ["熵", "热力学"], embed)
+
+    restarted = EmbeddingStore(persistent=LocalVectorTier(path))
+    loaded = await restarted.get_or_embed(MODEL, ["热力学", "熵"], embed)
+
+    assert len(embed.calls) == 1
+    np.testing.assert_array_equal(loaded[0], original[1])
+    np.testing.assert_array_equal(loaded[1], original[0])
+    assert restarted.get_stats()["persistent_hits"] == 2
@@ -0,0 +1,106 @@
+"""共享HTTP连接池单元测试（本地HTTP服务，不访问外网）"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from algorithms.data_crawler import DataCrawler
+from shared.http_pool import HttpPools
+
+
+@pytest_asyncio.fixture
+async def local_server():
+    """启动一个本地aiohttp服务，返回基础URL"""
+    async def handler(request):
+        return web.Response(text=f"ok:{request.query.get('q', '')}")
+
+    async def slow(request):
+        await asyncio.sleep(1)
+        return web.Response(text="slow")
+
+    app = web.Application()
+    app.router.add_get("/query", handler)
+    app.router.add_get("/slow", slow)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/query"
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_pooled_client_reuses_connections(local_server):
+    """连续请求复用keep-alive连接，只新建一次TCP连接"""
+    pools = HttpPools(http2=False)
+    await pools.start()
+    try:
+        for i in range(5):
+            async with pools.borrow("arxiv") as client:
+                response = await client.get(local_server, params={"q": i})
+                assert response.text == f"ok:{i}"
+
+        stats = pools.get_stats()["pools"]["arxiv"]
+        assert stats["requests"] == 5
+        assert stats["connections_created"] == 1
+        assert stats["in_flight"] == 0
+    finally:
+        await pools.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_requests_settle_in_flight_once(local_server):
+    """httpx超时、调用方取消（asyncio超时）都只结算一次in_flight"""
+    pools = HttpPools(http2=False)
+    await pools.start()
+    slow_url = local_server.replace("/query", "/slow")
+    try:
+        with pytest.raises(httpx.TimeoutException):
+            async with pools.borrow("arxiv") as client:
+                await client.get(slow_url, timeout=0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            async with pools.borrow("arxiv") as client:
+                await asyncio.wait_for(client.get(slow_url), timeout=0.05)
+        async with pools.borrow("arxiv") as client:
+            await client.get(local_server)
+
+        stats = pools.get_stats()["pools"]["arxiv"]
+        assert stats["requests"] == 3
+        assert stats["errors"] == 2
+        assert stats["in_flight"] == 0
+    finally:
+        await pools.close()
+
+
+@pytest.mark.asyncio
+async def test_borrow_without_start_uses_temporary_client(local_server):
+    pools = HttpPools(http2=False)
+    async with pools.borrow("arxiv") as client:
+        response = await client.get(local_server)
+    assert response.status_code == 200
+    assert client.is_closed
+    assert pools.aiohttp_session() is None
+
+
+@pytest.mark.asyncio
+async def test_data_crawler_uses_injected_session(local_server):
+    pools = HttpPools(http2=False)
+    await pools.start()
+    try:
+        crawler = DataCrawler(session=pools.aiohttp_session(), max_retries=0)
+        texts = await asyncio.gather(*[crawler._fetch_with_retry(local_server, params={"q": "熵"}) for _ in range(3)])
+
+        assert texts == ["ok:熵"] * 3
+        stats = pools.get_stats()["pools"]["aiohttp"]
+        assert stats["requests"] == 3
+        assert not crawler.session.closed
+    finally:
+        await pools.close()
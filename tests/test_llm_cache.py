@@ -0,0 +1,138 @@
+"""LLM响应缓存单元测试"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared.llm_cache import LLMResponseCache, make_cache_key
+from agents.llm_client import LLMClient
+
+
+class DictRedis:
+    """最小的异步Redis替身（get/set）"""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiry[key] = ex
+
+
+def completion(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+def counting_call(text="Entropy"):
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return completion(text)
+    return call, calls
+
+
+PARAMS = {
+    "model": "m",
+    "messages": [{"role": "user", "content": "熵"}],
+    "temperature": 0.1,
+    "max_tokens": 50,
+    "extra_body": {"reasoning": {"enabled": True}}
+}
+
+
+def test_key_covers_request_fields():
+    assert make_cache_key(PARAMS) == make_cache_key(dict(reversed(list(PARAMS.items()))))
+    assert make_cache_key(PARAMS) != make_cache_key({**PARAMS, "temperature": 0.2})
+    assert make_cache_key(PARAMS) != make_cache_key({**PARAMS, "extra_body": None})
+    assert make_cache_key(PARAMS) == make_cache_key({**PARAMS, "stream": False})
+
+
+@pytest.mark.asyncio
+async def test_memory_hit_skips_call():
+    cache = LLMResponseCache()
+    call, calls = counting_call()
+
+    first = await cache.complete("translate", PARAMS, call)
+    second = await cache.complete("translate", PARAMS, call)
+
+    assert first == second == "Entropy"
+    assert len(calls) == 1
+    assert cache.get_stats()["sites"]["translate"] == {"memory_hits": 1, "redis_hits": 0, "misses": 1, "bypass": 0}
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_shared_between_processes():
+    redis = DictRedis()
+    call, calls = counting_call()
+
+    await LLMResponseCache(redis=redis).complete("brief_summary", PARAMS, call)
+    other = LLMResponseCache(redis=redis)
+    assert await other.complete("brief_summary", PARAMS, call) == "Entropy"
+
+    assert len(calls) == 1
+    assert list(redis.expiry.values()) == [24 * 3600]
+    assert other.get_stats()["sites"]["brief_summary"]["redis_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_zero_ttl_and_empty_answers_not_cached(monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_TTL_TRANSLATE", "0")
+    cache = LLMResponseCache()
+    call, calls = counting_call()
+    await cache.complete("translate", PARAMS, call)
+    await cache.complete("translate", PARAMS, call)
+    assert len(calls) == 2
+    assert cache.get_stats()["sites"]["translate"]["bypass"] == 2
+
+    empty, empty_calls = counting_call("")
+    await cache.complete("chat", PARAMS, empty)
+    await cache.complete("agent", PARAMS, empty)
+    await cache.complete("agent", PARAMS, empty)
+    assert len(empty_calls) == 3
+    assert cache.get_stats()["memory_entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_expiry(monkeypatch):
+    cache = LLMResponseCache(max_entries=2)
+    for i in range(3):
+        await cache.set(f"k{i}", f"v{i}", ttl=60)
+    assert (await cache.get("k0", 60)) == (None, None)
+    assert (await cache.get("k2", 60)) == ("v2", "memory")
+
+    now = [1000.0]
+    monkeypatch.setattr("shared.llm_cache.time.monotonic", lambda: now[0])
+    await cache.set("short", "v", ttl=5)
+    now[0] += 6
+    assert (await cache.get("short", 5)) == (None, None)
+
+
+@pytest.mark.asyncio
+async def test_llm_client_caches_single_turn_but_not_chat(monkeypatch):
+    cache = LLMResponseCache()
+    monkeypatch.setattr("agents.llm_client.get_llm_cache", lambda: cache)
+    client = LLMClient(api_key="test")
+    requests = []
+
+    async def create(**params):
+        requests.append(params)
+        return completion('[{"concept_name": "信息熵"}]')
+
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    assert await client.call_json("熵") == await client.call_json("熵")
+    assert len(requests) == 1
+
+    history = [{"role": "system", "content": "你是助手"}]
+    await client.call_with_retry("你好", messages_history=history)
+    await client.call_with_retry("你好", messages_history=history)
+    assert len(requests) == 3
@@ -0,0 +1,106 @@
+"""LLM对冲请求单元测试"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared.llm_hedge import HedgePolicy
+
+
+def warmed(latency=0.02, **kwargs):
+    """延迟样本已就绪的对冲策略（p90 = latency）"""
+    policy = HedgePolicy("test", enabled=True, min_samples=5, **kwargs)
+    policy._latencies.extend([latency] * 10)
+    return policy
+
+
+def reply(value, delay, log=None):
+    async def call():
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if log is not None:
+                log.append(f"{value} cancelled")
+            raise
+        return value
+    return call
+
+
+@pytest.mark.asyncio
+async def test_backup_wins_when_primary_is_slow():
+    policy = warmed()
+    log = []
+
+    assert await policy.run(reply("primary", 1.0, log), reply("backup", 0.01, log)) == "backup"
+    assert log == ["primary cancelled"]
+
+    stats = policy.get_stats()
+    assert stats["hedged"] == 1 and stats["backup_wins"] == 1
+    assert stats["hedge_rate"] == 1.0
+    assert list(policy._latencies) == [0.02] * 10  # 备份胜出不记录延迟样本
+
+    # 主请求在p90内返回：不发备份请求
+    backup_calls = []
+    assert await policy.run(reply("primary", 0.0), lambda: backup_calls.append(1)) == "primary"
+    assert backup_calls == []
+
+
+@pytest.mark.asyncio
+async def test_invalid_or_failed_result_waits_for_the_other():
+    policy = warmed(budget=1.0)
+
+    async def broken():
+        await asyncio.sleep(0.03)
+        raise ConnectionError("reset")
+
+    assert await policy.run(broken, reply("backup", 0.05)) == "backup"
+    assert await policy.run(reply("primary", 0.05), reply("", 0.0), valid=bool) == "primary"
+    assert policy.stats["backup_wins"] == 1
+
+    with pytest.raises(ConnectionError):
+        await policy.run(broken, broken)
+
+
+@pytest.mark.asyncio
+async def test_budget_and_deadline_limit_hedging():
+    policy = warmed(budget=0.0)
+    policy._tokens = 1.0
+    for _ in range(3):
+        assert await policy.run(reply("primary", 0.04), reply("backup", 0.0)) in ("primary", "backup")
+    assert policy.stats["hedged"] == 1
+    assert policy.stats["budget_denied"] == 2
+
+    # 剩余时间不足以让备份请求完成时不对冲
+    policy = warmed(latency=1.0)
+    assert policy.hedge_delay(deadline=1.5) is None
+    assert policy.hedge_delay(deadline=5.0) == 1.0
+    assert HedgePolicy("cold", enabled=True).hedge_delay() is None
+
+
+@pytest.mark.asyncio
+async def test_stream_switches_to_backup_and_closes_primary():
+    policy = warmed()
+    closed = []
+
+    async def lines(name, first_delay):
+        try:
+            await asyncio.sleep(first_delay)
+            for i in range(3):
+                yield f"{name}-{i}"
+        finally:
+            closed.append(name)
+
+    items = [item async for item in policy.stream(lambda: lines("primary", 1.0), lambda: lines("backup", 0.01))]
+
+    assert items == ["backup-0", "backup-1", "backup-2"]
+    assert closed == ["primary", "backup"]
+    assert policy.stats["backup_wins"] == 1
+
+    # 关闭时不对冲，直接产出主请求
+    policy.enabled = False
+    items = [item async for item in policy.stream(lambda: lines("primary", 0.05), lambda: lines("backup", 0.0))]
+    assert items == ["primary-0", "primary-1", "primary-2"]
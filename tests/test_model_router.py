@@ -0,0 +1,138 @@
+"""按任务路由LLM模型单元测试"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared import circuit_breaker
+from shared.circuit_breaker import CircuitOpenError
+from shared.model_router import DEFAULT_MODEL, ModelRouter
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for name in ("LLM_MODEL", "LLM_MODEL_FAST", "LLM_MODEL_FALLBACK", "LLM_ROUTE_TRANSLATE_MODELS", "LLM_ROUTE_CHAT_TIMEOUT"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+
+
+def test_route_table_tiers_and_overrides(monkeypatch):
+    router = ModelRouter()
+    monkeypatch.setenv("LLM_MODEL", "strong")
+
+    # 未配置fast模型时与原行为一致
+    assert router.route("translate").model == "strong"
+
+    monkeypatch.setenv("LLM_MODEL_FAST", "small")
+    monkeypatch.setenv("LLM_MODEL_FALLBACK", "backup")
+    assert router.candidates("translate") == ["small", "strong", "backup"]
+    assert router.candidates("graph_build") == ["strong", "backup"]
+    assert router.candidates("verify", default_model="agent-model") == ["agent-model", "backup"]
+
+    route = router.route("translate")
+    assert (route.model, route.max_tokens, route.timeout) == ("small", 50, 10.0)
+
+    monkeypatch.setenv("LLM_ROUTE_TRANSLATE_MODELS", "tiny, small")
+    monkeypatch.setenv("LLM_ROUTE_CHAT_TIMEOUT", "12")
+    assert router.candidates("translate") == ["tiny", "small"]
+    assert router.route("chat").timeout == 12.0
+
+
+def test_selection_uses_success_rate_and_latency(monkeypatch):
+    monkeypatch.setenv("LLM_ROUTE_TRANSLATE_MODELS", "small,strong")
+    router = ModelRouter(min_samples=3)
+
+    # 第二个候选没有样本时不参与比较
+    for _ in range(3):
+        router.record("translate", "small", True, 2.0)
+    assert router.route("translate").model == "small"
+
+    # 两者都有样本：选延迟/成功率更小的
+    for _ in range(3):
+        router.record("translate", "strong", True, 1.0)
+    assert router.route("translate").model == "strong"
+
+    # 成功率过低的模型暂不使用
+    for _ in range(6):
+        router.record("translate", "strong", False, 0.1)
+    assert router.route("translate").model == "small"
+    assert router.get_stats()["translate"]["strong"]["calls"] == 9
+
+
+def test_blank_route_override_uses_default_candidates(monkeypatch):
+    """LLM_ROUTE_<TASK>_MODELS为空或只有逗号时不产生空路由"""
+    router = ModelRouter()
+    monkeypatch.setenv("LLM_MODEL", "strong")
+    for configured in ("", ",", " , "):
+        monkeypatch.setenv("LLM_ROUTE_TRANSLATE_MODELS", configured)
+        assert router.candidates("translate") == ["strong"]
+        assert router.route("translate").model == "strong"
+
+    monkeypatch.setenv("LLM_MODEL", "")
+    assert router.route("translate").model == DEFAULT_MODEL
+
+
+@pytest.mark.asyncio
+async def test_run_falls_back_to_next_model(monkeypatch):
+    monkeypatch.setenv("LLM_ROUTE_SUMMARIZE_MODELS", "small,strong")
+    router = ModelRouter()
+    calls = []
+
+    async def attempt(route):
+        calls.append(route.model)
+
+        async def create():
+            if route.model == "small":
+                raise ConnectionError("reset")
+            return f"answer from {route.model}"
+        return await route.call(create)
+
+    assert await router.run("summarize", attempt) == "answer from strong"
+    assert calls == ["small", "strong"]
+    stats = router.get_stats()["summarize"]
+    assert stats["small"]["success_rate"] == 0.0
+    assert stats["strong"]["success_rate"] == 1.0
+
+    # 所有候选都失败时抛出最后的异常；熔断时不换模型
+    async def broken(route):
+        calls.append(route.model)
+        raise ValueError(route.model)
+
+    with pytest.raises(ValueError, match="strong"):
+        await router.run("summarize", broken)
+
+    calls.clear()
+
+    async def rejected(route):
+        calls.append(route.model)
+        raise CircuitOpenError("llm")
+
+    with pytest.raises(CircuitOpenError):
+        await router.run("summarize", rejected)
+    assert calls == ["small"]
+
+
+@pytest.mark.asyncio
+async def test_route_timeout_and_stream_tracking():
+    router = ModelRouter()
+    route = router.route("filter")
+
+    with pytest.raises(asyncio.TimeoutError):
+        await route.call(lambda: asyncio.sleep(1), timeout=0.01)
+
+    async def lines():
+        async with route.track():
+            for i in range(5):
+                yield i
+
+    gen = lines()
+    assert await gen.__anext__() == 0
+    await gen.aclose()  # 提前关闭记为成功
+
+    stats = router.get_stats()["filter"][route.model]
+    assert stats["calls"] == 2
+    assert stats["success_rate"] == 0.5
@@ -0,0 +1,111 @@
+"""OpenAI兼容客户端工厂单元测试（本地HTTP服务，不访问外网）"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared import rate_limiter
+from shared.openai_clients import OpenAIClientFactory
+
+
+@pytest_asyncio.fixture
+async def local_api():
+    """本地OpenAI兼容服务：chat.completions与embeddings"""
+    async def chat(request):
+        body = await request.json()
+        await asyncio.sleep(0.02)
+        return web.json_response({
+            "id": "c1", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "ok"}}]
+        })
+
+    async def embeddings(request):
+        body = await request.json()
+        return web.json_response({
+            "object": "list", "model": body["model"], "usage": {"prompt_tokens": 1, "total_tokens": 1},
+            "data": [{"object": "embedding", "index": i, "embedding": [0.1, 0.2]} for i, _ in enumerate(body["input"])]
+        })
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat)
+    app.router.add_post("/v1/embeddings", embeddings)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/v1"
+    await runner.cleanup()
+
+
+def test_site_profiles_and_missing_key(monkeypatch):
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setenv("OPENAI_CLIENT_RETRIES_CHAT", "3")
+    factory = OpenAIClientFactory(http2=False)
+
+    assert factory.get_client("generation") is None
+
+    # 节点生成器只认OPENROUTER_API_KEY，不回退到OPENAI_API_KEY
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-openai")
+    assert factory.get_client("generation").api_key == "sk-openai"
+    assert factory.get_client("node_generation") is None
+    monkeypatch.delenv("OPENAI_API_KEY")
+
+    chat = factory.get_client("chat", api_key="k", base_url="http://llm.local/v1/")
+    assert chat.max_retries == 3
+    assert chat.timeout.read == 30.0
+    assert factory.get_client("chat", api_key="k", base_url="http://llm.local/v1") is chat
+    assert factory.get_client("agent", api_key="k", base_url="http://llm.local/v1").max_retries == 0
+
+
+def test_limiters_are_per_upstream_host(monkeypatch):
+    """OpenRouter的429不降低OpenAI（classifier）的并发上限"""
+    monkeypatch.setattr(rate_limiter, "_limiters", {})
+    factory = OpenAIClientFactory(http2=False)
+    openrouter = factory.http_client("https://openrouter.ai/api/v1", "llm")._transport.limiter
+    openai = factory.http_client("https://api.openai.com/v1", "llm")._transport.limiter
+
+    assert (openrouter.name, openai.name) == ("llm:openrouter.ai", "llm:api.openai.com")
+    openrouter.on_rate_limited()
+    assert openrouter.limit < openai.limit == openai.max_concurrency
+
+
+@pytest.mark.asyncio
+async def test_sites_share_one_pool_per_base_url(local_api, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_limiters", {})  # 使用全新的限流器
+    factory = OpenAIClientFactory(max_connections=4, http2=False)
+    generation = factory.get_client("generation", api_key="a", base_url=local_api)
+    chat = factory.get_client("chat", api_key="b", base_url=local_api)
+    embedding = factory.get_client("embedding", api_key="c", base_url=local_api)
+    try:
+        for client in (generation, chat, generation):
+            response = await client.chat.completions.create(model="m", messages=[{"role": "user", "content": "hi"}])
+            assert response.choices[0].message.content == "ok"
+        vectors = await embedding.embeddings.create(model="e", input=["x", "y"])
+        assert len(vectors.data) == 2
+
+        assert set(rate_limiter._limiters) == {"llm:127.0.0.1", "embedding:127.0.0.1"}
+        stats = factory.get_stats()["pools"]
+        assert list(stats) == [local_api]
+        assert stats[local_api]["requests"] == 4
+        assert stats[local_api]["connections_created"] == 1  # 不同调用点、不同Key复用同一连接
+        assert stats[local_api]["in_flight"] == 0
+
+        # 并发超过连接上限时记录排队与饱和度
+        await asyncio.gather(*[
+            chat.chat.completions.create(model="m", messages=[{"role": "user", "content": str(i)}])
+            for i in range(6)
+        ])
+        stats = factory.get_stats()["pools"][local_api]
+        assert stats["peak_in_flight"] == 6
+        assert stats["queued"] == 2
+        assert stats["connections_created"] <= 4
+    finally:
+        await factory.close()
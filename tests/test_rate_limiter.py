@@ -0,0 +1,112 @@
+"""LLM/Embedding全局限流器单元测试（httpx.MockTransport，不访问外网）"""
+
+import sys
+import asyncio
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared.rate_limiter import AdaptiveLimiter, RateLimitedTransport, TokenBucket, latency_class, request_priority
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_jump_the_queue():
+    """并发名额释放时，等待中的interactive请求先于更早排队的background请求"""
+    limiter = AdaptiveLimiter("test", max_concurrency=1)
+    await limiter.acquire()
+    order = []
+
+    async def worker(name, lane):
+        with request_priority(lane):
+            await limiter.acquire()
+        order.append(name)
+        limiter.release()
+
+    tasks = [asyncio.create_task(worker("bg1", "background")), asyncio.create_task(worker("bg2", "background"))]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(worker("ui", "interactive")))
+    await asyncio.sleep(0)
+
+    limiter.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["ui", "bg1", "bg2"]
+    assert limiter.stats["queued"] == {"interactive": 1, "background": 2}
+    assert limiter.in_flight == 0
+
+
+def test_aimd_decrease_and_recovery():
+    limiter = AdaptiveLimiter("test", max_concurrency=8, min_concurrency=1)
+    limiter.on_success(0.1)
+
+    limiter.on_rate_limited(retry_after=0.5)
+    assert limiter.limit == 4
+    limiter.on_rate_limited()  # 同一拥塞窗口内的连续429只减一次
+    assert limiter.limit == 4
+    assert limiter.paused_until > time.monotonic()
+
+    for _ in range(20):
+        limiter.on_success(0.1)
+    assert 4 < limiter.limit <= 8
+
+
+def test_latency_congestion_is_judged_per_request_class():
+    """长输出请求的延迟不与短请求比较，只有同类请求变慢才视为拥塞"""
+    limiter = AdaptiveLimiter("test", max_concurrency=8)
+    limiter.limit = 4.0
+    for _ in range(5):
+        limiter.on_success(0.5, "max_tokens<=256")
+    limiter.on_success(6.0, "max_tokens<=4096")
+    assert limiter.stats["decreases"] == 0
+    assert limiter.limit > 4.0
+
+    limiter.on_success(6.0, "max_tokens<=256")
+    assert limiter.stats["decreases"] == 1
+
+
+def test_latency_class_buckets_by_max_tokens():
+    def request(payload):
+        return httpx.Request("POST", "http://llm.local/v1/chat/completions", json=payload)
+
+    assert latency_class(request({"max_tokens": 100})) == "max_tokens<=256"
+    assert latency_class(request({"max_tokens": 1500})) == "max_tokens<=2048"
+    assert latency_class(request({"max_tokens": 1500, "stream": True})) == "stream"
+    assert latency_class(request({"input": "x"})) == "default"
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_throttles_after_burst():
+    bucket = TokenBucket(rate=50, capacity=2)
+    start = time.monotonic()
+    for _ in range(4):
+        await bucket.acquire()
+    assert time.monotonic() - start >= 0.03
+
+
+@pytest.mark.asyncio
+async def test_transport_feeds_limiter_and_releases_on_stream_close():
+    statuses = iter([429, 200])
+
+    def handler(request):
+        status = next(statuses)
+        return httpx.Response(status, headers={"retry-after": "0"}, content=b"data: x\n\n")
+
+    limiter = AdaptiveLimiter("test", max_concurrency=4)
+    client = httpx.AsyncClient(transport=RateLimitedTransport(limiter, httpx.MockTransport(handler)))
+
+    response = await client.post("http://llm.local/v1/chat/completions", json={"max_tokens": 10})
+    assert response.status_code == 429
+    assert limiter.stats["rate_limited"] == 1
+    assert limiter.limit == 2
+    assert limiter.in_flight == 0
+
+    async with client.stream("POST", "http://llm.local/v1/chat/completions", json={}) as response:
+        assert limiter.in_flight == 1  # 流式响应读取期间占用名额
+        await response.aread()
+    assert limiter.in_flight == 0
+    assert limiter.latency_ewma is not None
+    await client.aclose()
@@ -0,0 +1,104 @@
+"""SemanticSimilarity批量/矩阵接口单元测试（使用假Embedding客户端）"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from algorithms.embedding_store import EmbeddingStore
+from algorithms.semantic_similarity import SemanticSimilarity
+
+
+class _Item:
+    def __init__(self, embedding):
+        self.embedding = embedding
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeEmbeddings:
+    """按文本哈希生成确定性向量，并记录请求次数"""
+
+    def __init__(self):
+        self.requests = []
+
+    async def create(self, input, model):
+        texts = [input] if isinstance(input, str) else list(input)
+        self.requests.append(texts)
+        data = []
+        for text in texts:
+            rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+            data.append(_Item(rng.normal(size=16).tolist()))
+        return _Response(data)
+
+
+class FakeClient:
+    def __init__(self):
+        self.embeddings = FakeEmbeddings()
+
+
+@pytest.fixture
+def sem():
+    calculator = SemanticSimilarity(api_key="test", embedding_store=EmbeddingStore(), batch_size=4)
+    calculator.client = FakeClient()
+    return calculator
+
+
+def test_top_k_indices_matches_full_sort():
+    scores = np.array([0.2, 0.9, 0.5, 0.9, 0.1, 0.7])
+    assert SemanticSimilarity.top_k_indices(scores, 3).tolist() == [1, 3, 5]
+    assert SemanticSimilarity.top_k_indices(scores, 10).tolist() == [1, 3, 5, 2, 0, 4]
+    assert SemanticSimilarity.top_k_indices(scores, 0).tolist() == []
+
+
+@pytest.mark.asyncio
+async def test_find_most_similar_batches_requests(sem):
+    """候选全部批量embedding（按batch_size分批），排序与逐对计算一致"""
+    candidates = [f"概念{i}" for i in range(10)]
+
+    result = await sem.find_most_similar("熵", candidates, top_k=3)
+
+    assert len(sem.client.embeddings.requests) == 3  # 11个文本，batch_size=4
+    expected = []
+    for c in candidates:
+        expected.append((c, await sem.compute_similarity("熵", c)))
+    expected.sort(key=lambda x: x[1], reverse=True)
+    assert [c for c, _ in result] == [c for c, _ in expected[:3]]
+    for (_, got), (_, want) in zip(result, expected):
+        assert got == pytest.approx(want, abs=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_find_distant_relatives_matches_pairwise(sem):
+    """矩阵版本与逐对调用compute_concept_distance的结果一致"""
+    candidates = [(f"概念{i}", d) for i, d in enumerate(["物理", "数学", "生物", "物理", "计算机", "化学"])]
+
+    result = await sem.find_distant_relatives(
+        "熵", "物理", candidates, top_k=10, similarity_threshold=0.4, diversity_threshold=0.1
+    )
+
+    expected = []
+    for concept, discipline in candidates:
+        if await sem.compute_similarity("物理", discipline) > 0.9:
+            continue
+        info = await sem.compute_concept_distance("熵", concept, "物理", discipline)
+        if info["semantic_similarity"] < 0.4:
+            continue
+        expected.append((concept, discipline, info["final_score"]))
+    expected.sort(key=lambda x: x[2], reverse=True)
+
+    assert [(c, d) for c, d, _ in result] == [(c, d) for c, d, _ in expected]
+    for got, want in zip(result, expected):
+        assert got[2] == pytest.approx(want[2], abs=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_empty_candidates(sem):
+    assert await sem.find_most_similar("熵", []) == []
+    assert await sem.find_distant_relatives("熵", "物理", []) == []
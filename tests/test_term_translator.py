@@ -0,0 +1,165 @@
+"""术语中译英单元测试（LLM为本地替身）"""
+
+import sys
+import json
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared import term_translator
+from shared.term_translator import BUNDLED_GLOSSARY, Glossary, REDIS_KEY, TermTranslator
+
+
+class HashRedis:
+    """最小的异步Redis替身（hget/hset）"""
+
+    def __init__(self):
+        self.hashes = {}
+
+    async def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+
+def fake_llm(translator, answers, hints=None, delay=0):
+    """替换LLM调用，记录每次调用翻译的术语（和附带的逐词译文）"""
+    calls = []
+
+    async def llm_translate(terms, term_hints=None):
+        calls.append(list(terms))
+        if hints is not None:
+            hints.append(dict(term_hints or {}))
+        await asyncio.sleep(delay)
+        return {t: answers[t] for t in terms if t in answers}
+
+    translator._llm_translate = llm_translate
+    return calls
+
+
+def test_glossary_exact_hits_and_segmentation(tmp_path):
+    glossary = Glossary.load([BUNDLED_GLOSSARY])
+    assert glossary.translate("熵") == "entropy"
+    assert glossary.translate("量子纠缠") == "quantum entanglement"  # 术语表中列出的复合术语
+    # 未列出的复合术语不直接翻译，逐词译文只作为参考
+    assert glossary.translate("量子熵") is None
+    assert glossary.segment("量子熵") == "quantum entropy"
+    assert glossary.segment("神经网络与复杂网络") == "neural network and complex network"
+    assert glossary.segment("DNA测序 算法") == "DNA sequencing algorithm"
+    assert glossary.segment("拓扑绝缘体") is None  # "绝缘体"不在术语表中
+
+    extra = tmp_path / "extra.json"
+    extra.write_text(json.dumps({"绝缘体": "insulator", "熵": "Entropy"}, ensure_ascii=False), encoding="utf-8")
+    glossary = Glossary.load([BUNDLED_GLOSSARY, extra, tmp_path / "missing.json"])
+    assert glossary.translate("拓扑绝缘体") is None
+    assert glossary.segment("拓扑绝缘体") == "topology insulator"  # 逐词拼接不地道，需要LLM
+    assert glossary.translate("熵") == "Entropy"
+
+
+@pytest.mark.asyncio
+async def test_segmented_compounds_go_to_llm_with_hint():
+    glossary = Glossary({"拓扑": "topology", "绝缘体": "insulator", "量子": "quantum", "熵": "entropy"})
+    translator = TermTranslator(glossary, batch_window=0.01)
+    hints = []
+    calls = fake_llm(translator, {"拓扑绝缘体": "topological insulator"}, hints)
+
+    results = await translator.translate_many(["拓扑绝缘体", "量子熵"])
+
+    assert results == {"拓扑绝缘体": "topological insulator", "量子熵": "quantum entropy"}
+    assert calls == [["拓扑绝缘体", "量子熵"]]
+    assert hints == [{"拓扑绝缘体": "topology insulator", "量子熵": "quantum entropy"}]
+    # LLM未给出译文时退回逐词译文，但不缓存，下次仍交给LLM
+    assert translator.stats["gloss_fallbacks"] == 1
+    assert "量子熵" not in translator._memory
+
+
+@pytest.mark.asyncio
+async def test_in_flight_terms_are_shared_and_shielded():
+    translator = TermTranslator(batch_window=0.01)
+    calls = fake_llm(translator, {"超流体": "superfluid"}, delay=0.05)
+
+    first = asyncio.ensure_future(translator.translate("超流体"))
+    await asyncio.sleep(0.03)  # 已发出、LLM尚未返回
+    second = asyncio.ensure_future(translator.translate("超流体"))
+    third = asyncio.ensure_future(translator.translate("超流体"))
+    await asyncio.sleep(0)
+    first.cancel()  # 一个调用方取消不影响共用同一结果的其他调用方
+
+    assert await second == "superfluid" and await third == "superfluid"
+    assert first.cancelled()
+    assert calls == [["超流体"]]
+
+
+@pytest.mark.asyncio
+async def test_misses_are_batched_and_cached():
+    redis = HashRedis()
+    translator = TermTranslator(Glossary({"熵": "entropy"}), batch_window=0.01, redis=redis)
+    calls = fake_llm(translator, {"拓扑绝缘体": "topological insulator", "超流体": "superfluid"})
+
+    results = await asyncio.gather(
+        translator.translate("熵"),
+        translator.translate("拓扑绝缘体"),
+        translator.translate("超流体"),
+        translator.translate("拓扑绝缘体"),
+        translator.translate("未知术语"),
+        translator.translate("entropy")
+    )
+
+    assert results == ["entropy", "topological insulator", "superfluid", "topological insulator", "未知术语", "entropy"]
+    assert calls == [["拓扑绝缘体", "超流体", "未知术语"]]
+    assert redis.hashes[REDIS_KEY] == {"拓扑绝缘体": "topological insulator", "超流体": "superfluid"}
+
+    # 命中进程内缓存；新进程从Redis读到；失败的术语下次重新翻译
+    assert await translator.translate("超流体") == "superfluid"
+    other = TermTranslator(redis=redis)
+    other_calls = fake_llm(other, {})
+    assert await other.translate_many(["拓扑绝缘体", "未知术语"]) == {"拓扑绝缘体": "topological insulator", "未知术语": "未知术语"}
+    assert other_calls == [["未知术语"]]
+
+    stats = translator.get_stats()
+    assert (stats["glossary_hits"], stats["memory_hits"], stats["failures"]) == (1, 1, 1)
+    assert other.get_stats()["redis_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_max_batch_splits_llm_calls():
+    translator = TermTranslator(batch_window=10.0, max_batch=2)
+    terms = [f"术语{i}" for i in range(5)]
+    calls = fake_llm(translator, {t: f"term {i}" for i, t in enumerate(terms)})
+
+    results = await asyncio.wait_for(translator.translate_many(terms), timeout=1.0)
+
+    assert list(results.values()) == [f"term {i}" for i in range(5)]
+    assert [len(c) for c in calls][:2] == [2, 2]
+    assert sum(len(c) for c in calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_llm_reply_parsing(monkeypatch):
+    replies = []
+
+    class Router:
+        async def run(self, task, attempt):
+            assert task == "translate"
+            return replies.pop(0)
+
+    monkeypatch.setattr(term_translator, "get_openai_client", lambda site: object())
+    monkeypatch.setattr(term_translator, "get_model_router", Router)
+    translator = TermTranslator()
+
+    replies.append('好的：\n```json\n{"超流体": "superfluid", "拓扑绝缘体": "拓扑绝缘体"}\n```')
+    assert await translator._llm_translate(["超流体", "拓扑绝缘体"]) == {"超流体": "superfluid"}
+
+    replies.append('"Superfluidity"\n')
+    assert await translator._llm_translate(["超流性"]) == {"超流性": "Superfluidity"}
+    assert translator.stats["llm_calls"] == 2 and translator.stats["llm_terms"] == 2
+
+    # 中文全角引号、单引号和首尾空白都去掉
+    replies.append('“Superfluidity”')
+    assert await translator._llm_translate(["超流性"]) == {"超流性": "Superfluidity"}
+    replies.append('{"超流体": " ‘superfluid’ ", "玻色子": "\'boson\'"}')
+    assert await translator._llm_translate(["超流体", "玻色子"]) == {"超流体": "superfluid", "玻色子": "boson"}
@@ -0,0 +1,86 @@
+"""VerificationAgent.verify_concepts 并发校验单元测试（证据来源均为本地替身）"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.verification_agent import VerificationAgent
+from shared.constants import VerificationStrategy
+
+
+class FakeSources:
+    """记录各来源并发峰值的证据来源"""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.active = {name: 0 for name in delays}
+        self.peak = {name: 0 for name in delays}
+
+    async def _call(self, name, result):
+        self.active[name] += 1
+        self.peak[name] = max(self.peak[name], self.active[name])
+        try:
+            await asyncio.sleep(self.delays[name])
+            return result
+        finally:
+            self.active[name] -= 1
+
+    async def search_wikipedia(self, query):
+        return await self._call("wikipedia", {
+            "title": query, "summary": f"{query} 的百科摘要", "url": "https://zh.wikipedia.org/wiki/x", "exists": True
+        })
+
+    async def search_arxiv(self, query, max_results=5):
+        return await self._call("arxiv", [{"title": query, "summary": "paper", "link": "https://arxiv.org/abs/1"}])
+
+    async def llm_reasoning(self, concept_a, concept_b, claimed_relation, strength):
+        return await self._call("llm", {"is_valid": True, "confidence": 0.9, "reasoning": claimed_relation})
+
+
+def make_agent(delays):
+    agent = VerificationAgent()
+    sources = FakeSources(delays)
+    agent.data_crawler = sources
+    agent._get_llm_reasoning = sources.llm_reasoning
+    return agent, sources
+
+
+def concepts(n):
+    return [{"concept_name": f"概念{i}", "reasoning": f"关联{i}", "strength": 0.8} for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_sources_run_concurrently_within_limits():
+    agent, sources = make_agent({"wikipedia": 0.05, "arxiv": 0.05, "llm": 0.05})
+    items = concepts(6)
+
+    start = asyncio.get_running_loop().time()
+    await agent.verify_concepts(
+        items, "熵", source_concurrency={"wikipedia": 3, "arxiv": 2, "llm": 3},
+        strategy=VerificationStrategy.MULTI_SOURCE
+    )
+    elapsed = asyncio.get_running_loop().time() - start
+
+    assert sources.peak == {"wikipedia": 3, "arxiv": 2, "llm": 3}
+    assert elapsed < 0.4  # 串行需要 6 × 3 × 0.05 = 0.9 秒
+    assert all("verification" in item for item in items)
+
+
+@pytest.mark.asyncio
+async def test_deadline_keeps_partial_evidence():
+    agent, sources = make_agent({"wikipedia": 0.01, "arxiv": 5.0, "llm": 0.01})
+    items = concepts(3)
+
+    start = asyncio.get_running_loop().time()
+    await agent.verify_concepts(items, "熵", deadline=0.2, strategy=VerificationStrategy.MULTI_SOURCE)
+
+    assert asyncio.get_running_loop().time() - start < 1.0
+    assert sources.active["arxiv"] == 0  # 未完成的Arxiv请求已取消
+    for item in items:
+        sources_used = {e["source_type"] for e in item["verification"]["evidence"]}
+        assert "arxiv" not in sources_used and "wikipedia" in sources_used
+        assert any("arxiv" in w for w in item["verification"]["warnings"])
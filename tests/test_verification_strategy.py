@@ -0,0 +1,110 @@
+"""VerificationAgent 批量/分级校验策略单元测试（LLM与证据来源均为本地替身）"""
+
+import re
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.verification_agent import VerificationAgent
+from shared.constants import AgentConfig, VerificationStrategy
+
+
+class FakeLLM:
+    """按概念编号返回批量得分的LLM替身，记录调用次数"""
+
+    def __init__(self, scores):
+        self.scores = scores
+        self.calls = 0
+
+    async def call_json(self, prompt, **kwargs):
+        self.calls += 1
+        # 批量提示词每行一条关联：“1. 熵 → 概念12: 关联12”
+        numbers = re.findall(r"^(\d+)\. .* → 概念(\d+):", prompt, re.M)
+        return [
+            {"index": int(index), "credibility_score": self.scores[int(n)], "quick_reasoning": f"批量{n}", "warnings": []}
+            for index, n in numbers
+        ]
+
+
+def make_agent(scores):
+    agent = VerificationAgent()
+    agent.llm_client = FakeLLM(scores)
+    multi_source = []
+
+    async def verify_relation(concept_a, concept_b, claimed_relation, strength, **kwargs):
+        multi_source.append(concept_b)
+        return {"credibility_score": 0.8, "is_valid": True, "evidence": [], "warnings": []}
+
+    agent.verify_relation = verify_relation
+    return agent, multi_source
+
+
+def concepts(n):
+    return [{"concept_name": f"概念{i}", "reasoning": f"关联{i}", "strength": 0.8} for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_tiered_escalates_only_borderline_scores():
+    # 阈值0.5，边界±0.15：0.4/0.5/0.6 需要多源校验，0.1 和 0.9 由批量结果决定
+    scores = [0.9, 0.1, 0.4, 0.5, 0.6] * 6
+    agent, multi_source = make_agent(scores)
+    items = concepts(30)
+
+    verified = await agent.verify_concepts(items, "熵", strategy=VerificationStrategy.TIERED)
+
+    assert agent.llm_client.calls == 3  # 30个概念按每块10个批量校验
+    assert sorted(multi_source) == sorted(f"概念{i}" for i, s in enumerate(scores) if 0.35 <= s <= 0.65)
+    assert items[0]["credibility"] == 0.9
+    assert items[0]["verification"]["evidence"][0]["content"] == "批量0"
+    assert items[1]["credibility"] == 0.1 and items[1] not in verified
+    assert items[2]["credibility"] == 0.8 and items[2] in verified  # 多源校验结果覆盖批量得分
+    assert [c["concept_name"] for c in verified] == [c["concept_name"] for c in items if c["credibility"] >= 0.5]
+
+
+@pytest.mark.asyncio
+async def test_batch_falls_back_to_multi_source_for_missing_scores():
+    agent, multi_source = make_agent([0.5] * 12)
+    items = concepts(12)
+
+    async def partial(prompt, **kwargs):
+        agent.llm_client.calls += 1
+        if "概念10" in prompt:
+            raise ValueError("invalid json")
+        return [{"index": 1, "credibility_score": 0.45}]
+
+    agent.llm_client.call_json = partial
+    await agent.verify_concepts(items, "熵", strategy=VerificationStrategy.BATCH)
+
+    assert agent.llm_client.calls == 2
+    assert items[0]["credibility"] == 0.45 and "verification" in items[0]
+    # 批量结果缺失的概念（含失败的块）改做多源校验
+    assert multi_source == [f"概念{i}" for i in range(1, 12)]
+
+    with pytest.raises(ValueError):
+        await agent.verify_concepts(items, "熵", strategy="unknown")
+
+
+@pytest.mark.asyncio
+async def test_batch_phase_respects_deadline():
+    """批量校验块超过截止时间按缺失处理，不再等待；默认策略为tiered"""
+    agent, multi_source = make_agent([0.9] * 20)
+    items = concepts(20)
+    fast = agent.llm_client.call_json
+
+    async def slow_second_chunk(prompt, **kwargs):
+        if "概念10" in prompt:
+            await asyncio.sleep(5)
+        return await fast(prompt, **kwargs)
+
+    agent.llm_client.call_json = slow_second_chunk
+    start = asyncio.get_running_loop().time()
+    verified = await agent.verify_concepts(items, "熵", deadline=0.2)
+
+    assert AgentConfig.VERIFY_STRATEGY == VerificationStrategy.TIERED
+    assert asyncio.get_running_loop().time() - start < 1.0
+    assert [c["concept_name"] for c in verified] == [f"概念{i}" for i in range(10)]
+    assert multi_source == []  # 截止时间已到，超时块的概念不再多源校验
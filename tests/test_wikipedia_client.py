@@ -0,0 +1,160 @@
+"""异步Wikipedia客户端单元测试（伪造HTTP响应，不访问外网）"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from algorithms.data_crawler import DataCrawler
+from algorithms.wikipedia_client import WikipediaClient
+
+SUMMARIES = {
+    ("zh", "熵"): {"type": "standard", "title": "熵", "extract": "熵是描述系统混乱程度的物理量。",
+                  "content_urls": {"desktop": {"page": "https://zh.wikipedia.org/wiki/熵"}}},
+    ("en", "Entropy"): {"type": "standard", "title": "Entropy", "extract": "Entropy is a measure of disorder.",
+                        "content_urls": {"desktop": {"page": "https://en.wikipedia.org/wiki/Entropy"}}},
+    ("zh", "网络"): {"type": "disambiguation", "title": "网络", "extract": "网络可以指："},
+    ("zh", "计算机网络"): {"type": "standard", "title": "计算机网络", "extract": "计算机网络是……",
+                      "content_urls": {"desktop": {"page": "https://zh.wikipedia.org/wiki/计算机网络"}}},
+}
+
+
+def fake_get(calls):
+    async def _get(self, url, lang, params=None):
+        calls.append((lang, url, params))
+        await asyncio.sleep(0)
+        assert url.startswith(f"https://{lang}.wikipedia.org/")
+        if "/page/summary/" in url:
+            title = httpx.URL(url).path.split("/page/summary/")[1].replace("_", " ")
+            data = SUMMARIES.get((lang, title))
+            return httpx.Response(200 if data else 404, json=data or {"type": "not_found"})
+        if params.get("prop") == "links":
+            return httpx.Response(200, json={"query": {"pages": [{"title": params["titles"], "links": [{"title": "计算机网络"}]}]}})
+        # 批量接口：标题规范化 + 重定向
+        return httpx.Response(200, json={"query": {
+            "normalized": [{"from": "entropy", "to": "Entropy"}],
+            "redirects": [{"from": "Entropy", "to": "Entropy (physics)"}],
+            "pages": [
+                {"title": "Entropy (physics)", "extract": "Entropy is a measure of disorder.",
+                 "fullurl": "https://en.wikipedia.org/wiki/Entropy_(physics)"},
+                {"title": "Nonexistent", "missing": True},
+            ]
+        }})
+    return _get
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(WikipediaClient, "_get", fake_get(recorded))
+    return recorded
+
+
+@pytest.mark.asyncio
+async def test_per_language_urls_without_global_state(calls):
+    """zh/en并发查询各自使用对应语言的URL"""
+    client = WikipediaClient(api_url="https://zh.wikipedia.org/api/rest_v1")
+
+    zh, en = await asyncio.gather(client.get_summary("熵", "zh"), client.get_summary("Entropy", "en"))
+
+    assert zh["exists"] and zh["summary"].startswith("熵是")
+    assert en["exists"] and en["url"].startswith("https://en.wikipedia.org/")
+    assert client.action_url("en") == "https://en.wikipedia.org/w/api.php"
+
+
+@pytest.mark.asyncio
+async def test_missing_and_disambiguation(calls):
+    client = WikipediaClient()
+
+    missing = await client.get_summary("不存在的概念", "zh")
+    resolved = await client.get_summary("网络", "zh")
+
+    assert missing["exists"] is False
+    assert resolved["exists"] and resolved["title"] == "计算机网络"
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_resolves_redirects(calls):
+    client = WikipediaClient()
+
+    results = await client.get_summaries(["entropy", "Nonexistent", "entropy"], lang="en")
+
+    assert len(calls) == 1  # 一次请求
+    assert calls[0][2]["titles"] == "entropy|Nonexistent"
+    assert results["entropy"]["exists"] and results["entropy"]["title"] == "Entropy (physics)"
+    assert results["Nonexistent"]["exists"] is False
+
+
+@pytest.mark.asyncio
+async def test_data_crawler_uses_async_client(calls):
+    crawler = DataCrawler()
+
+    result = await crawler.verify_concept_exists("熵")
+
+    assert result == {
+        "exists": True,
+        "source": "zh-wiki",
+        "url": "https://zh.wikipedia.org/wiki/熵",
+        "summary": "熵是描述系统混乱程度的物理量。"
+    }
+
+
+def scripted_client(script, **kwargs):
+    """按语言返回预设(延迟, 是否命中)的客户端，记录被取消的请求"""
+    client = WikipediaClient(lookup_mode="hedged", **kwargs)
+    client.cancelled = []
+
+    async def get_summary(title, lang="zh", follow_disambiguation=True):
+        delay, hit = script[lang]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            client.cancelled.append(lang)
+            raise
+        return {"title": title, "summary": f"{lang}摘要" if hit else "", "url": "", "exists": hit, "lang": lang}
+
+    client.get_summary = get_summary
+    return client
+
+
+@pytest.mark.asyncio
+async def test_hedged_prefers_primary_within_grace():
+    """英文先命中，中文在宽限期内命中时仍返回中文"""
+    client = scripted_client({"zh": (0.05, True), "en": (0.01, True)}, hedge_delay=0, preferred_grace=0.2)
+    result = await client.lookup("熵")
+    assert result["lang"] == "zh"
+
+
+@pytest.mark.asyncio
+async def test_hedged_returns_fallback_after_grace_and_cancels_primary():
+    client = scripted_client({"zh": (1.0, True), "en": (0.01, True)}, hedge_delay=0, preferred_grace=0.05)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    result = await client.lookup("Entropy")
+
+    assert result["lang"] == "en"
+    assert loop.time() - start < 0.5
+    await asyncio.sleep(0)
+    assert client.cancelled == ["zh"]
+
+
+@pytest.mark.asyncio
+async def test_hedged_primary_fast_hit_skips_fallback():
+    client = scripted_client({"zh": (0.01, True), "en": (0.01, True)}, hedge_delay=0.2)
+    result = await client.lookup("熵")
+    assert result["lang"] == "zh"
+    assert client.cancelled == []
+
+
+@pytest.mark.asyncio
+async def test_hedged_primary_miss_uses_fallback_and_both_miss():
+    client = scripted_client({"zh": (0.01, False), "en": (0.02, True)}, hedge_delay=0.5)
+    assert (await client.lookup("x"))["lang"] == "en"
+
+    client = scripted_client({"zh": (0.01, False), "en": (0.01, False)}, hedge_delay=0)
+    assert (await client.lookup("x"))["exists"] is False